@@ -0,0 +1,126 @@
+"""
+日志装饰器每次请求的元数据解析开销对比（旧实现：每次调用解析 vs 新实现：装饰时预解析 + User-Agent 有界 LRU）。
+
+在 backend 目录下执行：python -m benchmark.log_annotation_benchmark --number 20000
+"""
+import argparse
+import inspect
+import os
+import sys
+import timeit
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Callable, Dict, List
+from user_agents import parse
+
+USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+    'Chrome/124.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) '
+    'Version/17.4 Safari/605.1.15',
+    'Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) '
+    'Version/17.4 Mobile/15E148 Safari/604.1',
+    'Mozilla/5.0 (X11; Linux x86_64; rv:125.0) Gecko/20100101 Firefox/125.0',
+]
+
+
+async def sample_endpoint(request: Request, page_num: int = 1, query_db: AsyncSession = None, current_user=None):
+    pass
+
+
+def legacy_user_agent(user_agent: str):
+    operator_type = 0
+    if 'Windows' in user_agent or 'Macintosh' in user_agent or 'Linux' in user_agent:
+        operator_type = 1
+    if 'Mobile' in user_agent or 'Android' in user_agent or 'iPhone' in user_agent:
+        operator_type = 2
+    user_agent_info = parse(user_agent)
+    browser = f'{user_agent_info.browser.family}'
+    system_os = f'{user_agent_info.os.family}'
+    if user_agent_info.browser.version != ():
+        browser += f' {user_agent_info.browser.version[0]}'
+    if user_agent_info.os.version != ():
+        system_os += f' {user_agent_info.os.version[0]}'
+    return operator_type, browser, system_os
+
+
+def legacy_parameter_value(func: Callable, name: str, *args, **kwargs):
+    # 旧实现：每次调用重新解析签名并绑定全部参数
+    bound_parameters = inspect.signature(func).bind(*args, **kwargs)
+    bound_parameters.apply_defaults()
+    return bound_parameters.arguments.get(name)
+
+
+def run(number: int) -> List[Dict]:
+    from module_admin.annotation.log_annotation import (
+        get_function_parameter_getter,
+        get_function_parameters_name_by_type,
+        get_function_path,
+        get_operator_type,
+        parse_user_agent,
+    )
+
+    def legacy_metadata(func: Callable, args: tuple, kwargs: dict):
+        # 旧实现：每次请求解析函数路径，并两次解析签名、绑定参数
+        file_path = inspect.getfile(func)
+        relative_path = os.path.relpath(file_path, start=os.getcwd())[0:-2].replace('\\', '.').replace('/', '.')
+        func_path = f'{relative_path}{func.__name__}()'
+        request_name_list = get_function_parameters_name_by_type(func, Request)
+        request = legacy_parameter_value(func, request_name_list[0], *args, **kwargs)
+        session_name_list = get_function_parameters_name_by_type(func, AsyncSession)
+        query_db = legacy_parameter_value(func, session_name_list[0], *args, **kwargs)
+        return func_path, request, query_db
+
+    kwargs = dict(request=object(), page_num=1, query_db=object(), current_user=object())
+    signature = inspect.signature(sample_endpoint)
+    func_path = get_function_path(sample_endpoint)
+    get_request = get_function_parameter_getter(signature, 'request')
+    get_query_db = get_function_parameter_getter(signature, 'query_db')
+
+    def precomputed_metadata():
+        return func_path, get_request((), kwargs), get_query_db((), kwargs)
+
+    user_agent_index = iter(range(10**12))
+
+    def next_user_agent():
+        return USER_AGENTS[next(user_agent_index) % len(USER_AGENTS)]
+
+    def cached_user_agent():
+        user_agent = next_user_agent()
+        return get_operator_type(user_agent), *parse_user_agent(user_agent)
+
+    cases = [
+        ('函数路径与参数解析', lambda: legacy_metadata(sample_endpoint, (), kwargs), precomputed_metadata),
+        ('User-Agent 解析', lambda: legacy_user_agent(next_user_agent()), cached_user_agent),
+    ]
+    results = []
+    for name, legacy, current in cases:
+        legacy_seconds = min(timeit.repeat(legacy, number=number, repeat=3)) / number
+        current_seconds = min(timeit.repeat(current, number=number, repeat=3)) / number
+        results.append(
+            dict(
+                name=name,
+                legacy_us=legacy_seconds * 1e6,
+                current_us=current_seconds * 1e6,
+                speedup=legacy_seconds / current_seconds,
+            )
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Log decorator per-request overhead micro-benchmark')
+    parser.add_argument('--number', type=int, default=20000, help='Calls per timing round')
+    args, rest = parser.parse_known_args()
+    # config.env 会解析命令行中的 --env，导入应用模块前去掉本脚本的参数
+    sys.argv = [sys.argv[0], *rest]
+    print(f'{"场景":<20}{"旧实现(us/次)":>16}{"新实现(us/次)":>16}{"加速比":>10}')
+    for result in run(args.number):
+        print(
+            f'{result["name"]:<20}{result["legacy_us"]:>16.2f}{result["current_us"]:>16.2f}'
+            f'{result["speedup"]:>10.1f}x'
+        )
+
+
+if __name__ == '__main__':
+    main()
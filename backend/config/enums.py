@@ -49,3 +49,9 @@ class RedisInitKeyConfig(Enum):
     ACCOUNT_LOCK = {'key': 'account_lock', 'remark': '用户锁定'}
     PASSWORD_ERROR_COUNT = {'key': 'password_error_count', 'remark': '密码错误次数'}
     SMS_CODE = {'key': 'sms_code', 'remark': '短信验证码'}
+    USER_SNAPSHOT = {'key': 'user_snapshot', 'remark': '用户权限快照'}
+    USER_SNAPSHOT_VERSION = {'key': 'user_snapshot_version', 'remark': '用户权限快照版本'}
+    IP_LOCATION = {'key': 'ip_location', 'remark': 'IP归属区域'}
+    JOB_DISPATCH = {'key': 'job_dispatch', 'remark': '定时任务分发队列'}
+    JOB_SCHEDULER_LEADER = {'key': 'job_scheduler_leader', 'remark': '定时任务调度主节点锁'}
+    JOB_CHANGED = {'key': 'job_changed', 'remark': '定时任务变更通知频道'}
@@ -21,7 +21,20 @@ class AppSettings(BaseSettings):
     app_version: str = '1.0.0'
     app_reload: bool = True
     app_ip_location_query: bool = True
+    app_ip_location_db_file: str = ''
+    app_ip_location_remote_url: str = 'https://qifu-api.baidubce.com/ip/geo/v1/district?ip={ip}'
+    app_ip_location_remote_timeout: float = 2
+    app_ip_location_cache_expire_hours: int = 24
     app_same_time_login: bool = True
+    app_user_snapshot_cache: bool = True
+    app_user_snapshot_lru_size: int = 1024
+    app_user_snapshot_expire_minutes: int = 30
+    app_log_async_write: bool = True
+    app_log_queue_size: int = 10000
+    app_log_batch_size: int = 200
+    app_log_flush_ms: int = 500
+    app_log_overflow_policy: Literal['drop', 'spill'] = 'spill'
+    app_log_spill_file: str = 'logs/log_spill.jsonl'
 
 
 class JwtSettings(BaseSettings):
@@ -33,6 +46,8 @@ class JwtSettings(BaseSettings):
     jwt_algorithm: str = 'HS256'
     jwt_expire_minutes: int = 1440
     jwt_redis_expire_minutes: int = 30
+    jwt_redis_refresh_ratio: float = 0.5
+    jwt_session_memo_seconds: float = 2
 
 
 class DataBaseSettings(BaseSettings):
@@ -71,6 +86,19 @@ class RedisSettings(BaseSettings):
     redis_database: int = 2
 
 
+class JobSettings(BaseSettings):
+    """
+    定时任务配置
+    """
+
+    job_dispatch_mode: Literal['local', 'distributed'] = 'local'
+    job_stream_maxlen: int = 10000
+    job_consumer_group: str = 'job_workers'
+    job_leader_lock_seconds: int = 30
+    job_worker_concurrency: str = 'default:4,sqlalchemy:4,redis:4'
+    job_worker_claim_idle_seconds: int = 300
+
+
 class MinioSettings(BaseSettings):
     """
     Minio配置
@@ -195,6 +223,14 @@ class GetConfig:
         # 实例化Redis配置模型
         return RedisSettings()
 
+    @lru_cache()
+    def get_job_config(self):
+        """
+        获取定时任务配置
+        """
+        # 实例化定时任务配置模型
+        return JobSettings()
+
     @lru_cache()
     def get_minio_config(self):
         """
@@ -256,6 +292,8 @@ JwtConfig = get_config.get_jwt_config()
 DataBaseConfig = get_config.get_database_config()
 # Redis配置
 RedisConfig = get_config.get_redis_config()
+# 定时任务配置
+JobConfig = get_config.get_job_config()
 # Minio配置
 MinioConfig = get_config.get_minio_config()
 # 代码生成配置
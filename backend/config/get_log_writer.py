@@ -0,0 +1,202 @@
+import asyncio
+import json
+import os
+import time
+from typing import Dict, List, Literal, Optional, Tuple, Union
+from config.database import AsyncSessionLocal
+from config.env import AppConfig
+from module_admin.dao.log_dao import LoginLogDao, OperationLogDao
+from module_admin.entity.vo.log_vo import LogininforModel, OperLogModel
+from utils.log_util import logger
+
+LogRecord = Tuple[Literal['login', 'operation'], Union[LogininforModel, OperLogModel]]
+
+
+class LogWriterUtil:
+    """
+    操作日志、登录日志异步批量写入
+
+    日志装饰器只将日志放入有界队列，后台任务每攒满 batch_size 条或距上次写入超过 flush_ms 毫秒时批量入库。
+    队列已满或入库失败时，按溢出策略丢弃或追加写入溢出文件，溢出文件在下次启动时补录。
+    """
+
+    _queue: Optional[asyncio.Queue] = None
+    _task: Optional[asyncio.Task] = None
+    _stats: Dict[str, float] = dict(
+        enqueued=0, written=0, dropped=0, spilled=0, failed_batches=0, max_queue_size=0, last_flush_ms=0
+    )
+    _last_drop_warning = 0.0
+
+    @classmethod
+    async def init_log_writer(cls):
+        """
+        应用启动时启动日志写入任务，并补录上次遗留的溢出文件
+
+        :return:
+        """
+        if not AppConfig.app_log_async_write:
+            return
+        await cls.__replay_spill_file()
+        cls._queue = asyncio.Queue(maxsize=AppConfig.app_log_queue_size)
+        cls._task = asyncio.create_task(cls.__run())
+        logger.info('日志异步写入任务已启动')
+
+    @classmethod
+    async def close_log_writer(cls):
+        """
+        应用关闭时写入队列中剩余日志并停止写入任务
+
+        :return:
+        """
+        if cls._task is None:
+            return
+        # 放入结束标记，写入任务处理完标记前的日志后退出
+        await cls._queue.put(None)
+        await cls._task
+        records = []
+        while not cls._queue.empty():
+            record = cls._queue.get_nowait()
+            if record is not None:
+                records.append(record)
+        if records:
+            await cls.__flush(records)
+        cls._queue = None
+        cls._task = None
+        logger.info('日志异步写入任务已停止')
+
+    @classmethod
+    def is_running(cls) -> bool:
+        """
+        日志写入任务是否运行中，未运行时调用方应同步写入
+
+        :return: 是否运行中
+        """
+        return cls._task is not None and not cls._task.done()
+
+    @classmethod
+    def submit(cls, log_type: Literal['login', 'operation'], log: Union[LogininforModel, OperLogModel]):
+        """
+        提交日志，不等待入库
+
+        :param log_type: 日志类型（login表示登录日志，operation表示为操作日志）
+        :param log: 日志对象
+        :return:
+        """
+        try:
+            cls._queue.put_nowait((log_type, log))
+        except asyncio.QueueFull:
+            cls.__overflow([(log_type, log)])
+            return
+        cls._stats['enqueued'] += 1
+        cls._stats['max_queue_size'] = max(cls._stats['max_queue_size'], cls._queue.qsize())
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, float]:
+        """
+        获取写入统计，用于观察积压情况
+
+        :return: 当前队列长度、队列容量及累计入队、写入、丢弃、溢出条数等
+        """
+        return dict(
+            running=cls.is_running(),
+            queue_size=cls._queue.qsize() if cls._queue is not None else 0,
+            queue_capacity=AppConfig.app_log_queue_size,
+            overflow_policy=AppConfig.app_log_overflow_policy,
+            **cls._stats,
+        )
+
+    @classmethod
+    async def __run(cls):
+        batch_size = AppConfig.app_log_batch_size
+        flush_seconds = AppConfig.app_log_flush_ms / 1000
+        while True:
+            record = await cls._queue.get()
+            if record is None:
+                return
+            records = [record]
+            deadline = time.monotonic() + flush_seconds
+            stopping = False
+            while len(records) < batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    record = await asyncio.wait_for(cls._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if record is None:
+                    stopping = True
+                    break
+                records.append(record)
+            await cls.__flush(records)
+            if stopping:
+                return
+
+    @classmethod
+    async def __flush(cls, records: List[LogRecord]):
+        start_time = time.monotonic()
+        login_log_list = [log for log_type, log in records if log_type == 'login']
+        operation_log_list = [log for log_type, log in records if log_type == 'operation']
+        try:
+            async with AsyncSessionLocal() as session:
+                if login_log_list:
+                    await LoginLogDao.add_login_log_batch_dao(session, login_log_list)
+                if operation_log_list:
+                    await OperationLogDao.add_operation_log_batch_dao(session, operation_log_list)
+                await session.commit()
+        except Exception as e:
+            cls._stats['failed_batches'] += 1
+            logger.error(f'日志批量写入失败，共{len(records)}条，详细错误信息：{e}')
+            cls.__overflow(records)
+            return
+        cls._stats['written'] += len(records)
+        cls._stats['last_flush_ms'] = round((time.monotonic() - start_time) * 1000, 2)
+
+    @classmethod
+    def __overflow(cls, records: List[LogRecord]):
+        if AppConfig.app_log_overflow_policy == 'spill':
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(AppConfig.app_log_spill_file)), exist_ok=True)
+                with open(AppConfig.app_log_spill_file, 'a', encoding='utf-8') as f:
+                    for log_type, log in records:
+                        f.write(
+                            json.dumps(
+                                dict(log_type=log_type, log=log.model_dump(mode='json', by_alias=True)),
+                                ensure_ascii=False,
+                            )
+                            + '\n'
+                        )
+                cls._stats['spilled'] += len(records)
+                return
+            except OSError as e:
+                logger.error(f'日志写入溢出文件失败，详细错误信息：{e}')
+        cls._stats['dropped'] += len(records)
+        # 丢弃告警每分钟最多输出一次，避免积压时刷屏
+        if time.monotonic() - cls._last_drop_warning > 60:
+            cls._last_drop_warning = time.monotonic()
+            logger.warning(f'日志队列已满或写入失败，已丢弃{int(cls._stats["dropped"])}条日志')
+
+    @classmethod
+    async def __replay_spill_file(cls):
+        spill_file = AppConfig.app_log_spill_file
+        # 先改名再补录，补录失败的日志重新写入溢出文件；上次补录中断遗留的文件优先处理
+        replay_file = f'{spill_file}.replay'
+        if os.path.exists(spill_file) and not os.path.exists(replay_file):
+            os.replace(spill_file, replay_file)
+        if not os.path.exists(replay_file):
+            return
+        records: List[LogRecord] = []
+        with open(replay_file, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    data = json.loads(line)
+                    model = LogininforModel if data.get('log_type') == 'login' else OperLogModel
+                    records.append((data.get('log_type'), model.model_validate(data.get('log'))))
+                except Exception as e:
+                    logger.warning(f'溢出日志解析失败，已跳过，详细错误信息：{e}')
+        for index in range(0, len(records), AppConfig.app_log_batch_size):
+            await cls.__flush(records[index : index + AppConfig.app_log_batch_size])
+        os.remove(replay_file)
+        logger.info(f'溢出日志补录完成，共{len(records)}条')
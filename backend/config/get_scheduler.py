@@ -1,4 +1,10 @@
+import asyncio
 import json
+import os
+import queue
+import socket
+import threading
+import time
 from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR, EVENT_JOB_MISSED, EVENT_JOB_SUBMITTED
 from apscheduler.executors.asyncio import AsyncIOExecutor
 from apscheduler.executors.pool import ProcessPoolExecutor
@@ -10,17 +16,18 @@ from apscheduler.triggers.combining import OrTrigger
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.date import DateTrigger
 from asyncio import iscoroutinefunction
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from sqlalchemy.engine import create_engine
-from sqlalchemy.orm import sessionmaker
-from typing import Optional, Union
+from sqlalchemy.orm import Session, sessionmaker
+from typing import Dict, List, Optional, Union
 from config.database import AsyncSessionLocal, quote_plus
-from config.env import DataBaseConfig, RedisConfig
+from config.enums import RedisInitKeyConfig
+from config.env import DataBaseConfig, JobConfig, RedisConfig
 from module_admin.dao.job_dao import JobDao
 from module_admin.dao.job_log_dao import JobLogDao
 from module_admin.entity.do.job_do import SysJob
 from module_admin.entity.vo.job_vo import JobLogModel, JobModel
-from module_admin.service.job_log_service import JobLogService
 from utils.log_util import logger
 import module_task  # noqa: F401
 
@@ -121,25 +128,56 @@ scheduler = AsyncIOScheduler()
 scheduler.configure(jobstores=job_stores, executors=executors, job_defaults=job_defaults)
 
 
+async def dispatch_scheduler_job(**job_message):
+    """
+    分布式模式下调度器触发的任务函数：将到期任务写入分发队列，由job_worker执行invoke_target
+    """
+    await SchedulerUtil.dispatch_job(job_message)
+
+
 class SchedulerUtil:
     """
     定时任务相关方法
     """
 
+    # KEYS: 主节点锁键 ARGV: 实例标识、锁有效期（毫秒）
+    LEADER_RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+    LEADER_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+    _redis = None
+    _leader_task: Optional[asyncio.Task] = None
+    _job_change_task: Optional[asyncio.Task] = None
+    _is_leader = False
+    _instance_id = f'{socket.gethostname()}:{os.getpid()}'
+
     @classmethod
-    async def init_system_scheduler(cls):
+    async def init_system_scheduler(cls, redis=None):
         """
         应用启动时初始化定时任务
 
+        :param redis: redis连接对象，分布式模式下用于主节点选举及任务分发
         :return:
         """
         logger.info('开始启动定时任务...')
-        scheduler.start()
-        async with AsyncSessionLocal() as session:
-            job_list = await JobDao.get_job_list_for_scheduler(session)
-            for item in job_list:
-                cls.remove_scheduler_job(job_id=str(item.job_id))
-                cls.add_scheduler_job(item)
+        job_log_writer.start()
+        if JobConfig.job_dispatch_mode == 'distributed':
+            # 各实例均以暂停状态启动调度器，仅获得主节点锁的实例恢复调度，避免多副本重复触发
+            cls._redis = redis
+            scheduler.start(paused=True)
+            cls._leader_task = asyncio.create_task(cls.__run_leader_election())
+        else:
+            scheduler.start()
+            await cls.__load_scheduler_jobs()
         scheduler.add_listener(
             cls.scheduler_event_listener,
             EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED | EVENT_JOB_SUBMITTED,
@@ -153,9 +191,184 @@ class SchedulerUtil:
 
         :return:
         """
+        if cls._leader_task is not None:
+            cls._leader_task.cancel()
+            cls._leader_task = None
+            cls.__stop_job_change_listener()
+            if cls._is_leader:
+                try:
+                    await cls._redis.eval(
+                        cls.LEADER_RELEASE_SCRIPT, 1, RedisInitKeyConfig.JOB_SCHEDULER_LEADER.key, cls._instance_id
+                    )
+                except Exception as e:
+                    logger.warning(f'释放定时任务主节点锁失败，详细错误信息：{e}')
+                cls._is_leader = False
         scheduler.shutdown()
+        await job_log_writer.stop()
         logger.info('关闭定时任务成功')
 
+    @classmethod
+    async def __load_scheduler_jobs(cls):
+        async with AsyncSessionLocal() as session:
+            job_list = await JobDao.get_job_list_for_scheduler(session)
+            # 任务存储可持久化，先移除库中已删除或已暂停的任务，避免本实例成为主节点后仍按旧任务触发
+            job_ids = {str(item.job_id) for item in job_list}
+            for job in scheduler.get_jobs():
+                if job.id.removesuffix('_immediate') not in job_ids:
+                    scheduler.remove_job(job_id=job.id)
+            for item in job_list:
+                cls.remove_scheduler_job(job_id=str(item.job_id))
+                cls.add_scheduler_job(item)
+
+    @classmethod
+    async def __run_leader_election(cls):
+        lock_key = RedisInitKeyConfig.JOB_SCHEDULER_LEADER.key
+        lock_ms = JobConfig.job_leader_lock_seconds * 1000
+        last_renewed = 0.0
+        while True:
+            try:
+                if cls._is_leader:
+                    if await cls._redis.eval(cls.LEADER_RENEW_SCRIPT, 1, lock_key, cls._instance_id, lock_ms):
+                        last_renewed = time.monotonic()
+                    else:
+                        cls.__step_down('主节点锁已被其他实例持有')
+                elif await cls._redis.set(lock_key, cls._instance_id, nx=True, px=lock_ms):
+                    last_renewed = time.monotonic()
+                    try:
+                        # 非主节点期间其他实例可能修改过任务，成为主节点时按数据库重新加载
+                        await cls.__load_scheduler_jobs()
+                    except Exception:
+                        # 加载失败时立即释放锁，避免持锁却不续期，导致锁过期前所有实例都无法调度
+                        await cls._redis.eval(cls.LEADER_RELEASE_SCRIPT, 1, lock_key, cls._instance_id)
+                        raise
+                    cls._is_leader = True
+                    cls._job_change_task = asyncio.create_task(cls.__run_job_change_listener())
+                    scheduler.resume()
+                    logger.info(f'当前实例成为定时任务调度主节点：{cls._instance_id}')
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f'定时任务主节点选举失败，详细错误信息：{e}')
+                # 锁过期前主动让出调度，避免与新主节点同时触发
+                if cls._is_leader and time.monotonic() - last_renewed >= JobConfig.job_leader_lock_seconds * 2 / 3:
+                    cls.__step_down('主节点锁续期超时')
+            await asyncio.sleep(JobConfig.job_leader_lock_seconds / 3)
+
+    @classmethod
+    def __step_down(cls, reason: str):
+        scheduler.pause()
+        cls._is_leader = False
+        cls.__stop_job_change_listener()
+        logger.warning(f'当前实例不再是定时任务调度主节点：{reason}')
+
+    @classmethod
+    def __stop_job_change_listener(cls):
+        if cls._job_change_task is not None:
+            cls._job_change_task.cancel()
+            cls._job_change_task = None
+
+    @classmethod
+    async def __run_job_change_listener(cls):
+        # 其他实例处理的新增、修改、暂停、删除只作用于其自身暂停中的调度器，主节点按通知从数据库重新加载对应任务
+        while True:
+            try:
+                async with cls._redis.pubsub() as pubsub:
+                    await pubsub.subscribe(RedisInitKeyConfig.JOB_CHANGED.key)
+                    async for message in pubsub.listen():
+                        if message.get('type') != 'message':
+                            continue
+                        for job_id in str(message.get('data') or '').split(','):
+                            if job_id:
+                                await cls.reload_scheduler_job(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f'定时任务变更通知处理失败，详细错误信息：{e}')
+                await asyncio.sleep(1)
+
+    @classmethod
+    async def reload_scheduler_job(cls, job_id: Union[str, int]):
+        """
+        按数据库中的任务配置重新加载单个任务，任务已删除或已暂停时从调度器移除
+
+        :param job_id: 任务id
+        :return:
+        """
+        async with AsyncSessionLocal() as session:
+            job_info = await JobDao.get_job_detail_by_id(session, int(job_id))
+        cls.remove_scheduler_job(job_id=str(job_id))
+        if job_info and job_info.status == '0':
+            cls.add_scheduler_job(job_info)
+
+    @classmethod
+    async def notify_jobs_changed(cls, job_ids: List[Union[str, int]]):
+        """
+        分布式模式下通知主节点任务已变更，由主节点从数据库重新加载
+
+        :param job_ids: 已变更的任务id列表
+        :return:
+        """
+        if JobConfig.job_dispatch_mode != 'distributed' or cls._redis is None or not job_ids:
+            return
+        try:
+            await cls._redis.publish(RedisInitKeyConfig.JOB_CHANGED.key, ','.join(str(job_id) for job_id in job_ids))
+        except Exception as e:
+            logger.error(f'定时任务变更通知发送失败，主节点切换前变更不生效，详细错误信息：{e}')
+
+    @classmethod
+    def get_dispatch_stream_key(cls, job_group: str):
+        """
+        获取任务组对应的分发队列键名，每个任务组一个stream，便于按任务组独立设置执行并发
+
+        :param job_group: 任务组名
+        :return: 分发队列键名
+        """
+        return f'{RedisInitKeyConfig.JOB_DISPATCH.key}:{job_group or "default"}'
+
+    @classmethod
+    async def dispatch_job(cls, job_message: dict):
+        """
+        将任务写入分发队列
+
+        :param job_message: 任务消息
+        :return:
+        """
+        await cls._redis.xadd(
+            cls.get_dispatch_stream_key(job_message.get('job_group')),
+            dict(job_message, dispatched_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S')),
+            maxlen=JobConfig.job_stream_maxlen,
+            approximate=True,
+        )
+
+    @staticmethod
+    def __build_job_message(job_info: JobModel, job_id: str, job_trigger: str):
+        return dict(
+            job_id=job_id,
+            job_name=job_info.job_name or '',
+            job_group=job_info.job_group or 'default',
+            job_executor=job_info.job_executor or 'default',
+            invoke_target=job_info.invoke_target,
+            job_args=job_info.job_args or '',
+            job_kwargs=job_info.job_kwargs or '',
+            job_trigger=job_trigger,
+        )
+
+    @classmethod
+    def __get_job_target(cls, job_info: JobModel, job_id: str, job_trigger: str):
+        if JobConfig.job_dispatch_mode == 'distributed':
+            # 调度器只负责分发，invoke_target由job_worker执行
+            return dispatch_scheduler_job, 'default', None, cls.__build_job_message(job_info, job_id, job_trigger)
+        job_func = eval(job_info.invoke_target)
+        job_executor = job_info.job_executor
+        if iscoroutinefunction(job_func):
+            job_executor = 'default'
+        return (
+            job_func,
+            job_executor,
+            job_info.job_args.split(',') if job_info.job_args else None,
+            json.loads(job_info.job_kwargs) if job_info.job_kwargs else None,
+        )
+
     @classmethod
     def get_scheduler_job(cls, job_id: Union[str, int]):
         """
@@ -176,15 +389,14 @@ class SchedulerUtil:
         :param job_info: 任务对象信息
         :return:
         """
-        job_func = eval(job_info.invoke_target)
-        job_executor = job_info.job_executor
-        if iscoroutinefunction(job_func):
-            job_executor = 'default'
+        job_func, job_executor, job_args, job_kwargs = cls.__get_job_target(
+            job_info, str(job_info.job_id), job_info.cron_expression
+        )
         scheduler.add_job(
-            func=eval(job_info.invoke_target),
+            func=job_func,
             trigger=MyCronTrigger.from_crontab(job_info.cron_expression),
-            args=job_info.job_args.split(',') if job_info.job_args else None,
-            kwargs=json.loads(job_info.job_kwargs) if job_info.job_kwargs else None,
+            args=job_args,
+            kwargs=job_kwargs,
             id=str(job_info.job_id),
             name=job_info.job_name,
             misfire_grace_time=1000000000000 if job_info.misfire_policy == '3' else None,
@@ -195,23 +407,25 @@ class SchedulerUtil:
         )
 
     @classmethod
-    def execute_scheduler_job_once(cls, job_info: JobModel):
+    async def execute_scheduler_job_once(cls, job_info: JobModel):
         """
         立即执行一次：添加一个仅触发一次的任务（id 带 _immediate），使用传入的 job_info（含临时 kwargs）。
         不删除、不覆盖原定时任务，后续 cron 仍使用数据库中保存的配置。
+        分布式模式下直接写入分发队列，非主节点实例也可立即执行。
         """
-        job_func = eval(job_info.invoke_target)
-        job_executor = job_info.job_executor
-        if iscoroutinefunction(job_func):
-            job_executor = 'default'
+        job_id = str(job_info.job_id) + '_immediate'
+        if JobConfig.job_dispatch_mode == 'distributed':
+            await cls.dispatch_job(cls.__build_job_message(job_info, job_id, 'date'))
+            return
+        job_func, job_executor, job_args, job_kwargs = cls.__get_job_target(job_info, job_id, 'date')
         # 仅本次触发，不绑定 cron，避免覆盖原任务的 kwargs
         job_trigger = DateTrigger()
         scheduler.add_job(
-            func=eval(job_info.invoke_target),
+            func=job_func,
             trigger=job_trigger,
-            args=job_info.job_args.split(',') if job_info.job_args else None,
-            kwargs=json.loads(job_info.job_kwargs) if job_info.job_kwargs else None,
-            id=str(job_info.job_id) + '_immediate',
+            args=job_args,
+            kwargs=job_kwargs,
+            id=job_id,
             name=job_info.job_name,
             misfire_grace_time=1000000000000 if job_info.misfire_policy == '3' else None,
             coalesce=True if job_info.misfire_policy == '2' else False,
@@ -247,6 +461,9 @@ class SchedulerUtil:
 
     @classmethod
     def scheduler_event_listener(cls, event):
+        """
+        任务事件监听：只整理日志数据并放入写入队列，数据库读写由JobLogWriter后台线程完成，不阻塞事件循环
+        """
         if not hasattr(event, 'job_id'):
             return
 
@@ -254,20 +471,30 @@ class SchedulerUtil:
         log_job_id = cls._main_job_id(job_id)
         if log_job_id is None:
             return
-        scheduled_run_time = cls._normalize_datetime(getattr(event, 'scheduled_run_time', None))
         event_type = event.__class__.__name__
+        if JobConfig.job_dispatch_mode == 'distributed' and event.code & (EVENT_JOB_SUBMITTED | EVENT_JOB_EXECUTED):
+            # 分布式模式下调度器只负责分发，执行日志由job_worker写入，此处仅记录分发失败及错过触发
+            return
+        # 任务信息在事件发生时从内存中的调度器读取；仅触发一次的任务（如 _immediate）执行结束时可能已被移除
+        job_detail = cls._get_job_detail_from_scheduler(job_id)
 
         if event.code & EVENT_JOB_SUBMITTED:
-            job_detail = cls._get_job_detail(job_id)
-            cls._create_job_log(
-                job_id=log_job_id,
-                start_time=scheduled_run_time or datetime.now().replace(microsecond=0),
-                status='2',
-                job_message=f'事件类型: {event_type}, 任务ID: {job_id}, 执行开始',
-                job_detail=job_detail,
+            # 提交事件携带本次提交的全部计划执行时间，执行事件按 任务id + 计划执行时间 与之关联
+            run_times = [cls._normalize_datetime(run_time) for run_time in getattr(event, 'scheduled_run_times', [])]
+            job_log_writer.submit(
+                JobLogWriter.CREATE,
+                dict(
+                    job_id=job_id,
+                    log_job_id=log_job_id,
+                    run_keys=[(str(job_id), run_time) for run_time in run_times],
+                    start_time=datetime.now().replace(microsecond=0),
+                    job_message=f'事件类型: {event_type}, 任务ID: {job_id}, 执行开始',
+                    job_detail=job_detail,
+                ),
             )
             return
 
+        scheduled_run_time = cls._normalize_datetime(getattr(event, 'scheduled_run_time', None))
         status = '0'
         exception_info = ''
         if event.code & EVENT_JOB_ERROR:
@@ -278,7 +505,33 @@ class SchedulerUtil:
             exception_info = '任务触发错过'
 
         job_result = getattr(event, 'retval', None) if event.code & EVENT_JOB_EXECUTED else None
-        if (event.code & EVENT_JOB_EXECUTED) and isinstance(job_result, dict):
+        job_log_writer.submit(
+            JobLogWriter.FINISH,
+            dict(
+                job_id=job_id,
+                log_job_id=log_job_id,
+                run_key=(str(job_id), scheduled_run_time),
+                start_time=scheduled_run_time or datetime.now().replace(microsecond=0),
+                job_detail=job_detail,
+                update_data=cls.build_job_log_update_data(job_id, event_type, status, exception_info, job_result),
+            ),
+        )
+
+    @classmethod
+    def build_job_log_update_data(
+        cls, job_id: Union[str, int], event_type: str, status: str, exception_info: str, job_result
+    ) -> dict:
+        """
+        根据执行结果生成任务日志的结束字段
+
+        :param job_id: 任务id
+        :param event_type: 事件类型
+        :param status: 执行状态（0正常 1失败 3异常）
+        :param exception_info: 异常信息
+        :param job_result: 任务函数返回值
+        :return: 任务日志更新字段
+        """
+        if isinstance(job_result, dict):
             result_status = job_result.get('status')
             if result_status == 'failed':
                 status = '1'
@@ -290,38 +543,15 @@ class SchedulerUtil:
         _EXCEPTION_INFO_MAX_LEN = 500
         if len(exception_info) > _EXCEPTION_INFO_MAX_LEN:
             exception_info = exception_info[:_EXCEPTION_INFO_MAX_LEN].rstrip() + '...'
-        job_message = f'事件类型: {event_type}, 任务ID: {job_id}, 执行于{datetime.now().strftime("%Y-%m-%d %H:%M:%S")}'
-
-        # 优先用任务日志主键 id 更新，避免 job_id + start_time 不一致导致更新不到；失败时再用「执行中」的 start_time 兜底
-        session = SessionLocal()
-        try:
-            job_log_id = JobLogDao.get_latest_running_log_id(session, int(log_job_id))
-            fallback_start = JobLogDao.get_latest_running_log_start_time(session, int(log_job_id)) if job_log_id is None else None
-        finally:
-            session.close()
-
-        if job_log_id is not None:
-            cls._update_job_log_by_id(
-                job_log_id=job_log_id,
-                status=status,
-                exception_info=exception_info,
-                job_result=job_result,
-                job_message=job_message,
-            )
-        else:
-            # 无主键时用「执行中」日志的 start_time 更新，避免 EXECUTED 的 scheduled_run_time 与 SUBMITTED 不一致
-            update_start_time = (
-                cls._normalize_datetime(fallback_start) if fallback_start is not None
-                else (cls._normalize_datetime(scheduled_run_time) or datetime.now().replace(microsecond=0))
-            )
-            cls._update_job_log(
-                job_id=log_job_id,
-                start_time=update_start_time,
-                status=status,
-                exception_info=exception_info,
-                job_result=job_result,
-                job_message=job_message,
-            )
+        return {
+            'status': status,
+            'exception_info': exception_info,
+            'job_result': cls._serialize_job_result(job_result),
+            'end_time': datetime.now().replace(microsecond=0),
+            'job_message': (
+                f'事件类型: {event_type}, 任务ID: {job_id}, 执行于{datetime.now().strftime("%Y-%m-%d %H:%M:%S")}'
+            ),
+        }
 
     @staticmethod
     def _normalize_datetime(value):
@@ -351,30 +581,29 @@ class SchedulerUtil:
         }
 
     @classmethod
-    def _get_job_detail_from_db(cls, job_id: Union[str, int]):
-        session = SessionLocal()
+    def _get_job_detail_from_db(cls, job_id: Union[str, int], session: Optional[Session] = None):
+        db_id = cls._main_job_id(job_id)
+        if db_id is None:
+            return None
+        # 传入会话时复用调用方的事务，否则单独开启会话
+        query_session = session or SessionLocal()
         try:
-            db_id = cls._main_job_id(job_id)
-            if db_id is None:
-                return None
-            db_job = session.query(SysJob).filter(SysJob.job_id == int(db_id)).first()
-            if not db_job:
-                return None
-            return {
-                'job_name': db_job.job_name,
-                'job_group': db_job.job_group,
-                'job_executor': db_job.job_executor,
-                'invoke_target': db_job.invoke_target,
-                'job_args': db_job.job_args or '',
-                'job_kwargs': db_job.job_kwargs or '',
-                'job_trigger': db_job.cron_expression or '',
-            }
+            db_job = query_session.query(SysJob).filter(SysJob.job_id == int(db_id)).first()
         finally:
-            session.close()
-
-    @classmethod
-    def _get_job_detail(cls, job_id: Union[str, int]):
-        return cls._get_job_detail_from_scheduler(job_id) or cls._get_job_detail_from_db(job_id) or {}
+            if session is None:
+                query_session.close()
+        if not db_job:
+            return None
+        return {
+            'job_name': db_job.job_name,
+            'job_group': db_job.job_group,
+            'job_executor': db_job.job_executor,
+            'invoke_target': db_job.invoke_target,
+            'job_args': db_job.job_args or '',
+            'job_kwargs': db_job.job_kwargs or '',
+            # 立即执行一次的任务不使用cron表达式触发
+            'job_trigger': 'date' if str(job_id).endswith('_immediate') else db_job.cron_expression or '',
+        }
 
     @staticmethod
     def _serialize_job_result(result) -> str:
@@ -398,22 +627,110 @@ class SchedulerUtil:
         except Exception:
             return str(result)[:2000]
 
-    @classmethod
-    def _create_job_log(
-        cls,
+
+class JobLogWriter:
+    """
+    定时任务日志后台写入线程
+
+    任务事件监听只将日志操作放入队列，由本线程按批次在同一事务中写入；
+    提交事件写入「执行中」日志后记录 (任务id, 计划执行时间) -> 日志主键，执行结束事件据此按主键更新，无需再查询最近一条执行中日志。
+    """
+
+    CREATE = 'create'
+    FINISH = 'finish'
+    # 单批最多处理的操作数
+    BATCH_SIZE = 100
+    # 未收到结束事件的日志主键最多保留条数，超出时丢弃最早的记录
+    PENDING_LIMIT = 10000
+
+    def __init__(self):
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._pending: 'OrderedDict[tuple, int]' = OrderedDict()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self.__run, name='job-log-writer', daemon=True)
+        self._thread.start()
+
+    async def stop(self, timeout: float = 10):
+        if self._thread is None:
+            return
+        # 放入结束标记，写完标记前的日志后退出
+        self._queue.put(None)
+        await asyncio.to_thread(self._thread.join, timeout)
+        self._thread = None
+
+    def submit(self, op_type: str, data: dict):
+        if self._thread is None:
+            # 写入线程未启动（如脚本中直接调度任务）时同步写入
+            self.__write_batch([(op_type, data)])
+            return
+        self._queue.put((op_type, data))
+
+    def __run(self):
+        while True:
+            op = self._queue.get()
+            if op is None:
+                return
+            batch = [op]
+            stopping = False
+            # 积压时一次取出多条，合并为一个事务写入
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    op = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if op is None:
+                    stopping = True
+                    break
+                batch.append(op)
+            self.__write_batch(batch)
+            if stopping:
+                return
+
+    def __write_batch(self, batch: List[tuple]):
+        created: Dict[tuple, int] = {}
+        finished: List[tuple] = []
+        try:
+            with SessionLocal() as session:
+                for op_type, data in batch:
+                    if op_type == self.CREATE:
+                        self.__create(session, data, created)
+                    else:
+                        self.__finish(session, data, created, finished)
+                session.commit()
+        except Exception as e:
+            if len(batch) > 1:
+                # 批量写入失败时逐条重试，避免单条异常数据影响同批其他日志
+                for op in batch:
+                    self.__write_batch([op])
+            else:
+                logger.error(f'定时任务日志写入失败，详细错误信息：{e}')
+            return
+        # 事务提交成功后再更新主键映射
+        self._pending.update(created)
+        for run_key in finished:
+            self._pending.pop(run_key, None)
+        while len(self._pending) > self.PENDING_LIMIT:
+            self._pending.popitem(last=False)
+
+    @staticmethod
+    def __build_job_log(
+        session: Session,
         job_id: Union[str, int],
+        log_job_id: Union[str, int],
         start_time: datetime,
-        status: str,
-        job_message: str,
         job_detail: Optional[dict] = None,
+        **fields,
     ):
-        if job_detail is None:
-            job_detail = cls._get_job_detail(job_id)
+        # 任务信息由事件监听时传入；监听时调度器中已无该任务才在当前批次事务中查询数据库
+        job_detail = job_detail or SchedulerUtil._get_job_detail_from_db(job_id, session)
         if not job_detail:
-            return
-        normalized_start = cls._normalize_datetime(start_time) or datetime.now().replace(microsecond=0)
-        job_log = JobLogModel(
-            jobId=int(job_id),
+            return None
+        return JobLogModel(
+            jobId=int(log_job_id),
             jobName=job_detail.get('job_name'),
             jobGroup=job_detail.get('job_group'),
             jobExecutor=job_detail.get('job_executor'),
@@ -421,93 +738,53 @@ class SchedulerUtil:
             jobArgs=job_detail.get('job_args'),
             jobKwargs=job_detail.get('job_kwargs'),
             jobTrigger=job_detail.get('job_trigger'),
-            jobMessage=job_message,
-            status=status,
+            startTime=start_time,
+            createTime=start_time,
+            **fields,
+        )
+
+    def __create(self, session: Session, data: dict, created: Dict[tuple, int]):
+        job_log = self.__build_job_log(
+            session,
+            data['job_id'],
+            data['log_job_id'],
+            data['start_time'],
+            data.get('job_detail'),
+            jobMessage=data['job_message'],
+            status='2',
             exceptionInfo='',
             jobResult='',
-            startTime=normalized_start,
             endTime=None,
-            createTime=normalized_start,
         )
-        session = SessionLocal()
-        JobLogService.add_job_log_services(session, job_log)
-        session.close()
+        if job_log is None:
+            return
+        db_job_log = JobLogDao.add_job_log_dao(session, job_log)
+        for run_key in data['run_keys']:
+            created[run_key] = db_job_log.job_log_id
+
+    def __finish(self, session: Session, data: dict, created: Dict[tuple, int], finished: List[tuple]):
+        run_key = data['run_key']
+        update_data = data['update_data']
+        job_log_id = created.get(run_key) or self._pending.get(run_key)
+        if job_log_id is not None:
+            finished.append(run_key)
+            if JobLogDao.update_job_log_by_id(session, job_log_id, update_data):
+                return
+        # 无对应的执行中日志（如错过触发、提交日志写入失败或应用重启前提交的任务）时写入一条完整日志
+        job_log = self.__build_job_log(
+            session,
+            data['job_id'],
+            data['log_job_id'],
+            data['start_time'],
+            data.get('job_detail'),
+            jobMessage=update_data['job_message'],
+            status=update_data['status'],
+            exceptionInfo=update_data['exception_info'],
+            jobResult=update_data['job_result'],
+            endTime=update_data['end_time'],
+        )
+        if job_log is not None:
+            JobLogDao.add_job_log_dao(session, job_log)
 
-    @classmethod
-    def _update_job_log_by_id(
-        cls,
-        job_log_id: int,
-        status: str,
-        exception_info: str,
-        job_result,
-        job_message: str,
-    ):
-        """按任务日志主键 id 更新，避免 start_time 不一致导致更新不到。"""
-        update_data = {
-            'status': status,
-            'exception_info': exception_info,
-            'job_result': cls._serialize_job_result(job_result),
-            'end_time': datetime.now().replace(microsecond=0),
-            'job_message': job_message,
-        }
-        session = SessionLocal()
-        try:
-            JobLogService.update_job_log_by_id_services(session, job_log_id, update_data)
-        finally:
-            session.close()
 
-    @classmethod
-    def _update_job_log(
-        cls,
-        job_id: Union[str, int],
-        start_time: datetime,
-        status: str,
-        exception_info: str,
-        job_result,
-        job_message: str,
-    ):
-        normalized_start = cls._normalize_datetime(start_time) or datetime.now().replace(microsecond=0)
-        update_data = {
-            'status': status,
-            'exception_info': exception_info,
-            'job_result': cls._serialize_job_result(job_result),
-            'end_time': datetime.now().replace(microsecond=0),
-            'job_message': job_message,
-        }
-        session = SessionLocal()
-        update_result = JobLogService.update_job_log_services(session, int(job_id), normalized_start, update_data)
-        # EXECUTED 事件的 scheduled_run_time 可能与 SUBMITTED 时不一致（尤其异步任务），
-        # 导致按 start_time 更新不到「执行中」那条；用该任务最近一条执行中日志的 start_time 再试一次
-        if not update_result.is_success:
-            fallback_start = JobLogDao.get_latest_running_log_start_time(session, int(job_id))
-            if fallback_start is not None:
-                fallback_normalized = cls._normalize_datetime(fallback_start)
-                if fallback_normalized:
-                    update_result = JobLogService.update_job_log_services(
-                        session, int(job_id), fallback_normalized, update_data
-                    )
-        session.close()
-        if not update_result.is_success:
-            job_detail = cls._get_job_detail(job_id)
-            if not job_detail:
-                return
-            job_log = JobLogModel(
-                jobId=int(job_id),
-                jobName=job_detail.get('job_name'),
-                jobGroup=job_detail.get('job_group'),
-                jobExecutor=job_detail.get('job_executor'),
-                invokeTarget=job_detail.get('invoke_target'),
-                jobArgs=job_detail.get('job_args'),
-                jobKwargs=job_detail.get('job_kwargs'),
-                jobTrigger=job_detail.get('job_trigger'),
-                jobMessage=job_message,
-                status=status,
-                exceptionInfo=exception_info,
-                jobResult=cls._serialize_job_result(job_result),
-                startTime=normalized_start,
-                endTime=datetime.now().replace(microsecond=0),
-                createTime=normalized_start,
-            )
-            session = SessionLocal()
-            JobLogService.add_job_log_services(session, job_log)
-            session.close()
+job_log_writer = JobLogWriter()
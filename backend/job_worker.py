@@ -0,0 +1,280 @@
+import asyncio
+import importlib
+import json
+import os
+import signal
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from inspect import iscoroutinefunction
+from redis.exceptions import ResponseError
+from typing import Callable, Dict, List, Optional
+from config.constant import JobConstant
+from config.env import JobConfig
+from config.database import AsyncSessionLocal
+from config.get_redis import RedisUtil
+from config.get_scheduler import JobLogWriter, SchedulerUtil, job_log_writer
+from module_admin.dao.job_dao import JobDao
+from utils.log_util import logger
+from utils.string_util import StringUtil
+
+
+def parse_concurrency(value: str) -> Dict[str, int]:
+    """
+    解析任务组并发配置，如 default:4,sqlalchemy:2
+
+    :param value: 并发配置
+    :return: 任务组 -> 并发数
+    """
+    concurrency = {}
+    for item in value.split(','):
+        if not item.strip():
+            continue
+        job_group, _, limit = item.partition(':')
+        concurrency[job_group.strip()] = max(int(limit or 1), 1)
+    return concurrency
+
+
+def resolve_invoke_target(invoke_target: str) -> Callable:
+    """
+    按模块路径解析调用目标，只允许调用白名单内的模块
+
+    :param invoke_target: 调用目标字符串，如 module_task.scheduler_test.job
+    :return: 调用目标函数
+    """
+    if StringUtil.startswith_any_case(invoke_target, JobConstant.JOB_ERROR_LIST) or not StringUtil.startswith_any_case(
+        invoke_target, JobConstant.JOB_WHITE_LIST
+    ):
+        raise ValueError(f'调用目标不在允许范围内：{invoke_target}')
+    module_path, _, func_name = invoke_target.rpartition('.')
+    return getattr(importlib.import_module(module_path), func_name)
+
+
+class JobWorker:
+    """
+    定时任务执行节点
+
+    消费调度器写入的各任务组分发队列，按任务组限制同时执行的任务数，执行结果写入sys_job_log。
+    执行中的消息定期续领，其他节点超时未续领的消息视为节点失联并接管执行。
+
+    投递语义为至少执行一次：执行结束后才确认消息，节点在确认前失联或确认失败时，
+    消息会在 job_worker_claim_idle_seconds 后被重新执行并再写入一条执行日志，任务函数需可重复执行。
+    """
+
+    # 每次阻塞读取的最长等待时间（毫秒）
+    READ_BLOCK_MS = 5000
+
+    def __init__(self, redis, concurrency: Dict[str, int]):
+        self.redis = redis
+        self.concurrency = concurrency
+        self.consumer_name = f'{socket.gethostname()}-{os.getpid()}'
+        self._running: Dict[str, Dict[asyncio.Task, str]] = {job_group: {} for job_group in concurrency}
+        self._stopping = asyncio.Event()
+        self._thread_executor = ThreadPoolExecutor(max_workers=sum(concurrency.values()))
+        self._process_executor: Optional[ProcessPoolExecutor] = None
+
+    def stop(self):
+        self._stopping.set()
+
+    async def run_forever(self):
+        logger.info(f'定时任务执行节点启动：{self.consumer_name}，任务组并发：{self.concurrency}')
+        job_log_writer.start()
+        try:
+            await asyncio.gather(
+                *[self.__consume(job_group, limit) for job_group, limit in self.concurrency.items()],
+                self.__keep_claimed(),
+            )
+        finally:
+            running_tasks = [task for tasks in self._running.values() for task in tasks]
+            if running_tasks:
+                logger.info(f'等待{len(running_tasks)}个执行中的任务完成')
+                await asyncio.gather(*running_tasks, return_exceptions=True)
+            self._thread_executor.shutdown(wait=True)
+            if self._process_executor is not None:
+                self._process_executor.shutdown(wait=True)
+            await job_log_writer.stop()
+            logger.info(f'定时任务执行节点已停止：{self.consumer_name}')
+
+    async def __ensure_group(self, stream_key: str):
+        try:
+            await self.redis.xgroup_create(stream_key, JobConfig.job_consumer_group, id='0', mkstream=True)
+        except ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+
+    async def __consume(self, job_group: str, limit: int):
+        stream_key = SchedulerUtil.get_dispatch_stream_key(job_group)
+        await self.__ensure_group(stream_key)
+        running = self._running[job_group]
+        claim_interval = JobConfig.job_worker_claim_idle_seconds / 3
+        claim_cursor = '0-0'
+        next_claim_at = 0.0
+        while not self._stopping.is_set():
+            free = limit - len(running)
+            if free <= 0:
+                await asyncio.wait(list(running), return_when=asyncio.FIRST_COMPLETED)
+                continue
+            try:
+                entries = []
+                if time.monotonic() >= next_claim_at:
+                    # 定期接管失联节点超时未确认的消息，一轮扫描完成后再等待下一个周期
+                    claim_cursor, entries, *_ = await self.redis.xautoclaim(
+                        stream_key,
+                        JobConfig.job_consumer_group,
+                        self.consumer_name,
+                        min_idle_time=JobConfig.job_worker_claim_idle_seconds * 1000,
+                        start_id=claim_cursor,
+                        count=free,
+                    )
+                    if claim_cursor == '0-0':
+                        next_claim_at = time.monotonic() + claim_interval
+                if not entries:
+                    response = await self.redis.xreadgroup(
+                        JobConfig.job_consumer_group,
+                        self.consumer_name,
+                        {stream_key: '>'},
+                        count=free,
+                        block=self.READ_BLOCK_MS,
+                    )
+                    entries = response[0][1] if response else []
+            except Exception as e:
+                logger.error(f'读取定时任务分发队列失败，任务组：{job_group}，详细错误信息：{e}')
+                await asyncio.sleep(1)
+                continue
+            for message_id, fields in entries:
+                # 已被删除（超出队列长度被裁剪）的消息接管时字段为空，直接确认
+                if not fields:
+                    await self.__ack(stream_key, message_id)
+                    continue
+                task = asyncio.create_task(self.__execute(stream_key, message_id, fields))
+                running[task] = message_id
+                task.add_done_callback(running.pop)
+
+    async def __keep_claimed(self):
+        # 定期重新认领执行中的消息，刷新空闲时间，避免长任务被其他节点误判为失联而重复执行
+        interval = JobConfig.job_worker_claim_idle_seconds / 3
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            for job_group, running in self._running.items():
+                message_ids = list(running.values())
+                if not message_ids:
+                    continue
+                try:
+                    await self.redis.xclaim(
+                        SchedulerUtil.get_dispatch_stream_key(job_group),
+                        JobConfig.job_consumer_group,
+                        self.consumer_name,
+                        min_idle_time=0,
+                        message_ids=message_ids,
+                        justid=True,
+                    )
+                except Exception as e:
+                    logger.warning(f'续领执行中的定时任务失败，任务组：{job_group}，详细错误信息：{e}')
+
+    async def __ack(self, stream_key: str, message_id: str):
+        try:
+            await self.redis.xack(stream_key, JobConfig.job_consumer_group, message_id)
+        except Exception as e:
+            # 未确认的消息留在pending列表，超时后会被重新执行
+            logger.error(f'确认定时任务消息失败，stream：{stream_key}，消息ID：{message_id}，详细错误信息：{e}')
+
+    @staticmethod
+    async def __is_job_enabled(job_id: str) -> bool:
+        # 其他实例对任务的暂停、删除可能尚未同步到调度主节点，执行前以数据库中的任务状态为准
+        try:
+            async with AsyncSessionLocal() as session:
+                job_info = await JobDao.get_job_detail_by_id(session, int(job_id))
+        except Exception as e:
+            logger.warning(f'查询定时任务状态失败，按启用状态执行，任务ID：{job_id}，详细错误信息：{e}')
+            return True
+        return job_info is not None and job_info.status == '0'
+
+    async def __call(self, job_message: Dict[str, str]):
+        job_func = resolve_invoke_target(job_message['invoke_target'])
+        job_args: List[str] = job_message['job_args'].split(',') if job_message.get('job_args') else []
+        job_kwargs: dict = json.loads(job_message['job_kwargs']) if job_message.get('job_kwargs') else {}
+        if iscoroutinefunction(job_func):
+            return await job_func(*job_args, **job_kwargs)
+        if job_message.get('job_executor') == 'processpool':
+            if self._process_executor is None:
+                self._process_executor = ProcessPoolExecutor(max_workers=sum(self.concurrency.values()))
+            executor = self._process_executor
+        else:
+            executor = self._thread_executor
+        return await asyncio.get_running_loop().run_in_executor(executor, partial(job_func, *job_args, **job_kwargs))
+
+    async def __execute(self, stream_key: str, message_id: str, job_message: Dict[str, str]):
+        job_id = job_message.get('job_id')
+        # 立即执行一次不受任务启用状态限制
+        if not job_id.endswith('_immediate') and not await self.__is_job_enabled(job_id):
+            logger.info(f'定时任务已暂停或已删除，跳过执行，任务ID：{job_id}')
+            await self.__ack(stream_key, message_id)
+            return
+        log_job_id = SchedulerUtil._main_job_id(job_id)
+        run_key = (stream_key, message_id)
+        job_detail = dict(
+            job_name=job_message.get('job_name'),
+            job_group=job_message.get('job_group'),
+            job_executor=job_message.get('job_executor'),
+            invoke_target=job_message.get('invoke_target'),
+            job_args=job_message.get('job_args'),
+            job_kwargs=job_message.get('job_kwargs'),
+            job_trigger=job_message.get('job_trigger'),
+        )
+        start_time = datetime.now().replace(microsecond=0)
+        job_log_writer.submit(
+            JobLogWriter.CREATE,
+            dict(
+                job_id=job_id,
+                log_job_id=log_job_id,
+                run_keys=[run_key],
+                start_time=start_time,
+                job_message=f'执行节点: {self.consumer_name}, 任务ID: {job_id}, 执行开始',
+                job_detail=job_detail,
+            ),
+        )
+        status = '0'
+        exception_info = ''
+        job_result = None
+        try:
+            job_result = await self.__call(job_message)
+        except Exception as e:
+            logger.exception(e)
+            status = '1'
+            exception_info = str(e)
+        job_log_writer.submit(
+            JobLogWriter.FINISH,
+            dict(
+                job_id=job_id,
+                log_job_id=log_job_id,
+                run_key=run_key,
+                start_time=start_time,
+                job_detail=job_detail,
+                update_data=SchedulerUtil.build_job_log_update_data(
+                    job_id, f'JobWorker({self.consumer_name})', status, exception_info, job_result
+                ),
+            ),
+        )
+        await self.__ack(stream_key, message_id)
+
+
+async def main():
+    redis = await RedisUtil.create_redis_pool()
+    worker = JobWorker(redis, parse_concurrency(JobConfig.job_worker_concurrency))
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    try:
+        await worker.run_forever()
+    finally:
+        await redis.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
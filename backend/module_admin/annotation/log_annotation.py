@@ -1,7 +1,6 @@
 import inspect
 import json
 import os
-import requests
 import time
 from datetime import datetime
 from fastapi import Request
@@ -12,13 +11,18 @@ from typing import Any, Callable, Literal, Optional
 from user_agents import parse
 from config.enums import BusinessType
 from config.env import AppConfig
+from config.get_log_writer import LogWriterUtil
 from exceptions.exception import LoginException, ServiceException, ServiceWarning
 from module_admin.entity.vo.log_vo import LogininforModel, OperLogModel
 from module_admin.service.log_service import LoginLogService, OperationLogService
 from module_admin.service.login_service import LoginService
+from utils.ip_location_util import IpLocationUtil
 from utils.log_util import logger
 from utils.response_util import ResponseUtil
 
+# User-Agent解析结果缓存条数
+USER_AGENT_CACHE_SIZE = 1024
+
 
 class Log:
     """
@@ -44,37 +48,33 @@ class Log:
         self.log_type = log_type
 
     def __call__(self, func):
+        # 被装饰函数的路径及Request、AsyncSession参数位置只与函数本身有关，在装饰时解析一次
+        func_path = get_function_path(func)
+        signature = inspect.signature(func)
+        get_request = get_function_parameter_getter(
+            signature, get_function_parameters_name_by_type(func, Request)[0]
+        )
+        get_query_db = get_function_parameter_getter(
+            signature, get_function_parameters_name_by_type(func, AsyncSession)[0]
+        )
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
             start_time = time.time()
-            # 获取被装饰函数的文件路径
-            file_path = inspect.getfile(func)
-            # 获取项目根路径
-            project_root = os.getcwd()
-            # 处理文件路径，去除项目根路径部分
-            relative_path = os.path.relpath(file_path, start=project_root)[0:-2].replace('\\', '.').replace('/', '.')
-            # 获取当前被装饰函数所在路径
-            func_path = f'{relative_path}{func.__name__}()'
             # 获取上下文信息
-            request_name_list = get_function_parameters_name_by_type(func, Request)
-            request = get_function_parameters_value_by_name(func, request_name_list[0], *args, **kwargs)
+            request = get_request(args, kwargs)
             token = request.headers.get('Authorization')
-            session_name_list = get_function_parameters_name_by_type(func, AsyncSession)
-            query_db = get_function_parameters_value_by_name(func, session_name_list[0], *args, **kwargs)
+            query_db = get_query_db(args, kwargs)
             request_method = request.method
-            operator_type = 0
-            user_agent = request.headers.get('User-Agent')
-            if 'Windows' in user_agent or 'Macintosh' in user_agent or 'Linux' in user_agent:
-                operator_type = 1
-            if 'Mobile' in user_agent or 'Android' in user_agent or 'iPhone' in user_agent:
-                operator_type = 2
+            user_agent = request.headers.get('User-Agent') or ''
+            operator_type = get_operator_type(user_agent)
             # 获取请求的url
             oper_url = request.url.path
             # 获取请求的ip及ip归属区域
             oper_ip = request.headers.get('X-Forwarded-For')
             oper_location = '内网IP'
             if AppConfig.app_ip_location_query:
-                oper_location = get_ip_location(oper_ip)
+                oper_location = await IpLocationUtil.get_ip_location(request.app.state.redis, oper_ip)
             # 根据不同的请求类型使用不同的方法获取请求参数
             content_type = request.headers.get('Content-Type')
             if content_type and (
@@ -101,13 +101,7 @@ class Log:
             # 此处在登录之前向原始函数传递一些登录信息，用于监测在线用户的相关信息
             login_log = {}
             if self.log_type == 'login':
-                user_agent_info = parse(user_agent)
-                browser = f'{user_agent_info.browser.family}'
-                system_os = f'{user_agent_info.os.family}'
-                if user_agent_info.browser.version != ():
-                    browser += f' {user_agent_info.browser.version[0]}'
-                if user_agent_info.os.version != ():
-                    system_os += f' {user_agent_info.os.version[0]}'
+                browser, system_os = parse_user_agent(user_agent)
                 login_log = dict(
                     ipaddr=oper_ip,
                     loginLocation=oper_location,
@@ -173,9 +167,16 @@ class Log:
                     login_log['status'] = str(status)
                     login_log['msg'] = result_dict.get('msg')
 
-                    await LoginLogService.add_login_log_services(query_db, LogininforModel(**login_log))
+                    # 日志写入任务运行时只入队，由后台批量入库，不占用当前请求
+                    if LogWriterUtil.is_running():
+                        LogWriterUtil.submit('login', LogininforModel(**login_log))
+                    else:
+                        await LoginLogService.add_login_log_services(query_db, LogininforModel(**login_log))
             else:
-                current_user = await LoginService.get_current_user(request, token, query_db)
+                # 鉴权依赖已解析过当前用户时直接复用
+                current_user = getattr(request.state, 'current_user', None)
+                if current_user is None:
+                    current_user = await LoginService.get_current_user(request, token, query_db)
                 oper_name = current_user.user.user_name
                 dept_name = current_user.user.dept.dept_name if current_user.user.dept else None
                 operation_log = OperLogModel(
@@ -196,35 +197,88 @@ class Log:
                     operTime=oper_time,
                     costTime=int(cost_time),
                 )
-                await OperationLogService.add_operation_log_services(query_db, operation_log)
+                if LogWriterUtil.is_running():
+                    LogWriterUtil.submit('operation', operation_log)
+                else:
+                    await OperationLogService.add_operation_log_services(query_db, operation_log)
 
             return result
 
         return wrapper
 
 
-@lru_cache()
-def get_ip_location(oper_ip: str):
+@lru_cache(maxsize=USER_AGENT_CACHE_SIZE)
+def get_operator_type(user_agent: str):
+    """
+    根据User-Agent获取操作类别
+
+    :param user_agent: 请求头中的User-Agent
+    :return: 操作类别（0其它 1后台用户 2手机端用户）
+    """
+    operator_type = 0
+    if 'Windows' in user_agent or 'Macintosh' in user_agent or 'Linux' in user_agent:
+        operator_type = 1
+    if 'Mobile' in user_agent or 'Android' in user_agent or 'iPhone' in user_agent:
+        operator_type = 2
+    return operator_type
+
+
+@lru_cache(maxsize=USER_AGENT_CACHE_SIZE)
+def parse_user_agent(user_agent: str):
+    """
+    解析User-Agent中的浏览器及操作系统，客户端种类有限，使用有界LRU缓存解析结果
+
+    :param user_agent: 请求头中的User-Agent
+    :return: 浏览器，操作系统
+    """
+    user_agent_info = parse(user_agent)
+    browser = f'{user_agent_info.browser.family}'
+    system_os = f'{user_agent_info.os.family}'
+    if user_agent_info.browser.version != ():
+        browser += f' {user_agent_info.browser.version[0]}'
+    if user_agent_info.os.version != ():
+        system_os += f' {user_agent_info.os.version[0]}'
+    return browser, system_os
+
+
+def get_function_path(func: Callable):
     """
-    查询ip归属区域
+    获取函数相对于项目根路径的调用路径
 
-    :param oper_ip: 需要查询的ip
-    :return: ip归属区域
+    :param func: 函数
+    :return: 函数调用路径，如module_admin.controller.user_controller.get_system_user_list()
     """
-    oper_location = '内网IP'
-    try:
-        if oper_ip != '127.0.0.1' and oper_ip != 'localhost':
-            oper_location = '未知'
-            ip_result = requests.get(f'https://qifu-api.baidubce.com/ip/geo/v1/district?ip={oper_ip}')
-            if ip_result.status_code == 200:
-                prov = ip_result.json().get('data').get('prov')
-                city = ip_result.json().get('data').get('city')
-                if prov or city:
-                    oper_location = f'{prov}-{city}'
-    except Exception as e:
-        oper_location = '未知'
-        print(e)
-    return oper_location
+    # 获取被装饰函数的文件路径
+    file_path = inspect.getfile(func)
+    # 获取项目根路径
+    project_root = os.getcwd()
+    # 处理文件路径，去除项目根路径部分
+    relative_path = os.path.relpath(file_path, start=project_root)[0:-2].replace('\\', '.').replace('/', '.')
+    return f'{relative_path}{func.__name__}()'
+
+
+def get_function_parameter_getter(signature: inspect.Signature, name: str):
+    """
+    根据函数签名生成指定参数的取值方法，调用时无需再次解析签名及绑定参数
+
+    :param signature: 函数签名
+    :param name: 参数名
+    :return: 取值方法，入参为调用时的args与kwargs
+    """
+    index = list(signature.parameters).index(name)
+    default = signature.parameters[name].default
+    if default is inspect.Parameter.empty:
+        default = None
+
+    def getter(args: tuple, kwargs: dict):
+        # FastAPI以关键字参数调用路由函数，优先从kwargs中获取
+        if name in kwargs:
+            return kwargs[name]
+        if index < len(args):
+            return args[index]
+        return default
+
+    return getter
 
 
 def get_function_parameters_name_by_type(func: Callable, param_type: Any):
@@ -243,19 +297,3 @@ def get_function_parameters_name_by_type(func: Callable, param_type: Any):
         if param.annotation == param_type:
             parameters_name_list.append(name)
     return parameters_name_list
-
-
-def get_function_parameters_value_by_name(func: Callable, name: str, *args, **kwargs):
-    """
-    获取函数指定参数的值
-
-    :param func: 函数
-    :param name: 参数名
-    :return: 参数值
-    """
-    # 获取参数值
-    bound_parameters = inspect.signature(func).bind(*args, **kwargs)
-    bound_parameters.apply_defaults()
-    parameters_value = bound_parameters.arguments.get(name)
-
-    return parameters_value
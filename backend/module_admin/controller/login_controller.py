@@ -78,8 +78,12 @@ async def login(
             access_token,
             ex=timedelta(minutes=JwtConfig.jwt_redis_expire_minutes),
         )
+    # 登录时间不影响权限，不递增快照版本，避免每次登录都使该用户快照失效
     await UserService.edit_user_services(
-        query_db, EditUserModel(userId=result[0].user_id, loginDate=datetime.now(), type='status')
+        request,
+        query_db,
+        EditUserModel(userId=result[0].user_id, loginDate=datetime.now(), type='status'),
+        bump_snapshot=False,
     )
     logger.info('登录成功')
     # 判断请求是否来自于api文档，如果是返回指定格式的结果，用于修复api文档认证成功后token显示undefined的bug
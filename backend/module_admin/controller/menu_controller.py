@@ -87,7 +87,7 @@ async def edit_system_menu(
 ):
     edit_menu.update_by = current_user.user.user_name
     edit_menu.update_time = datetime.now()
-    edit_menu_result = await MenuService.edit_menu_services(query_db, edit_menu)
+    edit_menu_result = await MenuService.edit_menu_services(request, query_db, edit_menu)
     logger.info(edit_menu_result.message)
 
     return ResponseUtil.success(msg=edit_menu_result.message)
@@ -97,7 +97,7 @@ async def edit_system_menu(
 @Log(title='菜单管理', business_type=BusinessType.DELETE)
 async def delete_system_menu(request: Request, menu_ids: str, query_db: AsyncSession = Depends(get_db)):
     delete_menu = DeleteMenuModel(menuIds=menu_ids)
-    delete_menu_result = await MenuService.delete_menu_services(query_db, delete_menu)
+    delete_menu_result = await MenuService.delete_menu_services(request, query_db, delete_menu)
     logger.info(delete_menu_result.message)
 
     return ResponseUtil.success(msg=delete_menu_result.message)
@@ -1,6 +1,7 @@
 from datetime import datetime, time
 from sqlalchemy import asc, delete, desc, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
 from module_admin.entity.do.log_do import SysLogininfor, SysOperLog
 from module_admin.entity.vo.log_vo import LogininforModel, LoginLogPageQueryModel, OperLogModel, OperLogPageQueryModel
 from utils.common_util import SnakeCaseUtil
@@ -67,6 +68,18 @@ class OperationLogDao:
 
         return db_operation_log
 
+    @classmethod
+    async def add_operation_log_batch_dao(cls, db: AsyncSession, operation_log_list: List[OperLogModel]):
+        """
+        批量新增操作日志数据库操作
+
+        :param db: orm对象
+        :param operation_log_list: 操作日志对象列表
+        :return:
+        """
+        db.add_all([SysOperLog(**operation_log.model_dump()) for operation_log in operation_log_list])
+        await db.flush()
+
     @classmethod
     async def delete_operation_log_dao(cls, db: AsyncSession, operation_log: OperLogModel):
         """
@@ -149,6 +162,18 @@ class LoginLogDao:
 
         return db_login_log
 
+    @classmethod
+    async def add_login_log_batch_dao(cls, db: AsyncSession, login_log_list: List[LogininforModel]):
+        """
+        批量新增登录日志数据库操作
+
+        :param db: orm对象
+        :param login_log_list: 登录日志对象列表
+        :return:
+        """
+        db.add_all([SysLogininfor(**login_log.model_dump()) for login_log in login_log_list])
+        await db.flush()
+
     @classmethod
     async def delete_login_log_dao(cls, db: AsyncSession, login_log: LogininforModel):
         """
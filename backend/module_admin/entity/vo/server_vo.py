@@ -53,6 +53,22 @@ class SysFiles(BaseModel):
     usage: Optional[str] = Field(default=None, description='资源的使用率')
 
 
+class LogWriterInfo(BaseModel):
+    model_config = ConfigDict(alias_generator=to_camel)
+
+    running: Optional[bool] = Field(default=None, description='日志写入任务是否运行中')
+    queue_size: Optional[int] = Field(default=None, description='当前队列积压条数')
+    queue_capacity: Optional[int] = Field(default=None, description='队列容量')
+    max_queue_size: Optional[int] = Field(default=None, description='队列最大积压条数')
+    overflow_policy: Optional[str] = Field(default=None, description='溢出策略（drop丢弃 spill写入溢出文件）')
+    enqueued: Optional[int] = Field(default=None, description='累计入队条数')
+    written: Optional[int] = Field(default=None, description='累计写入条数')
+    dropped: Optional[int] = Field(default=None, description='累计丢弃条数')
+    spilled: Optional[int] = Field(default=None, description='累计写入溢出文件条数')
+    failed_batches: Optional[int] = Field(default=None, description='累计写入失败批次数')
+    last_flush_ms: Optional[float] = Field(default=None, description='最近一次批量写入耗时（毫秒）')
+
+
 class ServerMonitorModel(BaseModel):
     """
     服务监控对应pydantic模型
@@ -65,3 +81,4 @@ class ServerMonitorModel(BaseModel):
     mem: Optional[MemoryInfo] = Field(description='內存相关信息')
     sys: Optional[SysInfo] = Field(description='服务器相关信息')
     sys_files: Optional[List[SysFiles]] = Field(description='磁盘相关信息')
+    log_writer: Optional[LogWriterInfo] = Field(default=None, description='日志异步写入相关信息')
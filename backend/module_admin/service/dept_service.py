@@ -1,9 +1,11 @@
+from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from config.constant import CommonConstant
 from exceptions.exception import ServiceException, ServiceWarning
 from module_admin.dao.dept_dao import DeptDao
 from module_admin.entity.vo.common_vo import CrudResponseModel
 from module_admin.entity.vo.dept_vo import DeleteDeptModel, DeptModel
+from module_admin.service.user_snapshot_service import UserSnapshotService
 from utils.common_util import CamelCaseUtil
 
 
@@ -120,10 +122,11 @@ class DeptService:
             raise e
 
     @classmethod
-    async def edit_dept_services(cls, query_db: AsyncSession, page_object: DeptModel):
+    async def edit_dept_services(cls, request: Request, query_db: AsyncSession, page_object: DeptModel):
         """
         编辑部门信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 编辑部门对象
         :return: 编辑部门校验结果
@@ -159,16 +162,18 @@ class DeptService:
             ):
                 await cls.update_parent_dept_status_normal(query_db, page_object)
             await query_db.commit()
+            await UserSnapshotService.bump_global_version_services(request)
             return CrudResponseModel(is_success=True, message='更新成功')
         except Exception as e:
             await query_db.rollback()
             raise e
 
     @classmethod
-    async def delete_dept_services(cls, query_db: AsyncSession, page_object: DeleteDeptModel):
+    async def delete_dept_services(cls, request: Request, query_db: AsyncSession, page_object: DeleteDeptModel):
         """
         删除部门信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 删除部门对象
         :return: 删除部门校验结果
@@ -184,6 +189,7 @@ class DeptService:
 
                     await DeptDao.delete_dept_dao(query_db, DeptModel(deptId=dept_id))
                 await query_db.commit()
+                await UserSnapshotService.bump_global_version_services(request)
                 return CrudResponseModel(is_success=True, message='删除成功')
             except Exception as e:
                 await query_db.rollback()
@@ -84,6 +84,7 @@ class JobService:
                 if job_info.status == '0':
                     SchedulerUtil.add_scheduler_job(job_info=job_info)
                 await query_db.commit()
+                await SchedulerUtil.notify_jobs_changed([add_job.job_id])
                 result = dict(is_success=True, message='新增成功')
             except Exception as e:
                 await query_db.rollback()
@@ -135,6 +136,7 @@ class JobService:
                     job_info = await cls.job_detail_services(query_db, edit_job.get('job_id'))
                     SchedulerUtil.add_scheduler_job(job_info=job_info)
                 await query_db.commit()
+                await SchedulerUtil.notify_jobs_changed([edit_job.get('job_id')])
                 return CrudResponseModel(is_success=True, message='更新成功')
             except Exception as e:
                 await query_db.rollback()
@@ -156,7 +158,7 @@ class JobService:
             # 立即执行时若请求体传入 job_kwargs，仅作为本次执行的临时参数，不写入任务配置表，仅在日志中记录
             if page_object.job_kwargs is not None:
                 job_info.job_kwargs = page_object.job_kwargs
-            SchedulerUtil.execute_scheduler_job_once(job_info=job_info)
+            await SchedulerUtil.execute_scheduler_job_once(job_info=job_info)
             return CrudResponseModel(is_success=True, message='执行成功')
         else:
             raise ServiceException(message='定时任务不存在')
@@ -177,6 +179,7 @@ class JobService:
                     await JobDao.delete_job_dao(query_db, JobModel(jobId=job_id))
                     SchedulerUtil.remove_scheduler_job(job_id=job_id)
                 await query_db.commit()
+                await SchedulerUtil.notify_jobs_changed(job_id_list)
                 return CrudResponseModel(is_success=True, message='删除成功')
             except Exception as e:
                 await query_db.rollback()
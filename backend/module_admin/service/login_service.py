@@ -19,6 +19,8 @@ from module_admin.entity.vo.common_vo import CrudResponseModel
 from module_admin.entity.vo.login_vo import MenuTreeModel, MetaModel, RouterModel, SmsCode, UserLogin, UserRegister
 from module_admin.entity.vo.user_vo import AddUserModel, CurrentUserModel, ResetUserModel, TokenData, UserInfoModel
 from module_admin.service.user_service import UserService
+from module_admin.service.token_session_service import TokenSessionService
+from module_admin.service.user_snapshot_service import UserSnapshotService
 from utils.common_util import CamelCaseUtil
 from utils.log_util import logger
 from utils.message_util import message_service
@@ -210,56 +212,71 @@ class LoginService:
         except InvalidTokenError:
             logger.warning('用户token已失效，请重新登录')
             raise AuthException(data='', message='用户token已失效，请重新登录')
-        query_user = await UserDao.get_user_by_id(query_db, user_id=token_data.user_id)
-        if query_user.get('user_basic_info') is None:
-            logger.warning('用户token不合法')
-            raise AuthException(data='', message='用户token不合法')
+        current_user = getattr(request.state, 'current_user', None)
+        if current_user is not None:
+            # 同一请求内（依赖注入、权限校验、日志装饰器等）只解析一次
+            return current_user
         if AppConfig.app_same_time_login:
-            redis_token = await request.app.state.redis.get(f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}')
+            token_key = f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}'
         else:
             # 此方法可实现同一账号同一时间只能登录一次
-            redis_token = await request.app.state.redis.get(
-                f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{query_user.get('user_basic_info').user_id}"
-            )
-        if token == redis_token:
-            if AppConfig.app_same_time_login:
-                await request.app.state.redis.set(
-                    f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}',
-                    redis_token,
-                    ex=timedelta(minutes=JwtConfig.jwt_redis_expire_minutes),
-                )
-            else:
-                await request.app.state.redis.set(
-                    f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{query_user.get('user_basic_info').user_id}",
-                    redis_token,
-                    ex=timedelta(minutes=JwtConfig.jwt_redis_expire_minutes),
-                )
-
-            role_id_list = [item.role_id for item in query_user.get('user_role_info')]
-            if 1 in role_id_list:
-                permissions = ['*:*:*']
-            else:
-                permissions = [row.perms for row in query_user.get('user_menu_info')]
-            post_ids = ','.join([str(row.post_id) for row in query_user.get('user_post_info')])
-            role_ids = ','.join([str(row.role_id) for row in query_user.get('user_role_info')])
-            roles = [row.role_key for row in query_user.get('user_role_info')]
-
-            current_user = CurrentUserModel(
-                permissions=permissions,
-                roles=roles,
-                user=UserInfoModel(
-                    **CamelCaseUtil.transform_result(query_user.get('user_basic_info')),
-                    postIds=post_ids,
-                    roleIds=role_ids,
-                    dept=CamelCaseUtil.transform_result(query_user.get('user_dept_info')),
-                    role=CamelCaseUtil.transform_result(query_user.get('user_role_info')),
-                ),
-            )
-            TraceCtx.set_user_id(current_user.user.user_id)
-            return current_user
-        else:
+            token_key = f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{token_data.user_id}'
+        # 令牌校验、快照版本读取与滑动续期一次往返完成
+        version = await TokenSessionService.verify_token_services(request, token_key, token, token_data.user_id)
+        if version is None:
             logger.warning('用户token已失效，请重新登录')
             raise AuthException(data='', message='用户token已失效，请重新登录')
+        current_user = await cls.__get_current_user_snapshot(request, query_db, token_data.user_id, version)
+        if current_user is None:
+            logger.warning('用户token不合法')
+            raise AuthException(data='', message='用户token不合法')
+        TraceCtx.set_user_id(current_user.user.user_id)
+        request.state.current_user = current_user
+        return current_user
+
+    @classmethod
+    async def __get_current_user_snapshot(
+        cls, request: Request, query_db: AsyncSession, user_id: int, version: str
+    ) -> Optional[CurrentUserModel]:
+        """
+        获取用户权限快照，缓存未命中或版本不一致时从数据库加载
+
+        :param request: Request对象
+        :param query_db: orm对象
+        :param user_id: 用户id
+        :param version: 快照版本
+        :return: 当前用户信息对象，用户不存在时为None
+        """
+        if AppConfig.app_user_snapshot_cache:
+            current_user = await UserSnapshotService.get_snapshot_services(request, user_id, version)
+            if current_user is not None:
+                return current_user
+        query_user = await UserDao.get_user_by_id(query_db, user_id=user_id)
+        if query_user.get('user_basic_info') is None:
+            return None
+        role_id_list = [item.role_id for item in query_user.get('user_role_info')]
+        if 1 in role_id_list:
+            permissions = ['*:*:*']
+        else:
+            permissions = [row.perms for row in query_user.get('user_menu_info')]
+        post_ids = ','.join([str(row.post_id) for row in query_user.get('user_post_info')])
+        role_ids = ','.join([str(row.role_id) for row in query_user.get('user_role_info')])
+        roles = [row.role_key for row in query_user.get('user_role_info')]
+
+        current_user = CurrentUserModel(
+            permissions=permissions,
+            roles=roles,
+            user=UserInfoModel(
+                **CamelCaseUtil.transform_result(query_user.get('user_basic_info')),
+                postIds=post_ids,
+                roleIds=role_ids,
+                dept=CamelCaseUtil.transform_result(query_user.get('user_dept_info')),
+                role=CamelCaseUtil.transform_result(query_user.get('user_role_info')),
+            ),
+        )
+        if AppConfig.app_user_snapshot_cache:
+            await UserSnapshotService.set_snapshot_services(request, user_id, version, current_user)
+        return current_user
 
     @classmethod
     async def get_current_user_routers(cls, user_id: int, query_db: AsyncSession):
@@ -486,7 +503,7 @@ class LoginService:
         if forget_user.sms_code == redis_sms_result:
             forget_user.password = PwdUtil.get_password_hash(forget_user.password)
             forget_user.user_id = (await UserDao.get_user_by_name(query_db, forget_user.user_name)).user_id
-            edit_result = await UserService.reset_user_services(query_db, forget_user)
+            edit_result = await UserService.reset_user_services(request, query_db, forget_user)
             result = edit_result.dict()
         elif not redis_sms_result:
             result = dict(is_success=False, message='短信验证码已过期')
@@ -506,6 +523,7 @@ class LoginService:
         :return: 退出登录结果
         """
         await request.app.state.redis.delete(f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}')
+        TokenSessionService.evict_local_services(f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}')
         # await request.app.state.redis.delete(f'{current_user.user.user_id}_access_token')
         # await request.app.state.redis.delete(f'{current_user.user.user_id}_session_id')
 
@@ -1,3 +1,4 @@
+from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from config.constant import CommonConstant, MenuConstant
@@ -8,6 +9,7 @@ from module_admin.entity.vo.common_vo import CrudResponseModel
 from module_admin.entity.vo.menu_vo import DeleteMenuModel, MenuQueryModel, MenuModel
 from module_admin.entity.vo.role_vo import RoleMenuQueryModel
 from module_admin.entity.vo.user_vo import CurrentUserModel
+from module_admin.service.user_snapshot_service import UserSnapshotService
 from utils.common_util import CamelCaseUtil
 from utils.string_util import StringUtil
 
@@ -112,10 +114,11 @@ class MenuService:
                 raise e
 
     @classmethod
-    async def edit_menu_services(cls, query_db: AsyncSession, page_object: MenuModel):
+    async def edit_menu_services(cls, request: Request, query_db: AsyncSession, page_object: MenuModel):
         """
         编辑菜单信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 编辑部门对象
         :return: 编辑菜单校验结果
@@ -133,6 +136,7 @@ class MenuService:
                 try:
                     await MenuDao.edit_menu_dao(query_db, edit_menu)
                     await query_db.commit()
+                    await UserSnapshotService.bump_global_version_services(request)
                     return CrudResponseModel(is_success=True, message='更新成功')
                 except Exception as e:
                     await query_db.rollback()
@@ -141,10 +145,11 @@ class MenuService:
             raise ServiceException(message='菜单不存在')
 
     @classmethod
-    async def delete_menu_services(cls, query_db: AsyncSession, page_object: DeleteMenuModel):
+    async def delete_menu_services(cls, request: Request, query_db: AsyncSession, page_object: DeleteMenuModel):
         """
         删除菜单信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 删除菜单对象
         :return: 删除菜单校验结果
@@ -159,6 +164,7 @@ class MenuService:
                         raise ServiceWarning(message='菜单已分配,不允许删除')
                     await MenuDao.delete_menu_dao(query_db, MenuModel(menuId=menu_id))
                 await query_db.commit()
+                await UserSnapshotService.bump_global_version_services(request)
                 return CrudResponseModel(is_success=True, message='删除成功')
             except Exception as e:
                 await query_db.rollback()
@@ -5,6 +5,7 @@ from config.env import JwtConfig
 from exceptions.exception import ServiceException
 from module_admin.entity.vo.common_vo import CrudResponseModel
 from module_admin.entity.vo.online_vo import DeleteOnlineModel, OnlineQueryModel
+from module_admin.service.token_session_service import TokenSessionService
 from utils.common_util import CamelCaseUtil
 
 
@@ -71,6 +72,7 @@ class OnlineService:
             token_id_list = page_object.token_ids.split(',')
             for token_id in token_id_list:
                 await request.app.state.redis.delete(f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{token_id}')
+                TokenSessionService.evict_local_services(f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:{token_id}')
             return CrudResponseModel(is_success=True, message='强退成功')
         else:
             raise ServiceException(message='传入session_id为空')
@@ -1,3 +1,4 @@
+from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from config.constant import CommonConstant
@@ -15,6 +16,7 @@ from module_admin.entity.vo.role_vo import (
 from module_admin.entity.vo.user_vo import UserInfoModel, UserRolePageQueryModel
 from module_admin.dao.role_dao import RoleDao
 from module_admin.dao.user_dao import UserDao
+from module_admin.service.user_snapshot_service import UserSnapshotService
 from utils.common_util import CamelCaseUtil
 from utils.excel_util import ExcelUtil
 from utils.page_util import PageResponseModel
@@ -162,10 +164,11 @@ class RoleService:
                 raise e
 
     @classmethod
-    async def edit_role_services(cls, query_db: AsyncSession, page_object: AddRoleModel):
+    async def edit_role_services(cls, request: Request, query_db: AsyncSession, page_object: AddRoleModel):
         """
         编辑角色信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 编辑角色对象
         :return: 编辑角色校验结果
@@ -192,6 +195,7 @@ class RoleService:
                                 query_db, RoleMenuModel(roleId=page_object.role_id, menuId=menu)
                             )
                 await query_db.commit()
+                await UserSnapshotService.bump_global_version_services(request)
                 return CrudResponseModel(is_success=True, message='更新成功')
             except Exception as e:
                 await query_db.rollback()
@@ -200,10 +204,11 @@ class RoleService:
             raise ServiceException(message='角色不存在')
 
     @classmethod
-    async def role_datascope_services(cls, query_db: AsyncSession, page_object: AddRoleModel):
+    async def role_datascope_services(cls, request: Request, query_db: AsyncSession, page_object: AddRoleModel):
         """
         分配角色数据权限service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 角色数据权限对象
         :return: 分配角色数据权限结果
@@ -220,6 +225,7 @@ class RoleService:
                             query_db, RoleDeptModel(roleId=page_object.role_id, deptId=dept)
                         )
                 await query_db.commit()
+                await UserSnapshotService.bump_global_version_services(request)
                 return CrudResponseModel(is_success=True, message='分配成功')
             except Exception as e:
                 await query_db.rollback()
@@ -228,10 +234,11 @@ class RoleService:
             raise ServiceException(message='角色不存在')
 
     @classmethod
-    async def delete_role_services(cls, query_db: AsyncSession, page_object: DeleteRoleModel):
+    async def delete_role_services(cls, request: Request, query_db: AsyncSession, page_object: DeleteRoleModel):
         """
         删除角色信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 删除角色对象
         :return: 删除角色校验结果
@@ -250,6 +257,7 @@ class RoleService:
                     await RoleDao.delete_role_dept_dao(query_db, RoleDeptModel(**role_id_dict))
                     await RoleDao.delete_role_dao(query_db, RoleModel(**role_id_dict))
                 await query_db.commit()
+                await UserSnapshotService.bump_global_version_services(request)
                 return CrudResponseModel(is_success=True, message='删除成功')
             except Exception as e:
                 await query_db.rollback()
@@ -3,7 +3,16 @@ import platform
 import psutil
 import socket
 import time
-from module_admin.entity.vo.server_vo import CpuInfo, MemoryInfo, PyInfo, ServerMonitorModel, SysFiles, SysInfo
+from config.get_log_writer import LogWriterUtil
+from module_admin.entity.vo.server_vo import (
+    CpuInfo,
+    LogWriterInfo,
+    MemoryInfo,
+    PyInfo,
+    ServerMonitorModel,
+    SysFiles,
+    SysInfo,
+)
 from utils.common_util import bytes2human
 
 
@@ -101,6 +110,22 @@ class ServerService:
                 logger.warning(f'无法访问磁盘分区 {i.device} ({i.mountpoint}): {str(e)}')
                 continue
 
-        result = ServerMonitorModel(cpu=cpu, mem=mem, sys=sys, py=py, sysFiles=sys_files)
+        # 日志异步写入积压信息
+        log_writer_stats = LogWriterUtil.get_stats()
+        log_writer = LogWriterInfo(
+            running=log_writer_stats['running'],
+            queueSize=log_writer_stats['queue_size'],
+            queueCapacity=log_writer_stats['queue_capacity'],
+            maxQueueSize=log_writer_stats['max_queue_size'],
+            overflowPolicy=log_writer_stats['overflow_policy'],
+            enqueued=log_writer_stats['enqueued'],
+            written=log_writer_stats['written'],
+            dropped=log_writer_stats['dropped'],
+            spilled=log_writer_stats['spilled'],
+            failedBatches=log_writer_stats['failed_batches'],
+            lastFlushMs=log_writer_stats['last_flush_ms'],
+        )
+
+        result = ServerMonitorModel(cpu=cpu, mem=mem, sys=sys, py=py, sysFiles=sys_files, logWriter=log_writer)
 
         return result
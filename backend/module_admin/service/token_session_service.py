@@ -0,0 +1,105 @@
+import time
+from collections import OrderedDict
+from fastapi import Request
+from typing import List, Optional, Tuple
+from config.env import JwtConfig
+from module_admin.service.user_snapshot_service import UserSnapshotService
+
+
+class TokenSessionService:
+    """
+    登录令牌会话校验服务层
+
+    令牌校验、快照版本读取与滑动续期合并为一次Lua调用，且仅在剩余有效期低于续期阈值时才重置过期时间；
+    校验通过的令牌在进程内短暂记忆，记忆期内的重复请求不再访问redis。
+    """
+
+    # KEYS: 令牌键、全局快照版本键、用户快照版本键
+    # ARGV: 请求令牌、续期阈值（剩余毫秒数）、令牌有效期（毫秒）
+    # 返回: {0} 令牌不存在或不一致；{1, 剩余毫秒数, 全局版本, 用户版本}
+    VERIFY_SCRIPT = """
+local token = redis.call('GET', KEYS[1])
+if not token or token ~= ARGV[1] then
+    return {0}
+end
+local ttl = redis.call('PTTL', KEYS[1])
+if ttl >= 0 and ttl <= tonumber(ARGV[2]) then
+    redis.call('PEXPIRE', KEYS[1], ARGV[3])
+    ttl = tonumber(ARGV[3])
+end
+return {1, ttl, redis.call('GET', KEYS[2]) or '', redis.call('GET', KEYS[3]) or ''}
+"""
+
+    LOCAL_CACHE_SIZE = 4096
+
+    _verify_script = None
+    _local_cache: 'OrderedDict[str, Tuple[str, str, float]]' = OrderedDict()
+
+    @classmethod
+    def __get_verify_script(cls, request: Request):
+        redis = request.app.state.redis
+        if cls._verify_script is None or cls._verify_script.registered_client is not redis:
+            cls._verify_script = redis.register_script(cls.VERIFY_SCRIPT)
+        return cls._verify_script
+
+    @classmethod
+    def __get_local(cls, token_key: str, token: str) -> Optional[str]:
+        local_session = cls._local_cache.get(token_key)
+        if not local_session:
+            return None
+        local_token, version, expire_at = local_session
+        if local_token != token or expire_at <= time.monotonic():
+            cls._local_cache.pop(token_key, None)
+            return None
+        return version
+
+    @classmethod
+    def __put_local(cls, token_key: str, token: str, version: str, ttl_ms: int):
+        memo_seconds = JwtConfig.jwt_session_memo_seconds
+        if memo_seconds <= 0:
+            return
+        # 记忆时间不超过令牌在redis中的剩余有效期，避免过期令牌在本地继续生效
+        if ttl_ms >= 0:
+            memo_seconds = min(memo_seconds, ttl_ms / 1000)
+        cls._local_cache[token_key] = (token, version, time.monotonic() + memo_seconds)
+        cls._local_cache.move_to_end(token_key)
+        while len(cls._local_cache) > cls.LOCAL_CACHE_SIZE:
+            cls._local_cache.popitem(last=False)
+
+    @classmethod
+    async def verify_token_services(cls, request: Request, token_key: str, token: str, user_id: int) -> Optional[str]:
+        """
+        校验令牌是否为当前有效会话，必要时滑动续期
+
+        :param request: Request对象
+        :param token_key: 令牌在redis中的键名
+        :param token: 请求携带的令牌
+        :param user_id: 用户id
+        :return: 用户权限快照版本，令牌已失效时为None
+        """
+        version = cls.__get_local(token_key, token)
+        if version is not None:
+            return version
+        expire_ms = JwtConfig.jwt_redis_expire_minutes * 60 * 1000
+        # 已使用时长达到有效期的 refresh_ratio 后才续期，即剩余有效期不超过 (1 - refresh_ratio) * 有效期
+        refresh_below_ms = int(expire_ms * (1 - JwtConfig.jwt_redis_refresh_ratio))
+        result: List = await cls.__get_verify_script(request)(
+            keys=[token_key, *UserSnapshotService.get_version_keys(user_id)],
+            args=[token, refresh_below_ms, expire_ms],
+        )
+        if not result or int(result[0]) != 1:
+            cls._local_cache.pop(token_key, None)
+            return None
+        version = UserSnapshotService.build_version(result[2:])
+        cls.__put_local(token_key, token, version, int(result[1]))
+        return version
+
+    @classmethod
+    def evict_local_services(cls, token_key: str):
+        """
+        移除进程内记忆的令牌，退出登录、强退后调用
+
+        :param token_key: 令牌在redis中的键名
+        :return:
+        """
+        cls._local_cache.pop(token_key, None)
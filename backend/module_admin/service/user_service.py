@@ -31,6 +31,7 @@ from module_admin.service.config_service import ConfigService
 from module_admin.service.dept_service import DeptService
 from module_admin.service.post_service import PostService
 from module_admin.service.role_service import RoleService
+from module_admin.service.user_snapshot_service import UserSnapshotService
 from utils.common_util import CamelCaseUtil
 from utils.excel_util import ExcelUtil
 from utils.page_util import PageResponseModel
@@ -257,12 +258,16 @@ class UserService:
                 raise e
 
     @classmethod
-    async def edit_user_services(cls, query_db: AsyncSession, page_object: EditUserModel):
+    async def edit_user_services(
+        cls, request: Request, query_db: AsyncSession, page_object: EditUserModel, bump_snapshot: bool = True
+    ):
         """
         编辑用户信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 编辑用户对象
+        :param bump_snapshot: 是否递增用户快照版本，仅更新登录时间等不影响权限的字段时可关闭
         :return: 编辑用户校验结果
         """
         edit_user = page_object.model_dump(exclude_unset=True, exclude={'admin'})
@@ -297,6 +302,8 @@ class UserService:
                                 query_db, UserPostModel(userId=page_object.user_id, postId=post)
                             )
                 await query_db.commit()
+                if bump_snapshot:
+                    await UserSnapshotService.bump_user_version_services(request, [page_object.user_id])
                 return CrudResponseModel(is_success=True, message='更新成功')
             except Exception as e:
                 await query_db.rollback()
@@ -305,10 +312,11 @@ class UserService:
             raise ServiceException(message='用户不存在')
 
     @classmethod
-    async def delete_user_services(cls, query_db: AsyncSession, page_object: DeleteUserModel):
+    async def delete_user_services(cls, request: Request, query_db: AsyncSession, page_object: DeleteUserModel):
         """
         删除用户信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 删除用户对象
         :return: 删除用户校验结果
@@ -324,6 +332,7 @@ class UserService:
                     await UserDao.delete_user_post_dao(query_db, UserPostModel(**user_id_dict))
                     await UserDao.delete_user_dao(query_db, UserModel(**user_id_dict))
                 await query_db.commit()
+                await UserSnapshotService.bump_user_version_services(request, user_id_list)
                 return CrudResponseModel(is_success=True, message='删除成功')
             except Exception as e:
                 await query_db.rollback()
@@ -393,10 +402,11 @@ class UserService:
         )
 
     @classmethod
-    async def reset_user_services(cls, query_db: AsyncSession, page_object: ResetUserModel):
+    async def reset_user_services(cls, request: Request, query_db: AsyncSession, page_object: ResetUserModel):
         """
         重置用户密码service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 重置用户对象
         :return: 重置用户校验结果
@@ -417,6 +427,7 @@ class UserService:
             reset_user['password'] = PwdUtil.get_password_hash(page_object.password)
             await UserDao.edit_user_dao(query_db, reset_user)
             await query_db.commit()
+            await UserSnapshotService.bump_user_version_services(request, [page_object.user_id])
             return CrudResponseModel(is_success=True, message='重置成功')
         except Exception as e:
             await query_db.rollback()
@@ -459,6 +470,7 @@ class UserService:
         await file.close()
         df.rename(columns=header_dict, inplace=True)
         add_error_result = []
+        edit_user_id_list = []
         count = 0
         try:
             for index, row in df.iterrows():
@@ -518,6 +530,7 @@ class UserService:
                             )
                         edit_user = edit_user_model.model_dump(exclude_unset=True)
                         await UserDao.edit_user_dao(query_db, edit_user)
+                        edit_user_id_list.append(edit_user_model.user_id)
                     else:
                         add_error_result.append(f"{count}.用户账号{row['user_name']}已存在")
                 else:
@@ -528,6 +541,7 @@ class UserService:
                         )
                     await UserDao.add_user_dao(query_db, add_user)
             await query_db.commit()
+            await UserSnapshotService.bump_user_version_services(request, edit_user_id_list)
             return CrudResponseModel(is_success=True, message='\n'.join(add_error_result))
         except Exception as e:
             await query_db.rollback()
@@ -621,10 +635,11 @@ class UserService:
         return result
 
     @classmethod
-    async def add_user_role_services(cls, query_db: AsyncSession, page_object: CrudUserRoleModel):
+    async def add_user_role_services(cls, request: Request, query_db: AsyncSession, page_object: CrudUserRoleModel):
         """
         新增用户关联角色信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 新增用户关联角色对象
         :return: 新增用户关联角色校验结果
@@ -636,6 +651,7 @@ class UserService:
                 for role_id in role_id_list:
                     await UserDao.add_user_role_dao(query_db, UserRoleModel(userId=page_object.user_id, roleId=role_id))
                 await query_db.commit()
+                await UserSnapshotService.bump_user_version_services(request, [page_object.user_id])
                 return CrudResponseModel(is_success=True, message='分配成功')
             except Exception as e:
                 await query_db.rollback()
@@ -644,6 +660,7 @@ class UserService:
             try:
                 await UserDao.delete_user_role_by_user_and_role_dao(query_db, UserRoleModel(userId=page_object.user_id))
                 await query_db.commit()
+                await UserSnapshotService.bump_user_version_services(request, [page_object.user_id])
                 return CrudResponseModel(is_success=True, message='分配成功')
             except Exception as e:
                 await query_db.rollback()
@@ -662,6 +679,7 @@ class UserService:
                             query_db, UserRoleModel(userId=user_id, roleId=page_object.role_id)
                         )
                 await query_db.commit()
+                await UserSnapshotService.bump_user_version_services(request, user_id_list)
                 return CrudResponseModel(is_success=True, message='新增成功')
             except Exception as e:
                 await query_db.rollback()
@@ -670,10 +688,11 @@ class UserService:
             raise ServiceException(message='不满足新增条件')
 
     @classmethod
-    async def delete_user_role_services(cls, query_db: AsyncSession, page_object: CrudUserRoleModel):
+    async def delete_user_role_services(cls, request: Request, query_db: AsyncSession, page_object: CrudUserRoleModel):
         """
         删除用户关联角色信息service
 
+        :param request: Request对象
         :param query_db: orm对象
         :param page_object: 删除用户关联角色对象
         :return: 删除用户关联角色校验结果
@@ -685,6 +704,7 @@ class UserService:
                         query_db, UserRoleModel(userId=page_object.user_id, roleId=page_object.role_id)
                     )
                     await query_db.commit()
+                    await UserSnapshotService.bump_user_version_services(request, [page_object.user_id])
                     return CrudResponseModel(is_success=True, message='删除成功')
                 except Exception as e:
                     await query_db.rollback()
@@ -697,6 +717,7 @@ class UserService:
                             query_db, UserRoleModel(userId=user_id, roleId=page_object.role_id)
                         )
                     await query_db.commit()
+                    await UserSnapshotService.bump_user_version_services(request, user_id_list)
                     return CrudResponseModel(is_success=True, message='删除成功')
                 except Exception as e:
                     await query_db.rollback()
@@ -0,0 +1,136 @@
+import json
+from collections import OrderedDict
+from datetime import timedelta
+from fastapi import Request
+from typing import Iterable, List, Optional, Tuple, Union
+from config.enums import RedisInitKeyConfig
+from config.env import AppConfig
+from module_admin.entity.vo.user_vo import CurrentUserModel
+from utils.log_util import logger
+
+
+class UserSnapshotService:
+    """
+    当前用户权限快照缓存服务层
+
+    快照按 user_id 缓存在 Redis 与进程内 LRU 中，并记录生成时的版本号（全局版本.用户版本）。
+    角色、菜单、部门变更递增全局版本，用户自身变更递增用户版本，版本不一致的快照视为失效。
+    """
+
+    GLOBAL_VERSION_ID = 'global'
+
+    _local_cache: 'OrderedDict[int, Tuple[str, CurrentUserModel]]' = OrderedDict()
+
+    @classmethod
+    def get_version_keys(cls, user_id: int) -> List[str]:
+        """
+        获取快照版本号键名
+
+        :param user_id: 用户id
+        :return: 全局版本键名与用户版本键名
+        """
+        return [
+            f'{RedisInitKeyConfig.USER_SNAPSHOT_VERSION.key}:{cls.GLOBAL_VERSION_ID}',
+            f'{RedisInitKeyConfig.USER_SNAPSHOT_VERSION.key}:{user_id}',
+        ]
+
+    @classmethod
+    def build_version(cls, version_values: Iterable[Optional[str]]) -> str:
+        """
+        根据redis中的版本号生成快照版本
+
+        :param version_values: 全局版本号与用户版本号，不存在时为None
+        :return: 快照版本
+        """
+        return '.'.join([str(value or 0) for value in version_values])
+
+    @classmethod
+    def __put_local(cls, user_id: int, version: str, snapshot: CurrentUserModel):
+        cls._local_cache[user_id] = (version, snapshot)
+        cls._local_cache.move_to_end(user_id)
+        while len(cls._local_cache) > AppConfig.app_user_snapshot_lru_size:
+            cls._local_cache.popitem(last=False)
+
+    @classmethod
+    async def get_snapshot_services(cls, request: Request, user_id: int, version: str) -> Optional[CurrentUserModel]:
+        """
+        获取当前版本的用户权限快照，优先读取进程内缓存
+
+        :param request: Request对象
+        :param user_id: 用户id
+        :param version: 快照版本
+        :return: 用户权限快照副本，不存在或版本不一致时为None
+        """
+        local_snapshot = cls._local_cache.get(user_id)
+        if local_snapshot and local_snapshot[0] == version:
+            cls._local_cache.move_to_end(user_id)
+            # 返回副本，避免请求内对当前用户对象的修改污染缓存
+            return local_snapshot[1].model_copy(deep=True)
+        cache_value = await request.app.state.redis.get(f'{RedisInitKeyConfig.USER_SNAPSHOT.key}:{user_id}')
+        if not cache_value:
+            return None
+        try:
+            cache_data = json.loads(cache_value)
+            if cache_data.get('version') != version:
+                return None
+            snapshot = CurrentUserModel.model_validate(cache_data.get('snapshot'))
+        except Exception as e:
+            logger.warning(f'用户权限快照解析失败，重新加载，详细错误信息：{e}')
+            return None
+        cls.__put_local(user_id, version, snapshot)
+        return snapshot.model_copy(deep=True)
+
+    @classmethod
+    async def set_snapshot_services(cls, request: Request, user_id: int, version: str, snapshot: CurrentUserModel):
+        """
+        缓存用户权限快照
+
+        :param request: Request对象
+        :param user_id: 用户id
+        :param version: 快照版本（加载前读取的版本，加载期间发生变更时下次请求会因版本不一致重新加载）
+        :param snapshot: 用户权限快照
+        :return:
+        """
+        await request.app.state.redis.set(
+            f'{RedisInitKeyConfig.USER_SNAPSHOT.key}:{user_id}',
+            json.dumps(
+                dict(version=version, snapshot=snapshot.model_dump(mode='json', by_alias=True)), ensure_ascii=False
+            ),
+            ex=timedelta(minutes=AppConfig.app_user_snapshot_expire_minutes),
+        )
+        cls.__put_local(user_id, version, snapshot.model_copy(deep=True))
+
+    @classmethod
+    async def bump_user_version_services(cls, request: Request, user_ids: Iterable[Union[int, str]]):
+        """
+        用户信息、角色分配等变更后递增用户版本，需在事务提交后调用；失败仅记录日志，不影响已提交的变更
+
+        :param request: Request对象
+        :param user_ids: 用户id列表
+        :return:
+        """
+        version_keys = [cls.get_version_keys(user_id)[1] for user_id in dict.fromkeys(user_ids) if user_id]
+        if not version_keys:
+            return
+        try:
+            async with request.app.state.redis.pipeline(transaction=False) as pipe:
+                for version_key in version_keys:
+                    pipe.incr(version_key)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f'用户快照版本递增失败，快照过期前可能仍使用旧权限，详细错误信息：{e}')
+
+    @classmethod
+    async def bump_global_version_services(cls, request: Request):
+        """
+        角色、菜单、部门变更后递增全局版本，所有用户的快照随之失效，需在事务提交后调用；失败仅记录日志，不影响已提交的变更
+
+        :param request: Request对象
+        :return:
+        """
+        try:
+            await request.app.state.redis.incr(
+                f'{RedisInitKeyConfig.USER_SNAPSHOT_VERSION.key}:{cls.GLOBAL_VERSION_ID}'
+            )
+        except Exception as e:
+            logger.error(f'全局快照版本递增失败，快照过期前可能仍使用旧权限，详细错误信息：{e}')
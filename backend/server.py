@@ -2,6 +2,7 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from config.env import AppConfig
 from config.get_db import init_create_table, init_admin_user
+from config.get_log_writer import LogWriterUtil
 from config.get_redis import RedisUtil
 from config.get_scheduler import SchedulerUtil
 from domains.ingestion.events import register_ingestion_event_handlers
@@ -10,6 +11,7 @@ from exceptions.handle import handle_exception
 from middlewares.handle import handle_middleware
 from sub_applications.handle import handle_sub_applications
 from utils.common_util import worship
+from utils.ip_location_util import IpLocationUtil
 from utils.log_util import logger
 
 
@@ -24,11 +26,16 @@ async def lifespan(app: FastAPI):
     app.state.redis = await RedisUtil.create_redis_pool()
     await RedisUtil.init_sys_dict(app.state.redis)
     await RedisUtil.init_sys_config(app.state.redis)
-    await SchedulerUtil.init_system_scheduler()
+    await SchedulerUtil.init_system_scheduler(app.state.redis)
+    await LogWriterUtil.init_log_writer()
+    if AppConfig.app_ip_location_query:
+        IpLocationUtil.init_providers()
     logger.info(f'{AppConfig.app_name}启动成功')
     yield
-    await RedisUtil.close_redis_pool(app)
+    await LogWriterUtil.close_log_writer()
+    # 分布式调度模式下关闭定时任务时需释放redis中的主节点锁，先于redis连接关闭
     await SchedulerUtil.close_system_scheduler()
+    await RedisUtil.close_redis_pool(app)
 
 
 # 初始化FastAPI对象
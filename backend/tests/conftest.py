@@ -0,0 +1,94 @@
+import os
+import sys
+import types
+from urllib.parse import quote_plus
+
+import pytest
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, BACKEND_DIR)
+# 配置按当前目录加载 .env.dev，与 python app.py --env=dev 启动时一致
+os.chdir(BACKEND_DIR)
+
+# config.env 在导入时解析命令行参数，导入期间替换为应用自身的启动参数，避免解析 pytest 参数
+_pytest_argv = sys.argv
+sys.argv = [_pytest_argv[0], '--env=dev']
+try:
+    import config.env  # noqa: E402,F401
+finally:
+    sys.argv = _pytest_argv
+
+from sqlalchemy import BigInteger, create_engine  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncAttrs, async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.orm import DeclarativeBase, sessionmaker  # noqa: E402
+from sqlalchemy.pool import NullPool  # noqa: E402
+
+
+@compiles(BigInteger, 'sqlite')
+def _compile_big_integer_sqlite(type_, compiler, **kw):
+    # SQLite 仅 INTEGER PRIMARY KEY 自增，BigInteger 主键按 INTEGER 建表
+    return 'INTEGER'
+
+
+def _build_test_database_module() -> types.ModuleType:
+    """
+    以 SQLite 提供 config.database 的同名对象：测试不连接 MySQL/PostgreSQL，各用例再按需替换为独立的临时库会话。
+    """
+    module = types.ModuleType('config.database')
+    module.quote_plus = quote_plus
+    module.ASYNC_SQLALCHEMY_DATABASE_URL = 'sqlite+aiosqlite://'
+    module.async_engine = create_async_engine(module.ASYNC_SQLALCHEMY_DATABASE_URL)
+    module.AsyncSessionLocal = async_sessionmaker(autocommit=False, autoflush=False, bind=module.async_engine)
+    module.async_task_engine = module.async_engine
+    module.AsyncTaskSessionLocal = module.AsyncSessionLocal
+
+    class Base(AsyncAttrs, DeclarativeBase):
+        pass
+
+    class TaskBase(AsyncAttrs, DeclarativeBase):
+        pass
+
+    module.Base = Base
+    module.TaskBase = TaskBase
+    return module
+
+
+sys.modules['config.database'] = _build_test_database_module()
+import config  # noqa: E402
+
+config.database = sys.modules['config.database']
+
+
+@pytest.fixture
+def sqlite_url(tmp_path):
+    return f'{tmp_path / "backend.db"}'
+
+
+@pytest.fixture
+def sync_session_factory(sqlite_url):
+    """
+    临时 SQLite 库上的同步会话，已建好全部表。
+    """
+    from config.database import Base
+
+    engine = create_engine(f'sqlite:///{sqlite_url}')
+    Base.metadata.create_all(engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def async_session_factory(sqlite_url, sync_session_factory):
+    """
+    与 sync_session_factory 同一临时库上的异步会话工厂；不复用连接，各用例的事件循环结束后不遗留连接。
+    """
+    engine = create_async_engine(f'sqlite+aiosqlite:///{sqlite_url}', poolclass=NullPool)
+    return async_sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def redis_client():
+    from fakeredis import FakeAsyncRedis
+
+    return FakeAsyncRedis(decode_responses=True)
@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from utils.ip_location_util import IpLocationProvider, IpLocationUtil, OfflineIpLocationProvider
+
+IP_DB_LINES = [
+    '# 起始ip,结束ip,归属区域',
+    '1.0.8.0,1.0.15.255,广东-广州',
+    '16777216,16777471,北京-北京',
+    'bad line',
+    '8.8.8.0,8.8.8.255,美国-加州',
+]
+
+
+class RecordingProvider(IpLocationProvider):
+    name = 'recording'
+
+    def __init__(self, location):
+        self.location = location
+        self.queried = []
+
+    async def lookup(self, ip):
+        self.queried.append(ip)
+        return self.location
+
+
+@pytest.fixture
+def offline_provider(tmp_path):
+    db_file = tmp_path / 'ip.csv'
+    db_file.write_text('\n'.join(IP_DB_LINES) + '\n', encoding='utf-8')
+    return OfflineIpLocationProvider(str(db_file))
+
+
+@pytest.fixture
+def ip_location(monkeypatch, offline_provider):
+    monkeypatch.setattr(IpLocationUtil, '_initialized', True)
+    monkeypatch.setattr(IpLocationUtil, '_offline_provider', offline_provider)
+    monkeypatch.setattr(IpLocationUtil, '_remote_provider', None)
+    monkeypatch.setattr(IpLocationUtil, '_pending', {})
+    return IpLocationUtil
+
+
+@pytest.mark.parametrize(
+    'ip, location',
+    [
+        ('1.0.0.0', '北京-北京'),
+        ('1.0.0.255', '北京-北京'),
+        ('1.0.1.0', None),
+        ('1.0.8.0', '广东-广州'),
+        ('1.0.15.255', '广东-广州'),
+        ('1.0.16.0', None),
+        ('0.255.255.255', None),
+        ('8.8.8.8', '美国-加州'),
+        ('not-an-ip', None),
+        ('2001:4860::8888', None),
+    ],
+)
+def test_offline_lookup_bisects_sorted_ranges(offline_provider, ip, location):
+    assert offline_provider.lookup_sync(ip) == location
+
+
+@pytest.mark.parametrize(
+    'ip, intranet',
+    [
+        ('', True),
+        ('localhost', True),
+        ('127.0.0.1', True),
+        ('10.1.2.3', True),
+        ('172.16.0.1', True),
+        ('192.168.1.1', True),
+        ('169.254.0.1', True),
+        ('::1', True),
+        ('8.8.8.8', False),
+        ('unknown', False),
+    ],
+)
+def test_intranet_detection(ip, intranet):
+    assert IpLocationUtil.is_intranet(ip) is intranet
+
+
+def test_forwarded_for_uses_the_first_client_address(ip_location, redis_client):
+    async def scenario():
+        assert await ip_location.get_ip_location(redis_client, '8.8.8.8, 10.0.0.1') == '美国-加州'
+        assert await ip_location.get_ip_location(redis_client, ' 10.0.0.1 , 8.8.8.8') == IpLocationUtil.INTRANET
+        assert await ip_location.get_ip_location(redis_client, None) == IpLocationUtil.INTRANET
+
+    asyncio.run(scenario())
+
+
+def test_offline_miss_is_resolved_remotely_in_background_and_cached(ip_location, redis_client):
+    remote_provider = RecordingProvider('日本-东京')
+    ip_location._remote_provider = remote_provider
+
+    async def scenario():
+        # 首次查询不等待远程接口
+        assert await ip_location.get_ip_location(redis_client, '93.184.216.34') == IpLocationUtil.UNKNOWN
+        await asyncio.gather(*ip_location._pending.values())
+
+        assert await ip_location.get_ip_location(redis_client, '93.184.216.34') == '日本-东京'
+        # 离线库命中时不访问远程接口
+        assert await ip_location.get_ip_location(redis_client, '1.0.8.1') == '广东-广州'
+        assert remote_provider.queried == ['93.184.216.34']
+
+    asyncio.run(scenario())
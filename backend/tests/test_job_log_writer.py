@@ -0,0 +1,182 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_SUBMITTED, JobExecutionEvent, JobSubmissionEvent
+
+from config import get_scheduler
+from config.get_scheduler import JobLogWriter, SchedulerUtil
+from module_admin.entity.do.job_do import SysJob, SysJobLog
+
+RUN_TIME = datetime(2026, 1, 1, 8, 0, 0)
+JOB_DETAIL = {
+    'job_name': '测试任务',
+    'job_group': 'default',
+    'job_executor': 'default',
+    'invoke_target': 'module_task.scheduler_test.job',
+    'job_args': '',
+    'job_kwargs': '',
+    'job_trigger': 'cron[second=0]',
+}
+
+
+@pytest.fixture
+def writer(monkeypatch, sync_session_factory):
+    monkeypatch.setattr(get_scheduler, 'SessionLocal', sync_session_factory)
+    return JobLogWriter()
+
+
+def create_op(job_id='1', run_time=RUN_TIME, job_detail=JOB_DETAIL):
+    return dict(
+        job_id=job_id,
+        log_job_id=SchedulerUtil._main_job_id(job_id),
+        run_keys=[(str(job_id), run_time)],
+        start_time=run_time,
+        job_message='执行开始',
+        job_detail=job_detail,
+    )
+
+
+def finish_op(job_id='1', run_time=RUN_TIME, job_detail=JOB_DETAIL, status='0'):
+    return dict(
+        job_id=job_id,
+        log_job_id=SchedulerUtil._main_job_id(job_id),
+        run_key=(str(job_id), run_time),
+        start_time=run_time,
+        job_detail=job_detail,
+        update_data=SchedulerUtil.build_job_log_update_data(job_id, 'JobExecutionEvent', status, '', {'rows': 3}),
+    )
+
+
+def query_job_logs(session_factory):
+    with session_factory() as session:
+        return session.query(SysJobLog).order_by(SysJobLog.job_log_id).all()
+
+
+def test_finish_updates_the_row_written_on_submit(writer, sync_session_factory):
+    writer.submit(JobLogWriter.CREATE, create_op())
+    [running_log] = query_job_logs(sync_session_factory)
+    assert running_log.status == '2'
+    assert writer._pending[('1', RUN_TIME)] == running_log.job_log_id
+
+    writer.submit(JobLogWriter.FINISH, finish_op())
+
+    [job_log] = query_job_logs(sync_session_factory)
+    assert job_log.job_log_id == running_log.job_log_id
+    assert job_log.status == '0'
+    assert job_log.end_time is not None
+    assert '"rows": 3' in job_log.job_result
+    assert not writer._pending
+
+
+def test_create_and_finish_in_one_batch_share_the_row(writer, sync_session_factory):
+    writer._JobLogWriter__write_batch(
+        [
+            (JobLogWriter.CREATE, create_op()),
+            (JobLogWriter.FINISH, finish_op(status='1')),
+        ]
+    )
+
+    [job_log] = query_job_logs(sync_session_factory)
+    assert job_log.status == '1'
+    assert not writer._pending
+
+
+def test_finish_without_submit_inserts_a_complete_row(writer, sync_session_factory):
+    writer.submit(JobLogWriter.FINISH, finish_op())
+
+    [job_log] = query_job_logs(sync_session_factory)
+    assert job_log.status == '0'
+    assert job_log.job_name == '测试任务'
+    assert job_log.start_time == RUN_TIME
+    assert job_log.end_time is not None
+
+
+def test_failed_op_does_not_drop_the_rest_of_the_batch(writer, sync_session_factory):
+    broken_op = create_op(job_id='2', run_time=datetime(2026, 1, 1, 9, 0, 0))
+    del broken_op['job_message']
+
+    writer._JobLogWriter__write_batch(
+        [
+            (JobLogWriter.CREATE, create_op()),
+            (JobLogWriter.CREATE, broken_op),
+            (JobLogWriter.FINISH, finish_op(job_id='3')),
+        ]
+    )
+
+    job_logs = query_job_logs(sync_session_factory)
+    assert [job_log.job_id for job_log in job_logs] == [1, 3]
+    # 逐条重试后成功写入的执行中日志仍可被结束事件关联
+    assert ('1', RUN_TIME) in writer._pending
+    assert ('2', datetime(2026, 1, 1, 9, 0, 0)) not in writer._pending
+
+
+def test_job_detail_falls_back_to_db_when_job_left_the_scheduler(writer, sync_session_factory):
+    with sync_session_factory() as session:
+        session.add(
+            SysJob(
+                job_id=5,
+                job_name='库中任务',
+                invoke_target='module_task.scheduler_test.job',
+                cron_expression='0 * * * * ?',
+            )
+        )
+        session.commit()
+
+    writer.submit(JobLogWriter.FINISH, finish_op(job_id='5', job_detail=None))
+    writer.submit(JobLogWriter.FINISH, finish_op(job_id='5_immediate', job_detail=None))
+    writer.submit(JobLogWriter.FINISH, finish_op(job_id='6', job_detail=None))
+
+    job_logs = query_job_logs(sync_session_factory)
+    assert [(job_log.job_id, job_log.job_name, job_log.job_trigger) for job_log in job_logs] == [
+        (5, '库中任务', '0 * * * * ?'),
+        (5, '库中任务', 'date'),
+    ]
+
+
+def test_background_thread_writes_queued_ops_before_stopping(writer, sync_session_factory):
+    writer.start()
+    for minute in range(3):
+        run_time = RUN_TIME.replace(minute=minute)
+        writer.submit(JobLogWriter.CREATE, create_op(run_time=run_time))
+        writer.submit(JobLogWriter.FINISH, finish_op(run_time=run_time))
+    asyncio.run(writer.stop())
+
+    job_logs = query_job_logs(sync_session_factory)
+    assert len(job_logs) == 3
+    assert {job_log.status for job_log in job_logs} == {'0'}
+    assert not writer._pending
+
+
+@pytest.fixture
+def captured_ops(monkeypatch):
+    ops = []
+    monkeypatch.setattr(get_scheduler.job_log_writer, 'submit', lambda op_type, data: ops.append((op_type, data)))
+    monkeypatch.setattr(SchedulerUtil, '_get_job_detail_from_scheduler', classmethod(lambda cls, job_id: JOB_DETAIL))
+    return ops
+
+
+def test_listener_correlates_submitted_and_executed_events(captured_ops):
+    scheduled_run_time = RUN_TIME.replace(microsecond=123456).astimezone()
+
+    SchedulerUtil.scheduler_event_listener(
+        JobSubmissionEvent(EVENT_JOB_SUBMITTED, '7_immediate', 'default', [scheduled_run_time])
+    )
+    SchedulerUtil.scheduler_event_listener(
+        JobExecutionEvent(EVENT_JOB_EXECUTED, '7_immediate', 'default', scheduled_run_time, retval={'status': 'failed'})
+    )
+
+    [(create_type, create_data), (finish_type, finish_data)] = captured_ops
+    assert (create_type, finish_type) == (JobLogWriter.CREATE, JobLogWriter.FINISH)
+    assert create_data['log_job_id'] == finish_data['log_job_id'] == 7
+    assert create_data['run_keys'] == [finish_data['run_key']] == [('7_immediate', RUN_TIME)]
+    assert finish_data['update_data']['status'] == '1'
+
+
+def test_listener_skips_run_events_in_distributed_mode(monkeypatch, captured_ops):
+    monkeypatch.setattr(get_scheduler.JobConfig, 'job_dispatch_mode', 'distributed')
+
+    SchedulerUtil.scheduler_event_listener(JobSubmissionEvent(EVENT_JOB_SUBMITTED, '7', 'default', [RUN_TIME]))
+    SchedulerUtil.scheduler_event_listener(JobExecutionEvent(EVENT_JOB_EXECUTED, '7', 'default', RUN_TIME))
+
+    assert captured_ops == []
@@ -0,0 +1,193 @@
+import asyncio
+
+import pytest
+
+import job_worker
+import module_task.scheduler_test
+from config import get_scheduler
+from config.get_scheduler import JobLogWriter, SchedulerUtil
+from job_worker import JobWorker, parse_concurrency, resolve_invoke_target
+from module_admin.entity.do.job_do import SysJob, SysJobLog
+
+STREAM_KEY = SchedulerUtil.get_dispatch_stream_key('default')
+
+
+@pytest.fixture
+def worker(monkeypatch, redis_client, async_session_factory, sync_session_factory):
+    monkeypatch.setattr(job_worker, 'AsyncSessionLocal', async_session_factory)
+    monkeypatch.setattr(get_scheduler, 'SessionLocal', sync_session_factory)
+    monkeypatch.setattr(job_worker, 'job_log_writer', JobLogWriter())
+    monkeypatch.setattr(job_worker.JobConfig, 'job_dispatch_mode', 'distributed')
+    monkeypatch.setattr(JobWorker, 'READ_BLOCK_MS', 10)
+    monkeypatch.setattr(SchedulerUtil, '_redis', redis_client)
+    with sync_session_factory() as session:
+        session.add_all([build_job(1, status='0'), build_job(2, status='1')])
+        session.commit()
+    job_worker_instance = JobWorker(redis_client, {'default': 2})
+    job_worker_instance.consumer_name = 'worker-a'
+    yield job_worker_instance
+    job_worker_instance._thread_executor.shutdown(wait=True)
+
+
+def build_job(job_id: int, status: str) -> SysJob:
+    return SysJob(
+        job_id=job_id,
+        job_name=f'job{job_id}',
+        job_group='default',
+        invoke_target='module_task.scheduler_test.async_job',
+        cron_expression='0 * * * * ?',
+        status=status,
+    )
+
+
+def job_message(job_id: str, invoke_target: str = 'module_task.scheduler_test.async_job') -> dict:
+    return dict(
+        job_id=job_id,
+        job_name=f'job{job_id}',
+        job_group='default',
+        job_executor='default',
+        invoke_target=invoke_target,
+        job_args='a,b',
+        job_kwargs='{"c": 1}',
+        job_trigger='0 * * * * ?',
+    )
+
+
+async def deliver(worker: JobWorker, message: dict):
+    """
+    写入分发队列并以执行节点身份读取，返回待确认的消息
+    """
+    await SchedulerUtil.dispatch_job(message)
+    await worker._JobWorker__ensure_group(STREAM_KEY)
+    [(_, [(message_id, fields)])] = await worker.redis.xreadgroup(
+        job_worker.JobConfig.job_consumer_group, worker.consumer_name, {STREAM_KEY: '>'}, count=1
+    )
+    return message_id, fields
+
+
+async def pending_count(worker: JobWorker) -> int:
+    return (await worker.redis.xpending(STREAM_KEY, job_worker.JobConfig.job_consumer_group))['pending']
+
+
+def query_job_logs(session_factory):
+    with session_factory() as session:
+        return session.query(SysJobLog).order_by(SysJobLog.job_log_id).all()
+
+
+def test_parse_concurrency_and_invoke_target_whitelist():
+    assert parse_concurrency('default:4, sqlalchemy:0,redis,') == {'default': 4, 'sqlalchemy': 1, 'redis': 1}
+    assert resolve_invoke_target('module_task.scheduler_test.job') is module_task.scheduler_test.job
+    with pytest.raises(ValueError):
+        resolve_invoke_target('config.get_scheduler.scheduler')
+    with pytest.raises(ValueError):
+        resolve_invoke_target('os.system')
+
+
+def test_enabled_job_runs_logs_and_acks(monkeypatch, worker, sync_session_factory):
+    calls = []
+
+    async def async_job(*args, **kwargs):
+        calls.append((args, kwargs))
+        return {'status': 'success'}
+
+    monkeypatch.setattr(module_task.scheduler_test, 'async_job', async_job)
+
+    async def scenario():
+        message_id, fields = await deliver(worker, job_message('1'))
+        assert fields['dispatched_at']
+        await worker._JobWorker__execute(STREAM_KEY, message_id, fields)
+        assert await pending_count(worker) == 0
+
+    asyncio.run(scenario())
+
+    assert calls == [(('a', 'b'), {'c': 1})]
+    [job_log] = query_job_logs(sync_session_factory)
+    assert (job_log.job_id, job_log.status, job_log.job_trigger) == (1, '0', '0 * * * * ?')
+    assert 'worker-a' in job_log.job_message
+
+
+def test_disabled_job_is_skipped_and_acked(worker, sync_session_factory):
+    async def scenario():
+        message_id, fields = await deliver(worker, job_message('2'))
+        await worker._JobWorker__execute(STREAM_KEY, message_id, fields)
+        assert await pending_count(worker) == 0
+
+        # 已删除的任务同样跳过
+        message_id, fields = await deliver(worker, job_message('9'))
+        await worker._JobWorker__execute(STREAM_KEY, message_id, fields)
+        assert await pending_count(worker) == 0
+
+    asyncio.run(scenario())
+    assert query_job_logs(sync_session_factory) == []
+
+
+def test_immediate_run_ignores_the_job_status(worker, sync_session_factory):
+    async def scenario():
+        message_id, fields = await deliver(worker, job_message('2_immediate'))
+        await worker._JobWorker__execute(STREAM_KEY, message_id, fields)
+
+    asyncio.run(scenario())
+    [job_log] = query_job_logs(sync_session_factory)
+    assert (job_log.job_id, job_log.status) == (2, '0')
+
+
+def test_failed_job_is_logged_and_still_acked(worker, sync_session_factory):
+    async def scenario():
+        message_id, fields = await deliver(worker, job_message('1_immediate', invoke_target='os.system'))
+        await worker._JobWorker__execute(STREAM_KEY, message_id, fields)
+        assert await pending_count(worker) == 0
+
+    asyncio.run(scenario())
+    [job_log] = query_job_logs(sync_session_factory)
+    assert job_log.status == '1'
+    assert '调用目标不在允许范围内' in job_log.exception_info
+
+
+def test_ack_failure_leaves_message_pending_without_raising(monkeypatch, worker, sync_session_factory):
+    async def failing_xack(*args, **kwargs):
+        raise ConnectionError('redis unavailable')
+
+    async def scenario():
+        message_id, fields = await deliver(worker, job_message('1'))
+        monkeypatch.setattr(worker.redis, 'xack', failing_xack)
+        await worker._JobWorker__execute(STREAM_KEY, message_id, fields)
+        # 未确认的消息留在 pending 列表，超时后由其他节点接管
+        assert await pending_count(worker) == 1
+
+    asyncio.run(scenario())
+    assert len(query_job_logs(sync_session_factory)) == 1
+
+
+def test_run_forever_consumes_dispatched_jobs_until_stopped(monkeypatch, worker, sync_session_factory):
+    xreadgroup = worker.redis.xreadgroup
+
+    async def blocking_xreadgroup(*args, block=None, **kwargs):
+        # fakeredis 的阻塞读取无消息时立即返回，按 Redis 行为等待 block 毫秒，让出事件循环给执行中的任务
+        response = await xreadgroup(*args, block=block, **kwargs)
+        if not response and block:
+            await asyncio.sleep(block / 1000)
+        return response
+
+    monkeypatch.setattr(worker.redis, 'xreadgroup', blocking_xreadgroup)
+
+    async def scenario():
+        for job_id in ('1', '2', '1_immediate'):
+            await SchedulerUtil.dispatch_job(job_message(job_id))
+        [*_, (last_id, _)] = await worker.redis.xrange(STREAM_KEY)
+        run_task = asyncio.create_task(worker.run_forever())
+
+        async def consumed():
+            groups = await worker.redis.xinfo_groups(STREAM_KEY)
+            return groups and groups[0]['last-delivered-id'] == last_id and await pending_count(worker) == 0
+
+        deadline = asyncio.get_running_loop().time() + 3
+        while not await consumed():
+            assert asyncio.get_running_loop().time() < deadline, 'dispatched jobs not consumed before timeout'
+            await asyncio.sleep(0.01)
+        worker.stop()
+        await asyncio.wait_for(run_task, 3)
+
+    asyncio.run(scenario())
+    job_logs = query_job_logs(sync_session_factory)
+    assert sorted(job_log.job_id for job_log in job_logs) == [1, 1]
+    assert {job_log.status for job_log in job_logs} == {'0'}
@@ -0,0 +1,164 @@
+import asyncio
+import os
+from datetime import datetime
+
+import pytest
+
+from config import get_log_writer
+from config.env import AppConfig
+from config.get_log_writer import LogWriterUtil
+from module_admin.dao.log_dao import LoginLogDao
+from module_admin.entity.do.log_do import SysLogininfor, SysOperLog
+from module_admin.entity.vo.log_vo import LogininforModel, OperLogModel
+
+
+@pytest.fixture
+def log_writer(monkeypatch, tmp_path, async_session_factory):
+    monkeypatch.setattr(get_log_writer, 'AsyncSessionLocal', async_session_factory)
+    monkeypatch.setattr(AppConfig, 'app_log_async_write', True)
+    monkeypatch.setattr(AppConfig, 'app_log_queue_size', 100)
+    monkeypatch.setattr(AppConfig, 'app_log_batch_size', 3)
+    monkeypatch.setattr(AppConfig, 'app_log_flush_ms', 60000)
+    monkeypatch.setattr(AppConfig, 'app_log_overflow_policy', 'spill')
+    monkeypatch.setattr(AppConfig, 'app_log_spill_file', str(tmp_path / 'logs' / 'log_spill.jsonl'))
+    monkeypatch.setattr(LogWriterUtil, '_queue', None)
+    monkeypatch.setattr(LogWriterUtil, '_task', None)
+    stats = dict(LogWriterUtil._stats, enqueued=0, written=0, dropped=0, spilled=0, failed_batches=0)
+    monkeypatch.setattr(LogWriterUtil, '_stats', stats)
+    return LogWriterUtil
+
+
+def login_log(user_name: str) -> LogininforModel:
+    return LogininforModel(userName=user_name, ipaddr='127.0.0.1', status='0', msg='登录成功', loginTime=datetime.now())
+
+
+def operation_log(title: str) -> OperLogModel:
+    return OperLogModel(title=title, businessType=1, operName='admin', status=0, operTime=datetime.now(), costTime=5)
+
+
+def count_rows(session_factory, model) -> int:
+    with session_factory() as session:
+        return session.query(model).count()
+
+
+async def wait_until(predicate, timeout: float = 2):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, 'condition not met before timeout'
+        await asyncio.sleep(0.01)
+
+
+def test_full_batch_is_written_without_waiting_for_flush_interval(log_writer, sync_session_factory):
+    async def scenario():
+        await log_writer.init_log_writer()
+        log_writer.submit('login', login_log('admin'))
+        log_writer.submit('operation', operation_log('用户管理'))
+        log_writer.submit('operation', operation_log('角色管理'))
+        log_writer.submit('login', login_log('ry'))
+
+        await wait_until(lambda: log_writer.get_stats()['written'] == 3)
+        # 未攒满一批且未到 flush_ms 的日志留在写入任务中
+        await asyncio.sleep(0.05)
+        assert log_writer.get_stats()['written'] == 3
+
+        await log_writer.close_log_writer()
+        assert not log_writer.is_running()
+
+    asyncio.run(scenario())
+    assert count_rows(sync_session_factory, SysLogininfor) == 2
+    assert count_rows(sync_session_factory, SysOperLog) == 2
+    assert log_writer.get_stats()['enqueued'] == 4
+
+
+def test_partial_batch_is_written_after_flush_interval(monkeypatch, log_writer, sync_session_factory):
+    monkeypatch.setattr(AppConfig, 'app_log_batch_size', 100)
+    monkeypatch.setattr(AppConfig, 'app_log_flush_ms', 20)
+
+    async def scenario():
+        await log_writer.init_log_writer()
+        log_writer.submit('login', login_log('admin'))
+        log_writer.submit('login', login_log('ry'))
+
+        await wait_until(lambda: log_writer.get_stats()['written'] == 2)
+        assert log_writer.is_running()
+        await log_writer.close_log_writer()
+
+    asyncio.run(scenario())
+    assert count_rows(sync_session_factory, SysLogininfor) == 2
+
+
+def test_close_drains_queued_logs(log_writer, sync_session_factory):
+    async def scenario():
+        await log_writer.init_log_writer()
+        for index in range(7):
+            log_writer.submit('operation', operation_log(f'模块{index}'))
+        # 不让出事件循环，关闭时全部日志仍在队列中
+        await log_writer.close_log_writer()
+
+    asyncio.run(scenario())
+    assert count_rows(sync_session_factory, SysOperLog) == 7
+    assert log_writer.get_stats()['queue_size'] == 0
+
+
+def test_queue_overflow_spills_to_file_and_replays_on_next_start(monkeypatch, log_writer, sync_session_factory):
+    monkeypatch.setattr(AppConfig, 'app_log_queue_size', 2)
+
+    async def scenario():
+        await log_writer.init_log_writer()
+        for index in range(5):
+            log_writer.submit('login', login_log(f'user{index}'))
+        assert log_writer.get_stats()['spilled'] == 3
+        await log_writer.close_log_writer()
+        assert count_rows(sync_session_factory, SysLogininfor) == 2
+        assert os.path.exists(AppConfig.app_log_spill_file)
+
+        await log_writer.init_log_writer()
+        await log_writer.close_log_writer()
+
+    asyncio.run(scenario())
+    with sync_session_factory() as session:
+        user_names = sorted(user_name for (user_name,) in session.query(SysLogininfor.user_name))
+    assert user_names == [f'user{index}' for index in range(5)]
+    assert not os.path.exists(AppConfig.app_log_spill_file)
+    assert not os.path.exists(f'{AppConfig.app_log_spill_file}.replay')
+
+
+def test_failed_batch_spills_instead_of_losing_logs(monkeypatch, log_writer, sync_session_factory):
+    add_login_log_batch_dao = LoginLogDao.add_login_log_batch_dao
+
+    async def failing_batch_dao(db, login_log_list):
+        raise RuntimeError('database unavailable')
+
+    async def scenario():
+        monkeypatch.setattr(LoginLogDao, 'add_login_log_batch_dao', failing_batch_dao)
+        await log_writer.init_log_writer()
+        log_writer.submit('login', login_log('admin'))
+        log_writer.submit('operation', operation_log('用户管理'))
+        await log_writer.close_log_writer()
+        stats = log_writer.get_stats()
+        assert (stats['failed_batches'], stats['spilled'], stats['written']) == (1, 2, 0)
+
+        # 数据库恢复后重启，溢出文件中的日志补录入库
+        monkeypatch.setattr(LoginLogDao, 'add_login_log_batch_dao', add_login_log_batch_dao)
+        await log_writer.init_log_writer()
+        await log_writer.close_log_writer()
+
+    asyncio.run(scenario())
+    assert count_rows(sync_session_factory, SysLogininfor) == 1
+    assert count_rows(sync_session_factory, SysOperLog) == 1
+
+
+def test_drop_policy_counts_rejected_logs(monkeypatch, log_writer, sync_session_factory):
+    monkeypatch.setattr(AppConfig, 'app_log_queue_size', 1)
+    monkeypatch.setattr(AppConfig, 'app_log_overflow_policy', 'drop')
+
+    async def scenario():
+        await log_writer.init_log_writer()
+        for index in range(3):
+            log_writer.submit('login', login_log(f'user{index}'))
+        await log_writer.close_log_writer()
+
+    asyncio.run(scenario())
+    stats = log_writer.get_stats()
+    assert (stats['written'], stats['dropped'], stats['spilled']) == (1, 2, 0)
+    assert not os.path.exists(AppConfig.app_log_spill_file)
@@ -0,0 +1,193 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.schedulers.base import STATE_PAUSED, STATE_RUNNING
+
+from config import get_scheduler
+from config.enums import RedisInitKeyConfig
+from config.get_scheduler import SchedulerUtil
+from module_admin.dao.job_dao import JobDao
+from module_admin.entity.do.job_do import SysJob
+
+LOCK_KEY = RedisInitKeyConfig.JOB_SCHEDULER_LEADER.key
+
+
+@pytest.fixture
+def distributed_scheduler(monkeypatch, redis_client, async_session_factory, sync_session_factory):
+    # 以内存任务存储的调度器代替模块级调度器，避免连接任务存储所在的数据库与 Redis
+    monkeypatch.setattr(get_scheduler, 'scheduler', AsyncIOScheduler())
+    monkeypatch.setattr(get_scheduler, 'AsyncSessionLocal', async_session_factory)
+    monkeypatch.setattr(get_scheduler.JobConfig, 'job_dispatch_mode', 'distributed')
+    monkeypatch.setattr(get_scheduler.JobConfig, 'job_leader_lock_seconds', 1)
+    monkeypatch.setattr(SchedulerUtil, '_redis', redis_client)
+    monkeypatch.setattr(SchedulerUtil, '_is_leader', False)
+    monkeypatch.setattr(SchedulerUtil, '_job_change_task', None)
+    monkeypatch.setattr(SchedulerUtil, '_instance_id', 'instance-a')
+    with sync_session_factory() as session:
+        session.add(add_job_row(1, 'sync job'))
+        session.commit()
+    return get_scheduler.scheduler
+
+
+def add_job_row(job_id: int, job_name: str, status: str = '0') -> SysJob:
+    return SysJob(
+        job_id=job_id,
+        job_name=job_name,
+        job_group='default',
+        job_executor='default',
+        invoke_target='module_task.scheduler_test.job',
+        cron_expression='0 * * * * ?',
+        status=status,
+    )
+
+
+@asynccontextmanager
+async def leader_election(scheduler):
+    scheduler.start(paused=True)
+    task = asyncio.create_task(SchedulerUtil._SchedulerUtil__run_leader_election())
+    try:
+        yield
+    finally:
+        task.cancel()
+        SchedulerUtil._SchedulerUtil__stop_job_change_listener()
+        scheduler.shutdown(wait=False)
+
+
+async def wait_until(predicate, timeout: float = 3):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        result = predicate()
+        if asyncio.iscoroutine(result):
+            result = await result
+        if result:
+            return
+        assert asyncio.get_running_loop().time() < deadline, 'condition not met before timeout'
+        await asyncio.sleep(0.01)
+
+
+def change_subscribers_are(redis_client, count: int):
+    async def predicate():
+        [(_, subscribers)] = await redis_client.pubsub_numsub(RedisInitKeyConfig.JOB_CHANGED.key)
+        return subscribers == count
+
+    return predicate
+
+
+def test_instance_holding_the_lock_loads_jobs_and_resumes(distributed_scheduler, redis_client):
+    async def scenario():
+        async with leader_election(distributed_scheduler):
+            await wait_until(lambda: SchedulerUtil._is_leader)
+
+            assert await redis_client.get(LOCK_KEY) == 'instance-a'
+            assert distributed_scheduler.state == STATE_RUNNING
+            job = distributed_scheduler.get_job('1')
+            assert job.func is get_scheduler.dispatch_scheduler_job
+            assert job.kwargs['invoke_target'] == 'module_task.scheduler_test.job'
+            # 续期刷新锁有效期
+            await asyncio.sleep(0.5)
+            assert 0 < await redis_client.pttl(LOCK_KEY) <= 1000
+
+    asyncio.run(scenario())
+
+
+def test_follower_stays_paused_while_another_instance_holds_the_lock(distributed_scheduler, redis_client):
+    async def scenario():
+        await redis_client.set(LOCK_KEY, 'instance-b', px=5000)
+        async with leader_election(distributed_scheduler):
+            await asyncio.sleep(0.1)
+
+            assert not SchedulerUtil._is_leader
+            assert distributed_scheduler.state == STATE_PAUSED
+            assert distributed_scheduler.get_jobs() == []
+
+    asyncio.run(scenario())
+
+
+def test_leader_steps_down_when_the_lock_is_taken_over(distributed_scheduler, redis_client):
+    async def scenario():
+        async with leader_election(distributed_scheduler):
+            await wait_until(lambda: SchedulerUtil._is_leader)
+            await redis_client.set(LOCK_KEY, 'instance-b', px=5000)
+
+            await wait_until(lambda: not SchedulerUtil._is_leader)
+            assert distributed_scheduler.state == STATE_PAUSED
+            assert SchedulerUtil._job_change_task is None
+            assert await redis_client.get(LOCK_KEY) == 'instance-b'
+
+    asyncio.run(scenario())
+
+
+def test_lock_is_released_when_loading_jobs_fails(monkeypatch, distributed_scheduler, redis_client):
+    lock_holders = []
+
+    async def failing_job_list(db):
+        lock_holders.append(await redis_client.get(LOCK_KEY))
+        raise RuntimeError('database unavailable')
+
+    monkeypatch.setattr(JobDao, 'get_job_list_for_scheduler', failing_job_list)
+
+    async def scenario():
+        async with leader_election(distributed_scheduler):
+            await wait_until(lambda: lock_holders)
+            await asyncio.sleep(0.05)
+
+            assert lock_holders == ['instance-a']
+            # 加载失败后立即释放锁，其他实例无需等待锁过期即可接管
+            assert await redis_client.get(LOCK_KEY) is None
+            assert not SchedulerUtil._is_leader
+            assert distributed_scheduler.state == STATE_PAUSED
+
+    asyncio.run(scenario())
+
+
+def test_leader_reloads_jobs_changed_on_other_instances(distributed_scheduler, redis_client, sync_session_factory):
+    async def scenario():
+        async with leader_election(distributed_scheduler):
+            await wait_until(lambda: SchedulerUtil._is_leader)
+            # 等待主节点订阅变更通知后再修改任务
+            await wait_until(change_subscribers_are(redis_client, 1))
+            with sync_session_factory() as session:
+                session.get(SysJob, 1).status = '1'
+                session.add(add_job_row(2, 'new job'))
+                session.commit()
+
+            await SchedulerUtil.notify_jobs_changed([1, 2])
+
+            await wait_until(lambda: distributed_scheduler.get_job('2') is not None)
+            await wait_until(lambda: distributed_scheduler.get_job('1') is None)
+
+    asyncio.run(scenario())
+
+
+def test_jobs_removed_while_following_are_dropped_on_becoming_leader(distributed_scheduler, redis_client):
+    async def scenario():
+        async with leader_election(distributed_scheduler):
+            # 作为从节点期间任务存储中残留的任务，数据库中已删除
+            distributed_scheduler.add_job(print, 'interval', id='9', hours=1)
+            distributed_scheduler.add_job(print, 'date', id='9_immediate')
+            await wait_until(lambda: SchedulerUtil._is_leader)
+
+            assert sorted(job.id for job in distributed_scheduler.get_jobs()) == ['1']
+
+    asyncio.run(scenario())
+
+
+def test_notify_jobs_changed_only_publishes_in_distributed_mode(monkeypatch, distributed_scheduler, redis_client):
+    async def scenario():
+        async with redis_client.pubsub() as pubsub:
+            await pubsub.subscribe(RedisInitKeyConfig.JOB_CHANGED.key)
+            await pubsub.get_message(timeout=1)
+
+            await SchedulerUtil.notify_jobs_changed([])
+            monkeypatch.setattr(get_scheduler.JobConfig, 'job_dispatch_mode', 'local')
+            await SchedulerUtil.notify_jobs_changed([3])
+            monkeypatch.setattr(get_scheduler.JobConfig, 'job_dispatch_mode', 'distributed')
+            await SchedulerUtil.notify_jobs_changed([1, '2'])
+
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1)
+            assert message['data'] == '1,2'
+            assert await pubsub.get_message(ignore_subscribe_messages=True, timeout=0.05) is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,90 @@
+import asyncio
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+
+from config.enums import RedisInitKeyConfig
+from config.env import JwtConfig
+from module_admin.entity.vo.online_vo import DeleteOnlineModel
+from module_admin.service.online_service import OnlineService
+from module_admin.service.token_session_service import TokenSessionService
+from module_admin.service.user_snapshot_service import UserSnapshotService
+
+TOKEN_KEY = f'{RedisInitKeyConfig.ACCESS_TOKEN.key}:session-1'
+EXPIRE_MS = 30 * 60 * 1000
+
+
+@pytest.fixture
+def request_with_redis(monkeypatch, redis_client):
+    monkeypatch.setattr(JwtConfig, 'jwt_redis_expire_minutes', 30)
+    monkeypatch.setattr(JwtConfig, 'jwt_redis_refresh_ratio', 0.5)
+    monkeypatch.setattr(JwtConfig, 'jwt_session_memo_seconds', 2)
+    monkeypatch.setattr(TokenSessionService, '_local_cache', OrderedDict())
+    monkeypatch.setattr(TokenSessionService, '_verify_script', None)
+    return SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(redis=redis_client)))
+
+
+def test_token_is_renewed_only_after_refresh_ratio_of_its_lifetime(monkeypatch, request_with_redis):
+    # 关闭进程内记忆，每次校验都访问redis
+    monkeypatch.setattr(JwtConfig, 'jwt_session_memo_seconds', 0)
+
+    async def scenario():
+        redis = request_with_redis.app.state.redis
+        # 已使用 40% 有效期：不续期
+        await redis.set(TOKEN_KEY, 'token-a', px=int(EXPIRE_MS * 0.6))
+        assert await TokenSessionService.verify_token_services(request_with_redis, TOKEN_KEY, 'token-a', 1) == '0.0'
+        assert await redis.pttl(TOKEN_KEY) <= EXPIRE_MS * 0.6
+
+        # 已使用 60% 有效期：续期为完整有效期
+        await redis.pexpire(TOKEN_KEY, int(EXPIRE_MS * 0.4))
+        assert await TokenSessionService.verify_token_services(request_with_redis, TOKEN_KEY, 'token-a', 1) == '0.0'
+        assert await redis.pttl(TOKEN_KEY) > EXPIRE_MS * 0.9
+
+    asyncio.run(scenario())
+
+
+def test_replaced_token_is_rejected_and_forgotten(request_with_redis):
+    async def scenario():
+        redis = request_with_redis.app.state.redis
+        await redis.set(TOKEN_KEY, 'token-a', px=EXPIRE_MS)
+        assert await TokenSessionService.verify_token_services(request_with_redis, TOKEN_KEY, 'token-a', 1) == '0.0'
+
+        # 同一会话重新登录后旧令牌失效，新令牌不能复用旧令牌的本地记忆
+        await redis.set(TOKEN_KEY, 'token-b', px=EXPIRE_MS)
+        assert await TokenSessionService.verify_token_services(request_with_redis, TOKEN_KEY, 'token-x', 1) is None
+        assert TOKEN_KEY not in TokenSessionService._local_cache
+        assert await TokenSessionService.verify_token_services(request_with_redis, TOKEN_KEY, 'token-b', 1) == '0.0'
+
+    asyncio.run(scenario())
+
+
+def test_snapshot_version_is_read_with_the_token(request_with_redis):
+    async def scenario():
+        redis = request_with_redis.app.state.redis
+        await redis.set(TOKEN_KEY, 'token-a', px=EXPIRE_MS)
+        await UserSnapshotService.bump_global_version_services(request_with_redis)
+        await UserSnapshotService.bump_user_version_services(request_with_redis, [1, 1])
+
+        assert await TokenSessionService.verify_token_services(request_with_redis, TOKEN_KEY, 'token-a', 1) == '1.1'
+
+    asyncio.run(scenario())
+
+
+def test_force_logout_clears_the_local_memo(request_with_redis):
+    async def scenario():
+        redis = request_with_redis.app.state.redis
+        await redis.set(TOKEN_KEY, 'token-a', px=EXPIRE_MS)
+        assert await TokenSessionService.verify_token_services(request_with_redis, TOKEN_KEY, 'token-a', 1) == '0.0'
+
+        # 记忆期内令牌已从redis删除，仍命中本地记忆
+        await redis.delete(TOKEN_KEY)
+        assert await TokenSessionService.verify_token_services(request_with_redis, TOKEN_KEY, 'token-a', 1) == '0.0'
+
+        # 强退后移除本地记忆，下一次请求立即失效
+        await redis.set(TOKEN_KEY, 'token-a', px=EXPIRE_MS)
+        await OnlineService.delete_online_services(request_with_redis, DeleteOnlineModel(tokenIds='session-1'))
+        assert await redis.get(TOKEN_KEY) is None
+        assert await TokenSessionService.verify_token_services(request_with_redis, TOKEN_KEY, 'token-a', 1) is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,163 @@
+import asyncio
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+
+from config.enums import RedisInitKeyConfig
+from config.env import AppConfig
+from module_admin.entity.vo.user_vo import CurrentUserModel, UserInfoModel
+from module_admin.service.user_snapshot_service import UserSnapshotService
+
+
+@pytest.fixture
+def request_with_redis(monkeypatch, redis_client):
+    monkeypatch.setattr(UserSnapshotService, '_local_cache', OrderedDict())
+    return SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(redis=redis_client)))
+
+
+async def current_version(request, user_id: int) -> str:
+    # 与令牌校验脚本一致：读取全局版本与用户版本后拼接
+    return UserSnapshotService.build_version(
+        await request.app.state.redis.mget(UserSnapshotService.get_version_keys(user_id))
+    )
+
+
+def build_snapshot(user_id: int, permissions=('system:user:list',)) -> CurrentUserModel:
+    return CurrentUserModel(
+        permissions=list(permissions),
+        roles=['common'],
+        user=UserInfoModel(userId=user_id, userName=f'user{user_id}'),
+    )
+
+
+def test_snapshot_hits_local_then_redis_for_the_same_version(request_with_redis):
+    async def scenario():
+        request = request_with_redis
+        version = await current_version(request, 1)
+        assert version == '0.0'
+        assert await UserSnapshotService.get_snapshot_services(request, 1, version) is None
+
+        await UserSnapshotService.set_snapshot_services(request, 1, version, build_snapshot(1))
+        assert (await UserSnapshotService.get_snapshot_services(request, 1, version)).user.user_name == 'user1'
+
+        # 进程内缓存被清空（如其他实例）时从 Redis 读取并回填
+        UserSnapshotService._local_cache.clear()
+        snapshot = await UserSnapshotService.get_snapshot_services(request, 1, version)
+        assert snapshot.permissions == ['system:user:list']
+        assert 1 in UserSnapshotService._local_cache
+
+    asyncio.run(scenario())
+
+
+def test_user_version_bump_invalidates_only_that_user(request_with_redis):
+    async def scenario():
+        request = request_with_redis
+        for user_id in (1, 2):
+            version = await current_version(request, user_id)
+            await UserSnapshotService.set_snapshot_services(request, user_id, version, build_snapshot(user_id))
+
+        await UserSnapshotService.bump_user_version_services(request, [1, 1, None])
+
+        version_1 = await current_version(request, 1)
+        assert version_1 == '0.1'
+        assert await UserSnapshotService.get_snapshot_services(request, 1, version_1) is None
+        UserSnapshotService._local_cache.clear()
+        assert await UserSnapshotService.get_snapshot_services(request, 1, version_1) is None
+        assert await UserSnapshotService.get_snapshot_services(request, 2, await current_version(request, 2))
+
+    asyncio.run(scenario())
+
+
+def test_global_version_bump_invalidates_every_user(request_with_redis):
+    async def scenario():
+        request = request_with_redis
+        for user_id in (1, 2):
+            version = await current_version(request, user_id)
+            await UserSnapshotService.set_snapshot_services(request, user_id, version, build_snapshot(user_id))
+
+        await UserSnapshotService.bump_global_version_services(request)
+
+        for user_id in (1, 2):
+            version = await current_version(request, user_id)
+            assert version == '1.0'
+            assert await UserSnapshotService.get_snapshot_services(request, user_id, version) is None
+
+    asyncio.run(scenario())
+
+
+def test_snapshot_loaded_before_a_change_is_not_served_after_it(request_with_redis):
+    async def scenario():
+        request = request_with_redis
+        # 加载期间角色发生变更：快照以加载前的版本写入，下次请求版本不一致重新加载
+        version_before = await current_version(request, 1)
+        await UserSnapshotService.bump_global_version_services(request)
+        await UserSnapshotService.set_snapshot_services(request, 1, version_before, build_snapshot(1))
+
+        assert await UserSnapshotService.get_snapshot_services(request, 1, await current_version(request, 1)) is None
+
+    asyncio.run(scenario())
+
+
+def test_returned_snapshot_is_a_copy(request_with_redis):
+    async def scenario():
+        request = request_with_redis
+        snapshot = build_snapshot(1)
+        await UserSnapshotService.set_snapshot_services(request, 1, '0.0', snapshot)
+        snapshot.permissions.append('system:user:remove')
+
+        cached = await UserSnapshotService.get_snapshot_services(request, 1, '0.0')
+        cached.permissions.append('system:user:remove')
+        cached.user.nick_name = 'changed'
+
+        cached_again = await UserSnapshotService.get_snapshot_services(request, 1, '0.0')
+        assert cached_again.permissions == ['system:user:list']
+        assert cached_again.user.nick_name is None
+
+    asyncio.run(scenario())
+
+
+def test_local_cache_is_bounded_by_lru_size(monkeypatch, request_with_redis):
+    monkeypatch.setattr(AppConfig, 'app_user_snapshot_lru_size', 2)
+
+    async def scenario():
+        request = request_with_redis
+        for user_id in (1, 2):
+            await UserSnapshotService.set_snapshot_services(request, user_id, '0.0', build_snapshot(user_id))
+        # 访问用户1后写入用户3，淘汰最久未使用的用户2
+        await UserSnapshotService.get_snapshot_services(request, 1, '0.0')
+        await UserSnapshotService.set_snapshot_services(request, 3, '0.0', build_snapshot(3))
+
+        assert list(UserSnapshotService._local_cache) == [1, 3]
+        # 被淘汰的快照仍可从 Redis 读取
+        assert (await UserSnapshotService.get_snapshot_services(request, 2, '0.0')).user.user_id == 2
+
+    asyncio.run(scenario())
+
+
+def test_unreadable_redis_snapshot_is_treated_as_a_miss(request_with_redis):
+    async def scenario():
+        request = request_with_redis
+        await request.app.state.redis.set(f'{RedisInitKeyConfig.USER_SNAPSHOT.key}:1', '{"version": "0.0"')
+
+        assert await UserSnapshotService.get_snapshot_services(request, 1, '0.0') is None
+
+    asyncio.run(scenario())
+
+
+def test_version_bump_failure_is_logged_not_raised(monkeypatch, request_with_redis):
+    class BrokenRedis:
+        def pipeline(self, transaction=True):
+            raise ConnectionError('redis down')
+
+        async def incr(self, key):
+            raise ConnectionError('redis down')
+
+    async def scenario():
+        request = request_with_redis
+        monkeypatch.setattr(request.app.state, 'redis', BrokenRedis())
+        # 数据库变更已提交，版本递增失败不应使接口报错
+        await UserSnapshotService.bump_user_version_services(request, [1])
+        await UserSnapshotService.bump_global_version_services(request)
+
+    asyncio.run(scenario())
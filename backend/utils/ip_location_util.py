@@ -0,0 +1,231 @@
+import asyncio
+import httpx
+import ipaddress
+import os
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_right
+from datetime import timedelta
+from typing import Dict, List, Optional
+from config.enums import RedisInitKeyConfig
+from config.env import AppConfig
+from utils.log_util import logger
+
+
+class IpLocationProvider(ABC):
+    """
+    IP归属区域查询提供方基类
+    """
+
+    name = ''
+
+    @abstractmethod
+    async def lookup(self, ip: str) -> Optional[str]:
+        """
+        查询ip归属区域
+
+        :param ip: 需要查询的ip
+        :return: ip归属区域，查询不到时为None
+        """
+
+
+class OfflineIpLocationProvider(IpLocationProvider):
+    """
+    离线IP段库查询
+
+    库文件每行一条记录：起始ip,结束ip,归属区域（ip可为点分格式或整数，#开头为注释）。
+    加载后起止地址存入有序的连续uint32数组，查询时二分定位，不产生网络请求。
+    """
+
+    name = 'offline'
+
+    def __init__(self, db_file: str):
+        self.db_file = db_file
+        self._starts = array('I')
+        self._ends = array('I')
+        self._locations: List[str] = []
+        self.__load()
+
+    @staticmethod
+    def __to_int(value: str) -> int:
+        value = value.strip()
+        return int(value) if value.isdigit() else int(ipaddress.IPv4Address(value))
+
+    def __load(self):
+        ranges = []
+        with open(self.db_file, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                try:
+                    start, end, location = line.split(',', 2)
+                    ranges.append((self.__to_int(start), self.__to_int(end), location.strip()))
+                except ValueError:
+                    logger.warning(f'离线IP库记录格式错误，已跳过：{line}')
+        ranges.sort()
+        # 相同归属区域复用同一字符串对象，降低大库的内存占用
+        interned: Dict[str, str] = {}
+        for start, end, location in ranges:
+            self._starts.append(start)
+            self._ends.append(end)
+            self._locations.append(interned.setdefault(location, location))
+        logger.info(f'离线IP库加载完成，共{len(self._locations)}条记录')
+
+    def lookup_sync(self, ip: str) -> Optional[str]:
+        """
+        同步查询ip归属区域，纯内存操作
+
+        :param ip: 需要查询的ip
+        :return: ip归属区域，查询不到时为None
+        """
+        try:
+            ip_int = int(ipaddress.IPv4Address(ip))
+        except ValueError:
+            return None
+        index = bisect_right(self._starts, ip_int) - 1
+        if index >= 0 and ip_int <= self._ends[index]:
+            return self._locations[index]
+        return None
+
+    async def lookup(self, ip: str) -> Optional[str]:
+        return self.lookup_sync(ip)
+
+
+class RemoteIpLocationProvider(IpLocationProvider):
+    """
+    远程接口查询，异步请求并设置超时
+    """
+
+    name = 'remote'
+
+    def __init__(self, url: str, timeout: float):
+        self.url = url
+        self.timeout = timeout
+
+    async def lookup(self, ip: str) -> Optional[str]:
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            ip_result = await client.get(self.url.format(ip=ip))
+        if ip_result.status_code != 200:
+            return None
+        data = ip_result.json().get('data') or {}
+        prov = data.get('prov')
+        city = data.get('city')
+        if prov or city:
+            return f'{prov}-{city}'
+        return None
+
+
+class IpLocationUtil:
+    """
+    IP归属区域查询工具类
+
+    查询顺序：内网地址 -> 离线IP库 -> redis缓存。均未命中时立即返回“未知”，
+    并在后台调用远程提供方查询，结果写入redis缓存供后续请求使用，请求本身不等待外部接口。
+    """
+
+    UNKNOWN = '未知'
+    INTRANET = '内网IP'
+    # 同时进行的远程查询数上限，超出时本次不查询，等待后续请求再触发
+    MAX_PENDING_LOOKUPS = 100
+
+    _offline_provider: Optional[OfflineIpLocationProvider] = None
+    _remote_provider: Optional[IpLocationProvider] = None
+    _initialized = False
+    _pending: Dict[str, asyncio.Task] = {}
+
+    @classmethod
+    def init_providers(cls):
+        """
+        初始化查询提供方，应用启动时调用以提前加载离线IP库
+
+        :return:
+        """
+        if cls._initialized:
+            return
+        cls._initialized = True
+        if AppConfig.app_ip_location_db_file:
+            if os.path.exists(AppConfig.app_ip_location_db_file):
+                cls._offline_provider = OfflineIpLocationProvider(AppConfig.app_ip_location_db_file)
+            else:
+                logger.warning(f'离线IP库文件不存在：{AppConfig.app_ip_location_db_file}')
+        if cls._remote_provider is None and AppConfig.app_ip_location_remote_url:
+            cls._remote_provider = RemoteIpLocationProvider(
+                AppConfig.app_ip_location_remote_url, AppConfig.app_ip_location_remote_timeout
+            )
+
+    @classmethod
+    def set_remote_provider(cls, provider: Optional[IpLocationProvider]):
+        """
+        替换远程查询提供方，用于接入其他IP归属区域服务
+
+        :param provider: 查询提供方，为None时关闭远程查询
+        :return:
+        """
+        cls.init_providers()
+        cls._remote_provider = provider
+
+    @classmethod
+    def is_intranet(cls, ip: str) -> bool:
+        """
+        判断是否为内网地址
+
+        :param ip: 需要判断的ip
+        :return: 是否为内网地址
+        """
+        if not ip or ip == 'localhost':
+            return True
+        try:
+            ip_address = ipaddress.ip_address(ip)
+        except ValueError:
+            return False
+        return ip_address.is_private or ip_address.is_loopback or ip_address.is_link_local
+
+    @classmethod
+    async def get_ip_location(cls, redis, ip: str) -> str:
+        """
+        查询ip归属区域，不等待远程接口
+
+        :param redis: redis连接对象
+        :param ip: 需要查询的ip
+        :return: ip归属区域
+        """
+        # X-Forwarded-For 经多级代理时为逗号分隔的地址列表，第一个为客户端地址
+        ip = ip.split(',')[0].strip() if ip else ip
+        if cls.is_intranet(ip):
+            return cls.INTRANET
+        cls.init_providers()
+        if cls._offline_provider is not None:
+            location = cls._offline_provider.lookup_sync(ip)
+            if location:
+                return location
+        cache_key = f'{RedisInitKeyConfig.IP_LOCATION.key}:{ip}'
+        try:
+            location = await redis.get(cache_key)
+        except Exception as e:
+            logger.warning(f'读取ip归属区域缓存失败，详细错误信息：{e}')
+            return cls.UNKNOWN
+        if location:
+            return location
+        if (
+            cls._remote_provider is not None
+            and ip not in cls._pending
+            and len(cls._pending) < cls.MAX_PENDING_LOOKUPS
+        ):
+            cls._pending[ip] = asyncio.create_task(cls.__refresh_remote(redis, ip, cache_key))
+        return cls.UNKNOWN
+
+    @classmethod
+    async def __refresh_remote(cls, redis, ip: str, cache_key: str):
+        try:
+            location = await cls._remote_provider.lookup(ip)
+            # 查询不到也缓存，避免同一ip反复请求远程接口
+            await redis.set(
+                cache_key,
+                location or cls.UNKNOWN,
+                ex=timedelta(hours=AppConfig.app_ip_location_cache_expire_hours),
+            )
+        except Exception as e:
+            logger.warning(f'远程查询ip归属区域失败，ip：{ip}，详细错误信息：{e}')
+        finally:
+            cls._pending.pop(ip, None)
@@ -1,8 +1,18 @@
-from fastapi import APIRouter, Depends, File, UploadFile
+from fastapi import APIRouter, Depends, File, Request, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.infrastructure.database import get_db
-from app.schemas.dataset import DatasetCreateRequest, DatasetCreateResponse, IngestionJobStatusResponse, IngestionUploadResponse
+from app.schemas.dataset import (
+    DatasetCreateRequest,
+    DatasetCreateResponse,
+    IngestionJobStatusResponse,
+    IngestionUploadResponse,
+    UploadPartResponse,
+    UploadSessionCreateRequest,
+    UploadSessionResponse,
+)
 from app.services.ingestion_service import IngestionService
+from app.services.outbox_relay import OutboxRelay
+from app.services.upload_session_service import UploadSessionService
 
 router = APIRouter()
 
@@ -12,6 +22,11 @@ async def health_check():
     return {'status': 'ok', 'service': 'ingestion-service'}
 
 
+@router.get('/outbox/lag')
+async def get_outbox_lag():
+    return await OutboxRelay.get_lag()
+
+
 @router.post('/datasets', response_model=DatasetCreateResponse)
 async def create_dataset(payload: DatasetCreateRequest, db: AsyncSession = Depends(get_db)):
     return await IngestionService.create_dataset(db, payload)
@@ -27,3 +42,28 @@ async def get_ingestion_job_status(
     dataset_id: str, ingestion_job_id: str, db: AsyncSession = Depends(get_db)
 ):
     return await IngestionService.get_ingestion_status(db, dataset_id, ingestion_job_id)
+
+
+@router.post('/datasets/{dataset_id}/uploads', response_model=UploadSessionResponse)
+async def create_upload_session(
+    dataset_id: str, payload: UploadSessionCreateRequest, db: AsyncSession = Depends(get_db)
+):
+    return await UploadSessionService.create_session(db, dataset_id, payload)
+
+
+@router.put('/datasets/{dataset_id}/uploads/{upload_id}/parts/{part_number}', response_model=UploadPartResponse)
+async def upload_part(
+    dataset_id: str, upload_id: str, part_number: int, request: Request, db: AsyncSession = Depends(get_db)
+):
+    # 请求体为分片原始字节，直接流式写盘
+    return await UploadSessionService.upload_part(db, dataset_id, upload_id, part_number, request.stream())
+
+
+@router.get('/datasets/{dataset_id}/uploads/{upload_id}', response_model=UploadSessionResponse)
+async def get_upload_session(dataset_id: str, upload_id: str, db: AsyncSession = Depends(get_db)):
+    return await UploadSessionService.get_session(db, dataset_id, upload_id)
+
+
+@router.post('/datasets/{dataset_id}/uploads/{upload_id}/complete', response_model=IngestionUploadResponse)
+async def complete_upload_session(dataset_id: str, upload_id: str, db: AsyncSession = Depends(get_db)):
+    return await UploadSessionService.complete_session(db, dataset_id, upload_id)
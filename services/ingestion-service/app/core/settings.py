@@ -8,7 +8,15 @@ class Settings(BaseSettings):
     db_schema: str = 'ingestion'
     redis_url: str = 'redis://127.0.0.1:6379/0'
     dataset_ingested_stream_key: str = 'dataset.events'
-    event_publish_required: bool = False
+    stream_shard_count: int = 1
+    upload_chunk_size_bytes: int = 1024 * 1024
+    content_dedupe_enabled: bool = True
+    upload_part_size_bytes: int = 8 * 1024 * 1024
+    upload_session_ttl_hours: int = 24
+    outbox_relay_enabled: bool = True
+    outbox_batch_size: int = 500
+    outbox_poll_interval_ms: int = 500
+    outbox_lag_log_interval_seconds: int = 30
 
 
 settings = Settings()
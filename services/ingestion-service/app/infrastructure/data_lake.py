@@ -0,0 +1,117 @@
+import asyncio
+import hashlib
+import os
+import shutil
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import List
+from uuid import uuid4
+from fastapi import UploadFile
+
+
+@dataclass
+class StoredObject:
+    file_path: str
+    file_size: int
+    content_sha256: str
+
+
+class DataLakeWriter:
+    """
+    流式写入数据湖：分块读取上传内容，文件 IO 在线程中执行，边写边计算大小与 SHA-256。
+    """
+
+    @staticmethod
+    def _open_for_write(file_path: str):
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        return open(file_path, 'wb')
+
+    @staticmethod
+    def _write_chunk(fs, digest, chunk: bytes) -> None:
+        # hashlib 对大块数据会释放 GIL，哈希与写盘一起放到线程中
+        digest.update(chunk)
+        fs.write(chunk)
+
+    @staticmethod
+    async def _iter_upload(file: UploadFile, chunk_size: int) -> AsyncIterator[bytes]:
+        while chunk := await file.read(chunk_size):
+            yield chunk
+
+    @classmethod
+    async def write_upload(cls, file: UploadFile, file_path: str, chunk_size: int) -> StoredObject:
+        return await cls.write_stream(cls._iter_upload(file, chunk_size), file_path)
+
+    @classmethod
+    async def write_stream(cls, chunks: AsyncIterator[bytes], file_path: str) -> StoredObject:
+        # 先写临时文件，完成后原子重命名，避免下游读到半截文件
+        temp_path = f'{file_path}.{uuid4().hex}.part'
+        digest = hashlib.sha256()
+        file_size = 0
+        fs = await asyncio.to_thread(cls._open_for_write, temp_path)
+        try:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                file_size += len(chunk)
+                await asyncio.to_thread(cls._write_chunk, fs, digest, chunk)
+            await asyncio.to_thread(fs.close)
+            await asyncio.to_thread(os.replace, temp_path, file_path)
+        except BaseException:
+            # 取消/异常时同步清理，避免在取消过程中再次 await
+            fs.close()
+            cls.remove_quietly(temp_path)
+            raise
+        return StoredObject(file_path=file_path, file_size=file_size, content_sha256=digest.hexdigest())
+
+    @staticmethod
+    def remove_quietly(file_path: str) -> None:
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _move(source_path: str, target_path: str) -> None:
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        os.replace(source_path, target_path)
+
+    @classmethod
+    async def promote(cls, staging_path: str, file_path: str) -> None:
+        await asyncio.to_thread(cls._move, staging_path, file_path)
+
+    @classmethod
+    async def discard(cls, file_path: str) -> None:
+        await asyncio.to_thread(cls.remove_quietly, file_path)
+
+    @classmethod
+    def _concat_files(cls, source_paths: List[str], file_path: str, chunk_size: int) -> StoredObject:
+        temp_path = f'{file_path}.{uuid4().hex}.part'
+        digest = hashlib.sha256()
+        file_size = 0
+        try:
+            with cls._open_for_write(temp_path) as target:
+                for source_path in source_paths:
+                    with open(source_path, 'rb') as source:
+                        while chunk := source.read(chunk_size):
+                            cls._write_chunk(target, digest, chunk)
+                            file_size += len(chunk)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            cls.remove_quietly(temp_path)
+            raise
+        return StoredObject(file_path=file_path, file_size=file_size, content_sha256=digest.hexdigest())
+
+    @classmethod
+    async def concat_files(cls, source_paths: List[str], file_path: str, chunk_size: int) -> StoredObject:
+        """
+        按顺序拼接分片文件，整体在线程中执行并同时计算大小与 SHA-256。
+        """
+        return await asyncio.to_thread(cls._concat_files, source_paths, file_path, chunk_size)
+
+    @staticmethod
+    def _remove_tree(dir_path: str) -> None:
+        shutil.rmtree(dir_path, ignore_errors=True)
+
+    @classmethod
+    async def discard_dir(cls, dir_path: str) -> None:
+        await asyncio.to_thread(cls._remove_tree, dir_path)
@@ -1,4 +1,5 @@
-from typing import Any, Dict
+import zlib
+from typing import Any, Dict, List, Tuple
 from redis import asyncio as aioredis
 from redis.asyncio import Redis
 import logging
@@ -24,14 +25,50 @@ class RedisStreamPublisher:
         await cls._redis.close()
         cls._redis = None
 
+    @staticmethod
+    def route_stream_key(dataset_id: str) -> str:
+        """
+        按 dataset_id 的 crc32 取模路由到 dataset.events.{n}；分片数为 1 时沿用单一 stream。
+        算法需与 processing-service 的 stream_shards.shard_index 保持一致。
+        """
+        base_key = settings.dataset_ingested_stream_key
+        if settings.stream_shard_count <= 1:
+            return base_key
+        return f'{base_key}.{zlib.crc32(dataset_id.encode("utf-8")) % settings.stream_shard_count}'
+
     @classmethod
     async def publish_dataset_ingested(cls, event_data: Dict[str, Any]) -> None:
+        await cls.publish_dataset_ingested_batch([event_data])
+
+    @classmethod
+    async def publish_dataset_ingested_batch(cls, events: List[Dict[str, Any]]) -> List[str]:
+        """
+        批量发布 dataset.ingested：N 条事件一次 pipeline 往返，只记一条汇总日志。
+        """
+        message_ids = await cls.publish_entries(
+            [(cls.route_stream_key(str(event_data.get('dataset_id', ''))), event_data) for event_data in events]
+        )
+        if message_ids:
+            logger.info(
+                f'stream published: key={settings.dataset_ingested_stream_key}, shards={settings.stream_shard_count}, '
+                f'event=dataset.ingested, count={len(message_ids)}, last_id={message_ids[-1]}'
+            )
+        return message_ids
+
+    @classmethod
+    async def publish_entries(cls, entries: List[Tuple[str, Dict[str, Any]]]) -> List[str]:
+        """
+        一次 pipeline 发送多条 XADD（非 MULTI 事务），返回各条消息 id。
+
+        :param entries: (stream_key, event_data) 列表
+        """
+        if not entries:
+            return []
         if cls._redis is None:
             await cls.connect()
 
-        payload = {key: str(value) for key, value in event_data.items()}
-        await cls._redis.xadd(settings.dataset_ingested_stream_key, payload, maxlen=100000, approximate=True)
-        logger.info(
-            f"stream published: key={settings.dataset_ingested_stream_key}, "
-            f"event=dataset.ingested, dataset_id={payload.get('dataset_id')}"
-        )
+        async with cls._redis.pipeline(transaction=False) as pipe:
+            for stream_key, event_data in entries:
+                payload = {key: str(value) for key, value in event_data.items()}
+                pipe.xadd(stream_key, payload, maxlen=100000, approximate=True)
+            return await pipe.execute()
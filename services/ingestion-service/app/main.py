@@ -1,8 +1,11 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
 from app.api.routes import router
 from app.infrastructure.database import init_database
+from app.core.settings import settings
 from app.infrastructure.redis_stream import RedisStreamPublisher
+from app.services.outbox_relay import OutboxRelay
 
 
 @asynccontextmanager
@@ -11,9 +14,14 @@ async def lifespan(app: FastAPI):
     try:
         await RedisStreamPublisher.connect()
     except Exception:
-        # 允许在无 redis 环境启动，发布阶段按配置决定是否失败
+        # 允许在无 redis 环境启动，事件留在 outbox 中由 relay 重试投递
         pass
+    relay_task = asyncio.create_task(OutboxRelay.run_forever()) if settings.outbox_relay_enabled else None
     yield
+    if relay_task is not None:
+        relay_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await relay_task
     await RedisStreamPublisher.close()
 
 app = FastAPI(
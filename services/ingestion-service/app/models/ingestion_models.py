@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import DateTime, Integer, String, BigInteger
+from sqlalchemy import DateTime, Integer, String, BigInteger, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 from app.core.settings import settings
 from app.infrastructure.database import Base
@@ -35,3 +35,101 @@ class IngestionJob(Base):
     last_error: Mapped[str] = mapped_column(String(2000), nullable=False, default='')
     created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class IngestionObject(Base):
+    __tablename__ = 'objects'
+    __table_args__ = {'schema': settings.db_schema}
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    content_sha256: Mapped[str] = mapped_column(String(64), unique=True, nullable=False, index=True)
+    object_key: Mapped[str] = mapped_column(String(1024), nullable=False)
+    file_size: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    ref_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class IngestionContentRef(Base):
+    __tablename__ = 'dataset_contents'
+    __table_args__ = (
+        UniqueConstraint('dataset_id', 'dataset_version', 'content_sha256', name='uk_dataset_contents_sha256'),
+        {'schema': settings.db_schema},
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    dataset_id: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    dataset_version: Mapped[str] = mapped_column(String(64), nullable=False, default='v1')
+    content_sha256: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    ingestion_job_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class IngestionUploadSession(Base):
+    __tablename__ = 'upload_sessions'
+    __table_args__ = {'schema': settings.db_schema}
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    upload_id: Mapped[str] = mapped_column(String(64), unique=True, nullable=False, index=True)
+    dataset_id: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    dataset_version: Mapped[str] = mapped_column(String(64), nullable=False, default='v1')
+    filename: Mapped[str] = mapped_column(String(512), nullable=False)
+    total_size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    part_size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    total_parts: Mapped[int] = mapped_column(Integer, nullable=False)
+    status: Mapped[str] = mapped_column(String(32), nullable=False, default='UPLOADING')
+    ingestion_job_id: Mapped[str] = mapped_column(String(64), nullable=False, default='')
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class IngestionUploadPart(Base):
+    __tablename__ = 'upload_parts'
+    __table_args__ = (
+        UniqueConstraint('upload_id', 'part_number', name='uk_upload_parts_part_number'),
+        {'schema': settings.db_schema},
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    upload_id: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    part_number: Mapped[int] = mapped_column(Integer, nullable=False)
+    part_size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    content_sha256: Mapped[str] = mapped_column(String(64), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class IngestionOutboxEvent(Base):
+    __tablename__ = 'outbox_events'
+    __table_args__ = {'schema': settings.db_schema}
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    event_id: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    event_type: Mapped[str] = mapped_column(String(64), nullable=False)
+    stream_key: Mapped[str] = mapped_column(String(255), nullable=False)
+    dataset_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    payload: Mapped[str] = mapped_column(Text, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[str] = mapped_column(String(2000), nullable=False, default='')
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class IngestionOutboxDeadLetter(Base):
+    """
+    无法投递的 outbox 事件（如 payload 无法解析），移出 outbox 以免反复占用批次，留待人工排查。
+    """
+
+    __tablename__ = 'outbox_dead_letters'
+    __table_args__ = {'schema': settings.db_schema}
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    event_id: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    event_type: Mapped[str] = mapped_column(String(64), nullable=False)
+    stream_key: Mapped[str] = mapped_column(String(255), nullable=False)
+    dataset_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    payload: Mapped[str] = mapped_column(Text, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[str] = mapped_column(String(2000), nullable=False, default='')
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    dead_lettered_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
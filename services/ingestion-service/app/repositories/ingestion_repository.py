@@ -1,6 +1,16 @@
-from sqlalchemy import select
+from datetime import datetime
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.ingestion_models import IngestionDataset, IngestionJob
+from app.models.ingestion_models import (
+    IngestionContentRef,
+    IngestionDataset,
+    IngestionJob,
+    IngestionObject,
+    IngestionOutboxDeadLetter,
+    IngestionOutboxEvent,
+    IngestionUploadPart,
+    IngestionUploadSession,
+)
 
 
 class IngestionRepository:
@@ -25,8 +35,12 @@ class IngestionRepository:
         return dataset
 
     @staticmethod
-    async def create_ingestion_job(db: AsyncSession, job: IngestionJob) -> IngestionJob:
+    async def create_ingestion_job(
+        db: AsyncSession, job: IngestionJob, outbox_event: IngestionOutboxEvent | None = None
+    ) -> IngestionJob:
         db.add(job)
+        if outbox_event is not None:
+            db.add(outbox_event)
         await db.flush()
         await db.commit()
         await db.refresh(job)
@@ -41,3 +55,190 @@ class IngestionRepository:
     async def get_ingestion_job_by_idempotency_key(db: AsyncSession, idempotency_key: str) -> IngestionJob | None:
         result = await db.execute(select(IngestionJob).where(IngestionJob.idempotency_key == idempotency_key))
         return result.scalars().first()
+
+    @staticmethod
+    async def get_object_by_sha256(db: AsyncSession, content_sha256: str) -> IngestionObject | None:
+        result = await db.execute(select(IngestionObject).where(IngestionObject.content_sha256 == content_sha256))
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_content_ref(
+        db: AsyncSession, dataset_id: str, dataset_version: str, content_sha256: str
+    ) -> IngestionContentRef | None:
+        result = await db.execute(
+            select(IngestionContentRef).where(
+                IngestionContentRef.dataset_id == dataset_id,
+                IngestionContentRef.dataset_version == dataset_version,
+                IngestionContentRef.content_sha256 == content_sha256,
+            )
+        )
+        return result.scalars().first()
+
+    @staticmethod
+    async def create_content_job(
+        db: AsyncSession,
+        job: IngestionJob,
+        content_ref: IngestionContentRef,
+        new_object: IngestionObject | None,
+        updated_at: datetime,
+        outbox_event: IngestionOutboxEvent | None = None,
+    ) -> IngestionJob:
+        """
+        同一事务内登记 job、内容引用、outbox 事件，并新建对象或原子递增已有对象的引用计数。
+        """
+        if new_object is not None:
+            db.add(new_object)
+        else:
+            await db.execute(
+                update(IngestionObject)
+                .where(IngestionObject.content_sha256 == content_ref.content_sha256)
+                .values(ref_count=IngestionObject.ref_count + 1, updated_at=updated_at)
+            )
+        db.add(job)
+        db.add(content_ref)
+        if outbox_event is not None:
+            db.add(outbox_event)
+        await db.flush()
+        await db.commit()
+        await db.refresh(job)
+        return job
+
+    @staticmethod
+    async def requeue_ingestion_job(
+        db: AsyncSession,
+        ingestion_job_id: str,
+        expected_status: str,
+        updated_at: datetime,
+        outbox_event: IngestionOutboxEvent,
+    ) -> bool:
+        """
+        按状态条件将 job 重置为 PENDING，并与新的 outbox 事件同事务提交；状态已被其他请求改变时不做修改。
+        """
+        result = await db.execute(
+            update(IngestionJob)
+            .where(IngestionJob.ingestion_job_id == ingestion_job_id, IngestionJob.status == expected_status)
+            .values(status='PENDING', retry_count=0, last_error='', updated_at=updated_at)
+        )
+        if result.rowcount != 1:
+            await db.rollback()
+            return False
+        db.add(outbox_event)
+        await db.flush()
+        await db.commit()
+        return True
+
+    @staticmethod
+    async def create_upload_session(db: AsyncSession, upload_session: IngestionUploadSession) -> IngestionUploadSession:
+        db.add(upload_session)
+        await db.flush()
+        await db.commit()
+        await db.refresh(upload_session)
+        return upload_session
+
+    @staticmethod
+    async def get_upload_session(db: AsyncSession, upload_id: str) -> IngestionUploadSession | None:
+        result = await db.execute(select(IngestionUploadSession).where(IngestionUploadSession.upload_id == upload_id))
+        return result.scalars().first()
+
+    @staticmethod
+    async def update_upload_session(db: AsyncSession, upload_session: IngestionUploadSession) -> IngestionUploadSession:
+        await db.flush()
+        await db.commit()
+        await db.refresh(upload_session)
+        return upload_session
+
+    @staticmethod
+    async def list_upload_parts(db: AsyncSession, upload_id: str) -> list[IngestionUploadPart]:
+        result = await db.execute(
+            select(IngestionUploadPart)
+            .where(IngestionUploadPart.upload_id == upload_id)
+            .order_by(IngestionUploadPart.part_number)
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def save_upload_part(
+        db: AsyncSession, upload_id: str, part_number: int, part_size: int, content_sha256: str, now: datetime
+    ) -> None:
+        """
+        登记分片；重复上传同一分片时覆盖大小与摘要。
+        """
+        result = await db.execute(
+            update(IngestionUploadPart)
+            .where(IngestionUploadPart.upload_id == upload_id, IngestionUploadPart.part_number == part_number)
+            .values(part_size=part_size, content_sha256=content_sha256, updated_at=now)
+        )
+        if result.rowcount == 0:
+            db.add(
+                IngestionUploadPart(
+                    upload_id=upload_id,
+                    part_number=part_number,
+                    part_size=part_size,
+                    content_sha256=content_sha256,
+                    created_at=now,
+                    updated_at=now,
+                )
+            )
+        await db.flush()
+        await db.commit()
+
+    @staticmethod
+    async def claim_outbox_events(db: AsyncSession, limit: int) -> list[IngestionOutboxEvent]:
+        """
+        按写入顺序取待发布事件；PostgreSQL 下 SKIP LOCKED，多实例 relay 互不阻塞。
+        """
+        result = await db.execute(
+            select(IngestionOutboxEvent)
+            .order_by(IngestionOutboxEvent.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def delete_outbox_events(db: AsyncSession, event_ids: list[int]) -> None:
+        await db.execute(delete(IngestionOutboxEvent).where(IngestionOutboxEvent.id.in_(event_ids)))
+        await db.commit()
+
+    @staticmethod
+    async def mark_outbox_failed(db: AsyncSession, event_ids: list[int], last_error: str) -> None:
+        await db.execute(
+            update(IngestionOutboxEvent)
+            .where(IngestionOutboxEvent.id.in_(event_ids))
+            .values(attempts=IngestionOutboxEvent.attempts + 1, last_error=last_error[:2000])
+        )
+        await db.commit()
+
+    @staticmethod
+    async def dead_letter_outbox_events(
+        db: AsyncSession, events: list[tuple[IngestionOutboxEvent, str]], dead_lettered_at: datetime
+    ) -> None:
+        """
+        将无法投递的事件连同错误信息移入死信表，并从 outbox 删除；不提交，由调用方与本批其余操作一并提交。
+        """
+        for event, last_error in events:
+            db.add(
+                IngestionOutboxDeadLetter(
+                    event_id=event.event_id,
+                    event_type=event.event_type,
+                    stream_key=event.stream_key,
+                    dataset_id=event.dataset_id,
+                    payload=event.payload,
+                    attempts=event.attempts + 1,
+                    last_error=last_error[:2000],
+                    created_at=event.created_at,
+                    dead_lettered_at=dead_lettered_at,
+                )
+            )
+        await db.flush()
+        await db.execute(
+            delete(IngestionOutboxEvent).where(IngestionOutboxEvent.id.in_([event.id for event, _ in events]))
+        )
+
+    @staticmethod
+    async def get_outbox_backlog(db: AsyncSession) -> tuple[int, datetime | None]:
+        result = await db.execute(
+            select(func.count(IngestionOutboxEvent.id), func.min(IngestionOutboxEvent.created_at))
+        )
+        pending_count, oldest_created_at = result.one()
+        return pending_count, oldest_created_at
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 
 
 class DatasetCreateRequest(BaseModel):
@@ -22,6 +22,8 @@ class IngestionUploadResponse(BaseModel):
     filename: str
     object_key: str
     file_size: int
+    content_sha256: Optional[str] = None
+    is_deduplicated: bool = False
     created_at: Optional[str] = None
 
 
@@ -34,3 +36,34 @@ class IngestionJobStatusResponse(BaseModel):
     file_size: int
     created_at: Optional[str] = None
     updated_at: Optional[str] = None
+
+
+class UploadSessionCreateRequest(BaseModel):
+    filename: str = Field(..., description='原始文件名')
+    total_size: int = Field(..., gt=0, description='文件总字节数')
+    part_size: Optional[int] = Field(default=None, gt=0, description='分片字节数，最后一片可小于该值')
+
+
+class UploadSessionResponse(BaseModel):
+    upload_id: str
+    dataset_id: str
+    dataset_version: str
+    filename: str
+    status: str
+    total_size: int
+    part_size: int
+    total_parts: int
+    received_parts: List[int] = []
+    received_bytes: int = 0
+    missing_parts: List[int] = []
+    ingestion_job_id: Optional[str] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    expires_at: Optional[str] = None
+
+
+class UploadPartResponse(BaseModel):
+    upload_id: str
+    part_number: int
+    part_size: int
+    content_sha256: str
@@ -1,12 +1,21 @@
 from datetime import datetime, timezone
 from fastapi import HTTPException, UploadFile
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import uuid4
+import json
 import os
 import logging
 from app.core.settings import settings
+from app.infrastructure.data_lake import DataLakeWriter, StoredObject
 from app.infrastructure.redis_stream import RedisStreamPublisher
-from app.models.ingestion_models import IngestionDataset, IngestionJob
+from app.models.ingestion_models import (
+    IngestionContentRef,
+    IngestionDataset,
+    IngestionJob,
+    IngestionObject,
+    IngestionOutboxEvent,
+)
 from app.repositories.ingestion_repository import IngestionRepository
 from app.schemas.dataset import DatasetCreateRequest, DatasetCreateResponse, IngestionJobStatusResponse, IngestionUploadResponse
 
@@ -15,19 +24,21 @@ logger = logging.getLogger(__name__)
 
 class IngestionService:
     DATA_LAKE_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../data-lake/raw'))
+    # 引用的 job 处于这些状态时相同内容直接复用；FAILED 等终态需重新入队处理
+    DEDUPE_JOB_STATUSES = ('PENDING', 'RUNNING', 'SUCCEEDED')
 
     @staticmethod
-    def _utc_now_iso() -> str:
+    def utc_now_iso() -> str:
         return datetime.now(timezone.utc).isoformat()
 
     @staticmethod
-    def _build_idempotency_key(dataset_id: str, dataset_version: str, original_filename: str) -> str:
+    def build_idempotency_key(dataset_id: str, dataset_version: str, original_filename: str) -> str:
         return f'{dataset_id}:{dataset_version}:{original_filename}'
 
     @classmethod
     async def create_dataset(cls, db: AsyncSession, payload: DatasetCreateRequest) -> DatasetCreateResponse:
         dataset_id = uuid4().hex
-        created_at = cls._utc_now_iso()
+        created_at = cls.utc_now_iso()
         dataset = IngestionDataset(
             dataset_id=dataset_id,
             dataset_name=payload.dataset_name,
@@ -51,33 +62,62 @@ class IngestionService:
             raise HTTPException(status_code=404, detail=f'dataset not found: {dataset_id}')
 
         dataset_version = dataset.dataset_version
-        created_at = cls._utc_now_iso()
+        created_at = cls.utc_now_iso()
         original_filename = file.filename or 'unnamed.bin'
-        idempotency_key = cls._build_idempotency_key(dataset_id, dataset_version, original_filename)
+        idempotency_key = cls.build_idempotency_key(dataset_id, dataset_version, original_filename)
         existing_job = await IngestionRepository.get_ingestion_job_by_idempotency_key(db, idempotency_key)
         if existing_job:
-            return IngestionUploadResponse(
-                dataset_id=existing_job.dataset_id,
-                dataset_version=existing_job.dataset_version,
-                ingestion_job_id=existing_job.ingestion_job_id,
-                status=existing_job.status,
-                filename=existing_job.filename,
-                object_key=existing_job.object_key,
-                file_size=existing_job.file_size,
-                created_at=existing_job.created_at.isoformat(),
-            )
+            return cls.build_job_response(existing_job)
 
-        object_dir = os.path.join(cls.DATA_LAKE_ROOT, dataset_id, dataset_version)
-        os.makedirs(object_dir, exist_ok=True)
-        object_name = f'{created_at.replace(":", "").replace("-", "").replace(".", "")}_{original_filename}'
-        object_key = f'raw/{dataset_id}/{dataset_version}/{object_name}'
-        file_path = os.path.join(object_dir, object_name)
+        staging_path = os.path.join(cls.DATA_LAKE_ROOT, '_staging', uuid4().hex)
+        stored_object = await DataLakeWriter.write_upload(file, staging_path, settings.upload_chunk_size_bytes)
+        return await cls.register_staged_object(
+            db, dataset, original_filename, idempotency_key, stored_object, created_at
+        )
 
-        file_content = await file.read()
-        with open(file_path, 'wb') as fs:
-            fs.write(file_content)
+    @staticmethod
+    def build_job_response(
+        job: IngestionJob, content_sha256: str | None = None, is_deduplicated: bool = False
+    ) -> IngestionUploadResponse:
+        return IngestionUploadResponse(
+            dataset_id=job.dataset_id,
+            dataset_version=job.dataset_version,
+            ingestion_job_id=job.ingestion_job_id,
+            status=job.status,
+            filename=job.filename,
+            object_key=job.object_key,
+            file_size=job.file_size,
+            content_sha256=content_sha256,
+            is_deduplicated=is_deduplicated,
+            created_at=job.created_at.isoformat(),
+        )
+
+    @staticmethod
+    def _build_content_object_key(content_sha256: str, original_filename: str) -> str:
+        # 保留扩展名，processing-service 按扩展名选择解析方式
+        extension = original_filename.rsplit('.', 1)[-1].lower() if '.' in original_filename else 'bin'
+        return f'raw/objects/{content_sha256[:2]}/{content_sha256}.{extension}'
 
-        file_size = len(file_content)
+    @classmethod
+    def _object_key_to_path(cls, object_key: str) -> str:
+        return os.path.join(cls.DATA_LAKE_ROOT, object_key.replace('raw/', '', 1))
+
+    @classmethod
+    async def register_staged_object(
+        cls,
+        db: AsyncSession,
+        dataset: IngestionDataset,
+        original_filename: str,
+        idempotency_key: str,
+        stored_object: StoredObject,
+        created_at: str,
+    ) -> IngestionUploadResponse:
+        """
+        将已落到暂存区的文件登记为接入任务：内容去重、入湖，job 与 dataset.ingested outbox 事件同事务提交。
+        """
+        dataset_id = dataset.dataset_id
+        dataset_version = dataset.dataset_version
+        content_sha256 = stored_object.content_sha256
         ingestion_job_id = uuid4().hex
         job = IngestionJob(
             ingestion_job_id=ingestion_job_id,
@@ -86,45 +126,178 @@ class IngestionService:
             dataset_version=dataset_version,
             status='PENDING',
             filename=original_filename,
-            object_key=object_key,
-            file_size=file_size,
+            object_key='',
+            file_size=stored_object.file_size,
             retry_count=0,
             last_error='',
             created_at=datetime.fromisoformat(created_at),
             updated_at=datetime.fromisoformat(created_at),
         )
-        await IngestionRepository.create_ingestion_job(db, job)
+
+        if settings.content_dedupe_enabled:
+            duplicated_job = await cls._find_duplicated_job(db, dataset_id, dataset_version, content_sha256)
+            if duplicated_job:
+                await DataLakeWriter.discard(stored_object.file_path)
+                return await cls._reuse_duplicated_job(db, dataset, duplicated_job, content_sha256, created_at)
+            try:
+                await cls._store_content_object(db, dataset, job, stored_object, original_filename, created_at)
+            except IntegrityError:
+                # 并发上传相同内容：回滚后以已提交的结果为准
+                await db.rollback()
+                await db.refresh(dataset)
+                duplicated_job = await cls._find_duplicated_job(db, dataset_id, dataset_version, content_sha256)
+                if duplicated_job:
+                    await DataLakeWriter.discard(stored_object.file_path)
+                    return await cls._reuse_duplicated_job(db, dataset, duplicated_job, content_sha256, created_at)
+                existing_job = await IngestionRepository.get_ingestion_job_by_idempotency_key(db, idempotency_key)
+                if existing_job:
+                    await DataLakeWriter.discard(stored_object.file_path)
+                    return cls.build_job_response(existing_job)
+                try:
+                    await cls._store_content_object(db, dataset, job, stored_object, original_filename, created_at)
+                except IntegrityError:
+                    # 重试时仍冲突：同名文件并发上传，idempotency_key 被其他请求先提交
+                    await db.rollback()
+                    existing_job = await IngestionRepository.get_ingestion_job_by_idempotency_key(db, idempotency_key)
+                    if not existing_job:
+                        raise
+                    await DataLakeWriter.discard(stored_object.file_path)
+                    return cls.build_job_response(existing_job)
+        else:
+            object_name = f'{created_at.replace(":", "").replace("-", "").replace(".", "")}_{original_filename}'
+            job.object_key = f'raw/{dataset_id}/{dataset_version}/{object_name}'
+            await DataLakeWriter.promote(stored_object.file_path, cls._object_key_to_path(job.object_key))
+            cls._mark_dataset_pending(dataset, created_at)
+            await IngestionRepository.create_ingestion_job(
+                db, job, cls._build_outbox_event(job, content_sha256, created_at)
+            )
+
+        return cls.build_job_response(job, content_sha256)
+
+    @staticmethod
+    def _mark_dataset_pending(dataset: IngestionDataset, created_at: str) -> None:
+        # dataset 已在当前会话中，状态变更随 job 同一次提交
         dataset.status = 'PENDING'
         dataset.updated_at = datetime.fromisoformat(created_at)
-        await IngestionRepository.update_dataset(db, dataset)
 
+    @staticmethod
+    def _build_outbox_event(job: IngestionJob, content_sha256: str, created_at: str) -> IngestionOutboxEvent:
+        """
+        dataset.ingested 事件先写入 outbox，与 job 同事务提交，由 OutboxRelay 异步投递到 Redis Streams。
+        """
+        event_id = uuid4().hex
         stream_event = {
             'event_type': 'dataset.ingested',
-            'event_id': uuid4().hex,
+            'event_id': event_id,
             'occurred_at': created_at,
-            'dataset_id': dataset_id,
-            'dataset_version': dataset_version,
-            'ingestion_job_id': ingestion_job_id,
-            'object_key': object_key,
-            'file_size': file_size,
+            'dataset_id': job.dataset_id,
+            'dataset_version': job.dataset_version,
+            'ingestion_job_id': job.ingestion_job_id,
+            'object_key': job.object_key,
+            'file_size': job.file_size,
+            'content_sha256': content_sha256,
             'status': 'PENDING',
         }
-        try:
-            await RedisStreamPublisher.publish_dataset_ingested(stream_event)
-        except Exception as exc:
-            logger.exception(f'publish dataset.ingested failed: {exc}')
-            if settings.event_publish_required:
-                raise HTTPException(status_code=503, detail='publish dataset.ingested failed') from exc
+        return IngestionOutboxEvent(
+            event_id=event_id,
+            event_type='dataset.ingested',
+            stream_key=RedisStreamPublisher.route_stream_key(job.dataset_id),
+            dataset_id=job.dataset_id,
+            payload=json.dumps(stream_event, ensure_ascii=False),
+            attempts=0,
+            last_error='',
+            created_at=datetime.fromisoformat(created_at),
+        )
 
-        return IngestionUploadResponse(
+    @classmethod
+    async def _reuse_duplicated_job(
+        cls,
+        db: AsyncSession,
+        dataset: IngestionDataset,
+        duplicated_job: IngestionJob,
+        content_sha256: str,
+        created_at: str,
+    ) -> IngestionUploadResponse:
+        """
+        相同内容已登记过 job：排队中、处理中或已成功时直接返回；失败等状态下重新入队，避免相同内容永远不再处理。
+        """
+        if duplicated_job.status in cls.DEDUPE_JOB_STATUSES:
+            logger.info(
+                f'duplicated content skipped: dataset_id={dataset.dataset_id}, sha256={content_sha256}, '
+                f'job_id={duplicated_job.ingestion_job_id}, status={duplicated_job.status}'
+            )
+            return cls.build_job_response(duplicated_job, content_sha256, is_deduplicated=True)
+
+        previous_status = duplicated_job.status
+        cls._mark_dataset_pending(dataset, created_at)
+        requeued = await IngestionRepository.requeue_ingestion_job(
+            db,
+            duplicated_job.ingestion_job_id,
+            previous_status,
+            datetime.fromisoformat(created_at),
+            cls._build_outbox_event(duplicated_job, content_sha256, created_at),
+        )
+        await db.refresh(duplicated_job)
+        if not requeued:
+            # 并发请求已重新入队，以其结果为准
+            return cls.build_job_response(duplicated_job, content_sha256, is_deduplicated=True)
+        logger.info(
+            f'duplicated content requeued: dataset_id={dataset.dataset_id}, sha256={content_sha256}, '
+            f'job_id={duplicated_job.ingestion_job_id}, previous_status={previous_status}'
+        )
+        return cls.build_job_response(duplicated_job, content_sha256)
+
+    @staticmethod
+    async def _find_duplicated_job(
+        db: AsyncSession, dataset_id: str, dataset_version: str, content_sha256: str
+    ) -> IngestionJob | None:
+        content_ref = await IngestionRepository.get_content_ref(db, dataset_id, dataset_version, content_sha256)
+        if not content_ref:
+            return None
+        return await IngestionRepository.get_ingestion_job_by_job_id(db, content_ref.ingestion_job_id)
+
+    @classmethod
+    async def _store_content_object(
+        cls,
+        db: AsyncSession,
+        dataset: IngestionDataset,
+        job: IngestionJob,
+        stored_object: StoredObject,
+        original_filename: str,
+        created_at: str,
+    ) -> None:
+        content_sha256 = stored_object.content_sha256
+        now = datetime.fromisoformat(created_at)
+        existing_object = await IngestionRepository.get_object_by_sha256(db, content_sha256)
+        new_object = None
+        if existing_object:
+            # 内容已在湖中：复用对象，丢弃本次暂存文件
+            job.object_key = existing_object.object_key
+            await DataLakeWriter.discard(stored_object.file_path)
+        else:
+            job.object_key = cls._build_content_object_key(content_sha256, original_filename)
+            object_path = cls._object_key_to_path(job.object_key)
+            # 冲突重试时暂存文件已在上一次尝试中移入按内容寻址的对象路径，无需再次移动
+            if os.path.exists(stored_object.file_path) or not os.path.exists(object_path):
+                await DataLakeWriter.promote(stored_object.file_path, object_path)
+            new_object = IngestionObject(
+                content_sha256=content_sha256,
+                object_key=job.object_key,
+                file_size=stored_object.file_size,
+                ref_count=1,
+                created_at=now,
+                updated_at=now,
+            )
+        content_ref = IngestionContentRef(
             dataset_id=job.dataset_id,
             dataset_version=job.dataset_version,
+            content_sha256=content_sha256,
             ingestion_job_id=job.ingestion_job_id,
-            status=job.status,
-            filename=job.filename,
-            object_key=job.object_key,
-            file_size=job.file_size,
-            created_at=job.created_at.isoformat(),
+            created_at=now,
+        )
+        cls._mark_dataset_pending(dataset, created_at)
+        await IngestionRepository.create_content_job(
+            db, job, content_ref, new_object, now, cls._build_outbox_event(job, content_sha256, created_at)
         )
 
     @classmethod
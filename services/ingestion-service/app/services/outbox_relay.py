@@ -0,0 +1,108 @@
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict
+from app.core.settings import settings
+from app.infrastructure.database import session_local
+from app.infrastructure.redis_stream import RedisStreamPublisher
+from app.repositories.ingestion_repository import IngestionRepository
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxRelay:
+    """
+    outbox 投递：按批读取待发布事件，pipeline 批量 XADD 后删除；投递失败保留行并累计 attempts，下轮重试；
+    payload 无法解析的事件移入死信表（outbox_dead_letters），其余事件照常投递。
+
+    投递语义为 at-least-once（XADD 成功但删除前进程退出会重复投递），下游按 ingestion_job_id 幂等处理。
+    """
+
+    _last_lag_log_at: float = 0.0
+
+    @staticmethod
+    def _utc_now() -> datetime:
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+
+    @classmethod
+    async def relay_once(cls) -> int:
+        async with session_local() as db:
+            events = await IngestionRepository.claim_outbox_events(db, settings.outbox_batch_size)
+            if not events:
+                await db.rollback()
+                return 0
+            entries, event_ids, dead_letters = [], [], []
+            for event in events:
+                # 逐行解析，单条坏数据移入死信表，不阻塞队头后续事件
+                try:
+                    event_data = json.loads(event.payload)
+                    if not isinstance(event_data, dict):
+                        raise ValueError(f'payload is not an object: {type(event_data).__name__}')
+                except ValueError as exc:
+                    dead_letters.append((event, f'invalid payload: {exc}'))
+                    continue
+                entries.append((event.stream_key, event_data))
+                event_ids.append(event.id)
+            if dead_letters:
+                await IngestionRepository.dead_letter_outbox_events(db, dead_letters, cls._utc_now())
+                logger.error(
+                    f'outbox events dead-lettered: ids={[event.id for event, _ in dead_letters]}, '
+                    f'error={dead_letters[0][1]}'
+                )
+            if not entries:
+                await db.commit()
+                return 0
+            try:
+                message_ids = await RedisStreamPublisher.publish_entries(entries)
+            except Exception as exc:
+                await IngestionRepository.mark_outbox_failed(db, event_ids, str(exc))
+                raise
+            await IngestionRepository.delete_outbox_events(db, event_ids)
+        logger.info(
+            f'outbox relayed: count={len(message_ids)}, first_id={event_ids[0]}, last_id={event_ids[-1]}'
+        )
+        return len(message_ids)
+
+    @classmethod
+    async def get_lag(cls) -> Dict[str, Any]:
+        """
+        outbox 积压：待投递条数与最早一条的等待时长。
+        """
+        async with session_local() as db:
+            pending_count, oldest_created_at = await IngestionRepository.get_outbox_backlog(db)
+        lag_seconds = 0.0
+        if oldest_created_at is not None:
+            lag_seconds = max((cls._utc_now() - oldest_created_at.replace(tzinfo=None)).total_seconds(), 0.0)
+        return {
+            'pending_count': pending_count,
+            'oldest_created_at': oldest_created_at.isoformat() if oldest_created_at else None,
+            'lag_seconds': round(lag_seconds, 3),
+        }
+
+    @classmethod
+    async def _log_lag_if_due(cls) -> None:
+        now = time.monotonic()
+        if now - cls._last_lag_log_at < settings.outbox_lag_log_interval_seconds:
+            return
+        cls._last_lag_log_at = now
+        lag = await cls.get_lag()
+        if lag['pending_count']:
+            logger.warning(f'outbox lag: pending={lag["pending_count"]}, lag_seconds={lag["lag_seconds"]}')
+
+    @classmethod
+    async def run_forever(cls) -> None:
+        interval_seconds = settings.outbox_poll_interval_ms / 1000
+        while True:
+            relayed = 0
+            try:
+                relayed = await cls.relay_once()
+                await cls._log_lag_if_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.exception(f'outbox relay failed: {exc}')
+            # 满批说明仍有积压，立即进入下一轮
+            if relayed < settings.outbox_batch_size:
+                await asyncio.sleep(interval_seconds)
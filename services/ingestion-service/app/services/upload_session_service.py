@@ -0,0 +1,229 @@
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import uuid4
+import os
+import logging
+from app.core.settings import settings
+from app.infrastructure.data_lake import DataLakeWriter
+from app.models.ingestion_models import IngestionUploadPart, IngestionUploadSession
+from app.repositories.ingestion_repository import IngestionRepository
+from app.schemas.dataset import (
+    IngestionUploadResponse,
+    UploadPartResponse,
+    UploadSessionCreateRequest,
+    UploadSessionResponse,
+)
+from app.services.ingestion_service import IngestionService
+
+logger = logging.getLogger(__name__)
+
+
+class UploadSessionService:
+    """
+    分片续传：分片落到 _uploads/<upload_id>/ 下，分片登记在数据库；complete 时按序拼接并登记接入任务。
+    """
+
+    UPLOAD_ROOT = os.path.join(IngestionService.DATA_LAKE_ROOT, '_uploads')
+
+    @classmethod
+    def _part_path(cls, upload_id: str, part_number: int) -> str:
+        return os.path.join(cls.UPLOAD_ROOT, upload_id, f'{part_number:06d}.part')
+
+    @staticmethod
+    def _is_expired(upload_session: IngestionUploadSession) -> bool:
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return upload_session.expires_at.replace(tzinfo=None) <= now
+
+    @staticmethod
+    def _expected_part_size(upload_session: IngestionUploadSession, part_number: int) -> int:
+        if part_number < upload_session.total_parts:
+            return upload_session.part_size
+        return upload_session.total_size - upload_session.part_size * (upload_session.total_parts - 1)
+
+    @staticmethod
+    async def _limit_part_size(
+        chunks: AsyncIterator[bytes], part_number: int, expected_size: int
+    ) -> AsyncIterator[bytes]:
+        # 超出分片大小立即中止读取，避免超大请求体先整体落盘；write_stream 异常时清理半截临时文件
+        received_size = 0
+        async for chunk in chunks:
+            received_size += len(chunk)
+            if received_size > expected_size:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f'part too large: part={part_number}, expected={expected_size}, got>={received_size}',
+                )
+            yield chunk
+
+    @staticmethod
+    def _build_session_response(
+        upload_session: IngestionUploadSession, parts: list[IngestionUploadPart]
+    ) -> UploadSessionResponse:
+        received_parts = [part.part_number for part in parts]
+        received_set = set(received_parts)
+        return UploadSessionResponse(
+            upload_id=upload_session.upload_id,
+            dataset_id=upload_session.dataset_id,
+            dataset_version=upload_session.dataset_version,
+            filename=upload_session.filename,
+            status=upload_session.status,
+            total_size=upload_session.total_size,
+            part_size=upload_session.part_size,
+            total_parts=upload_session.total_parts,
+            received_parts=received_parts,
+            received_bytes=sum(part.part_size for part in parts),
+            missing_parts=[
+                part_number
+                for part_number in range(1, upload_session.total_parts + 1)
+                if part_number not in received_set
+            ],
+            ingestion_job_id=upload_session.ingestion_job_id or None,
+            created_at=upload_session.created_at.isoformat(),
+            updated_at=upload_session.updated_at.isoformat(),
+            expires_at=upload_session.expires_at.isoformat(),
+        )
+
+    @classmethod
+    async def _get_session(cls, db: AsyncSession, dataset_id: str, upload_id: str) -> IngestionUploadSession:
+        upload_session = await IngestionRepository.get_upload_session(db, upload_id)
+        if not upload_session or upload_session.dataset_id != dataset_id:
+            raise HTTPException(status_code=404, detail=f'upload session not found: {upload_id}')
+        return upload_session
+
+    @classmethod
+    async def _get_active_session(cls, db: AsyncSession, dataset_id: str, upload_id: str) -> IngestionUploadSession:
+        upload_session = await cls._get_session(db, dataset_id, upload_id)
+        if upload_session.status == 'UPLOADING' and cls._is_expired(upload_session):
+            raise HTTPException(status_code=410, detail=f'upload session expired: {upload_id}')
+        return upload_session
+
+    @classmethod
+    async def create_session(
+        cls, db: AsyncSession, dataset_id: str, payload: UploadSessionCreateRequest
+    ) -> UploadSessionResponse:
+        dataset = await IngestionRepository.get_dataset_by_dataset_id(db, dataset_id)
+        if not dataset:
+            raise HTTPException(status_code=404, detail=f'dataset not found: {dataset_id}')
+
+        part_size = payload.part_size or settings.upload_part_size_bytes
+        now = datetime.fromisoformat(IngestionService.utc_now_iso())
+        upload_session = IngestionUploadSession(
+            upload_id=uuid4().hex,
+            dataset_id=dataset_id,
+            dataset_version=dataset.dataset_version,
+            filename=payload.filename,
+            total_size=payload.total_size,
+            part_size=part_size,
+            total_parts=(payload.total_size + part_size - 1) // part_size,
+            status='UPLOADING',
+            ingestion_job_id='',
+            created_at=now,
+            updated_at=now,
+            expires_at=now + timedelta(hours=settings.upload_session_ttl_hours),
+        )
+        await IngestionRepository.create_upload_session(db, upload_session)
+        return cls._build_session_response(upload_session, [])
+
+    @classmethod
+    async def get_session(cls, db: AsyncSession, dataset_id: str, upload_id: str) -> UploadSessionResponse:
+        upload_session = await cls._get_active_session(db, dataset_id, upload_id)
+        parts = await IngestionRepository.list_upload_parts(db, upload_id)
+        return cls._build_session_response(upload_session, parts)
+
+    @classmethod
+    async def upload_part(
+        cls,
+        db: AsyncSession,
+        dataset_id: str,
+        upload_id: str,
+        part_number: int,
+        chunks: AsyncIterator[bytes],
+    ) -> UploadPartResponse:
+        upload_session = await cls._get_active_session(db, dataset_id, upload_id)
+        if upload_session.status != 'UPLOADING':
+            raise HTTPException(status_code=409, detail=f'upload session already {upload_session.status}')
+        if part_number < 1 or part_number > upload_session.total_parts:
+            raise HTTPException(
+                status_code=400, detail=f'part_number out of range: 1..{upload_session.total_parts}'
+            )
+
+        # 同一分片重复上传时原子覆盖，支持客户端断点重传
+        part_path = cls._part_path(upload_id, part_number)
+        expected_size = cls._expected_part_size(upload_session, part_number)
+        stored_part = await DataLakeWriter.write_stream(
+            cls._limit_part_size(chunks, part_number, expected_size), part_path
+        )
+        if stored_part.file_size != expected_size:
+            await DataLakeWriter.discard(part_path)
+            raise HTTPException(
+                status_code=400,
+                detail=f'part size mismatch: part={part_number}, expected={expected_size}, got={stored_part.file_size}',
+            )
+
+        now = datetime.fromisoformat(IngestionService.utc_now_iso())
+        await IngestionRepository.save_upload_part(
+            db, upload_id, part_number, stored_part.file_size, stored_part.content_sha256, now
+        )
+        return UploadPartResponse(
+            upload_id=upload_id,
+            part_number=part_number,
+            part_size=stored_part.file_size,
+            content_sha256=stored_part.content_sha256,
+        )
+
+    @classmethod
+    async def complete_session(cls, db: AsyncSession, dataset_id: str, upload_id: str) -> IngestionUploadResponse:
+        upload_session = await cls._get_active_session(db, dataset_id, upload_id)
+        if upload_session.status == 'COMPLETED':
+            job = await IngestionRepository.get_ingestion_job_by_job_id(db, upload_session.ingestion_job_id)
+            if job:
+                return IngestionService.build_job_response(job)
+            # 分片已在首次完成时删除，不能重新合并
+            raise HTTPException(
+                status_code=409,
+                detail=f'upload session already completed, ingestion job not found: {upload_session.ingestion_job_id}',
+            )
+
+        parts = await IngestionRepository.list_upload_parts(db, upload_id)
+        missing_parts = cls._build_session_response(upload_session, parts).missing_parts
+        if missing_parts:
+            raise HTTPException(status_code=409, detail=f'upload incomplete, missing parts: {missing_parts[:20]}')
+
+        dataset = await IngestionRepository.get_dataset_by_dataset_id(db, dataset_id)
+        if not dataset:
+            raise HTTPException(status_code=404, detail=f'dataset not found: {dataset_id}')
+
+        idempotency_key = IngestionService.build_idempotency_key(
+            dataset_id, upload_session.dataset_version, upload_session.filename
+        )
+        existing_job = await IngestionRepository.get_ingestion_job_by_idempotency_key(db, idempotency_key)
+        if existing_job:
+            response = IngestionService.build_job_response(existing_job)
+        else:
+            staging_path = os.path.join(IngestionService.DATA_LAKE_ROOT, '_staging', uuid4().hex)
+            stored_object = await DataLakeWriter.concat_files(
+                [cls._part_path(upload_id, part.part_number) for part in parts],
+                staging_path,
+                settings.upload_chunk_size_bytes,
+            )
+            response = await IngestionService.register_staged_object(
+                db,
+                dataset,
+                upload_session.filename,
+                idempotency_key,
+                stored_object,
+                IngestionService.utc_now_iso(),
+            )
+
+        upload_session.status = 'COMPLETED'
+        upload_session.ingestion_job_id = response.ingestion_job_id
+        upload_session.updated_at = datetime.fromisoformat(IngestionService.utc_now_iso())
+        await IngestionRepository.update_upload_session(db, upload_session)
+        await DataLakeWriter.discard_dir(os.path.join(cls.UPLOAD_ROOT, upload_id))
+        logger.info(
+            f'upload session completed: upload_id={upload_id}, dataset_id={dataset_id}, '
+            f'job_id={response.ingestion_job_id}, parts={len(parts)}'
+        )
+        return response
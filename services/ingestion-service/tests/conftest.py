@@ -0,0 +1,76 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+# 测试不依赖真实 PostgreSQL/Redis：数据库走临时 SQLite 文件，Redis 由 fakeredis 提供；需在导入 app 之前设置
+os.environ.setdefault('INGESTION_DB_URL', 'sqlite+aiosqlite://')
+os.environ.setdefault('INGESTION_OUTBOX_RELAY_ENABLED', 'false')
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import fakeredis  # noqa: E402
+from sqlalchemy import BigInteger, event  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+from app.core.settings import settings  # noqa: E402
+from app.infrastructure import database  # noqa: E402
+from app.infrastructure.redis_stream import RedisStreamPublisher  # noqa: E402
+from app.models import ingestion_models  # noqa: E402,F401
+from app.services import outbox_relay  # noqa: E402
+from app.services.ingestion_service import IngestionService  # noqa: E402
+from app.services.upload_session_service import UploadSessionService  # noqa: E402
+
+
+@compiles(BigInteger, 'sqlite')
+def _compile_big_integer_sqlite(type_, compiler, **kw):
+    # SQLite 仅 INTEGER PRIMARY KEY 自增
+    return 'INTEGER'
+
+
+async def chunks_of(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(RedisStreamPublisher, '_redis', client)
+    return client
+
+
+@pytest.fixture
+def run_with_db(tmp_path, monkeypatch, redis_client):
+    """
+    在独立事件循环中准备 SQLite 库（ATTACH 为 settings.db_schema）与临时数据湖目录后执行用例协程。
+
+    用例协程签名为 ``async def scenario(session_factory)``。
+    """
+    data_lake_root = str(tmp_path / 'data-lake' / 'raw')
+    monkeypatch.setattr(IngestionService, 'DATA_LAKE_ROOT', data_lake_root)
+    monkeypatch.setattr(UploadSessionService, 'UPLOAD_ROOT', os.path.join(data_lake_root, '_uploads'))
+
+    def _run(scenario):
+        async def _main():
+            engine = create_async_engine(f'sqlite+aiosqlite:///{tmp_path / "main.db"}')
+
+            @event.listens_for(engine.sync_engine, 'connect')
+            def _attach_schema(dbapi_connection, _):
+                cursor = dbapi_connection.cursor()
+                cursor.execute(f"ATTACH DATABASE '{tmp_path / 'schema.db'}' AS {settings.db_schema}")
+                cursor.close()
+
+            session_factory = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+            monkeypatch.setattr(database, 'session_local', session_factory)
+            monkeypatch.setattr(outbox_relay, 'session_local', session_factory)
+            try:
+                async with engine.begin() as conn:
+                    await conn.run_sync(database.Base.metadata.create_all)
+                return await scenario(session_factory)
+            finally:
+                await engine.dispose()
+
+        return asyncio.run(_main())
+
+    return _run
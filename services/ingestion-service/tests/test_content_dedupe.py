@@ -0,0 +1,187 @@
+import os
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select, update
+
+from app.infrastructure.data_lake import DataLakeWriter
+from app.models.ingestion_models import IngestionDataset, IngestionJob, IngestionObject, IngestionOutboxEvent
+from app.repositories.ingestion_repository import IngestionRepository
+from app.services.ingestion_service import IngestionService
+from conftest import chunks_of
+
+
+async def _create_dataset(db, dataset_id: str) -> IngestionDataset:
+    now = datetime.fromisoformat(IngestionService.utc_now_iso())
+    return await IngestionRepository.create_dataset(
+        db,
+        IngestionDataset(
+            dataset_id=dataset_id,
+            dataset_name=dataset_id,
+            dataset_version='v1',
+            status='CREATED',
+            created_at=now,
+            updated_at=now,
+        ),
+    )
+
+
+async def _register(db, dataset: IngestionDataset, filename: str, content: bytes):
+    staging_path = os.path.join(IngestionService.DATA_LAKE_ROOT, '_staging', filename)
+    stored_object = await DataLakeWriter.write_stream(chunks_of(content), staging_path)
+    return await IngestionService.register_staged_object(
+        db,
+        dataset,
+        filename,
+        IngestionService.build_idempotency_key(dataset.dataset_id, dataset.dataset_version, filename),
+        stored_object,
+        IngestionService.utc_now_iso(),
+    )
+
+
+async def _get_object(db, content_sha256: str) -> IngestionObject:
+    db.expire_all()
+    return await IngestionRepository.get_object_by_sha256(db, content_sha256)
+
+
+def test_same_content_in_same_dataset_is_deduplicated(run_with_db):
+    async def scenario(session_factory):
+        async with session_factory() as db:
+            dataset = await _create_dataset(db, 'ds1')
+            first = await _register(db, dataset, 'a.csv', b'id,name\n1,x\n')
+            second = await _register(db, dataset, 'b.csv', b'id,name\n1,x\n')
+
+            assert second.is_deduplicated is True
+            assert second.ingestion_job_id == first.ingestion_job_id
+            assert (await _get_object(db, first.content_sha256)).ref_count == 1
+            # 去重时丢弃暂存文件
+            assert not os.path.exists(os.path.join(IngestionService.DATA_LAKE_ROOT, '_staging', 'b.csv'))
+
+    run_with_db(scenario)
+
+
+async def _set_job_status(db, ingestion_job_id: str, status: str):
+    await db.execute(
+        update(IngestionJob)
+        .where(IngestionJob.ingestion_job_id == ingestion_job_id)
+        .values(status=status, retry_count=3, last_error='parse error')
+    )
+    await db.commit()
+
+
+@pytest.mark.parametrize('status', ['RUNNING', 'SUCCEEDED'])
+def test_duplicate_of_live_or_succeeded_job_is_not_requeued(run_with_db, status):
+    async def scenario(session_factory):
+        async with session_factory() as db:
+            dataset = await _create_dataset(db, 'ds1')
+            first = await _register(db, dataset, 'a.csv', b'id\n1\n')
+            await _set_job_status(db, first.ingestion_job_id, status)
+
+            second = await _register(db, dataset, 'b.csv', b'id\n1\n')
+
+            assert second.is_deduplicated is True
+            assert second.status == status
+            events = (await db.execute(select(IngestionOutboxEvent))).scalars().all()
+            assert len(events) == 1
+
+    run_with_db(scenario)
+
+
+def test_duplicate_of_failed_job_is_requeued(run_with_db):
+    async def scenario(session_factory):
+        async with session_factory() as db:
+            dataset = await _create_dataset(db, 'ds1')
+            first = await _register(db, dataset, 'a.csv', b'id\n1\n')
+            await _set_job_status(db, first.ingestion_job_id, 'FAILED')
+            dataset.status = 'FAILED'
+            await db.commit()
+
+            second = await _register(db, dataset, 'b.csv', b'id\n1\n')
+
+            assert second.is_deduplicated is False
+            assert second.ingestion_job_id == first.ingestion_job_id
+            assert second.status == 'PENDING'
+            db.expire_all()
+            job = await IngestionRepository.get_ingestion_job_by_job_id(db, first.ingestion_job_id)
+            assert (job.retry_count, job.last_error) == (0, '')
+            assert (await IngestionRepository.get_dataset_by_dataset_id(db, 'ds1')).status == 'PENDING'
+            # 重新写入 dataset.ingested 事件，由 relay 再次投递
+            events = (await db.execute(select(IngestionOutboxEvent).order_by(IngestionOutboxEvent.id))).scalars().all()
+            assert [event.dataset_id for event in events] == ['ds1', 'ds1']
+            assert events[0].event_id != events[1].event_id
+            assert (await _get_object(db, first.content_sha256)).ref_count == 1
+            assert not os.path.exists(os.path.join(IngestionService.DATA_LAKE_ROOT, '_staging', 'b.csv'))
+
+            # 重新入队后再次上传相同内容按排队中去重
+            await db.refresh(dataset)
+            third = await _register(db, dataset, 'c.csv', b'id\n1\n')
+            assert third.is_deduplicated is True
+
+    run_with_db(scenario)
+
+
+def test_same_content_across_datasets_shares_one_object(run_with_db):
+    async def scenario(session_factory):
+        async with session_factory() as db:
+            dataset_a = await _create_dataset(db, 'ds1')
+            dataset_b = await _create_dataset(db, 'ds2')
+            first = await _register(db, dataset_a, 'a.csv', b'id\n1\n')
+            second = await _register(db, dataset_b, 'a.csv', b'id\n1\n')
+
+            assert second.is_deduplicated is False
+            assert second.ingestion_job_id != first.ingestion_job_id
+            assert second.object_key == first.object_key
+            content_object = await _get_object(db, first.content_sha256)
+            assert content_object.ref_count == 2
+            assert os.path.exists(IngestionService._object_key_to_path(content_object.object_key))
+            jobs = (await db.execute(select(IngestionJob))).scalars().all()
+            assert len(jobs) == 2
+
+    run_with_db(scenario)
+
+
+def test_lost_idempotency_key_race_returns_committed_job(run_with_db):
+    async def scenario(session_factory):
+        async with session_factory() as db:
+            dataset = await _create_dataset(db, 'ds1')
+            first = await _register(db, dataset, 'a.csv', b'v1\n')
+
+        # 另一请求跳过了 upload_file 的前置检查，以相同文件名、不同内容登记
+        async with session_factory() as db:
+            dataset = await IngestionRepository.get_dataset_by_dataset_id(db, 'ds1')
+            second = await _register(db, dataset, 'a.csv', b'v2\n')
+
+            assert second.ingestion_job_id == first.ingestion_job_id
+            assert not os.path.exists(os.path.join(IngestionService.DATA_LAKE_ROOT, '_staging', 'a.csv'))
+            jobs = (await db.execute(select(IngestionJob))).scalars().all()
+            assert len(jobs) == 1
+
+    run_with_db(scenario)
+
+
+def test_retry_conflict_on_idempotency_key_returns_committed_job(run_with_db, monkeypatch):
+    async def scenario(session_factory):
+        async with session_factory() as db:
+            dataset = await _create_dataset(db, 'ds1')
+            first = await _register(db, dataset, 'a.csv', b'v1\n')
+
+        # 首次冲突后的查询未看到对方提交，重试时再次冲突
+        original_lookup = IngestionRepository.get_ingestion_job_by_idempotency_key
+        lookups = []
+
+        async def racing_lookup(db, idempotency_key):
+            lookups.append(idempotency_key)
+            if len(lookups) == 1:
+                return None
+            return await original_lookup(db, idempotency_key)
+
+        monkeypatch.setattr(IngestionRepository, 'get_ingestion_job_by_idempotency_key', racing_lookup)
+
+        async with session_factory() as db:
+            dataset = await IngestionRepository.get_dataset_by_dataset_id(db, 'ds1')
+            second = await _register(db, dataset, 'a.csv', b'v2\n')
+
+            assert len(lookups) == 2
+            assert second.ingestion_job_id == first.ingestion_job_id
+
+    run_with_db(scenario)
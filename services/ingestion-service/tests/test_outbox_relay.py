@@ -0,0 +1,152 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql
+
+from app.core.settings import settings
+from app.infrastructure.data_lake import DataLakeWriter
+from app.infrastructure.redis_stream import RedisStreamPublisher
+from app.models.ingestion_models import IngestionOutboxDeadLetter, IngestionOutboxEvent
+from app.repositories.ingestion_repository import IngestionRepository
+from app.schemas.dataset import DatasetCreateRequest
+from app.services.ingestion_service import IngestionService
+from app.services.outbox_relay import OutboxRelay
+from conftest import chunks_of
+
+
+async def _register_jobs(db, count: int) -> list[str]:
+    dataset = await IngestionService.create_dataset(db, DatasetCreateRequest(dataset_name='chat'))
+    dataset = await IngestionRepository.get_dataset_by_dataset_id(db, dataset.dataset_id)
+    job_ids = []
+    for index in range(count):
+        stored_object = await DataLakeWriter.write_stream(
+            chunks_of(f'row-{index}\n'.encode()), f'{IngestionService.DATA_LAKE_ROOT}/_staging/{index}'
+        )
+        response = await IngestionService.register_staged_object(
+            db,
+            dataset,
+            f'{index}.csv',
+            IngestionService.build_idempotency_key(dataset.dataset_id, dataset.dataset_version, f'{index}.csv'),
+            stored_object,
+            IngestionService.utc_now_iso(),
+        )
+        job_ids.append(response.ingestion_job_id)
+    return job_ids
+
+
+def test_claim_query_skips_locked_rows():
+    class _CapturingSession:
+        statement = None
+
+        async def execute(self, statement):
+            self.statement = statement
+
+            class _Result:
+                def scalars(self):
+                    return self
+
+                def all(self):
+                    return []
+
+            return _Result()
+
+    async def scenario():
+        session = _CapturingSession()
+        await IngestionRepository.claim_outbox_events(session, 10)
+        return str(session.statement.compile(dialect=postgresql.dialect()))
+
+    sql = asyncio.run(scenario())
+    assert 'FOR UPDATE SKIP LOCKED' in sql
+    assert 'ORDER BY' in sql and 'LIMIT' in sql
+
+
+def test_relay_publishes_in_order_and_deletes_rows(run_with_db, redis_client, monkeypatch):
+    monkeypatch.setattr(settings, 'outbox_batch_size', 2)
+
+    async def scenario(session_factory):
+        async with session_factory() as db:
+            job_ids = await _register_jobs(db, 3)
+        # 登记时只写 outbox，不直接发布
+        assert await redis_client.xlen(settings.dataset_ingested_stream_key) == 0
+
+        assert await OutboxRelay.relay_once() == 2
+        assert await OutboxRelay.relay_once() == 1
+        assert await OutboxRelay.relay_once() == 0
+
+        entries = await redis_client.xrange(settings.dataset_ingested_stream_key)
+        assert [fields['ingestion_job_id'] for _, fields in entries] == job_ids
+        assert entries[0][1]['event_type'] == 'dataset.ingested'
+        async with session_factory() as db:
+            assert (await db.execute(select(IngestionOutboxEvent))).scalars().all() == []
+        assert (await OutboxRelay.get_lag())['pending_count'] == 0
+
+    run_with_db(scenario)
+
+
+def test_publish_failure_keeps_rows_and_counts_attempts(run_with_db, redis_client, monkeypatch):
+    async def scenario(session_factory):
+        async with session_factory() as db:
+            await _register_jobs(db, 1)
+
+        async def failing_publish(entries):
+            raise ConnectionError('redis down')
+
+        publish_entries = RedisStreamPublisher.publish_entries
+        monkeypatch.setattr(RedisStreamPublisher, 'publish_entries', failing_publish)
+        with pytest.raises(ConnectionError):
+            await OutboxRelay.relay_once()
+        with pytest.raises(ConnectionError):
+            await OutboxRelay.relay_once()
+
+        async with session_factory() as db:
+            events = (await db.execute(select(IngestionOutboxEvent))).scalars().all()
+            assert len(events) == 1
+            assert events[0].attempts == 2
+            assert events[0].last_error == 'redis down'
+            assert json.loads(events[0].payload)['event_type'] == 'dataset.ingested'
+        lag = await OutboxRelay.get_lag()
+        assert lag['pending_count'] == 1
+        assert lag['lag_seconds'] >= 0
+
+        # Redis 恢复后下一轮投递成功
+        monkeypatch.setattr(RedisStreamPublisher, 'publish_entries', publish_entries)
+        assert await OutboxRelay.relay_once() == 1
+        assert await redis_client.xlen(settings.dataset_ingested_stream_key) == 1
+
+    run_with_db(scenario)
+
+
+def test_invalid_payload_is_dead_lettered_without_blocking_the_batch(run_with_db, redis_client):
+    async def scenario(session_factory):
+        async with session_factory() as db:
+            job_ids = await _register_jobs(db, 3)
+            events = (await db.execute(select(IngestionOutboxEvent).order_by(IngestionOutboxEvent.id))).scalars().all()
+            bad_event_id = events[0].event_id
+            await db.execute(
+                update(IngestionOutboxEvent).where(IngestionOutboxEvent.id == events[0].id).values(payload='{"event_')
+            )
+            await db.execute(
+                update(IngestionOutboxEvent).where(IngestionOutboxEvent.id == events[2].id).values(payload='[]')
+            )
+            await db.commit()
+
+        # 队头坏数据不影响其余事件投递
+        assert await OutboxRelay.relay_once() == 1
+        entries = await redis_client.xrange(settings.dataset_ingested_stream_key)
+        assert [fields['ingestion_job_id'] for _, fields in entries] == [job_ids[1]]
+
+        async with session_factory() as db:
+            assert (await db.execute(select(IngestionOutboxEvent))).scalars().all() == []
+            dead_letters = (
+                await db.execute(select(IngestionOutboxDeadLetter).order_by(IngestionOutboxDeadLetter.id))
+            ).scalars().all()
+            assert [dead_letter.event_id for dead_letter in dead_letters][0] == bad_event_id
+            assert dead_letters[0].payload == '{"event_'
+            assert dead_letters[0].last_error.startswith('invalid payload:')
+            assert dead_letters[1].last_error == 'invalid payload: payload is not an object: list'
+            assert dead_letters[1].attempts == 1
+        assert await OutboxRelay.relay_once() == 0
+
+    run_with_db(scenario)
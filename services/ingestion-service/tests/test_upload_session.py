@@ -0,0 +1,142 @@
+import os
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import delete
+
+from app.models.ingestion_models import IngestionJob
+from app.schemas.dataset import DatasetCreateRequest, UploadSessionCreateRequest
+from app.services.ingestion_service import IngestionService
+from app.services.upload_session_service import UploadSessionService
+from conftest import chunks_of
+
+CONTENT = b'id,name\n1,alpha\n2,beta\n'
+PART_SIZE = 8
+
+
+async def _create_session(db):
+    dataset = await IngestionService.create_dataset(db, DatasetCreateRequest(dataset_name='chat'))
+    upload_session = await UploadSessionService.create_session(
+        db,
+        dataset.dataset_id,
+        UploadSessionCreateRequest(filename='chat.csv', total_size=len(CONTENT), part_size=PART_SIZE),
+    )
+    return dataset.dataset_id, upload_session
+
+
+async def _upload(db, dataset_id: str, upload_id: str, part_number: int):
+    start = (part_number - 1) * PART_SIZE
+    return await UploadSessionService.upload_part(
+        db, dataset_id, upload_id, part_number, chunks_of(CONTENT[start : start + PART_SIZE])
+    )
+
+
+def test_resume_and_complete(run_with_db):
+    async def scenario(session_factory):
+        async with session_factory() as db:
+            dataset_id, upload_session = await _create_session(db)
+            upload_id = upload_session.upload_id
+            assert upload_session.total_parts == 3
+
+            await _upload(db, dataset_id, upload_id, 1)
+            await _upload(db, dataset_id, upload_id, 3)
+            progress = await UploadSessionService.get_session(db, dataset_id, upload_id)
+            assert progress.received_parts == [1, 3]
+            assert progress.missing_parts == [2]
+
+            with pytest.raises(HTTPException) as exc_info:
+                await UploadSessionService.complete_session(db, dataset_id, upload_id)
+            assert exc_info.value.status_code == 409
+
+            # 断点续传：补传缺失分片，并重传已上传分片
+            await _upload(db, dataset_id, upload_id, 2)
+            await _upload(db, dataset_id, upload_id, 1)
+            progress = await UploadSessionService.get_session(db, dataset_id, upload_id)
+            assert progress.missing_parts == []
+            assert progress.received_bytes == len(CONTENT)
+
+            response = await UploadSessionService.complete_session(db, dataset_id, upload_id)
+            object_path = IngestionService._object_key_to_path(response.object_key)
+            with open(object_path, 'rb') as fs:
+                assert fs.read() == CONTENT
+            assert response.file_size == len(CONTENT)
+            assert not os.path.exists(os.path.join(UploadSessionService.UPLOAD_ROOT, upload_id))
+
+            # 重复 complete 返回同一任务
+            again = await UploadSessionService.complete_session(db, dataset_id, upload_id)
+            assert again.ingestion_job_id == response.ingestion_job_id
+
+    run_with_db(scenario)
+
+
+def test_part_size_mismatch_is_rejected(run_with_db):
+    async def scenario(session_factory):
+        async with session_factory() as db:
+            dataset_id, upload_session = await _create_session(db)
+
+            with pytest.raises(HTTPException) as exc_info:
+                await UploadSessionService.upload_part(
+                    db, dataset_id, upload_session.upload_id, 1, chunks_of(b'short')
+                )
+            assert exc_info.value.status_code == 400
+            progress = await UploadSessionService.get_session(db, dataset_id, upload_session.upload_id)
+            assert progress.received_parts == []
+
+            with pytest.raises(HTTPException) as exc_info:
+                await _upload(db, dataset_id, upload_session.upload_id, 4)
+            assert exc_info.value.status_code == 400
+
+    run_with_db(scenario)
+
+
+def test_complete_without_job_is_rejected(run_with_db):
+    async def scenario(session_factory):
+        async with session_factory() as db:
+            dataset_id, upload_session = await _create_session(db)
+            upload_id = upload_session.upload_id
+            for part_number in range(1, 4):
+                await _upload(db, dataset_id, upload_id, part_number)
+            response = await UploadSessionService.complete_session(db, dataset_id, upload_id)
+            await db.execute(delete(IngestionJob).where(IngestionJob.ingestion_job_id == response.ingestion_job_id))
+            await db.commit()
+
+            with pytest.raises(HTTPException) as exc_info:
+                await UploadSessionService.complete_session(db, dataset_id, upload_id)
+            assert exc_info.value.status_code == 409
+
+            with pytest.raises(HTTPException) as exc_info:
+                await _upload(db, dataset_id, upload_id, 1)
+            assert exc_info.value.status_code == 409
+
+    run_with_db(scenario)
+
+
+def test_oversized_part_is_rejected_before_it_is_written(run_with_db):
+    pulled_chunks = []
+
+    async def endless_body():
+        while True:
+            pulled_chunks.append(PART_SIZE)
+            yield b'x' * PART_SIZE
+
+    async def scenario(session_factory):
+        async with session_factory() as db:
+            dataset_id, upload_session = await _create_session(db)
+            upload_id = upload_session.upload_id
+            await _upload(db, dataset_id, upload_id, 1)
+
+            with pytest.raises(HTTPException) as exc_info:
+                await UploadSessionService.upload_part(db, dataset_id, upload_id, 1, endless_body())
+            assert exc_info.value.status_code == 413
+            # 超出分片大小后立即停止读取请求体
+            assert len(pulled_chunks) == 2
+
+            # 半截文件已清理，之前上传的同号分片保持不变
+            upload_dir = os.path.join(UploadSessionService.UPLOAD_ROOT, upload_id)
+            assert os.listdir(upload_dir) == ['000001.part']
+            with open(os.path.join(upload_dir, '000001.part'), 'rb') as fs:
+                assert fs.read() == CONTENT[:PART_SIZE]
+            progress = await UploadSessionService.get_session(db, dataset_id, upload_id)
+            assert progress.received_parts == [1]
+
+    run_with_db(scenario)
@@ -0,0 +1,207 @@
+import logging
+import math
+import time
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from contextlib import aclosing
+from typing import Any, Dict, List
+from sqlalchemy import column, insert, table, text
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+
+class BulkLoader:
+    """
+    批量入库：PostgreSQL(asyncpg) 走 COPY，其余方言走多行 VALUES。
+    指定 conflict_key 时为 upsert：COPY 先写入临时表再 INSERT ... ON CONFLICT DO UPDATE。
+    """
+
+    # 多行 VALUES 单条语句的绑定参数上限（asyncpg/sqlite 均在 32k 左右）
+    MAX_BIND_PARAMS = 30000
+
+    @staticmethod
+    def _normalize_value(value: Any) -> Any:
+        if value is None or value == '':
+            return None
+        if isinstance(value, float) and math.isnan(value):
+            return None
+        return value
+
+    @staticmethod
+    def _is_asyncpg(conn) -> bool:
+        return conn.dialect.name == 'postgresql' and conn.dialect.driver == 'asyncpg'
+
+    @classmethod
+    async def _copy_batch(cls, conn, schema: str, table_name: str, columns: List[str], batch: List[tuple]) -> None:
+        raw_connection = await conn.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            table_name,
+            records=batch,
+            columns=columns,
+            schema_name=schema,
+        )
+
+    @staticmethod
+    def _build_update_set(columns: List[str], conflict_key: str, source: str) -> str:
+        update_columns = [c for c in columns if c != conflict_key]
+        if not update_columns:
+            return 'NOTHING'
+        return 'UPDATE SET ' + ', '.join([f'"{c}" = {source}."{c}"' for c in update_columns])
+
+    @classmethod
+    async def _copy_upsert_batch(
+        cls,
+        db: AsyncSession,
+        conn,
+        schema: str,
+        table_name: str,
+        columns: List[str],
+        batch: List[tuple],
+        conflict_key: str,
+    ) -> None:
+        stage_table = f'stage_{table_name}'
+        full_table_name = f'"{schema}"."{table_name}"'
+        columns_sql = ', '.join([f'"{c}"' for c in columns])
+        # 临时表随事务提交删除，不同会话互不可见
+        await db.execute(
+            text(f'CREATE TEMP TABLE IF NOT EXISTS "{stage_table}" (LIKE {full_table_name} INCLUDING DEFAULTS) ON COMMIT DROP')
+        )
+        raw_connection = await conn.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(stage_table, records=batch, columns=columns)
+        await db.execute(
+            text(
+                f'INSERT INTO {full_table_name} ({columns_sql}) SELECT {columns_sql} FROM "{stage_table}" '
+                f'ON CONFLICT ("{conflict_key}") DO {cls._build_update_set(columns, conflict_key, "EXCLUDED")}'
+            )
+        )
+        await db.execute(text(f'TRUNCATE "{stage_table}"'))
+
+    @classmethod
+    def _build_insert(cls, conn, target_table, values: List[Dict[str, Any]], columns: List[str], conflict_key: str | None):
+        if not conflict_key:
+            return insert(target_table).values(values)
+        if conn.dialect.name == 'postgresql':
+            stmt = postgresql_insert(target_table).values(values)
+        elif conn.dialect.name == 'sqlite':
+            stmt = sqlite_insert(target_table).values(values)
+        else:
+            raise ValueError(f'upsert not supported for dialect: {conn.dialect.name}')
+        update_columns = [c for c in columns if c != conflict_key]
+        if not update_columns:
+            return stmt.on_conflict_do_nothing(index_elements=[conflict_key])
+        return stmt.on_conflict_do_update(
+            index_elements=[conflict_key],
+            set_={c: stmt.excluded[c] for c in update_columns},
+        )
+
+    @classmethod
+    async def _insert_batch(
+        cls, db: AsyncSession, conn, target_table, columns: List[str], batch: List[tuple], conflict_key: str | None
+    ) -> None:
+        rows_per_statement = max(cls.MAX_BIND_PARAMS // max(len(columns), 1), 1)
+        for offset in range(0, len(batch), rows_per_statement):
+            values = [dict(zip(columns, record)) for record in batch[offset : offset + rows_per_statement]]
+            await db.execute(cls._build_insert(conn, target_table, values, columns, conflict_key))
+
+    @staticmethod
+    def _dedupe_batch(batch: List[tuple], key_index: int) -> List[tuple]:
+        # 同一语句内冲突键重复会导致 ON CONFLICT DO UPDATE 报错，保留最后一条；空键不会冲突，全部保留
+        keyed: Dict[Any, tuple] = {}
+        unkeyed: List[tuple] = []
+        for record in batch:
+            if record[key_index] is None:
+                unkeyed.append(record)
+            else:
+                keyed[record[key_index]] = record
+        return unkeyed + list(keyed.values())
+
+    @staticmethod
+    async def _iterate_rows(
+        rows: Iterable[Dict[str, Any]] | AsyncIterable[Dict[str, Any]],
+    ) -> AsyncIterator[Dict[str, Any]]:
+        if isinstance(rows, AsyncIterable):
+            try:
+                async for row in rows:
+                    yield row
+            finally:
+                # 入库失败时及时关闭上游异步生成器（如解析进程池的读取）
+                if hasattr(rows, 'aclose'):
+                    await rows.aclose()
+        else:
+            for row in rows:
+                yield row
+
+    @classmethod
+    async def load_rows(
+        cls,
+        db: AsyncSession,
+        schema: str,
+        table_name: str,
+        rows: Iterable[Dict[str, Any]] | AsyncIterable[Dict[str, Any]],
+        batch_size: int,
+        columns: List[str] | None = None,
+        conflict_key: str | None = None,
+    ) -> Dict[str, Any]:
+        """
+        按 batch_size 分批写入目标表，调用方负责提交事务。
+
+        :param columns: 目标列；为空时取第一行的键
+        :param conflict_key: upsert 冲突列（需有唯一索引）；为空时直接追加写入
+        :return: 写入行数（批内冲突键去重后）、去重丢弃行数与每批行数/耗时
+        """
+        batch_size = max(batch_size, 1)
+        conn = await db.connection()
+        use_copy = cls._is_asyncpg(conn)
+        target_table = None
+        batches: List[Dict[str, Any]] = []
+        processed_count = 0
+        duplicate_count = 0
+        started_at = time.perf_counter()
+
+        async def flush(batch: List[tuple]) -> None:
+            nonlocal processed_count, duplicate_count
+            batch_started_at = time.perf_counter()
+            if conflict_key:
+                if conflict_key not in columns:
+                    raise ValueError(f'conflict key not in columns: {conflict_key}')
+                deduped = cls._dedupe_batch(batch, columns.index(conflict_key))
+                duplicate_count += len(batch) - len(deduped)
+                batch = deduped
+            if use_copy and conflict_key:
+                await cls._copy_upsert_batch(db, conn, schema, table_name, columns, batch, conflict_key)
+            elif use_copy:
+                await cls._copy_batch(conn, schema, table_name, columns, batch)
+            else:
+                await cls._insert_batch(db, conn, target_table, columns, batch, conflict_key)
+            processed_count += len(batch)
+            elapsed_ms = round((time.perf_counter() - batch_started_at) * 1000, 2)
+            batches.append({'batch_no': len(batches) + 1, 'rows': len(batch), 'elapsed_ms': elapsed_ms})
+            logger.debug(f'bulk batch loaded: table={schema}.{table_name}, rows={len(batch)}, elapsed_ms={elapsed_ms}')
+
+        pending: List[tuple] = []
+        async with aclosing(cls._iterate_rows(rows)) as row_iterator:
+            async for row in row_iterator:
+                if columns is None:
+                    columns = list(row.keys())
+                if target_table is None and not use_copy:
+                    target_table = table(table_name, *[column(c) for c in columns], schema=schema)
+                pending.append(tuple(cls._normalize_value(row.get(c)) for c in columns))
+                if len(pending) >= batch_size:
+                    await flush(pending)
+                    pending = []
+        if pending:
+            await flush(pending)
+
+        elapsed_ms = round((time.perf_counter() - started_at) * 1000, 2)
+        rows_per_minute = round(processed_count / (elapsed_ms / 60000)) if elapsed_ms > 0 else processed_count
+        load_mode = 'copy' if use_copy else 'multi_values'
+        return {
+            'processed_count': processed_count,
+            'duplicate_count': duplicate_count,
+            'load_mode': f'{load_mode}_upsert' if conflict_key else load_mode,
+            'elapsed_ms': elapsed_ms,
+            'rows_per_minute': rows_per_minute,
+            'batches': batches,
+        }
@@ -0,0 +1,96 @@
+import json
+import time
+from collections import defaultdict
+from typing import Dict, List
+from redis.asyncio import Redis
+
+# KEYS[1] 为延迟队列有序集合，KEYS[2] 为目标 stream；ARGV[1] 为 stream 长度上限，其余为待释放成员。
+# 仅 ZREM 成功的成员才写回 stream，多 worker 并发释放同一成员时只有一个会投递。
+_RELEASE_DUE_SCRIPT = """
+local released = 0
+for i = 2, #ARGV do
+    local member = ARGV[i]
+    if redis.call('ZREM', KEYS[1], member) == 1 then
+        local item = cjson.decode(member)
+        redis.call('XADD', KEYS[2], 'MAXLEN', '~', ARGV[1], '*', unpack(item['fields']))
+        released = released + 1
+    end
+end
+return released
+"""
+
+
+class DelayedRetryQueue:
+    """
+    基于 Redis 有序集合的延迟重试队列，score 为到期时间（毫秒时间戳）。
+    """
+
+    def __init__(self, redis_client: Redis, zset_key: str, stream_maxlen: int = 100000) -> None:
+        self._redis = redis_client
+        self._zset_key = zset_key
+        self._stream_maxlen = stream_maxlen
+        self._release_script = redis_client.register_script(_RELEASE_DUE_SCRIPT)
+
+    @staticmethod
+    def build_member(stream_name: str, message_id: str, payload: Dict[str, str]) -> str:
+        fields = []
+        for key, value in payload.items():
+            fields.extend([key, str(value)])
+        # message_id 保证相同 payload 的多次重试不会在有序集合中合并
+        return json.dumps({'stream': stream_name, 'source_id': message_id, 'fields': fields}, ensure_ascii=False)
+
+    @staticmethod
+    def calc_due_at_ms(delay_seconds: float) -> int:
+        return int((time.time() + delay_seconds) * 1000)
+
+    async def schedule(
+        self,
+        stream_name: str,
+        message_id: str,
+        payload: Dict[str, str],
+        delay_seconds: float,
+        ack_group: str | None = None,
+    ) -> int:
+        """
+        写入延迟队列；指定 ack_group 时在同一事务内 XACK 源消息。
+
+        :return: 到期时间（毫秒时间戳）
+        """
+        due_at_ms = self.calc_due_at_ms(delay_seconds)
+        member = self.build_member(stream_name, message_id, payload)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(self._zset_key, {member: due_at_ms})
+            if ack_group:
+                pipe.xack(stream_name, ack_group, message_id)
+            await pipe.execute()
+        return due_at_ms
+
+    async def release_due(self, limit: int) -> int:
+        """
+        释放到期成员：先读取到期成员，再按目标 stream 分组执行释放脚本，
+        脚本访问的有序集合与 stream 均通过 KEYS 传入（Redis Cluster 下需用 hash tag 使二者位于同一 slot）。
+
+        :return: 实际写回 stream 的成员数
+        """
+        due: List[str] = await self._redis.zrangebyscore(
+            self._zset_key, '-inf', int(time.time() * 1000), start=0, num=limit
+        )
+        if not due:
+            return 0
+        members_by_stream: Dict[str, List[str]] = defaultdict(list)
+        for member in due:
+            if isinstance(member, bytes):
+                member = member.decode()
+            members_by_stream[json.loads(member)['stream']].append(member)
+        released = 0
+        for stream_name, members in members_by_stream.items():
+            released += int(
+                await self._release_script(
+                    keys=[self._zset_key, stream_name],
+                    args=[self._stream_maxlen, *members],
+                )
+            )
+        return released
+
+    async def size(self) -> int:
+        return await self._redis.zcard(self._zset_key)
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, List, Tuple
+from wsgiref.simple_server import WSGIServer
+from threading import Thread
+from prometheus_client import CollectorRegistry, generate_latest, start_http_server, write_to_textfile
+
+logger = logging.getLogger(__name__)
+
+
+class RateWindow:
+    """
+    滑动窗口速率：记录最近 window_seconds 内的增量，用于 rows/sec 这类无需 PromQL 即可直接读取的指标。
+    """
+
+    def __init__(self, window_seconds: float = 60) -> None:
+        self._window_seconds = window_seconds
+        self._events: deque = deque()
+
+    def add(self, amount: float) -> None:
+        self._events.append((time.monotonic(), amount))
+
+    def per_second(self) -> float:
+        cutoff = time.monotonic() - self._window_seconds
+        while self._events and self._events[0][0] < cutoff:
+            self._events.popleft()
+        return sum(amount for _, amount in self._events) / self._window_seconds
+
+
+class MetricsExporter:
+    """
+    指标导出：prometheus_client 的 HTTP /metrics 端点，或定期原子写入文件（textfile collector）。
+
+    需访问 Redis 的指标（如 stream 长度）由采集回调按间隔刷新，抓取时读取最近一次采集的值。
+    """
+
+    def __init__(self, registry: CollectorRegistry) -> None:
+        self._registry = registry
+        self._collectors: List[Callable[[], Awaitable[None]]] = []
+        self._server: Tuple[WSGIServer, Thread] | None = None
+
+    def add_collector(self, collector: Callable[[], Awaitable[None]]) -> None:
+        """
+        刷新指标前执行的采集回调，失败不影响其余指标。
+        """
+        self._collectors.append(collector)
+
+    async def collect(self) -> None:
+        for collector in self._collectors:
+            try:
+                await collector()
+            except Exception as exc:
+                logger.warning(f'metrics collector failed: {exc}')
+
+    def render(self) -> str:
+        return generate_latest(self._registry).decode('utf-8')
+
+    def start_http(self, host: str, port: int) -> None:
+        self._server = start_http_server(port, addr=host, registry=self._registry)
+        logger.info(f'metrics endpoint listening: http://{host}:{port}/metrics')
+
+    def stop(self) -> None:
+        if self._server is not None:
+            server, thread = self._server
+            server.shutdown()
+            server.server_close()
+            thread.join(timeout=5)
+            self._server = None
+
+    def _write_file(self, file_path: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+        write_to_textfile(file_path, self._registry)
+
+    async def run_collect_loop(self, interval_seconds: float, file_path: str = '') -> None:
+        while True:
+            await self.collect()
+            if file_path:
+                try:
+                    await asyncio.to_thread(self._write_file, file_path)
+                except Exception as exc:
+                    logger.warning(f'metrics file push failed: {exc}')
+            await asyncio.sleep(interval_seconds)
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import multiprocessing
+import queue
+from collections.abc import AsyncIterator
+from contextlib import aclosing
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from typing import Any, Dict, List
+from app.utils.file_process_util import FileProcessUtil
+
+logger = logging.getLogger(__name__)
+
+_CHUNK_PUT_TIMEOUT_SECONDS = 1
+_CHUNK_GET_TIMEOUT_SECONDS = 1
+
+
+def _put_until_cancelled(chunk_queue, cancel_event, item) -> bool:
+    while True:
+        try:
+            chunk_queue.put(item, timeout=_CHUNK_PUT_TIMEOUT_SECONDS)
+            return True
+        except queue.Full:
+            if cancel_event.is_set():
+                return False
+
+
+def _parse_file_to_queue(
+    file_path: str, column_mapping: Dict[str, str], chunk_size: int, chunk_queue, cancel_event
+) -> int:
+    """
+    子进程入口：逐块解析文件，将映射后的记录块（pickle 传输）写入有界队列，None 表示结束。
+    """
+    chunk_count = 0
+    for records in FileProcessUtil.iter_file_chunks(file_path, column_mapping, chunk_size):
+        if not _put_until_cancelled(chunk_queue, cancel_event, records):
+            return chunk_count
+        chunk_count += 1
+    _put_until_cancelled(chunk_queue, cancel_event, None)
+    return chunk_count
+
+
+class ParsePool:
+    """
+    文件解析进程池：pandas/openpyxl 解析在子进程执行，不阻塞 worker 事件循环。
+    """
+
+    _executor: ProcessPoolExecutor | None = None
+    _manager = None
+
+    @classmethod
+    def start(cls, max_workers: int | None) -> None:
+        if cls._executor is not None:
+            return
+        # spawn 避免子进程继承事件循环与 redis/db 连接
+        mp_context = multiprocessing.get_context('spawn')
+        cls._manager = mp_context.Manager()
+        cls._executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context)
+        logger.info(f'parse pool started: max_workers={cls._executor._max_workers}')
+
+    @classmethod
+    def is_started(cls) -> bool:
+        return cls._executor is not None
+
+    @classmethod
+    def shutdown(cls) -> None:
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=False, cancel_futures=True)
+            cls._executor = None
+        if cls._manager is not None:
+            cls._manager.shutdown()
+            cls._manager = None
+
+    @staticmethod
+    async def _get_chunk(chunk_queue, future: Future) -> Any:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                return await loop.run_in_executor(None, partial(chunk_queue.get, timeout=_CHUNK_GET_TIMEOUT_SECONDS))
+            except queue.Empty:
+                if future.done():
+                    # 子进程异常退出时抛出原始异常；正常结束时结束标记一定已入队
+                    future.result()
+                    return None
+
+    @classmethod
+    async def iter_file_chunks(
+        cls, file_path: str, column_mapping: Dict[str, str], chunk_size: int, max_pending_chunks: int
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        if cls._executor is None:
+            raise RuntimeError('parse pool not started')
+        chunk_queue = cls._manager.Queue(maxsize=max(max_pending_chunks, 1))
+        cancel_event = cls._manager.Event()
+        future = cls._executor.submit(
+            _parse_file_to_queue, file_path, column_mapping, chunk_size, chunk_queue, cancel_event
+        )
+        try:
+            while True:
+                item = await cls._get_chunk(chunk_queue, future)
+                if item is None:
+                    break
+                yield item
+            await asyncio.wrap_future(future)
+        finally:
+            # 消费方提前退出（如入库失败）时通知子进程停止
+            cancel_event.set()
+
+    @classmethod
+    async def iter_file_records(
+        cls, file_path: str, column_mapping: Dict[str, str], chunk_size: int, max_pending_chunks: int
+    ) -> AsyncIterator[Dict[str, Any]]:
+        async with aclosing(cls.iter_file_chunks(file_path, column_mapping, chunk_size, max_pending_chunks)) as chunks:
+            async for records in chunks:
+                for record in records:
+                    yield record
@@ -0,0 +1,96 @@
+import logging
+import time
+import zlib
+from typing import Any, Dict, List
+from redis.exceptions import ResponseError
+
+logger = logging.getLogger(__name__)
+
+
+def shard_index(dataset_id: str, shard_count: int) -> int:
+    # 与 ingestion-service 的路由算法保持一致（crc32 取模）
+    return zlib.crc32(dataset_id.encode('utf-8')) % shard_count
+
+
+def shard_stream_key(base_key: str, dataset_id: str, shard_count: int) -> str:
+    if shard_count <= 1:
+        return base_key
+    return f'{base_key}.{shard_index(dataset_id, shard_count)}'
+
+
+def all_shard_keys(base_key: str, shard_count: int) -> List[str]:
+    if shard_count <= 1:
+        return [base_key]
+    return [f'{base_key}.{index}' for index in range(shard_count)]
+
+
+class ShardCoordinator:
+    """
+    分片归属协调：worker 定期在 ZSET 中心跳（score 为毫秒时间戳），超时未心跳视为离开；
+    存活 worker 按名称排序后轮流分配分片，各 worker 独立计算出一致的归属，无需中心调度。
+    """
+
+    def __init__(
+        self, redis_client, members_key: str, consumer_name: str, stream_keys: List[str], member_ttl_ms: int
+    ) -> None:
+        self._redis = redis_client
+        self._members_key = members_key
+        self._consumer_name = consumer_name
+        self._stream_keys = stream_keys
+        self._member_ttl_ms = member_ttl_ms
+
+    @staticmethod
+    def assign(members: List[str], stream_keys: List[str]) -> Dict[str, List[str]]:
+        assignment: Dict[str, List[str]] = {member: [] for member in members}
+        if not members:
+            return assignment
+        ordered = sorted(members)
+        for index, stream_key in enumerate(stream_keys):
+            assignment[ordered[index % len(ordered)]].append(stream_key)
+        return assignment
+
+    async def heartbeat(self) -> List[str]:
+        """
+        上报心跳并剔除过期成员，返回本 worker 当前应消费的 stream 列表。
+        """
+        now_ms = int(time.time() * 1000)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(self._members_key, {self._consumer_name: now_ms})
+            pipe.zremrangebyscore(self._members_key, '-inf', now_ms - self._member_ttl_ms)
+            pipe.zrange(self._members_key, 0, -1)
+            _, _, members = await pipe.execute()
+        return self.assign(members, self._stream_keys).get(self._consumer_name, [])
+
+    async def members(self) -> List[str]:
+        now_ms = int(time.time() * 1000)
+        return await self._redis.zrangebyscore(self._members_key, now_ms - self._member_ttl_ms, '+inf')
+
+    async def leave(self) -> None:
+        await self._redis.zrem(self._members_key, self._consumer_name)
+
+
+async def collect_shard_lag(redis_client, stream_keys: List[str], group_name: str) -> List[Dict[str, Any]]:
+    """
+    各分片积压：stream 长度、消费组 pending 数与未读 lag（Redis 7+ 才有 lag，低版本为 None）。
+    """
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for stream_key in stream_keys:
+            pipe.xlen(stream_key)
+            pipe.xinfo_groups(stream_key)
+        results = await pipe.execute(raise_on_error=False)
+    shard_lag = []
+    for index, stream_key in enumerate(stream_keys):
+        length, groups = results[index * 2], results[index * 2 + 1]
+        if isinstance(groups, ResponseError):
+            groups = []
+        group = next((item for item in groups if item.get('name') == group_name), {})
+        shard_lag.append(
+            {
+                'stream': stream_key,
+                'length': length if isinstance(length, int) else 0,
+                'pending': group.get('pending', 0),
+                'lag': group.get('lag'),
+                'consumers': group.get('consumers', 0),
+            }
+        )
+    return shard_lag
@@ -0,0 +1,84 @@
+from datetime import datetime, timezone
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.settings import settings
+
+
+class EventLedgerService:
+    """
+    已处理事件台账：以 ingestion_job_id（缺失时为 event_id）为主键，与目标表写入在同一事务内提交。
+    """
+
+    @staticmethod
+    def _ledger_table() -> str:
+        return f'"{settings.metadata_schema}"."{settings.ledger_table}"'
+
+    @staticmethod
+    def build_ledger_key(event: dict) -> str:
+        ingestion_job_id = event.get('ingestion_job_id', '')
+        if ingestion_job_id and ingestion_job_id != '-':
+            return ingestion_job_id
+        return event.get('event_id', '')
+
+    @classmethod
+    async def ensure_table(cls, db: AsyncSession) -> None:
+        await db.execute(
+            text(
+                f"""
+                CREATE TABLE IF NOT EXISTS {cls._ledger_table()} (
+                    ledger_key VARCHAR(64) PRIMARY KEY,
+                    event_id VARCHAR(64) NOT NULL,
+                    dataset_id VARCHAR(64) NOT NULL,
+                    processed_count BIGINT NOT NULL DEFAULT 0,
+                    processed_at TIMESTAMP NOT NULL
+                )
+                """
+            )
+        )
+        await db.commit()
+
+    @classmethod
+    async def try_acquire(cls, db: AsyncSession, event: dict) -> bool:
+        """
+        写入台账占位行；已存在时返回 False。并发处理同一 job 时，后到者会等待先到者事务结束。
+        """
+        ledger_key = cls.build_ledger_key(event)
+        if not ledger_key:
+            return True
+        result = await db.execute(
+            text(
+                f"""
+                INSERT INTO {cls._ledger_table()} (ledger_key, event_id, dataset_id, processed_count, processed_at)
+                VALUES (:ledger_key, :event_id, :dataset_id, 0, :processed_at)
+                ON CONFLICT (ledger_key) DO NOTHING
+                """
+            ),
+            {
+                'ledger_key': ledger_key,
+                'event_id': event.get('event_id', ''),
+                'dataset_id': event.get('dataset_id', ''),
+                'processed_at': datetime.now(timezone.utc).replace(tzinfo=None),
+            },
+        )
+        return result.rowcount == 1
+
+    @classmethod
+    async def mark_processed(cls, db: AsyncSession, event: dict, processed_count: int) -> None:
+        ledger_key = cls.build_ledger_key(event)
+        if not ledger_key:
+            return
+        await db.execute(
+            text(
+                f"""
+                UPDATE {cls._ledger_table()}
+                SET processed_count = :processed_count,
+                    processed_at = :processed_at
+                WHERE ledger_key = :ledger_key
+                """
+            ),
+            {
+                'ledger_key': ledger_key,
+                'processed_count': processed_count,
+                'processed_at': datetime.now(timezone.utc).replace(tzinfo=None),
+            },
+        )
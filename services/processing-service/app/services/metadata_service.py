@@ -1,4 +1,5 @@
 from datetime import datetime, timezone
+from typing import Dict, List
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.settings import settings
@@ -9,53 +10,129 @@ class MetadataService:
     def _utc_now_iso() -> str:
         return datetime.now(timezone.utc).isoformat()
 
+    @staticmethod
+    def _job_table() -> str:
+        return f'"{settings.metadata_schema}"."{settings.metadata_job_table}"'
+
+    @staticmethod
+    def _dataset_table() -> str:
+        return f'"{settings.metadata_schema}"."{settings.metadata_dataset_table}"'
+
+    @staticmethod
+    async def _is_postgresql(db: AsyncSession) -> bool:
+        conn = await db.connection()
+        return conn.dialect.name == 'postgresql'
+
     @classmethod
-    async def update_job_status(
+    async def transition_status(
         cls,
         db: AsyncSession,
         ingestion_job_id: str,
+        dataset_id: str,
         status: str,
         retry_count: int | None = None,
         last_error: str | None = None,
     ) -> None:
-        update_sql = text(
-            f"""
-            UPDATE "{settings.metadata_schema}"."{settings.metadata_job_table}"
+        """
+        在同一事务内同时更新 job 与 dataset 状态；PostgreSQL 下合并为一条 CTE 语句。
+        """
+        params = {
+            'status': status,
+            'retry_count': retry_count,
+            'last_error': last_error,
+            'updated_at': datetime.fromisoformat(cls._utc_now_iso()),
+            'ingestion_job_id': ingestion_job_id,
+            'dataset_id': dataset_id,
+        }
+        job_update = f"""
+            UPDATE {cls._job_table()}
             SET status = :status,
                 retry_count = COALESCE(:retry_count, retry_count),
                 last_error = COALESCE(:last_error, last_error),
                 updated_at = :updated_at
             WHERE ingestion_job_id = :ingestion_job_id
-            """
-        )
-        await db.execute(
-            update_sql,
-            {
-                'status': status,
-                'retry_count': retry_count,
-                'last_error': last_error,
-                'updated_at': datetime.fromisoformat(cls._utc_now_iso()),
-                'ingestion_job_id': ingestion_job_id,
-            },
-        )
-        await db.commit()
-
-    @classmethod
-    async def update_dataset_status(cls, db: AsyncSession, dataset_id: str, status: str) -> None:
-        update_sql = text(
-            f"""
-            UPDATE "{settings.metadata_schema}"."{settings.metadata_dataset_table}"
+        """
+        dataset_update = f"""
+            UPDATE {cls._dataset_table()}
             SET status = :status,
                 updated_at = :updated_at
             WHERE dataset_id = :dataset_id
-            """
-        )
-        await db.execute(
-            update_sql,
-            {
-                'status': status,
-                'updated_at': datetime.fromisoformat(cls._utc_now_iso()),
-                'dataset_id': dataset_id,
-            },
-        )
+        """
+        if await cls._is_postgresql(db):
+            await db.execute(text(f'WITH job_update AS ({job_update} RETURNING 1) {dataset_update}'), params)
+        else:
+            await db.execute(text(job_update), params)
+            await db.execute(text(dataset_update), params)
+        await db.commit()
+
+    @classmethod
+    async def transition_running_batch(cls, db: AsyncSession, transitions: List[Dict]) -> None:
+        """
+        批量将多个 job 及其 dataset 置为 RUNNING，只提交一次。
+
+        :param transitions: 每项包含 ingestion_job_id、dataset_id、retry_count
+        """
+        if not transitions:
+            return
+        updated_at = datetime.fromisoformat(cls._utc_now_iso())
+        if await cls._is_postgresql(db):
+            batch_sql = text(
+                f"""
+                WITH input AS (
+                    SELECT *
+                    FROM unnest(
+                        CAST(:ingestion_job_ids AS TEXT[]),
+                        CAST(:dataset_ids AS TEXT[]),
+                        CAST(:retry_counts AS INTEGER[])
+                    ) AS t(ingestion_job_id, dataset_id, retry_count)
+                ),
+                job_update AS (
+                    UPDATE {cls._job_table()} AS job
+                    SET status = 'RUNNING',
+                        retry_count = input.retry_count,
+                        last_error = '',
+                        updated_at = :updated_at
+                    FROM input
+                    WHERE job.ingestion_job_id = input.ingestion_job_id
+                    RETURNING 1
+                )
+                UPDATE {cls._dataset_table()} AS dataset
+                SET status = 'RUNNING',
+                    updated_at = :updated_at
+                FROM (SELECT DISTINCT dataset_id FROM input) AS dataset_input
+                WHERE dataset.dataset_id = dataset_input.dataset_id
+                """
+            )
+            await db.execute(
+                batch_sql,
+                {
+                    'ingestion_job_ids': [item['ingestion_job_id'] for item in transitions],
+                    'dataset_ids': [item['dataset_id'] for item in transitions],
+                    'retry_counts': [item['retry_count'] for item in transitions],
+                    'updated_at': updated_at,
+                },
+            )
+        else:
+            job_sql = text(
+                f"""
+                UPDATE {cls._job_table()}
+                SET status = 'RUNNING', retry_count = :retry_count, last_error = '', updated_at = :updated_at
+                WHERE ingestion_job_id = :ingestion_job_id
+                """
+            )
+            dataset_sql = text(
+                f"""
+                UPDATE {cls._dataset_table()}
+                SET status = 'RUNNING', updated_at = :updated_at
+                WHERE dataset_id = :dataset_id
+                """
+            )
+            await db.execute(job_sql, [{**item, 'updated_at': updated_at} for item in transitions])
+            await db.execute(
+                dataset_sql,
+                [
+                    {'dataset_id': dataset_id, 'updated_at': updated_at}
+                    for dataset_id in {item['dataset_id'] for item in transitions}
+                ],
+            )
         await db.commit()
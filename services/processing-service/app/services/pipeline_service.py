@@ -1,8 +1,10 @@
 import logging
 import os
-from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.settings import settings
+from app.infrastructure.bulk_loader import BulkLoader
+from app.infrastructure.parse_pool import ParsePool
+from app.services.event_ledger_service import EventLedgerService
 from app.utils.file_process_util import FileProcessUtil
 
 logger = logging.getLogger(__name__)
@@ -36,39 +38,38 @@ class PipelineService:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f'raw file not found: {file_path}')
 
-        rows = FileProcessUtil.process_file(file_path, cls.DEFAULT_COLUMN_MAPPING)
-        if not rows:
-            return {'status': 'SKIPPED', 'processed_count': 0}
-
-        columns = list(rows[0].keys())
-        column_to_param = {}
-        params = []
-        for col in columns:
-            param = col.replace('.', '_').replace(' ', '_').replace('-', '_')
-            if param in column_to_param.values():
-                idx = 1
-                base = param
-                while param in column_to_param.values():
-                    param = f'{base}_{idx}'
-                    idx += 1
-            column_to_param[col] = param
-            params.append(param)
-
-        full_table_name = f'"{settings.target_schema}"."{settings.target_table}"'
-        columns_sql = ', '.join([f'"{c}"' for c in columns])
-        placeholders = ', '.join([f':{p}' for p in params])
-        sql = text(f'INSERT INTO {full_table_name} ({columns_sql}) VALUES ({placeholders})')
+        if settings.ledger_enabled and not await EventLedgerService.try_acquire(db, event):
+            await db.rollback()
+            logger.info(
+                f'processing skipped, event already processed: dataset_id={event.get("dataset_id")}, '
+                f'job_id={event.get("ingestion_job_id")}, event_id={event.get("event_id")}'
+            )
+            return {'status': 'DUPLICATE', 'processed_count': 0}
 
-        for row in rows:
-            prepared = {}
-            for col in columns:
-                value = row.get(col)
-                prepared[column_to_param[col]] = None if value in (None, '') else value
-            await db.execute(sql, prepared)
+        if ParsePool.is_started():
+            rows = ParsePool.iter_file_records(
+                file_path, cls.DEFAULT_COLUMN_MAPPING, settings.read_chunk_size, settings.parse_max_pending_chunks
+            )
+        else:
+            rows = FileProcessUtil.iter_file_records(file_path, cls.DEFAULT_COLUMN_MAPPING, settings.read_chunk_size)
+        load_result = await BulkLoader.load_rows(
+            db,
+            schema=settings.target_schema,
+            table_name=settings.target_table,
+            rows=rows,
+            batch_size=settings.load_batch_size,
+            conflict_key=settings.upsert_conflict_key or None,
+        )
+        if settings.ledger_enabled:
+            # 台账与目标表写入同一事务提交，失败回滚后重试不会被误判为已处理
+            await EventLedgerService.mark_processed(db, event, load_result['processed_count'])
         await db.commit()
+        if load_result['processed_count'] == 0:
+            return {'status': 'SKIPPED', 'processed_count': 0}
 
         logger.info(
             f'processing completed: dataset_id={event.get("dataset_id")}, '
-            f'job_id={event.get("ingestion_job_id")}, rows={len(rows)}'
+            f'job_id={event.get("ingestion_job_id")}, rows={load_result["processed_count"]}, '
+            f'mode={load_result["load_mode"]}, elapsed_ms={load_result["elapsed_ms"]}'
         )
-        return {'status': 'SUCCEEDED', 'processed_count': len(rows)}
+        return {'status': 'SUCCEEDED', **load_result}
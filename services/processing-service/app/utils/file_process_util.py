@@ -1,32 +1,104 @@
+import codecs
 import pandas as pd
+from collections.abc import Iterator
+from openpyxl import load_workbook
 from typing import Dict, Any, List
 
 
 class FileProcessUtil:
+    CSV_ENCODINGS = ('utf-8', 'gbk', 'gb2312')
+    ENCODING_PROBE_BLOCK_SIZE = 1024 * 1024
+
     @staticmethod
-    def read_file_to_dataframe(file_path: str) -> pd.DataFrame:
-        file_extension = file_path.rsplit('.', 1)[-1].lower() if '.' in file_path else ''
-        if file_extension in ['xlsx', 'xls']:
-            return pd.read_excel(file_path, engine='openpyxl' if file_extension == 'xlsx' else 'xlrd')
-        if file_extension == 'csv':
+    def _get_file_extension(file_path: str) -> str:
+        return file_path.rsplit('.', 1)[-1].lower() if '.' in file_path else ''
+
+    @classmethod
+    def _detect_csv_encoding(cls, file_path: str) -> str:
+        # 分块增量解码探测编码，避免整文件读入内存
+        for encoding in cls.CSV_ENCODINGS:
+            decoder = codecs.getincrementaldecoder(encoding)()
             try:
-                return pd.read_csv(file_path, encoding='utf-8')
+                with open(file_path, 'rb') as fs:
+                    while block := fs.read(cls.ENCODING_PROBE_BLOCK_SIZE):
+                        decoder.decode(block)
+                    decoder.decode(b'', final=True)
+                return encoding
             except UnicodeDecodeError:
-                try:
-                    return pd.read_csv(file_path, encoding='gbk')
-                except UnicodeDecodeError:
-                    return pd.read_csv(file_path, encoding='gb2312')
-        raise ValueError(f'unsupported file extension: {file_extension}')
+                continue
+        return cls.CSV_ENCODINGS[-1]
 
     @classmethod
-    def process_file(cls, file_path: str, column_mapping: Dict[str, str]) -> List[Dict[str, Any]]:
-        df = cls.read_file_to_dataframe(file_path)
+    def _iter_csv_frames(cls, file_path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+        encoding = cls._detect_csv_encoding(file_path)
+        with pd.read_csv(file_path, encoding=encoding, chunksize=chunk_size) as reader:
+            yield from reader
+
+    @staticmethod
+    def _iter_xlsx_frames(file_path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = [
+                str(name) if name is not None else f'Unnamed: {idx}' for idx, name in enumerate(header)
+            ]
+            buffer: List[tuple] = []
+            for row in rows:
+                buffer.append(row[: len(columns)] + (None,) * (len(columns) - len(row)))
+                if len(buffer) >= chunk_size:
+                    yield pd.DataFrame.from_records(buffer, columns=columns)
+                    buffer = []
+            if buffer:
+                yield pd.DataFrame.from_records(buffer, columns=columns)
+        finally:
+            workbook.close()
+
+    @classmethod
+    def _iter_xls_frames(cls, file_path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+        # xls 无流式读取能力（且单表上限 65536 行），整表读取后按块切分
+        df = pd.read_excel(file_path, engine='xlrd')
+        for offset in range(0, len(df), chunk_size):
+            yield df.iloc[offset : offset + chunk_size]
+
+    @classmethod
+    def iter_dataframe_chunks(cls, file_path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+        chunk_size = max(chunk_size, 1)
+        file_extension = cls._get_file_extension(file_path)
+        if file_extension == 'csv':
+            return cls._iter_csv_frames(file_path, chunk_size)
+        if file_extension == 'xlsx':
+            return cls._iter_xlsx_frames(file_path, chunk_size)
+        if file_extension == 'xls':
+            return cls._iter_xls_frames(file_path, chunk_size)
+        raise ValueError(f'unsupported file extension: {file_extension}')
+
+    @staticmethod
+    def _map_chunk(df: pd.DataFrame, column_mapping: Dict[str, str]) -> List[Dict[str, Any]]:
         df = df.dropna(how='all')
         if column_mapping:
-            df.rename(columns=column_mapping, inplace=True)
+            df = df.rename(columns=column_mapping)
             mapped_columns = set(column_mapping.values())
-            filtered = []
-            for row in df.to_dict('records'):
-                filtered.append({k: v for k, v in row.items() if k in mapped_columns})
-            return filtered
+            df = df[[col for col in df.columns if col in mapped_columns]]
         return df.to_dict('records')
+
+    @classmethod
+    def iter_file_chunks(
+        cls, file_path: str, column_mapping: Dict[str, str], chunk_size: int
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        逐块读取文件并完成列映射与过滤，内存占用只与 chunk_size 相关。
+        """
+        for df in cls.iter_dataframe_chunks(file_path, chunk_size):
+            records = cls._map_chunk(df, column_mapping)
+            if records:
+                yield records
+
+    @classmethod
+    def iter_file_records(
+        cls, file_path: str, column_mapping: Dict[str, str], chunk_size: int
+    ) -> Iterator[Dict[str, Any]]:
+        for records in cls.iter_file_chunks(file_path, column_mapping, chunk_size):
+            yield from records
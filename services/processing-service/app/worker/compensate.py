@@ -1,13 +1,38 @@
 import argparse
 import asyncio
 import logging
+from typing import Dict, List, Tuple
 from redis import asyncio as aioredis
 from app.core.settings import settings
+from app.infrastructure.stream_shards import shard_stream_key
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s | %(levelname)s | %(message)s')
 logger = logging.getLogger(__name__)
 
 
+def _build_replay_payload(payload: Dict[str, str]) -> Dict[str, str]:
+    payload = dict(payload)
+    payload['retry_count'] = '0'
+    payload['compensated_at'] = payload.get('compensated_at') or ''
+    return payload
+
+
+def _target_stream(payload: Dict[str, str]) -> str:
+    # 按当前分片数重新路由，分片数调整后重放的消息也会进入正确分片
+    return shard_stream_key(settings.stream_key, payload.get('dataset_id', ''), settings.stream_shard_count)
+
+
+def _match_filters(payload: Dict[str, str], event_type: str, dataset_id: str, failed_reason: str) -> bool:
+    if event_type and payload.get('event_type', '') != event_type:
+        return False
+    if dataset_id and payload.get('dataset_id', '') != dataset_id:
+        return False
+    # failed_reason 为异常文本，按子串匹配
+    if failed_reason and failed_reason not in payload.get('failed_reason', ''):
+        return False
+    return True
+
+
 async def replay_one(redis_client, message_id: str) -> bool:
     entries = await redis_client.xrange(settings.dlq_stream_key, min=message_id, max=message_id, count=1)
     if not entries:
@@ -15,25 +40,64 @@ async def replay_one(redis_client, message_id: str) -> bool:
         return False
 
     entry_id, payload = entries[0]
-    payload = dict(payload)
-    payload['retry_count'] = '0'
-    payload['compensated_at'] = payload.get('compensated_at') or ''
-    await redis_client.xadd(settings.stream_key, payload, maxlen=100000, approximate=True)
+    target_stream = _target_stream(payload)
+    await redis_client.xadd(target_stream, _build_replay_payload(payload), maxlen=100000, approximate=True)
     await redis_client.xdel(settings.dlq_stream_key, entry_id)
-    logger.info(f'dlq message replayed: {entry_id} -> {settings.stream_key}')
+    logger.info(f'dlq message replayed: {entry_id} -> {target_stream}')
     return True
 
 
-async def replay_batch(redis_client, count: int) -> int:
-    entries = await redis_client.xrange(settings.dlq_stream_key, min='-', max='+', count=count)
+async def _replay_entries(redis_client, entries: List[Tuple[str, Dict[str, str]]]) -> None:
+    # XADD 与 XDEL 放在同一个 MULTI 中一次往返提交，避免重放后未删除导致重复
+    async with redis_client.pipeline(transaction=True) as pipe:
+        for _, payload in entries:
+            pipe.xadd(_target_stream(payload), _build_replay_payload(payload), maxlen=100000, approximate=True)
+        pipe.xdel(settings.dlq_stream_key, *[entry_id for entry_id, _ in entries])
+        await pipe.execute()
+
+
+async def replay_bulk(
+    redis_client,
+    count: int,
+    event_type: str = '',
+    dataset_id: str = '',
+    failed_reason: str = '',
+    page_size: int = 1000,
+    dry_run: bool = False,
+) -> int:
+    """
+    批量重放 DLQ：按页 XRANGE 读取，过滤后每页一个 pipeline 完成全部 XADD 与 XDEL。
+
+    :param count: 最多重放的消息数
+    :param page_size: 每页读取条数，即单个 pipeline 的最大消息数
+    :param dry_run: 只统计匹配条数，不重放
+    """
     replayed = 0
-    for entry_id, payload in entries:
-        ok = await replay_one(redis_client, entry_id)
-        if ok:
-            replayed += 1
+    cursor = '-'
+    while replayed < count:
+        entries = await redis_client.xrange(settings.dlq_stream_key, min=cursor, max='+', count=page_size)
+        if not entries:
+            break
+        # 未匹配的消息保留在 DLQ 中，下一页从本页最后一条之后开始
+        cursor = f'({entries[-1][0]}'
+        matched = [
+            (entry_id, payload)
+            for entry_id, payload in entries
+            if _match_filters(payload, event_type, dataset_id, failed_reason)
+        ][: count - replayed]
+        if matched and not dry_run:
+            await _replay_entries(redis_client, matched)
+        replayed += len(matched)
+        logger.info(f'dlq replay page: scanned={len(entries)}, matched={len(matched)}, total={replayed}')
+        if len(entries) < page_size:
+            break
     return replayed
 
 
+async def replay_batch(redis_client, count: int) -> int:
+    return await replay_bulk(redis_client, count, page_size=min(count, 1000))
+
+
 async def _main(args):
     redis_client = await aioredis.from_url(settings.redis_url, encoding='utf-8', decode_responses=True)
     await redis_client.ping()
@@ -41,8 +105,16 @@ async def _main(args):
         if args.message_id:
             await replay_one(redis_client, args.message_id)
         else:
-            total = await replay_batch(redis_client, args.count)
-            logger.info(f'dlq replay done: count={total}')
+            total = await replay_bulk(
+                redis_client,
+                args.count,
+                event_type=args.event_type,
+                dataset_id=args.dataset_id,
+                failed_reason=args.failed_reason,
+                page_size=args.page_size,
+                dry_run=args.dry_run,
+            )
+            logger.info(f'dlq replay done: count={total}, dry_run={args.dry_run}')
     finally:
         await redis_client.close()
 
@@ -50,7 +122,14 @@ async def _main(args):
 def parse_args():
     parser = argparse.ArgumentParser(description='Replay messages from DLQ stream to main stream')
     parser.add_argument('--message-id', type=str, default='', help='Specific dlq stream message id to replay')
-    parser.add_argument('--count', type=int, default=10, help='Replay first N messages when message-id absent')
+    parser.add_argument('--count', type=int, default=10, help='Replay first N matched messages when message-id absent')
+    parser.add_argument('--event-type', type=str, default='', help='Only replay messages with this event_type')
+    parser.add_argument('--dataset-id', type=str, default='', help='Only replay messages of this dataset_id')
+    parser.add_argument(
+        '--failed-reason', type=str, default='', help='Only replay messages whose failed_reason contains this text'
+    )
+    parser.add_argument('--page-size', type=int, default=1000, help='Messages read and replayed per pipeline')
+    parser.add_argument('--dry-run', action='store_true', help='Only count matched messages')
     return parser.parse_args()
 
 
@@ -1,11 +1,20 @@
 import asyncio
 import logging
+import time
 from datetime import datetime, timezone
 import json
+from typing import Dict
 from redis import asyncio as aioredis
 from redis.exceptions import ResponseError
 from app.core.settings import settings
-from app.handlers.dataset_ingested_handler import handle_dataset_ingested
+from app.handlers.dataset_ingested_handler import handle_dataset_ingested, mark_dataset_ingested_running
+from app.infrastructure.delayed_retry_queue import DelayedRetryQueue
+from app.infrastructure.database import get_db
+from app.infrastructure.metrics import MetricsExporter
+from app.infrastructure.parse_pool import ParsePool
+from app.infrastructure.stream_shards import ShardCoordinator, all_shard_keys, collect_shard_lag
+from app.services.event_ledger_service import EventLedgerService
+from app.worker import metrics
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s | %(levelname)s | %(message)s')
 logger = logging.getLogger(__name__)
@@ -14,52 +23,235 @@ logger = logging.getLogger(__name__)
 class ProcessingWorker:
     def __init__(self) -> None:
         self._redis = None
+        self._retry_queue: DelayedRetryQueue | None = None
+        self._semaphore = asyncio.Semaphore(settings.worker_concurrency)
+        self._in_flight: set[asyncio.Task] = set()
+        self._dataset_tails: Dict[str, asyncio.Task] = {}
+        self._in_flight_messages: Dict[str, str] = {}
+        self._active_count = 0
+        self._reclaim_cursors: Dict[str, str] = {}
+        self._stream_keys = all_shard_keys(settings.stream_key, settings.stream_shard_count)
+        self._owned_streams: list[str] = list(self._stream_keys)
+        self._shard_coordinator: ShardCoordinator | None = None
         self._handler_map = {
             'dataset.ingested': handle_dataset_ingested,
         }
+        self._batch_prepare_map = {
+            'dataset.ingested': mark_dataset_ingested_running,
+        }
+        self._running_marked: set[str] = set()
 
     async def connect(self) -> None:
         self._redis = await aioredis.from_url(settings.redis_url, encoding='utf-8', decode_responses=True)
         await self._redis.ping()
-        logger.info(f'processing worker connected: stream={settings.stream_key}')
+        self._retry_queue = DelayedRetryQueue(self._redis, settings.retry_zset_key)
+        if len(self._stream_keys) > 1:
+            self._shard_coordinator = ShardCoordinator(
+                self._redis,
+                settings.shard_members_key,
+                settings.consumer_name,
+                self._stream_keys,
+                settings.shard_member_ttl_ms,
+            )
+        logger.info(
+            f'processing worker connected: stream={settings.stream_key}, shards={len(self._stream_keys)}, '
+            f'concurrency={settings.worker_concurrency}'
+        )
 
     async def ensure_group(self) -> None:
-        try:
-            await self._redis.xgroup_create(
-                name=settings.stream_key,
-                groupname=settings.consumer_group,
-                id='0',
-                mkstream=True,
-            )
-            logger.info(f'consumer group created: {settings.consumer_group}')
-        except ResponseError as exc:
-            # BUSYGROUP 表示已存在
-            if 'BUSYGROUP' not in str(exc):
-                raise
+        for stream_key in self._stream_keys:
+            try:
+                await self._redis.xgroup_create(
+                    name=stream_key,
+                    groupname=settings.consumer_group,
+                    id='0',
+                    mkstream=True,
+                )
+                logger.info(f'consumer group created: stream={stream_key}, group={settings.consumer_group}')
+            except ResponseError as exc:
+                # BUSYGROUP 表示已存在
+                if 'BUSYGROUP' not in str(exc):
+                    raise
+
+    async def rebalance(self) -> None:
+        if self._shard_coordinator is None:
+            return
+        owned = await self._shard_coordinator.heartbeat()
+        if owned != self._owned_streams:
+            # 让出的分片上处理中的消息照常 ACK；未完成的 pending 由新归属方 XAUTOCLAIM 接管
+            logger.info(f'shard assignment changed: consumer={settings.consumer_name}, owned={owned}')
+            self._owned_streams = owned
+
+    async def run_rebalancer(self) -> None:
+        last_lag_log = 0.0
+        while True:
+            await asyncio.sleep(settings.shard_heartbeat_interval_ms / 1000)
+            try:
+                await self.rebalance()
+                if time.monotonic() - last_lag_log >= settings.shard_lag_log_interval_seconds:
+                    last_lag_log = time.monotonic()
+                    shard_lag = await collect_shard_lag(self._redis, self._owned_streams, settings.consumer_group)
+                    for item in shard_lag:
+                        logger.info(
+                            f'shard lag: stream={item["stream"]}, length={item["length"]}, '
+                            f'pending={item["pending"]}, lag={item["lag"]}'
+                        )
+            except Exception as exc:
+                logger.exception(f'shard rebalance failed: {exc}')
+
+    async def _wait_for_capacity(self) -> None:
+        while len(self._in_flight) >= settings.worker_concurrency:
+            await asyncio.wait(self._in_flight, return_when=asyncio.FIRST_COMPLETED)
 
     async def run_once(self) -> None:
+        await self._wait_for_capacity()
+        if not self._owned_streams:
+            # worker 数多于分片数时本 worker 暂无分片，等待下次再均衡
+            await asyncio.sleep(settings.block_ms / 1000)
+            return
         messages = await self._redis.xreadgroup(
             groupname=settings.consumer_group,
             consumername=settings.consumer_name,
-            streams={settings.stream_key: '>'},
-            count=settings.batch_size,
+            streams={stream_key: '>' for stream_key in self._owned_streams},
+            count=min(settings.batch_size, settings.worker_concurrency - len(self._in_flight)),
             block=settings.block_ms,
         )
         if not messages:
             return
 
+        received_at = time.monotonic()
+        received_count = 0
+        if settings.status_batch_enabled:
+            await self._prepare_batch(messages)
         for stream_name, entries in messages:
+            for message_id, payload in entries:
+                self._dispatch(stream_name, message_id, payload, received_at)
+                received_count += 1
+        logger.info(
+            f'batch dispatched: count={received_count}, in_flight={len(self._in_flight)}, '
+            f'active={self._active_count}, concurrency={settings.worker_concurrency}'
+        )
+
+    async def _prepare_batch(self, messages: list) -> None:
+        """
+        按事件类型批量执行前置状态回写（如 RUNNING），成功的消息在处理时跳过单条回写。
+        """
+        grouped: Dict[str, list[tuple[str, dict]]] = {}
+        batch_dataset_ids = set()
+        for _, entries in messages:
             for message_id, payload in entries:
                 event_type = payload.get('event_type', '')
-                handler = self._handler_map.get(event_type)
-                try:
-                    if handler:
-                        await handler(payload)
-                    else:
-                        logger.warning(f'unknown event type: {event_type}')
-                    await self._redis.xack(stream_name, settings.consumer_group, message_id)
-                except Exception as exc:
-                    await self._handle_retry(stream_name, message_id, payload, exc)
+                dataset_id = payload.get('dataset_id', '')
+                if event_type not in self._batch_prepare_map:
+                    continue
+                # 需等待同一 dataset 前序消息的，开始处理时再单独回写，避免覆盖前序状态
+                if settings.dataset_ordering_enabled and (
+                    dataset_id in self._dataset_tails or dataset_id in batch_dataset_ids
+                ):
+                    continue
+                batch_dataset_ids.add(dataset_id)
+                grouped.setdefault(event_type, []).append((message_id, payload))
+        for event_type, items in grouped.items():
+            try:
+                await self._batch_prepare_map[event_type]([payload for _, payload in items])
+                self._running_marked.update(message_id for message_id, _ in items)
+            except Exception as exc:
+                logger.warning(f'batch status update failed, fallback to per message: event={event_type}, err={exc}')
+
+    def _dispatch(self, stream_name: str, message_id: str, payload: dict, received_at: float) -> None:
+        dataset_id = payload.get('dataset_id', '')
+        # 同一 dataset 的消息串行处理：新任务等待该 dataset 上一个任务结束
+        previous = self._dataset_tails.get(dataset_id) if settings.dataset_ordering_enabled and dataset_id else None
+        task = asyncio.create_task(
+            self._process_message(stream_name, message_id, payload, received_at, previous),
+            name=f'processing-{message_id}',
+        )
+        self._in_flight.add(task)
+        self._in_flight_messages[message_id] = stream_name
+        task.add_done_callback(self._in_flight.discard)
+        task.add_done_callback(lambda _: self._in_flight_messages.pop(message_id, None))
+        if settings.dataset_ordering_enabled and dataset_id:
+            self._dataset_tails[dataset_id] = task
+            task.add_done_callback(lambda done, key=dataset_id: self._release_dataset_tail(key, done))
+
+    def _release_dataset_tail(self, dataset_id: str, task: asyncio.Task) -> None:
+        if self._dataset_tails.get(dataset_id) is task:
+            del self._dataset_tails[dataset_id]
+
+    async def _process_message(
+        self,
+        stream_name: str,
+        message_id: str,
+        payload: dict,
+        received_at: float,
+        previous: asyncio.Task | None,
+    ) -> None:
+        if previous is not None:
+            await asyncio.wait([previous])
+        async with self._semaphore:
+            self._active_count += 1
+            local_wait_ms = round((time.monotonic() - received_at) * 1000, 2)
+            stream_wait_ms = self._calc_stream_wait_ms(message_id)
+            logger.info(
+                f'handle message start: id={message_id}, dataset_id={payload.get("dataset_id", "-")}, '
+                f'stream_wait_ms={stream_wait_ms}, local_wait_ms={local_wait_ms}, '
+                f'active={self._active_count}/{settings.worker_concurrency}, in_flight={len(self._in_flight)}'
+            )
+            try:
+                await self._handle_message(stream_name, message_id, payload)
+            except Exception as exc:
+                # 重试/DLQ 自身失败时消息保留在 pending list，仅记录日志
+                logger.exception(f'handle message aborted: id={message_id}, err={exc}')
+            finally:
+                self._active_count -= 1
+
+    async def _handle_message(self, stream_name: str, message_id: str, payload: dict) -> None:
+        event_type = payload.get('event_type', '')
+        handler = self._handler_map.get(event_type)
+        started_at = time.monotonic()
+        outcome = 'failed'
+        try:
+            result = None
+            if handler:
+                is_running_marked = message_id in self._running_marked
+                self._running_marked.discard(message_id)
+                result = await handler(payload, is_running_marked=is_running_marked)
+            else:
+                logger.warning(f'unknown event type: {event_type}')
+            await self._redis.xack(stream_name, settings.consumer_group, message_id)
+            outcome = str(result.get('status', 'SUCCEEDED')).lower() if isinstance(result, dict) else 'succeeded'
+            self._record_success(event_type, payload, result)
+        except Exception as exc:
+            await self._handle_retry(stream_name, message_id, payload, exc)
+        finally:
+            elapsed_seconds = time.monotonic() - started_at
+            metrics.HANDLER_DURATION.labels(event_type=event_type, outcome=outcome).observe(elapsed_seconds)
+            metrics.MESSAGES_TOTAL.labels(event_type=event_type, outcome=outcome).inc()
+
+    @staticmethod
+    def _record_success(event_type: str, payload: dict, result: dict | None) -> None:
+        processed_count = int(result.get('processed_count', 0)) if isinstance(result, dict) else 0
+        if processed_count:
+            metrics.ROWS_TOTAL.labels(event_type=event_type).inc(processed_count)
+            metrics.rows_window.add(processed_count)
+        occurred_at = payload.get('occurred_at', '')
+        if occurred_at:
+            try:
+                occurred = datetime.fromisoformat(occurred_at)
+            except ValueError:
+                return
+            if occurred.tzinfo is None:
+                occurred = occurred.replace(tzinfo=timezone.utc)
+            latency_seconds = (datetime.now(timezone.utc) - occurred).total_seconds()
+            metrics.END_TO_END_LATENCY.labels(event_type=event_type).observe(max(latency_seconds, 0))
+
+    @staticmethod
+    def _calc_stream_wait_ms(message_id: str) -> int | None:
+        # stream 消息 ID 前缀为写入时的毫秒时间戳
+        try:
+            return max(int(time.time() * 1000) - int(message_id.split('-', 1)[0]), 0)
+        except ValueError:
+            return None
 
     @staticmethod
     def _calc_backoff_seconds(retry_count: int) -> int:
@@ -77,25 +269,32 @@ class ProcessingWorker:
                 f'handle message failed, retrying: id={message_id}, '
                 f'retry={next_retry}/{settings.max_retry_count}, backoff={backoff_seconds}s, err={exc}'
             )
-            await asyncio.sleep(backoff_seconds)
             retry_payload = dict(payload)
             retry_payload['retry_count'] = str(next_retry)
             retry_payload['status'] = 'PENDING'
             retry_payload['retried_at'] = datetime.now(timezone.utc).isoformat()
-            await self._redis.xadd(stream_name, retry_payload, maxlen=100000, approximate=True)
-            await self._redis.xack(stream_name, settings.consumer_group, message_id)
+            metrics.RETRIES_TOTAL.labels(event_type=payload.get('event_type', '')).inc()
+            # 写入延迟队列后立即 ACK，由调度协程到期后重新投递，不阻塞消费循环
+            await self._retry_queue.schedule(
+                stream_name, message_id, retry_payload, backoff_seconds, ack_group=settings.consumer_group
+            )
             return
 
         logger.error(
             f'message exceeded max retry: id={message_id}, '
             f'retry={current_retry}, max={settings.max_retry_count}, err={exc}'
         )
+        await self._move_to_dlq(stream_name, message_id, payload, str(exc), current_retry)
+
+    async def _move_to_dlq(
+        self, stream_name: str, message_id: str, payload: dict, failed_reason: str, retry_count: int
+    ) -> None:
         dlq_payload = dict(payload)
         dlq_payload['failed_at'] = datetime.now(timezone.utc).isoformat()
-        dlq_payload['failed_reason'] = str(exc)
+        dlq_payload['failed_reason'] = failed_reason
         dlq_payload['failed_message_id'] = message_id
         dlq_payload['failed_stream'] = stream_name
-        dlq_payload['retry_count'] = str(current_retry)
+        dlq_payload['retry_count'] = str(retry_count)
         dlq_payload['dlq_metadata'] = json.dumps(
             {
                 'max_retry_count': settings.max_retry_count,
@@ -105,16 +304,230 @@ class ProcessingWorker:
             ensure_ascii=False,
         )
         await self._redis.xadd(settings.dlq_stream_key, dlq_payload, maxlen=100000, approximate=True)
+        metrics.DLQ_TOTAL.labels(
+            event_type=payload.get('event_type', ''),
+            reason='max_deliveries' if failed_reason.startswith('exceeded max deliveries') else 'max_retry',
+        ).inc()
         logger.error(
             f'message moved to dlq: source={stream_name}, source_id={message_id}, dlq={settings.dlq_stream_key}'
         )
         await self._redis.xack(stream_name, settings.consumer_group, message_id)
 
+    async def run_retry_scheduler(self) -> None:
+        while True:
+            try:
+                released = await self._retry_queue.release_due(settings.retry_release_batch_size)
+                if released:
+                    logger.info(f'delayed retries released: count={released}')
+                    # 本轮满批时说明可能仍有到期消息，立即继续
+                    if released >= settings.retry_release_batch_size:
+                        continue
+            except Exception as exc:
+                logger.exception(f'release delayed retries failed: {exc}')
+            await asyncio.sleep(settings.retry_poll_interval_ms / 1000)
+
+    async def _refresh_in_flight_idle(self) -> None:
+        # 处理中的消息定期 XCLAIM 给自己以重置 idle，避免长任务被其他 consumer 误回收
+        by_stream: Dict[str, list[str]] = {}
+        for message_id, stream_key in self._in_flight_messages.items():
+            if stream_key in self._stream_keys:
+                by_stream.setdefault(stream_key, []).append(message_id)
+        for stream_key, message_ids in by_stream.items():
+            await self._redis.xclaim(
+                stream_key,
+                settings.consumer_group,
+                settings.consumer_name,
+                min_idle_time=0,
+                message_ids=message_ids,
+                justid=True,
+            )
+
+    async def _get_delivery_counts(self, stream_key: str, message_ids: list[str]) -> Dict[str, int]:
+        if not message_ids:
+            return {}
+        pending = await self._redis.xpending_range(
+            stream_key,
+            settings.consumer_group,
+            min=min(message_ids, key=self._stream_id_key),
+            max=max(message_ids, key=self._stream_id_key),
+            count=len(message_ids),
+            consumername=settings.consumer_name,
+        )
+        return {item['message_id']: item['times_delivered'] for item in pending}
+
+    @staticmethod
+    def _stream_id_key(message_id: str) -> tuple[int, int]:
+        ms_part, _, seq_part = message_id.partition('-')
+        return int(ms_part), int(seq_part or 0)
+
+    async def _dispatch_reclaimed(self, stream_key: str, entries: list, source: str) -> int:
+        entries = [(mid, payload) for mid, payload in entries if mid and mid not in self._in_flight_messages]
+        if not entries:
+            return 0
+        delivery_counts = await self._get_delivery_counts(stream_key, [mid for mid, _ in entries])
+        received_at = time.monotonic()
+        dispatched = 0
+        for message_id, payload in entries:
+            if not payload:
+                # 消息已被 trim/删除，仅清理 pending 记录
+                await self._redis.xack(stream_key, settings.consumer_group, message_id)
+                continue
+            deliveries = delivery_counts.get(message_id, 0)
+            if deliveries > settings.reclaim_max_deliveries:
+                await self._move_to_dlq(
+                    stream_key,
+                    message_id,
+                    payload,
+                    f'exceeded max deliveries: {deliveries}',
+                    int(payload.get('retry_count', '0')),
+                )
+                continue
+            logger.warning(
+                f'pending message reclaimed: stream={stream_key}, id={message_id}, source={source}, '
+                f'deliveries={deliveries}'
+            )
+            self._dispatch(stream_key, message_id, payload, received_at)
+            dispatched += 1
+        return dispatched
+
+    async def recover_own_pending(self) -> int:
+        """
+        启动时接管本 consumer 名下的 pending 消息（consumer 名固定时，重启后可立即恢复）。
+        """
+        recovered = 0
+        for stream_key in self._stream_keys:
+            pending = await self._redis.xpending_range(
+                stream_key,
+                settings.consumer_group,
+                min='-',
+                max='+',
+                count=settings.reclaim_batch_size,
+                consumername=settings.consumer_name,
+            )
+            message_ids = [item['message_id'] for item in pending]
+            if not message_ids:
+                continue
+            entries = await self._redis.xclaim(
+                stream_key,
+                settings.consumer_group,
+                settings.consumer_name,
+                min_idle_time=0,
+                message_ids=message_ids,
+            )
+            recovered += await self._dispatch_reclaimed(stream_key, entries, source='own')
+        return recovered
+
+    async def reclaim_once(self) -> int:
+        await self._refresh_in_flight_idle()
+        reclaimed = 0
+        # 只回收自己负责的分片，离开的 worker 遗留的 pending 由分片新归属方接管
+        for stream_key in list(self._owned_streams):
+            await self._wait_for_capacity()
+            response = await self._redis.xautoclaim(
+                stream_key,
+                settings.consumer_group,
+                settings.consumer_name,
+                min_idle_time=settings.reclaim_min_idle_ms,
+                start_id=self._reclaim_cursors.get(stream_key, '0-0'),
+                count=max(settings.worker_concurrency - len(self._in_flight), 1),
+            )
+            # Redis 7 起额外返回已删除的消息 ID；游标回到 0-0 表示 PEL 已扫描一轮
+            next_id, entries = response[0], response[1]
+            deleted_ids = response[2] if len(response) > 2 else []
+            self._reclaim_cursors[stream_key] = next_id
+            if deleted_ids:
+                logger.warning(
+                    f'pending entries already deleted from stream: stream={stream_key}, count={len(deleted_ids)}'
+                )
+            reclaimed += await self._dispatch_reclaimed(stream_key, entries, source='xautoclaim')
+        return reclaimed
+
+    async def cleanup_dead_consumers(self) -> int:
+        removed = 0
+        for stream_key in self._stream_keys:
+            consumers = await self._redis.xinfo_consumers(stream_key, settings.consumer_group)
+            for consumer in consumers:
+                if consumer['name'] == settings.consumer_name:
+                    continue
+                # 仅删除无 pending 且长时间无交互的 consumer，其 pending 消息会先被 XAUTOCLAIM 接管
+                if consumer['pending'] == 0 and consumer['idle'] >= settings.consumer_dead_idle_ms:
+                    await self._redis.xgroup_delconsumer(stream_key, settings.consumer_group, consumer['name'])
+                    logger.info(
+                        f'dead consumer removed: stream={stream_key}, name={consumer["name"]}, '
+                        f'idle_ms={consumer["idle"]}'
+                    )
+                    removed += 1
+        return removed
+
+    async def run_reclaimer(self) -> None:
+        while True:
+            await asyncio.sleep(settings.reclaim_interval_ms / 1000)
+            try:
+                reclaimed = await self.reclaim_once()
+                if reclaimed:
+                    logger.info(f'pending messages reclaimed: count={reclaimed}, in_flight={len(self._in_flight)}')
+                await self.cleanup_dead_consumers()
+            except Exception as exc:
+                logger.exception(f'reclaim pending messages failed: {exc}')
+
+    async def collect_stream_metrics(self) -> None:
+        shard_lag = await collect_shard_lag(
+            self._redis, [*self._stream_keys, settings.dlq_stream_key], settings.consumer_group
+        )
+        for item in shard_lag:
+            metrics.STREAM_LENGTH.labels(stream=item['stream']).set(item['length'])
+            if item['stream'] == settings.dlq_stream_key:
+                continue
+            metrics.STREAM_PENDING.labels(stream=item['stream'], group=settings.consumer_group).set(item['pending'])
+            if item['lag'] is not None:
+                metrics.STREAM_LAG.labels(stream=item['stream'], group=settings.consumer_group).set(item['lag'])
+        metrics.RETRY_QUEUE_SIZE.set(await self._retry_queue.size())
+        metrics.ROWS_PER_SECOND.set(round(metrics.rows_window.per_second(), 2))
+
+    async def _start_metrics(self, background_tasks: list[asyncio.Task]) -> MetricsExporter:
+        exporter = MetricsExporter(metrics.registry)
+        exporter.add_collector(self.collect_stream_metrics)
+        if settings.metrics_port:
+            exporter.start_http(settings.metrics_host, settings.metrics_port)
+        if settings.metrics_port or settings.metrics_file:
+            background_tasks.append(
+                asyncio.create_task(
+                    exporter.run_collect_loop(settings.metrics_collect_interval_seconds, settings.metrics_file),
+                    name='processing-metrics-collect',
+                )
+            )
+        return exporter
+
     async def run_forever(self) -> None:
+        if settings.parse_pool_enabled:
+            ParsePool.start(settings.parse_pool_size)
         await self.connect()
         await self.ensure_group()
-        while True:
-            await self.run_once()
+        await self.rebalance()
+        if settings.ledger_enabled:
+            async for db in get_db():
+                await EventLedgerService.ensure_table(db)
+        recovered = await self.recover_own_pending()
+        if recovered:
+            logger.info(f'own pending messages recovered: count={recovered}')
+        background_tasks = [
+            asyncio.create_task(self.run_retry_scheduler(), name='processing-retry-scheduler'),
+            asyncio.create_task(self.run_reclaimer(), name='processing-reclaimer'),
+        ]
+        if self._shard_coordinator is not None:
+            background_tasks.append(asyncio.create_task(self.run_rebalancer(), name='processing-rebalancer'))
+        exporter = await self._start_metrics(background_tasks)
+        try:
+            while True:
+                await self.run_once()
+        finally:
+            for task in background_tasks:
+                task.cancel()
+            exporter.stop()
+            if self._shard_coordinator is not None:
+                # 主动退出，其他 worker 下次心跳即可接管分片
+                await self._shard_coordinator.leave()
+            ParsePool.shutdown()
 
 
 async def _main() -> None:
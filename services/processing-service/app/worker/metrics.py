@@ -0,0 +1,48 @@
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+from app.infrastructure.metrics import RateWindow
+
+DEFAULT_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+registry = CollectorRegistry()
+
+STREAM_LENGTH = Gauge('processing_stream_length', 'Entries in the stream', ('stream',), registry=registry)
+STREAM_PENDING = Gauge(
+    'processing_stream_pending',
+    'Delivered but unacknowledged entries per group',
+    ('stream', 'group'),
+    registry=registry,
+)
+STREAM_LAG = Gauge(
+    'processing_stream_lag',
+    'Entries not yet delivered to the group (Redis 7+)',
+    ('stream', 'group'),
+    registry=registry,
+)
+RETRY_QUEUE_SIZE = Gauge(
+    'processing_retry_queue_size', 'Messages waiting in the delayed retry queue', registry=registry
+)
+HANDLER_DURATION = Histogram(
+    'processing_handler_duration_seconds',
+    'Handler latency per message',
+    ('event_type', 'outcome'),
+    buckets=DEFAULT_LATENCY_BUCKETS,
+    registry=registry,
+)
+END_TO_END_LATENCY = Histogram(
+    'processing_end_to_end_latency_seconds',
+    'Latency from event occurred_at to successful handling (ingested_to_succeeded_latency)',
+    ('event_type',),
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600),
+    registry=registry,
+)
+MESSAGES_TOTAL = Counter(
+    'processing_messages_total', 'Handled messages by outcome', ('event_type', 'outcome'), registry=registry
+)
+ROWS_TOTAL = Counter('processing_rows_total', 'Rows loaded into the target table', ('event_type',), registry=registry)
+ROWS_PER_SECOND = Gauge('processing_rows_per_second', 'Rows loaded per second over the last 60s', registry=registry)
+RETRIES_TOTAL = Counter('processing_retries_total', 'Messages scheduled for retry', ('event_type',), registry=registry)
+DLQ_TOTAL = Counter(
+    'processing_dlq_total', 'Messages moved to the dead letter queue', ('event_type', 'reason'), registry=registry
+)
+
+rows_window = RateWindow(window_seconds=60)
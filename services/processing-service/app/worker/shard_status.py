@@ -0,0 +1,26 @@
+import asyncio
+import json
+from redis import asyncio as aioredis
+from app.core.settings import settings
+from app.infrastructure.stream_shards import ShardCoordinator, all_shard_keys, collect_shard_lag
+
+
+async def _main() -> None:
+    redis_client = await aioredis.from_url(settings.redis_url, encoding='utf-8', decode_responses=True)
+    try:
+        stream_keys = all_shard_keys(settings.stream_key, settings.stream_shard_count)
+        coordinator = ShardCoordinator(
+            redis_client, settings.shard_members_key, '', stream_keys, settings.shard_member_ttl_ms
+        )
+        assignment = ShardCoordinator.assign(await coordinator.members(), stream_keys)
+        owners = {stream_key: member for member, owned in assignment.items() for stream_key in owned}
+        shard_lag = await collect_shard_lag(redis_client, stream_keys, settings.consumer_group)
+        for item in shard_lag:
+            item['owner'] = owners.get(item['stream'])
+        print(json.dumps(shard_lag, ensure_ascii=False, indent=2))
+    finally:
+        await redis_client.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(_main())
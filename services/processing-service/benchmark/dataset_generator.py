@@ -0,0 +1,110 @@
+import argparse
+import csv
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List
+from openpyxl import Workbook
+
+# 小/中/大三档：单文件行数与文件数
+TIERS: Dict[str, Dict[str, int]] = {
+    'small': {'rows': 1000, 'files': 20},
+    'medium': {'rows': 50000, 'files': 10},
+    'large': {'rows': 500000, 'files': 4},
+}
+
+_SCENES = ['商品详情页', '订单详情页', '店铺首页', '直播间', '售后入口']
+_END_SCENES = ['用户主动结束', '客服结束', '超时自动结束', '转接结束']
+_EVALS = ['非常满意', '满意', '一般', '不满意', '未评价']
+_SESSION_TYPES = ['机器人', '转人工', '直接人工']
+_AGENTS = [f'客服{index:02d}' for index in range(1, 31)]
+
+
+def get_headers() -> List[str]:
+    # 延迟导入：run_benchmark 需先写入 PROCESSING_* 环境变量，再加载 app.core.settings
+    from app.services.pipeline_service import PipelineService
+
+    return list(PipelineService.DEFAULT_COLUMN_MAPPING.keys())
+
+
+def _iter_rows(rows: int, seed: int) -> Iterator[List]:
+    """
+    生成抖店会话明细行，列顺序与 DEFAULT_COLUMN_MAPPING 一致；固定 seed 保证同一档位每次生成的数据相同。
+    """
+    rng = random.Random(seed)
+    base_time = datetime(2024, 1, 1)
+    for index in range(rows):
+        session_time = base_time + timedelta(seconds=rng.randint(0, 90 * 86400))
+        session_type = rng.choice(_SESSION_TYPES)
+        is_manual = session_type != '机器人'
+        yield [
+            f'S{seed:06d}{index:09d}',
+            session_time.strftime('%Y-%m-%d %H:%M:%S'),
+            f'用户{rng.randint(1, 500000):06d}',
+            rng.choice(_SCENES),
+            rng.choice(_END_SCENES),
+            rng.choice(_EVALS),
+            session_type,
+            (session_time + timedelta(seconds=rng.randint(1, 120))).strftime('%Y-%m-%d %H:%M:%S') if is_manual else '',
+            rng.choice(_AGENTS) if is_manual else '',
+            rng.randint(1, 180) if is_manual else '',
+            rng.randint(5, 300) if is_manual else '',
+            rng.randint(30, 3600) if is_manual else '',
+            f'{rng.choice(_AGENTS)}->{rng.choice(_AGENTS)}' if is_manual and rng.random() < 0.1 else '',
+        ]
+
+
+def write_csv(file_path: str, rows: int, seed: int) -> None:
+    with open(file_path, 'w', encoding='utf-8', newline='') as fs:
+        writer = csv.writer(fs)
+        writer.writerow(get_headers())
+        writer.writerows(_iter_rows(rows, seed))
+
+
+def write_xlsx(file_path: str, rows: int, seed: int) -> None:
+    # write_only 模式逐行写出，大档位也不会把整表放进内存
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(get_headers())
+    for row in _iter_rows(rows, seed):
+        sheet.append([value if value != '' else None for value in row])
+    workbook.save(file_path)
+
+
+def generate_files(output_dir: str, tier: str, file_format: str, rows: int, files: int) -> List[str]:
+    """
+    生成（或复用已生成的）压测文件，返回文件路径列表。
+
+    :param rows: 单文件行数
+    :param files: 文件数；每个文件使用不同 seed，session_id 不重复
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    writer = write_xlsx if file_format == 'xlsx' else write_csv
+    file_paths = []
+    for index in range(files):
+        file_path = os.path.join(output_dir, f'{tier}_{rows}_{index:03d}.{file_format}')
+        if not os.path.exists(file_path):
+            temp_path = f'{file_path}.tmp'
+            writer(temp_path, rows, seed=index + 1)
+            os.replace(temp_path, file_path)
+        file_paths.append(file_path)
+    return file_paths
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Generate synthetic chat session files for benchmarks')
+    parser.add_argument('--tier', choices=sorted(TIERS), default='small')
+    parser.add_argument('--format', dest='file_format', choices=['csv', 'xlsx'], default='csv')
+    parser.add_argument('--rows', type=int, default=0, help='Rows per file, overrides the tier default')
+    parser.add_argument('--files', type=int, default=0, help='Number of files, overrides the tier default')
+    parser.add_argument('--output-dir', type=str, default='benchmark/work/files')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    tier = TIERS[args.tier]
+    for path in generate_files(
+        args.output_dir, args.tier, args.file_format, args.rows or tier['rows'], args.files or tier['files']
+    ):
+        print(path)
@@ -0,0 +1,603 @@
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+from uuid import uuid4
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s | %(levelname)s | %(message)s')
+logger = logging.getLogger('benchmark')
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_WORK_DIR = os.path.join(BENCHMARK_DIR, 'work')
+DEFAULT_RESULTS_DIR = os.path.join(BENCHMARK_DIR, 'results')
+
+# 与 docs/ops/processing-performance-baseline.md 第 3 节阈值一致
+THRESHOLDS = {
+    'rows_per_minute': 10000,
+    'p95_latency_ms': 120000,
+    'failure_rate': 0.01,
+    'retry_rate': 0.05,
+}
+
+NUMERIC_COLUMNS = ('first_reply_time', 'average_reply_time', 'service_time')
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _sqlite_schema_path(work_dir: str, schema: str) -> str:
+    return os.path.join(work_dir, f'{schema}.db')
+
+
+def configure_environment(args, run_id: str) -> None:
+    """
+    app.core.settings 在导入时读取环境变量，必须在导入任何 app 模块前调用；worker 子进程（spawn）继承同一环境。
+    """
+    os.environ['PROCESSING_REDIS_URL'] = args.redis_url
+    os.environ['PROCESSING_DB_URL'] = args.db_url
+    os.environ['PROCESSING_DATA_LAKE_ROOT'] = os.path.join(args.work_dir, 'data-lake')
+    os.environ['PROCESSING_METADATA_SCHEMA'] = f'{args.schema_prefix}ingestion'
+    os.environ['PROCESSING_TARGET_SCHEMA'] = f'{args.schema_prefix}ods'
+    os.environ['PROCESSING_STREAM_SHARD_COUNT'] = str(args.shards)
+    # 每次运行使用独立的 Redis key，互不干扰，也不影响同一 Redis 上的正式消费组
+    os.environ['PROCESSING_STREAM_KEY'] = f'benchmark.{run_id}.events'
+    os.environ['PROCESSING_DLQ_STREAM_KEY'] = f'benchmark.{run_id}.events.dlq'
+    os.environ['PROCESSING_RETRY_ZSET_KEY'] = f'benchmark.{run_id}.events.retry'
+    os.environ['PROCESSING_SHARD_MEMBERS_KEY'] = f'benchmark.{run_id}.events.workers'
+    os.environ['PROCESSING_CONSUMER_GROUP'] = 'benchmark-group'
+    os.environ['PROCESSING_METRICS_PORT'] = '0'
+    os.environ.setdefault('PROCESSING_BLOCK_MS', '1000')
+    os.environ.setdefault('PROCESSING_SHARD_HEARTBEAT_INTERVAL_MS', '1000')
+
+
+def install_sqlite_schemas(engine, work_dir: str, schemas: List[str]) -> None:
+    """
+    SQLite 没有 schema，按 schema 名 ATTACH 独立库文件，使 "schema"."table" 的 SQL 原样可用。
+    """
+    from sqlalchemy import event
+
+    def on_connect(dbapi_connection, _) -> None:
+        cursor = dbapi_connection.cursor()
+        # 多个 worker 进程并发写入时等待锁，而不是直接报 database is locked
+        cursor.execute('PRAGMA busy_timeout = 60000')
+        for schema in schemas:
+            cursor.execute(f'ATTACH DATABASE \'{_sqlite_schema_path(work_dir, schema)}\' AS "{schema}"')
+        cursor.close()
+
+    event.listen(engine.sync_engine, 'connect', on_connect)
+
+
+def _peak_rss_mb(who: int) -> float:
+    # Linux 下 ru_maxrss 单位为 KB，macOS 下为字节
+    peak = resource.getrusage(who).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+async def _run_worker(stop_event, work_dir: str, schemas: List[str]) -> None:
+    from app.infrastructure.database import engine
+    from app.worker.main import ProcessingWorker
+
+    if engine.dialect.name == 'sqlite':
+        install_sqlite_schemas(engine, work_dir, schemas)
+    worker = ProcessingWorker()
+    task = asyncio.create_task(worker.run_forever())
+    while not stop_event.is_set() and not task.done():
+        await asyncio.sleep(0.2)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    await engine.dispose()
+
+
+def worker_process(index: int, stop_event, result_queue, work_dir: str, schemas: List[str], log_level: str) -> None:
+    os.environ['PROCESSING_CONSUMER_NAME'] = f'benchmark-worker-{index}'
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s | %(levelname)s | %(message)s')
+    logging.getLogger().setLevel(log_level)
+    asyncio.run(_run_worker(stop_event, work_dir, schemas))
+    # 解析进程池以 wait=False 关闭，等待其子进程退出后 RUSAGE_CHILDREN 才包含它们的峰值
+    for child in multiprocessing.active_children():
+        child.join(10)
+    result_queue.put(
+        {
+            'worker': index,
+            'peak_rss_mb': _peak_rss_mb(resource.RUSAGE_SELF),
+            # 解析进程池（ParsePool）子进程的峰值
+            'children_peak_rss_mb': _peak_rss_mb(resource.RUSAGE_CHILDREN),
+        }
+    )
+
+
+class BenchmarkRunner:
+    def __init__(self, args, run_id: str) -> None:
+        from app.core.settings import settings
+        from app.infrastructure.database import engine, session_local
+
+        self._args = args
+        self._run_id = run_id
+        self._settings = settings
+        self._engine = engine
+        self._session_local = session_local
+        self._schemas = [settings.metadata_schema, settings.target_schema]
+        self._redis = None
+        self._jobs: List[Dict[str, Any]] = []
+        self._files: List[str] = []
+        self._started_at: datetime | None = None
+        self._finished_at: datetime | None = None
+
+    @property
+    def schemas(self) -> List[str]:
+        return self._schemas
+
+    @property
+    def _is_sqlite(self) -> bool:
+        return self._engine.dialect.name == 'sqlite'
+
+    def generate_files(self) -> None:
+        from benchmark.dataset_generator import TIERS, generate_files
+
+        tier = TIERS[self._args.tier]
+        relative_dir = os.path.join('benchmark', f'{self._args.tier}_{self._args.file_format}')
+        self._files = generate_files(
+            os.path.join(self._settings.data_lake_root, 'raw', relative_dir),
+            self._args.tier,
+            self._args.file_format,
+            self._args.rows or tier['rows'],
+            self._args.files or tier['files'],
+        )
+        self._object_prefix = f'raw/{relative_dir}'
+        logger.info(f'benchmark files ready: count={len(self._files)}, dir={os.path.dirname(self._files[0])}')
+
+    async def prepare_database(self) -> None:
+        """
+        重建压测用的元数据表与目标表；只操作带 schema_prefix 的 schema，不会触碰正式表。
+        """
+        from sqlalchemy import text
+
+        if self._is_sqlite:
+            for schema in self._schemas:
+                for suffix in ('', '-wal', '-shm'):
+                    path = _sqlite_schema_path(self._args.work_dir, schema) + suffix
+                    if os.path.exists(path):
+                        os.remove(path)
+            install_sqlite_schemas(self._engine, self._args.work_dir, self._schemas)
+
+        meta_schema, target_schema = self._schemas
+        target_columns = []
+        for column_name in self._target_column_names():
+            column_type = 'DOUBLE PRECISION' if column_name in NUMERIC_COLUMNS else 'TEXT'
+            target_columns.append(f'"{column_name}" {column_type}')
+        statements = [
+            f'DROP TABLE IF EXISTS "{meta_schema}"."{self._settings.metadata_dataset_table}"',
+            f'DROP TABLE IF EXISTS "{meta_schema}"."{self._settings.metadata_job_table}"',
+            f'DROP TABLE IF EXISTS "{meta_schema}"."{self._settings.ledger_table}"',
+            f'DROP TABLE IF EXISTS "{target_schema}"."{self._settings.target_table}"',
+            f"""
+            CREATE TABLE "{meta_schema}"."{self._settings.metadata_dataset_table}" (
+                dataset_id VARCHAR(64) PRIMARY KEY,
+                status VARCHAR(32) NOT NULL,
+                updated_at TIMESTAMP NOT NULL
+            )
+            """,
+            f"""
+            CREATE TABLE "{meta_schema}"."{self._settings.metadata_job_table}" (
+                ingestion_job_id VARCHAR(64) PRIMARY KEY,
+                dataset_id VARCHAR(64) NOT NULL,
+                status VARCHAR(32) NOT NULL,
+                retry_count INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT NOT NULL DEFAULT '',
+                created_at TIMESTAMP NOT NULL,
+                updated_at TIMESTAMP NOT NULL
+            )
+            """,
+            f'CREATE TABLE "{target_schema}"."{self._settings.target_table}" ({", ".join(target_columns)})',
+        ]
+        if self._settings.upsert_conflict_key:
+            statements.append(
+                f'CREATE UNIQUE INDEX "uk_{self._settings.target_table}_{self._settings.upsert_conflict_key}" '
+                f'ON "{target_schema}"."{self._settings.target_table}" ("{self._settings.upsert_conflict_key}")'
+            )
+        async with self._engine.begin() as conn:
+            if self._is_sqlite:
+                for schema in self._schemas:
+                    await conn.execute(text(f'PRAGMA "{schema}".journal_mode = WAL'))
+            else:
+                for schema in self._schemas:
+                    await conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{schema}"'))
+            for statement in statements:
+                await conn.execute(text(statement))
+        # 连接池绑定当前事件循环，压测主流程在新的事件循环中运行
+        await self._engine.dispose()
+        logger.info(f'benchmark tables ready: dialect={self._engine.dialect.name}, schemas={self._schemas}')
+
+    @staticmethod
+    def _target_column_names() -> List[str]:
+        from app.services.pipeline_service import PipelineService
+
+        return list(PipelineService.DEFAULT_COLUMN_MAPPING.values())
+
+    async def connect_redis(self) -> None:
+        from redis import asyncio as aioredis
+
+        self._redis = await aioredis.from_url(self._settings.redis_url, encoding='utf-8', decode_responses=True)
+        await self._redis.ping()
+
+    async def wait_workers_ready(self, workers: int, timeout_seconds: float = 120) -> None:
+        """
+        等待 worker 完成启动（解析进程池、建组）并开始 XREADGROUP，避免把启动耗时计入延迟。
+        """
+        from redis.exceptions import ResponseError
+        from app.infrastructure.stream_shards import all_shard_keys
+
+        stream_keys = all_shard_keys(self._settings.stream_key, self._settings.stream_shard_count)
+        # 分片时每个 worker 只读取分到的分片，分片数少于 worker 数时部分 worker 空闲
+        expected = workers if len(stream_keys) == 1 else min(workers, len(stream_keys))
+        deadline = time.monotonic() + timeout_seconds
+        while time.monotonic() < deadline:
+            consumers = set()
+            for stream_key in stream_keys:
+                try:
+                    items = await self._redis.xinfo_consumers(stream_key, self._settings.consumer_group)
+                except ResponseError:
+                    continue
+                consumers.update(item['name'] for item in items)
+            if len(consumers) >= expected:
+                logger.info(f'benchmark workers ready: consumers={len(consumers)}')
+                return
+            await asyncio.sleep(0.5)
+        raise TimeoutError(f'workers not ready in {timeout_seconds}s')
+
+    async def publish_events(self) -> None:
+        from sqlalchemy import text
+        from app.infrastructure.stream_shards import shard_stream_key
+
+        self._started_at = _utc_now()
+        created_at = self._started_at.replace(tzinfo=None)
+        for index, file_path in enumerate(self._files):
+            self._jobs.append(
+                {
+                    'dataset_id': f'benchmark-{self._run_id}-{index:03d}',
+                    'ingestion_job_id': uuid4().hex,
+                    'object_key': f'{self._object_prefix}/{os.path.basename(file_path)}',
+                }
+            )
+        async with self._session_local() as db:
+            await db.execute(
+                text(
+                    f'INSERT INTO "{self._schemas[0]}"."{self._settings.metadata_dataset_table}" '
+                    f"(dataset_id, status, updated_at) VALUES (:dataset_id, 'PENDING', :created_at)"
+                ),
+                [{'dataset_id': job['dataset_id'], 'created_at': created_at} for job in self._jobs],
+            )
+            await db.execute(
+                text(
+                    f'INSERT INTO "{self._schemas[0]}"."{self._settings.metadata_job_table}" '
+                    f'(ingestion_job_id, dataset_id, status, retry_count, last_error, created_at, updated_at) '
+                    f"VALUES (:ingestion_job_id, :dataset_id, 'PENDING', 0, '', :created_at, :created_at)"
+                ),
+                [{**job, 'created_at': created_at} for job in self._jobs],
+            )
+            await db.commit()
+
+        occurred_at = self._started_at.isoformat()
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for job in self._jobs:
+                pipe.xadd(
+                    shard_stream_key(self._settings.stream_key, job['dataset_id'], self._settings.stream_shard_count),
+                    {
+                        'event_type': 'dataset.ingested',
+                        'event_id': uuid4().hex,
+                        'occurred_at': occurred_at,
+                        'dataset_id': job['dataset_id'],
+                        'dataset_version': 'v1',
+                        'ingestion_job_id': job['ingestion_job_id'],
+                        'object_key': job['object_key'],
+                        'retry_count': '0',
+                    },
+                )
+            await pipe.execute()
+        logger.info(f'benchmark events published: count={len(self._jobs)}')
+
+    async def _count_job_status(self) -> Dict[str, int]:
+        from sqlalchemy import text
+
+        async with self._session_local() as db:
+            result = await db.execute(
+                text(
+                    f'SELECT status, COUNT(*) FROM "{self._schemas[0]}"."{self._settings.metadata_job_table}" '
+                    f'GROUP BY status'
+                )
+            )
+            return {status: count for status, count in result.all()}
+
+    async def wait_finished(self, timeout_seconds: float) -> bool:
+        """
+        等待全部 job 成功或进入 DLQ；超时返回 False，报告按已完成的部分统计。
+        """
+        deadline = time.monotonic() + timeout_seconds
+        last_log = 0.0
+        while time.monotonic() < deadline:
+            status_counts = await self._count_job_status()
+            dlq_count = await self._redis.xlen(self._settings.dlq_stream_key)
+            succeeded = status_counts.get('SUCCEEDED', 0)
+            if succeeded + dlq_count >= len(self._jobs):
+                self._finished_at = _utc_now()
+                return True
+            if time.monotonic() - last_log >= 10:
+                last_log = time.monotonic()
+                logger.info(f'benchmark progress: status={status_counts}, dlq={dlq_count}, total={len(self._jobs)}')
+            await asyncio.sleep(0.5)
+        self._finished_at = _utc_now()
+        return False
+
+    @staticmethod
+    def _to_utc(value: datetime | str) -> datetime:
+        # SQLite 以字符串返回时间；写入时带时区，读出时可能是 naive，统一按 UTC 处理
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+    @staticmethod
+    def _percentile(values: List[float], percent: float) -> float:
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        index = max(int(round(percent / 100 * len(ordered) + 0.5)) - 1, 0)
+        return round(ordered[min(index, len(ordered) - 1)], 1)
+
+    async def collect_result(self, completed: bool, worker_stats: List[Dict[str, Any]]) -> Dict[str, Any]:
+        from sqlalchemy import text
+
+        async with self._session_local() as db:
+            job_rows = (
+                await db.execute(
+                    text(
+                        f'SELECT status, retry_count, created_at, updated_at '
+                        f'FROM "{self._schemas[0]}"."{self._settings.metadata_job_table}"'
+                    )
+                )
+            ).all()
+            row_count = (
+                await db.execute(
+                    text(f'SELECT COUNT(*) FROM "{self._schemas[1]}"."{self._settings.target_table}"')
+                )
+            ).scalar_one()
+
+        latencies_ms = []
+        last_succeeded_at = self._started_at
+        for status, _, created_at, updated_at in job_rows:
+            if status != 'SUCCEEDED':
+                continue
+            finished_at = self._to_utc(updated_at)
+            latencies_ms.append((finished_at - self._to_utc(created_at)).total_seconds() * 1000)
+            last_succeeded_at = max(last_succeeded_at, finished_at)
+        total_jobs = len(job_rows)
+        succeeded_jobs = len(latencies_ms)
+        retried_jobs = sum(1 for _, retry_count, _, _ in job_rows if retry_count)
+        elapsed_seconds = max((last_succeeded_at - self._started_at).total_seconds(), 0.001)
+        tier_rows = self._args.rows or self._tier_defaults()['rows']
+        return {
+            'run_id': self._run_id,
+            'completed': completed,
+            'started_at': self._started_at.isoformat(),
+            'finished_at': self._finished_at.isoformat(),
+            'elapsed_seconds': round(elapsed_seconds, 2),
+            'workers': self._args.workers,
+            'worker_concurrency': self._settings.worker_concurrency,
+            'shards': self._settings.stream_shard_count,
+            'tier': self._args.tier,
+            'file_format': self._args.file_format,
+            'rows_per_file': tier_rows,
+            'files': len(self._files),
+            'db_dialect': f'{self._engine.dialect.name}+{self._engine.dialect.driver}',
+            'load_batch_size': self._settings.load_batch_size,
+            'read_chunk_size': self._settings.read_chunk_size,
+            'parse_pool_enabled': self._settings.parse_pool_enabled,
+            'upsert_conflict_key': self._settings.upsert_conflict_key,
+            'total_rows': row_count,
+            'rows_per_minute': round(row_count / (elapsed_seconds / 60)),
+            'p50_latency_ms': self._percentile(latencies_ms, 50),
+            'p95_latency_ms': self._percentile(latencies_ms, 95),
+            'max_latency_ms': round(max(latencies_ms), 1) if latencies_ms else 0.0,
+            'total_jobs': total_jobs,
+            'succeeded_jobs': succeeded_jobs,
+            'retried_jobs': retried_jobs,
+            'failure_rate': round((total_jobs - succeeded_jobs) / total_jobs, 4) if total_jobs else 0.0,
+            'retry_rate': round(retried_jobs / total_jobs, 4) if total_jobs else 0.0,
+            'peak_rss_mb': max((item['peak_rss_mb'] for item in worker_stats), default=0.0),
+            'children_peak_rss_mb': max((item['children_peak_rss_mb'] for item in worker_stats), default=0.0),
+            'worker_stats': sorted(worker_stats, key=lambda item: item['worker']),
+        }
+
+    def _tier_defaults(self) -> Dict[str, int]:
+        from benchmark.dataset_generator import TIERS
+
+        return TIERS[self._args.tier]
+
+    async def cleanup(self) -> None:
+        if self._redis is None:
+            return
+        if not self._args.keep_redis_keys:
+            from app.infrastructure.stream_shards import all_shard_keys
+
+            await self._redis.delete(
+                *all_shard_keys(self._settings.stream_key, self._settings.stream_shard_count),
+                self._settings.dlq_stream_key,
+                self._settings.retry_zset_key,
+                self._settings.shard_members_key,
+            )
+        await self._redis.close()
+        await self._engine.dispose()
+
+
+def render_report(result: Dict[str, Any]) -> str:
+    """
+    按 docs/ops/processing-performance-baseline.md 第 5 节模板输出 Markdown 报告。
+    """
+
+    def verdict(passed: bool) -> str:
+        return '达标' if passed else '未达标'
+
+    started_at = datetime.fromisoformat(result['started_at']).astimezone()
+    finished_at = datetime.fromisoformat(result['finished_at']).astimezone()
+    conclusions = [
+        f'吞吐 >= {THRESHOLDS["rows_per_minute"]:,} rows/min：'
+        f'{verdict(result["rows_per_minute"] >= THRESHOLDS["rows_per_minute"])}',
+        f'P95 延迟 <= {THRESHOLDS["p95_latency_ms"]:,} ms：'
+        f'{verdict(result["p95_latency_ms"] <= THRESHOLDS["p95_latency_ms"])}',
+        f'失败率 <= {THRESHOLDS["failure_rate"]:.0%}：{verdict(result["failure_rate"] <= THRESHOLDS["failure_rate"])}',
+        f'重试率 <= {THRESHOLDS["retry_rate"]:.0%}：{verdict(result["retry_rate"] <= THRESHOLDS["retry_rate"])}',
+    ]
+    if not result['completed']:
+        conclusions.append('压测超时，部分任务未完成，以上指标仅统计已完成部分')
+    if result['db_dialect'].startswith('sqlite'):
+        conclusions.append('SQLite 写入为库级锁，多 worker 结果不代表 PostgreSQL 下的扩展性')
+    lines = [
+        f'# 处理任务压测报告（{result["run_id"]}）',
+        '',
+        f'- 测试时间：{started_at:%Y-%m-%d %H:%M:%S} ~ {finished_at:%H:%M:%S}（{result["elapsed_seconds"]} s）',
+        f'- worker 实例数：{result["workers"]}（单实例并发 {result["worker_concurrency"]}，分片数 {result["shards"]}）',
+        f'- 平均吞吐：{result["rows_per_minute"]:,} rows/min（共 {result["total_rows"]:,} 行）',
+        f'- P95 延迟：{result["p95_latency_ms"]:,} ms（P50 {result["p50_latency_ms"]:,} ms，'
+        f'最大 {result["max_latency_ms"]:,} ms）',
+        f'- 失败率：{result["failure_rate"]:.2%}（{result["total_jobs"] - result["succeeded_jobs"]}/{result["total_jobs"]}）',
+        f'- 重试率：{result["retry_rate"]:.2%}（{result["retried_jobs"]}/{result["total_jobs"]}）',
+        f'- 内存峰值：worker {result["peak_rss_mb"]} MB，解析子进程 {result["children_peak_rss_mb"]} MB',
+        '- 结论与优化建议：',
+        *[f'  - {item}' for item in conclusions],
+        '',
+        '## 运行参数',
+        '',
+        '| 参数 | 值 |',
+        '| --- | --- |',
+        f'| 档位 | {result["tier"]}（{result["files"]} 个 {result["file_format"]} 文件 × {result["rows_per_file"]:,} 行） |',
+        f'| 数据库 | {result["db_dialect"]} |',
+        f'| PROCESSING_LOAD_BATCH_SIZE | {result["load_batch_size"]} |',
+        f'| PROCESSING_READ_CHUNK_SIZE | {result["read_chunk_size"]} |',
+        f'| PROCESSING_PARSE_POOL_ENABLED | {result["parse_pool_enabled"]} |',
+        f'| PROCESSING_UPSERT_CONFLICT_KEY | {result["upsert_conflict_key"] or "-"} |',
+        '',
+        '## 各 worker 内存峰值',
+        '',
+        '| worker | RSS (MB) | 解析子进程 RSS (MB) |',
+        '| --- | --- | --- |',
+        *[
+            f'| {item["worker"]} | {item["peak_rss_mb"]} | {item["children_peak_rss_mb"]} |'
+            for item in result['worker_stats']
+        ],
+        '',
+    ]
+    return '\n'.join(lines)
+
+
+def write_report(results_dir: str, result: Dict[str, Any]) -> str:
+    os.makedirs(results_dir, exist_ok=True)
+    report_path = os.path.join(results_dir, f'{result["run_id"]}.md')
+    with open(report_path, 'w', encoding='utf-8') as fs:
+        fs.write(render_report(result))
+    # JSON 便于脚本对比多次结果
+    with open(os.path.join(results_dir, f'{result["run_id"]}.json'), 'w', encoding='utf-8') as fs:
+        json.dump(result, fs, ensure_ascii=False, indent=2)
+    return report_path
+
+
+async def _run(args, runner: BenchmarkRunner, workers: List, stop_event, result_queue) -> Dict[str, Any]:
+    await runner.connect_redis()
+    completed = False
+    worker_stats: List[Dict[str, Any]] = []
+    try:
+        for process in workers:
+            process.start()
+        await runner.wait_workers_ready(args.workers)
+        await runner.publish_events()
+        completed = await runner.wait_finished(args.timeout_seconds)
+    finally:
+        stop_event.set()
+        for process in workers:
+            if process.pid is None:
+                continue
+            await asyncio.to_thread(process.join, 60)
+            if process.is_alive():
+                process.terminate()
+        for process in workers:
+            if process.exitcode == 0:
+                worker_stats.append(await asyncio.to_thread(result_queue.get, True, 10))
+    try:
+        return await runner.collect_result(completed, worker_stats)
+    finally:
+        await runner.cleanup()
+
+
+def parse_args():
+    from benchmark.dataset_generator import TIERS
+
+    parser = argparse.ArgumentParser(description='Processing worker throughput benchmark')
+    parser.add_argument('--tier', choices=sorted(TIERS), default='small')
+    parser.add_argument('--format', dest='file_format', choices=['csv', 'xlsx'], default='csv')
+    parser.add_argument('--rows', type=int, default=0, help='Rows per file, overrides the tier default')
+    parser.add_argument('--files', type=int, default=0, help='Number of files, overrides the tier default')
+    parser.add_argument('--workers', type=int, default=1, help='Number of ProcessingWorker processes')
+    parser.add_argument('--shards', type=int, default=1, help='Stream shard count')
+    parser.add_argument('--redis-url', type=str, default='redis://127.0.0.1:6379/15')
+    parser.add_argument(
+        '--db-url',
+        type=str,
+        default='',
+        help='Database url, e.g. postgresql+asyncpg://...; defaults to a SQLite file under the work dir',
+    )
+    parser.add_argument('--schema-prefix', type=str, default='bench_', help='Prefix of the benchmark-only schemas')
+    parser.add_argument('--work-dir', type=str, default=DEFAULT_WORK_DIR)
+    parser.add_argument('--results-dir', type=str, default=DEFAULT_RESULTS_DIR)
+    parser.add_argument('--timeout-seconds', type=float, default=3600)
+    parser.add_argument('--worker-log-level', type=str, default='WARNING')
+    parser.add_argument('--keep-redis-keys', action='store_true', help='Keep benchmark streams for inspection')
+    parser.add_argument('--clean-files', action='store_true', help='Regenerate the synthetic files')
+    args = parser.parse_args()
+    if not args.schema_prefix:
+        parser.error('--schema-prefix must not be empty, benchmark tables are dropped and recreated')
+    args.work_dir = os.path.abspath(args.work_dir)
+    if not args.db_url:
+        args.db_url = f'sqlite+aiosqlite:///{os.path.join(args.work_dir, "benchmark.db")}'
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    run_id = f'{datetime.now():%Y%m%d-%H%M%S}-{args.tier}-{args.file_format}-w{args.workers}'
+    os.makedirs(args.work_dir, exist_ok=True)
+    if args.clean_files:
+        shutil.rmtree(os.path.join(args.work_dir, 'data-lake', 'raw', 'benchmark'), ignore_errors=True)
+    configure_environment(args, run_id)
+
+    runner = BenchmarkRunner(args, run_id)
+    runner.generate_files()
+    asyncio.run(runner.prepare_database())
+
+    mp_context = multiprocessing.get_context('spawn')
+    stop_event = mp_context.Event()
+    result_queue = mp_context.Queue()
+    workers = [
+        mp_context.Process(
+            target=worker_process,
+            args=(index, stop_event, result_queue, args.work_dir, runner.schemas, args.worker_log_level),
+            name=f'benchmark-worker-{index}',
+        )
+        for index in range(args.workers)
+    ]
+    result = asyncio.run(_run(args, runner, workers, stop_event, result_queue))
+    report_path = write_report(args.results_dir, result)
+    logger.info(
+        f'benchmark done: rows_per_minute={result["rows_per_minute"]}, p95_latency_ms={result["p95_latency_ms"]}, '
+        f'peak_rss_mb={result["peak_rss_mb"]}, report={report_path}'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+# 测试不依赖真实 PostgreSQL/Redis：数据库走内存 SQLite，Redis 由 fakeredis 提供；需在导入 app 之前设置
+os.environ.setdefault('PROCESSING_DB_URL', 'sqlite+aiosqlite://')
+os.environ.setdefault('PROCESSING_METRICS_PORT', '0')
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import fakeredis  # noqa: E402
+from app.core.settings import settings  # noqa: E402
+from app.worker.main import ProcessingWorker  # noqa: E402
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeAsyncRedis(decode_responses=True)
+
+
+@pytest.fixture
+def worker_settings(monkeypatch):
+    monkeypatch.setattr(settings, 'stream_key', 'test.events')
+    monkeypatch.setattr(settings, 'stream_shard_count', 1)
+    monkeypatch.setattr(settings, 'consumer_name', 'worker-a')
+    monkeypatch.setattr(settings, 'block_ms', 10)
+    monkeypatch.setattr(settings, 'batch_size', 10)
+    monkeypatch.setattr(settings, 'worker_concurrency', 2)
+    monkeypatch.setattr(settings, 'status_batch_enabled', False)
+    monkeypatch.setattr(settings, 'dataset_ordering_enabled', True)
+    return settings
+
+
+@pytest.fixture
+def make_worker(redis_client, worker_settings):
+    """
+    构造连接 fakeredis 的 worker，handler 由用例替换。
+    """
+
+    async def _make(handler) -> ProcessingWorker:
+        worker = ProcessingWorker()
+        worker._redis = redis_client
+        worker._handler_map = {'dataset.ingested': handler}
+        worker._batch_prepare_map = {}
+        await worker.ensure_group()
+        return worker
+
+    return _make
+
+
+async def drain(worker: ProcessingWorker) -> None:
+    """
+    等待 worker 已派发的消息全部处理完成。
+    """
+    while worker._in_flight:
+        await asyncio.wait(set(worker._in_flight))
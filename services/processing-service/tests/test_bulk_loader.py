@@ -0,0 +1,48 @@
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.infrastructure.bulk_loader import BulkLoader
+
+
+def test_upsert_counts_rows_after_in_batch_dedupe():
+    async def scenario():
+        engine = create_async_engine('sqlite+aiosqlite://')
+        try:
+            async with AsyncSession(engine) as db:
+                await db.execute(text('CREATE TABLE t (k TEXT PRIMARY KEY, v TEXT)'))
+                rows = [{'k': 'a', 'v': '1'}, {'k': 'a', 'v': '2'}, {'k': 'b', 'v': '3'}]
+
+                result = await BulkLoader.load_rows(db, 'main', 't', rows, batch_size=10, conflict_key='k')
+
+                assert result['processed_count'] == 2
+                assert result['duplicate_count'] == 1
+                assert result['load_mode'] == 'multi_values_upsert'
+                assert sum(batch['rows'] for batch in result['batches']) == result['processed_count']
+                stored = (await db.execute(text('SELECT k, v FROM t ORDER BY k'))).all()
+                assert [tuple(row) for row in stored] == [('a', '2'), ('b', '3')]
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_append_splits_batches():
+    async def scenario():
+        engine = create_async_engine('sqlite+aiosqlite://')
+        try:
+            async with AsyncSession(engine) as db:
+                await db.execute(text('CREATE TABLE t (k TEXT, v TEXT)'))
+                rows = [{'k': str(index), 'v': ''} for index in range(5)]
+
+                result = await BulkLoader.load_rows(db, 'main', 't', rows, batch_size=2)
+
+                assert result['processed_count'] == 5
+                assert [batch['rows'] for batch in result['batches']] == [2, 2, 1]
+                # 空字符串按 NULL 写入
+                assert (await db.execute(text('SELECT COUNT(*) FROM t WHERE v IS NULL'))).scalar() == 5
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
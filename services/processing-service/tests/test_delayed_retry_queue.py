@@ -0,0 +1,74 @@
+import asyncio
+
+from app.infrastructure.delayed_retry_queue import DelayedRetryQueue
+
+
+def test_release_due_only_moves_expired_members(redis_client):
+    async def scenario():
+        queue = DelayedRetryQueue(redis_client, 'test.retry')
+        await queue.schedule('test.events', '1-0', {'dataset_id': 'd1', 'retry_count': '1'}, -1)
+        await queue.schedule('test.events', '2-0', {'dataset_id': 'd2', 'retry_count': '1'}, -1)
+        await queue.schedule('test.events', '3-0', {'dataset_id': 'd3', 'retry_count': '1'}, 60)
+
+        assert await queue.release_due(10) == 2
+        assert await queue.size() == 1
+        entries = await redis_client.xrange('test.events')
+        assert sorted(fields['dataset_id'] for _, fields in entries) == ['d1', 'd2']
+        assert entries[0][1]['retry_count'] == '1'
+
+    asyncio.run(scenario())
+
+
+def test_release_due_routes_members_to_their_own_stream(redis_client):
+    async def scenario():
+        queue = DelayedRetryQueue(redis_client, 'test.retry')
+        await queue.schedule('test.events.0', '1-0', {'dataset_id': 'd1'}, -1)
+        await queue.schedule('test.events.1', '1-0', {'dataset_id': 'd2'}, -1)
+
+        assert await queue.release_due(10) == 2
+        assert [f['dataset_id'] for _, f in await redis_client.xrange('test.events.0')] == ['d1']
+        assert [f['dataset_id'] for _, f in await redis_client.xrange('test.events.1')] == ['d2']
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_release_delivers_each_member_once(redis_client):
+    async def scenario():
+        queue = DelayedRetryQueue(redis_client, 'test.retry')
+        for index in range(5):
+            await queue.schedule('test.events', f'{index}-0', {'dataset_id': f'd{index}'}, -1)
+
+        released = await asyncio.gather(queue.release_due(10), queue.release_due(10))
+
+        assert sum(released) == 5
+        assert await redis_client.xlen('test.events') == 5
+        assert await queue.size() == 0
+
+    asyncio.run(scenario())
+
+
+def test_release_due_respects_limit(redis_client):
+    async def scenario():
+        queue = DelayedRetryQueue(redis_client, 'test.retry')
+        for index in range(3):
+            await queue.schedule('test.events', f'{index}-0', {'dataset_id': f'd{index}'}, -1)
+
+        assert await queue.release_due(2) == 2
+        assert await queue.size() == 1
+
+    asyncio.run(scenario())
+
+
+def test_schedule_acks_source_message(redis_client):
+    async def scenario():
+        await redis_client.xgroup_create('test.events', 'g', id='0', mkstream=True)
+        message_id = await redis_client.xadd('test.events', {'dataset_id': 'd1'})
+        await redis_client.xreadgroup('g', 'c', {'test.events': '>'})
+        queue = DelayedRetryQueue(redis_client, 'test.retry')
+
+        await queue.schedule('test.events', message_id, {'dataset_id': 'd1'}, 5, ack_group='g')
+
+        assert (await redis_client.xpending('test.events', 'g'))['pending'] == 0
+        assert await queue.size() == 1
+
+    asyncio.run(scenario())
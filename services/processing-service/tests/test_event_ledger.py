@@ -0,0 +1,115 @@
+import asyncio
+import os
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.settings import settings
+from app.infrastructure.bulk_loader import BulkLoader
+from app.services.event_ledger_service import EventLedgerService
+from app.services.pipeline_service import PipelineService
+
+
+@pytest.fixture
+def run_pipeline(tmp_path, monkeypatch):
+    """
+    在 SQLite 上以 ATTACH 模拟台账 schema 与目标表 schema，用例协程签名为 ``async def scenario(db)``。
+    """
+    monkeypatch.setattr(settings, 'data_lake_root', str(tmp_path / 'data-lake'))
+    monkeypatch.setattr(settings, 'target_table', 'chat_session')
+    monkeypatch.setattr(settings, 'upsert_conflict_key', 'session_id')
+    monkeypatch.setattr(settings, 'ledger_enabled', True)
+
+    def _run(scenario):
+        async def _main():
+            engine = create_async_engine(f'sqlite+aiosqlite:///{tmp_path / "main.db"}')
+
+            @event.listens_for(engine.sync_engine, 'connect')
+            def _attach_schemas(dbapi_connection, _):
+                cursor = dbapi_connection.cursor()
+                for schema in (settings.metadata_schema, settings.target_schema):
+                    cursor.execute(f"ATTACH DATABASE '{tmp_path / schema}.db' AS {schema}")
+                cursor.close()
+
+            try:
+                async with AsyncSession(engine) as db:
+                    await db.execute(
+                        text(
+                            f'CREATE TABLE {settings.target_schema}.chat_session '
+                            '(session_id TEXT PRIMARY KEY, user_name TEXT)'
+                        )
+                    )
+                    await EventLedgerService.ensure_table(db)
+                    await scenario(db)
+            finally:
+                await engine.dispose()
+
+        asyncio.run(_main())
+
+    return _run
+
+
+def _write_raw_file(name: str, rows: list[str]) -> str:
+    file_path = os.path.join(settings.data_lake_root, 'raw', name)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'w', encoding='utf-8') as fs:
+        fs.write('\n'.join(['会话ID,用户信息', *rows]) + '\n')
+    return f'raw/{name}'
+
+
+def _ingested_event(object_key: str, ingestion_job_id: str, event_id: str) -> dict:
+    return {'object_key': object_key, 'ingestion_job_id': ingestion_job_id, 'event_id': event_id, 'dataset_id': 'ds1'}
+
+
+async def _stored_rows(db) -> list[tuple]:
+    result = await db.execute(text(f'SELECT session_id, user_name FROM {settings.target_schema}.chat_session'))
+    return sorted(tuple(row) for row in result.all())
+
+
+async def _ledger_rows(db) -> list[tuple]:
+    result = await db.execute(text(f'SELECT ledger_key, processed_count FROM {EventLedgerService._ledger_table()}'))
+    return sorted(tuple(row) for row in result.all())
+
+
+def test_redelivered_event_is_skipped_by_ledger(run_pipeline):
+    async def scenario(db):
+        object_key = _write_raw_file('ds1/a.csv', ['s1,alice', 's2,bob'])
+
+        result = await PipelineService.process_dataset_ingested_event(db, _ingested_event(object_key, 'job-1', 'e1'))
+        assert (result['status'], result['processed_count']) == ('SUCCEEDED', 2)
+
+        # outbox 重复投递的事件 event_id 不同，按 ingestion_job_id 判重
+        duplicate = await PipelineService.process_dataset_ingested_event(db, _ingested_event(object_key, 'job-1', 'e2'))
+        assert duplicate == {'status': 'DUPLICATE', 'processed_count': 0}
+        assert await _stored_rows(db) == [('s1', 'alice'), ('s2', 'bob')]
+        assert await _ledger_rows(db) == [('job-1', 2)]
+
+    run_pipeline(scenario)
+
+
+def test_failed_load_rolls_back_ledger_and_retry_upserts(run_pipeline, monkeypatch):
+    async def scenario(db):
+        first_key = _write_raw_file('ds1/a.csv', ['s1,alice', 's2,bob'])
+        await PipelineService.process_dataset_ingested_event(db, _ingested_event(first_key, 'job-1', 'e1'))
+        second_key = _write_raw_file('ds1/b.csv', ['s2,bobby', 's3,carol'])
+
+        load_rows = BulkLoader.load_rows
+
+        async def failing_load_rows(*args, **kwargs):
+            raise ConnectionError('database unavailable')
+
+        monkeypatch.setattr(BulkLoader, 'load_rows', failing_load_rows)
+        with pytest.raises(ConnectionError):
+            await PipelineService.process_dataset_ingested_event(db, _ingested_event(second_key, 'job-2', 'e3'))
+        await db.rollback()
+        assert await _ledger_rows(db) == [('job-1', 2)]
+
+        # 台账占位随失败事务回滚，重试时正常处理，冲突键相同的行被更新
+        monkeypatch.setattr(BulkLoader, 'load_rows', load_rows)
+        result = await PipelineService.process_dataset_ingested_event(db, _ingested_event(second_key, 'job-2', 'e3'))
+        assert (result['status'], result['load_mode']) == ('SUCCEEDED', 'multi_values_upsert')
+        assert await _stored_rows(db) == [('s1', 'alice'), ('s2', 'bobby'), ('s3', 'carol')]
+        assert await _ledger_rows(db) == [('job-1', 2), ('job-2', 2)]
+
+    run_pipeline(scenario)
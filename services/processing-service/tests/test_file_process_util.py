@@ -0,0 +1,66 @@
+import pytest
+from openpyxl import Workbook
+
+from app.utils.file_process_util import FileProcessUtil
+
+
+def _write_csv(path, rows, encoding: str) -> str:
+    path.write_bytes(('\n'.join(rows) + '\n').encode(encoding))
+    return str(path)
+
+
+def test_csv_encoding_falls_back_when_utf8_fails_after_the_first_probe_block(tmp_path, monkeypatch):
+    # 非法 UTF-8 字节出现在第一个探测块之后，需读到文件末尾才能判定
+    monkeypatch.setattr(FileProcessUtil, 'ENCODING_PROBE_BLOCK_SIZE', 16)
+    rows = ['id,name'] + [f'{index},user{index}' for index in range(10)] + ['10,张三']
+    file_path = _write_csv(tmp_path / 'users.csv', rows, 'gbk')
+
+    assert FileProcessUtil._detect_csv_encoding(file_path) == 'gbk'
+    records = list(FileProcessUtil.iter_file_records(file_path, {}, chunk_size=4))
+    assert records[-1] == {'id': 10, 'name': '张三'}
+
+
+def test_utf8_character_split_across_probe_blocks_is_still_utf8(tmp_path, monkeypatch):
+    monkeypatch.setattr(FileProcessUtil, 'ENCODING_PROBE_BLOCK_SIZE', 5)
+    # '名称' 的 UTF-8 字节跨越第一个探测块边界
+    file_path = _write_csv(tmp_path / 'utf8.csv', ['id,名称', '1,数据'], 'utf-8')
+
+    assert FileProcessUtil._detect_csv_encoding(file_path) == 'utf-8'
+    assert list(FileProcessUtil.iter_file_records(file_path, {}, chunk_size=10)) == [{'id': 1, '名称': '数据'}]
+
+
+def test_csv_chunks_respect_chunk_size_and_column_mapping(tmp_path):
+    rows = ['id,name,ignored'] + [f'{index},user{index},x' for index in range(7)]
+    file_path = _write_csv(tmp_path / 'users.csv', rows, 'utf-8')
+
+    chunks = list(FileProcessUtil.iter_file_chunks(file_path, {'id': 'user_id', 'name': 'user_name'}, chunk_size=3))
+
+    assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+    assert chunks[0][0] == {'user_id': 0, 'user_name': 'user0'}
+    assert chunks[-1] == [{'user_id': 6, 'user_name': 'user6'}]
+
+
+def test_xlsx_chunks_pad_short_rows_and_skip_blank_rows(tmp_path):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(['id', 'name', None])
+    for index in range(4):
+        sheet.append([index, f'user{index}'])
+    sheet.append([None, None])
+    sheet.append([4, 'user4', 'extra'])
+    file_path = str(tmp_path / 'users.xlsx')
+    workbook.save(file_path)
+
+    frames = list(FileProcessUtil.iter_dataframe_chunks(file_path, chunk_size=2))
+    assert [len(frame) for frame in frames] == [2, 2, 2]
+    assert list(frames[0].columns) == ['id', 'name', 'Unnamed: 2']
+
+    chunks = list(FileProcessUtil.iter_file_chunks(file_path, {}, chunk_size=2))
+    # 整行为空的记录在映射时剔除
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert chunks[-1] == [{'id': 4, 'name': 'user4', 'Unnamed: 2': 'extra'}]
+
+
+def test_unsupported_extension_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match='unsupported file extension: json'):
+        FileProcessUtil.iter_dataframe_chunks(str(tmp_path / 'data.json'), 10)
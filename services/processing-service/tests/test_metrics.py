@@ -0,0 +1,67 @@
+import asyncio
+import urllib.request
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+
+from app.infrastructure.metrics import MetricsExporter
+from app.worker import metrics
+
+
+def test_worker_metrics_render_in_prometheus_text_format():
+    metrics.MESSAGES_TOTAL.labels(event_type='render.test', outcome='succeeded').inc()
+    metrics.HANDLER_DURATION.labels(event_type='render.test', outcome='succeeded').observe(0.2)
+    metrics.STREAM_LENGTH.labels(stream='render.stream').set(7)
+
+    body = MetricsExporter(metrics.registry).render()
+
+    assert '# TYPE processing_messages_total counter' in body
+    assert 'processing_messages_total{event_type="render.test",outcome="succeeded"} 1.0' in body
+    assert (
+        'processing_handler_duration_seconds_bucket{event_type="render.test",le="0.25",outcome="succeeded"} 1.0'
+    ) in body
+    assert 'processing_handler_duration_seconds_count{event_type="render.test",outcome="succeeded"} 1.0' in body
+    assert 'processing_stream_length{stream="render.stream"} 7.0' in body
+
+
+def test_collect_loop_refreshes_gauges_and_writes_textfile(tmp_path):
+    registry = CollectorRegistry()
+    stream_length = Gauge('test_stream_length', 'Entries in the stream', ('stream',), registry=registry)
+    exporter = MetricsExporter(registry)
+
+    async def failing_collector():
+        raise ConnectionError('redis down')
+
+    async def stream_collector():
+        stream_length.labels(stream='dataset.events').set(3)
+
+    # 单个采集回调失败不影响其余指标
+    exporter.add_collector(failing_collector)
+    exporter.add_collector(stream_collector)
+    file_path = tmp_path / 'textfile' / 'processing.prom'
+
+    async def scenario():
+        task = asyncio.create_task(exporter.run_collect_loop(60, str(file_path)))
+        while not file_path.exists():
+            await asyncio.sleep(0.01)
+        task.cancel()
+
+    asyncio.run(scenario())
+    assert 'test_stream_length{stream="dataset.events"} 3.0' in file_path.read_text(encoding='utf-8')
+
+
+def test_http_endpoint_serves_registry():
+    registry = CollectorRegistry()
+    Counter('test_events_total', 'Events', registry=registry).inc(2)
+    Histogram('test_duration_seconds', 'Duration', registry=registry).observe(1)
+    exporter = MetricsExporter(registry)
+    exporter.start_http('127.0.0.1', 0)
+    try:
+        port = exporter._server[0].server_port
+        with urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics', timeout=5) as response:
+            body = response.read().decode('utf-8')
+    finally:
+        exporter.stop()
+
+    assert 'test_events_total 2.0' in body
+    assert 'test_duration_seconds_count 1.0' in body
+    assert exporter._server is None
@@ -0,0 +1,129 @@
+import asyncio
+
+from app.core.settings import settings
+from conftest import drain
+
+
+async def _deliver_to(redis_client, consumer_name: str, count: int) -> list[str]:
+    message_ids = [
+        await redis_client.xadd(settings.stream_key, {'event_type': 'dataset.ingested', 'dataset_id': f'd{index}'})
+        for index in range(count)
+    ]
+    await redis_client.xreadgroup(settings.consumer_group, consumer_name, {settings.stream_key: '>'})
+    return message_ids
+
+
+def test_reclaim_once_takes_over_idle_messages_of_dead_consumer(make_worker, redis_client, monkeypatch):
+    monkeypatch.setattr(settings, 'reclaim_min_idle_ms', 0)
+
+    async def scenario():
+        handled = []
+
+        async def handler(payload, is_running_marked=False):
+            handled.append(payload['dataset_id'])
+            return {'status': 'SUCCEEDED'}
+
+        worker = await make_worker(handler)
+        await _deliver_to(redis_client, 'worker-dead', 2)
+
+        assert await worker.reclaim_once() == 2
+        await drain(worker)
+
+        assert sorted(handled) == ['d0', 'd1']
+        assert (await redis_client.xpending(settings.stream_key, settings.consumer_group))['pending'] == 0
+
+    asyncio.run(scenario())
+
+
+def test_reclaim_once_skips_messages_not_idle_long_enough(make_worker, redis_client, monkeypatch):
+    monkeypatch.setattr(settings, 'reclaim_min_idle_ms', 60000)
+
+    async def scenario():
+        async def handler(payload, is_running_marked=False):
+            return {'status': 'SUCCEEDED'}
+
+        worker = await make_worker(handler)
+        await _deliver_to(redis_client, 'worker-slow', 1)
+
+        assert await worker.reclaim_once() == 0
+        pending = await redis_client.xpending_range(
+            settings.stream_key, settings.consumer_group, min='-', max='+', count=10
+        )
+        assert [item['consumer'] for item in pending] == ['worker-slow']
+
+    asyncio.run(scenario())
+
+
+def test_reclaim_moves_over_delivered_message_to_dlq(make_worker, redis_client, monkeypatch):
+    monkeypatch.setattr(settings, 'reclaim_min_idle_ms', 0)
+    monkeypatch.setattr(settings, 'reclaim_max_deliveries', 1)
+    monkeypatch.setattr(settings, 'dlq_stream_key', 'test.events.dlq')
+
+    async def scenario():
+        handled = []
+
+        async def handler(payload, is_running_marked=False):
+            handled.append(payload['dataset_id'])
+            return {'status': 'SUCCEEDED'}
+
+        worker = await make_worker(handler)
+        await _deliver_to(redis_client, 'worker-dead', 1)
+
+        # 第一次投递给 worker-dead，XAUTOCLAIM 再计一次，超过上限直接进入 DLQ
+        assert await worker.reclaim_once() == 0
+
+        assert handled == []
+        dlq = await redis_client.xrange('test.events.dlq')
+        assert len(dlq) == 1
+        assert dlq[0][1]['failed_reason'].startswith('exceeded max deliveries')
+        assert (await redis_client.xpending(settings.stream_key, settings.consumer_group))['pending'] == 0
+
+    asyncio.run(scenario())
+
+
+def test_reclaim_does_not_redispatch_in_flight_messages(make_worker, redis_client, monkeypatch):
+    monkeypatch.setattr(settings, 'reclaim_min_idle_ms', 0)
+
+    async def scenario():
+        release = asyncio.Event()
+        handled = []
+
+        async def handler(payload, is_running_marked=False):
+            await release.wait()
+            handled.append(payload['dataset_id'])
+            return {'status': 'SUCCEEDED'}
+
+        worker = await make_worker(handler)
+        await redis_client.xadd(settings.stream_key, {'event_type': 'dataset.ingested', 'dataset_id': 'd0'})
+        await worker.run_once()
+        assert len(worker._in_flight) == 1
+
+        assert await worker.reclaim_once() == 0
+        release.set()
+        await drain(worker)
+
+        assert handled == ['d0']
+
+    asyncio.run(scenario())
+
+
+def test_recover_own_pending_after_restart(make_worker, redis_client):
+    async def scenario():
+        handled = []
+
+        async def handler(payload, is_running_marked=False):
+            handled.append(payload['dataset_id'])
+            return {'status': 'SUCCEEDED'}
+
+        # 旧进程读取后未 ACK 即退出，重启后的进程沿用同一 consumer 名
+        await make_worker(handler)
+        await _deliver_to(redis_client, settings.consumer_name, 2)
+        worker = await make_worker(handler)
+
+        assert await worker.recover_own_pending() == 2
+        await drain(worker)
+
+        assert sorted(handled) == ['d0', 'd1']
+        assert (await redis_client.xpending(settings.stream_key, settings.consumer_group))['pending'] == 0
+
+    asyncio.run(scenario())
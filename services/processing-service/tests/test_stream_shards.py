@@ -0,0 +1,70 @@
+import asyncio
+import time
+
+from app.infrastructure.stream_shards import (
+    ShardCoordinator,
+    all_shard_keys,
+    collect_shard_lag,
+    shard_stream_key,
+)
+
+STREAM_KEYS = all_shard_keys('dataset.events', 4)
+
+
+def test_dataset_is_routed_to_a_stable_shard():
+    assert STREAM_KEYS == ['dataset.events.0', 'dataset.events.1', 'dataset.events.2', 'dataset.events.3']
+    # 取值与 ingestion-service 的 crc32 取模路由一致
+    assert shard_stream_key('dataset.events', 'ds1', 4) == 'dataset.events.1'
+    assert shard_stream_key('dataset.events', 'ds2', 4) == 'dataset.events.3'
+    assert shard_stream_key('dataset.events', 'ds1', 1) == 'dataset.events'
+    assert all_shard_keys('dataset.events', 1) == ['dataset.events']
+
+
+def test_assignment_is_independent_of_member_order():
+    assignment = ShardCoordinator.assign(['worker-b', 'worker-a', 'worker-c'], STREAM_KEYS)
+
+    assert assignment == {
+        'worker-a': ['dataset.events.0', 'dataset.events.3'],
+        'worker-b': ['dataset.events.1'],
+        'worker-c': ['dataset.events.2'],
+    }
+    assert ShardCoordinator.assign(['worker-c', 'worker-a', 'worker-b'], STREAM_KEYS) == assignment
+    assert ShardCoordinator.assign([], STREAM_KEYS) == {}
+
+
+def test_shards_are_rebalanced_when_a_worker_stops_heartbeating(redis_client):
+    async def scenario():
+        worker_a = ShardCoordinator(redis_client, 'dataset.events.workers', 'worker-a', STREAM_KEYS, 1000)
+        worker_b = ShardCoordinator(redis_client, 'dataset.events.workers', 'worker-b', STREAM_KEYS, 1000)
+
+        assert await worker_a.heartbeat() == STREAM_KEYS
+        assert await worker_b.heartbeat() == ['dataset.events.1', 'dataset.events.3']
+        assert await worker_a.heartbeat() == ['dataset.events.0', 'dataset.events.2']
+
+        # worker-b 心跳超时后由 worker-a 接管全部分片
+        stale_ms = int(time.time() * 1000) - 5000
+        await redis_client.zadd('dataset.events.workers', {'worker-b': stale_ms})
+        assert await worker_a.heartbeat() == STREAM_KEYS
+        assert await worker_a.members() == ['worker-a']
+
+        await worker_a.leave()
+        assert await redis_client.zcard('dataset.events.workers') == 0
+
+    asyncio.run(scenario())
+
+
+def test_shard_lag_reports_length_and_pending_per_stream(redis_client):
+    async def scenario():
+        await redis_client.xgroup_create('dataset.events.0', 'processing', id='0', mkstream=True)
+        for index in range(3):
+            await redis_client.xadd('dataset.events.0', {'dataset_id': f'ds{index}'})
+        await redis_client.xreadgroup('processing', 'worker-a', {'dataset.events.0': '>'}, count=2)
+
+        shard_lag = await collect_shard_lag(redis_client, ['dataset.events.0', 'dataset.events.1'], 'processing')
+
+        assert shard_lag[0]['stream'] == 'dataset.events.0'
+        assert (shard_lag[0]['length'], shard_lag[0]['pending'], shard_lag[0]['consumers']) == (3, 2, 1)
+        # 尚未创建的分片不影响其余分片的统计
+        assert (shard_lag[1]['length'], shard_lag[1]['pending'], shard_lag[1]['lag']) == (0, 0, None)
+
+    asyncio.run(scenario())
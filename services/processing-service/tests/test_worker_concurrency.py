@@ -0,0 +1,93 @@
+import asyncio
+
+from app.core.settings import settings
+from app.infrastructure.delayed_retry_queue import DelayedRetryQueue
+from conftest import drain
+
+
+def test_concurrency_is_bounded_and_ack_follows_handler(make_worker, redis_client):
+    async def scenario():
+        active = 0
+        peak = 0
+        release = asyncio.Event()
+        pending_in_handler = []
+
+        async def handler(payload, is_running_marked=False):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await release.wait()
+            # handler 未返回前消息不能被 ACK
+            pending = await redis_client.xpending(settings.stream_key, settings.consumer_group)
+            pending_in_handler.append(pending['pending'])
+            active -= 1
+            return {'status': 'SUCCEEDED'}
+
+        worker = await make_worker(handler)
+        for index in range(5):
+            await redis_client.xadd(settings.stream_key, {'event_type': 'dataset.ingested', 'dataset_id': f'd{index}'})
+
+        await worker.run_once()
+        # 只读取空闲槽位数量的消息
+        assert len(worker._in_flight) == settings.worker_concurrency
+        await asyncio.sleep(0)
+        assert peak == settings.worker_concurrency
+
+        release.set()
+        await drain(worker)
+        # 剩余 3 条消息按空闲槽位分批读取
+        for _ in range(3):
+            await worker.run_once()
+            await drain(worker)
+
+        assert peak <= settings.worker_concurrency
+        assert len(pending_in_handler) == 5
+        assert all(count >= 1 for count in pending_in_handler)
+        pending = await redis_client.xpending(settings.stream_key, settings.consumer_group)
+        assert pending['pending'] == 0
+
+    asyncio.run(scenario())
+
+
+def test_same_dataset_messages_run_in_order(make_worker, redis_client):
+    async def scenario():
+        order = []
+
+        async def handler(payload, is_running_marked=False):
+            order.append(('start', payload['seq']))
+            await asyncio.sleep(0.01 if payload['seq'] == '0' else 0)
+            order.append(('end', payload['seq']))
+            return {'status': 'SUCCEEDED'}
+
+        worker = await make_worker(handler)
+        for seq in range(2):
+            await redis_client.xadd(
+                settings.stream_key, {'event_type': 'dataset.ingested', 'dataset_id': 'same', 'seq': str(seq)}
+            )
+
+        await worker.run_once()
+        await drain(worker)
+
+        assert order == [('start', '0'), ('end', '0'), ('start', '1'), ('end', '1')]
+        assert worker._dataset_tails == {}
+
+    asyncio.run(scenario())
+
+
+def test_failed_message_is_scheduled_for_retry_and_acked(make_worker, redis_client):
+    async def scenario():
+        async def handler(payload, is_running_marked=False):
+            raise RuntimeError('boom')
+
+        worker = await make_worker(handler)
+        worker._retry_queue = DelayedRetryQueue(redis_client, 'test.events.retry')
+        await redis_client.xadd(settings.stream_key, {'event_type': 'dataset.ingested', 'dataset_id': 'd1'})
+
+        await worker.run_once()
+        await drain(worker)
+
+        pending = await redis_client.xpending(settings.stream_key, settings.consumer_group)
+        assert pending['pending'] == 0
+        assert await redis_client.zcard('test.events.retry') == 1
+
+    asyncio.run(scenario())
@@ -1,5 +1,14 @@
-from fastapi import APIRouter
-from app.schemas.workflow import WorkflowCreateRequest, WorkflowStatusResponse
+from fastapi import APIRouter, Query
+from typing import List, Optional
+from app.core.settings import settings
+from app.schemas.workflow import (
+    WorkflowCreateRequest,
+    WorkflowPageResponse,
+    WorkflowStatusResponse,
+    WorkflowStepResponse,
+    WorkflowTransitionRequest,
+)
+from app.services.dag_engine import DagEngine
 from app.services.workflow_service import WorkflowService
 
 router = APIRouter()
@@ -12,9 +21,54 @@ async def health_check():
 
 @router.post('/workflows', response_model=WorkflowStatusResponse)
 async def create_workflow(payload: WorkflowCreateRequest):
-    return await WorkflowService.create_workflow_job(payload)
+    job = await WorkflowService.create_workflow_job(payload)
+    if settings.dag_auto_start:
+        await DagEngine.start_workflow(job.workflow_job_id)
+        return await WorkflowService.get_workflow_job_status(job.workflow_job_id)
+    return job
+
+
+@router.get('/workflows', response_model=WorkflowPageResponse)
+async def list_workflows(
+    dataset_id: Optional[str] = Query(default=None),
+    status: Optional[str] = Query(default=None),
+    page_num: int = Query(default=1, ge=1),
+    page_size: int = Query(default=10, ge=1, le=200),
+):
+    return await WorkflowService.list_workflow_jobs(dataset_id, status, page_num, page_size)
+
+
+@router.get('/datasets/{dataset_id}/workflows', response_model=WorkflowPageResponse)
+async def list_dataset_workflows(
+    dataset_id: str,
+    status: Optional[str] = Query(default=None),
+    page_num: int = Query(default=1, ge=1),
+    page_size: int = Query(default=10, ge=1, le=200),
+):
+    return await WorkflowService.list_workflow_jobs(dataset_id, status, page_num, page_size)
 
 
 @router.get('/workflows/{workflow_job_id}', response_model=WorkflowStatusResponse)
 async def get_workflow_status(workflow_job_id: str):
     return await WorkflowService.get_workflow_job_status(workflow_job_id)
+
+
+@router.post('/workflows/{workflow_job_id}/transitions', response_model=WorkflowStatusResponse)
+async def transition_workflow(workflow_job_id: str, payload: WorkflowTransitionRequest):
+    return await WorkflowService.transition_workflow_job(workflow_job_id, payload)
+
+
+@router.post('/workflows/{workflow_job_id}/start', response_model=List[WorkflowStepResponse])
+async def start_workflow(workflow_job_id: str):
+    steps = await DagEngine.start_workflow(workflow_job_id)
+    return [WorkflowService.build_step_response(step) for step in steps]
+
+
+@router.get('/workflows/{workflow_job_id}/steps', response_model=List[WorkflowStepResponse])
+async def list_workflow_steps(workflow_job_id: str):
+    return await WorkflowService.list_workflow_steps(workflow_job_id)
+
+
+@router.get('/steps/latency')
+async def get_step_latency():
+    return DagEngine.get_step_latency_stats()
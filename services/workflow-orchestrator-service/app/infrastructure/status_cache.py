@@ -0,0 +1,78 @@
+import json
+from typing import Any, Dict, Optional
+from redis import asyncio as aioredis
+from redis.asyncio import Redis
+import logging
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# 仅当缓存中不存在或版本更旧时写入，避免多副本乱序回写把新状态覆盖为旧状态
+_SET_IF_NEWER_SCRIPT = """
+local cached = redis.call('HGET', KEYS[1], 'version')
+if cached and tonumber(cached) >= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('HSET', KEYS[1], unpack(cjson.decode(ARGV[1])))
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[3]))
+return 1
+"""
+
+
+class WorkflowStatusCache:
+    """
+    工作流状态 Redis hash 缓存（workflow:job:<id>），服务热点状态查询；缓存不可用时调用方回源存储。
+    """
+
+    _redis: Redis | None = None
+    _set_if_newer = None
+
+    @classmethod
+    async def connect(cls) -> None:
+        if cls._redis is not None:
+            return
+        cls._redis = await aioredis.from_url(settings.redis_url, encoding='utf-8', decode_responses=True)
+        await cls._redis.ping()
+        cls._set_if_newer = cls._redis.register_script(_SET_IF_NEWER_SCRIPT)
+
+    @classmethod
+    async def close(cls) -> None:
+        if cls._redis is None:
+            return
+        await cls._redis.close()
+        cls._redis = None
+        cls._set_if_newer = None
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return settings.status_cache_enabled and cls._redis is not None
+
+    @staticmethod
+    def _key(workflow_job_id: str) -> str:
+        return f'{settings.status_cache_key_prefix}{workflow_job_id}'
+
+    @classmethod
+    async def get(cls, workflow_job_id: str) -> Optional[Dict[str, str]]:
+        if not cls.is_available():
+            return None
+        try:
+            cached = await cls._redis.hgetall(cls._key(workflow_job_id))
+        except Exception as exc:
+            logger.warning(f'workflow status cache get failed: {exc}')
+            return None
+        return cached or None
+
+    @classmethod
+    async def put(cls, job: Dict[str, Any]) -> None:
+        if not cls.is_available():
+            return
+        fields = []
+        for key, value in job.items():
+            fields.extend([key, value.isoformat() if hasattr(value, 'isoformat') else str(value)])
+        try:
+            await cls._set_if_newer(
+                keys=[cls._key(job['workflow_job_id'])],
+                args=[json.dumps(fields), job['version'], settings.status_cache_ttl_seconds],
+            )
+        except Exception as exc:
+            logger.warning(f'workflow status cache put failed: {exc}')
@@ -1,10 +1,29 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
 from app.api.routes import router
+from app.core.settings import settings
+from app.services.dag_engine import DagEngine
+from app.services.workflow_service import WorkflowService
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await WorkflowService.startup()
+    engine_task = asyncio.create_task(DagEngine.run_forever()) if settings.dag_engine_enabled else None
+    yield
+    if engine_task is not None:
+        engine_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await engine_task
+    await DagEngine.close()
+    await WorkflowService.shutdown()
 
 app = FastAPI(
     title='flowsight-workflow-orchestrator-service',
     description='FlowSight workflow orchestrator standalone service',
     version='0.1.0',
+    lifespan=lifespan,
 )
 
 app.include_router(router)
@@ -0,0 +1,3 @@
+"""
+Workflow ORM models.
+"""
@@ -0,0 +1,51 @@
+from datetime import datetime
+from sqlalchemy import BigInteger, DateTime, Index, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.settings import settings
+from app.infrastructure.database import Base
+
+
+class WorkflowJob(Base):
+    __tablename__ = 'workflow_jobs'
+    __table_args__ = (
+        Index('idx_workflow_jobs_dataset_created', 'dataset_id', 'created_at'),
+        Index('idx_workflow_jobs_status_created', 'status', 'created_at'),
+        Index('idx_workflow_jobs_created', 'created_at'),
+        {'schema': settings.db_schema},
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    workflow_job_id: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    dataset_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    dataset_version: Mapped[str] = mapped_column(String(64), nullable=False, default='v1')
+    status: Mapped[str] = mapped_column(String(32), nullable=False, default='PENDING')
+    retry_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    trigger_source: Mapped[str] = mapped_column(String(64), nullable=False, default='')
+    last_error: Mapped[str] = mapped_column(String(2000), nullable=False, default='')
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class WorkflowStep(Base):
+    __tablename__ = 'workflow_steps'
+    __table_args__ = (
+        UniqueConstraint('workflow_job_id', 'step_name', name='uk_workflow_steps_step_name'),
+        Index('idx_workflow_steps_status_deadline', 'status', 'deadline_at'),
+        {'schema': settings.db_schema},
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    workflow_job_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    step_name: Mapped[str] = mapped_column(String(64), nullable=False)
+    depends_on: Mapped[str] = mapped_column(String(512), nullable=False, default='')
+    status: Mapped[str] = mapped_column(String(32), nullable=False, default='PENDING')
+    attempt: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[str] = mapped_column(String(2000), nullable=False, default='')
+    latency_ms: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    dispatched_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    deadline_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
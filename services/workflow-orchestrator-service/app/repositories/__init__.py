@@ -0,0 +1,3 @@
+"""
+Workflow stores.
+"""
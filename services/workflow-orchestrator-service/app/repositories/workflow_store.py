@@ -0,0 +1,298 @@
+import asyncio
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import func, select, update
+from app.core.settings import settings
+from app.infrastructure.database import init_database, session_local
+from app.models.workflow_models import WorkflowJob, WorkflowStep
+
+
+class WorkflowStore(ABC):
+    """
+    工作流任务存储接口。记录以 dict 表示，时间字段为 datetime；状态变更基于 version 做乐观并发控制。
+    """
+
+    async def init(self) -> None:
+        return None
+
+    @abstractmethod
+    async def create(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    async def get(self, workflow_job_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def list(
+        self, dataset_id: str | None, status: str | None, page_num: int, page_size: int
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        按 created_at 倒序分页查询，返回 (当前页记录, 总数)。
+        """
+
+    @abstractmethod
+    async def compare_and_set(
+        self, workflow_job_id: str, expected_version: int, expected_status: str, changes: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        仅当当前 version 与 status 均与预期一致时写入 changes 并递增 version；不一致返回 None。
+        """
+
+    @abstractmethod
+    async def create_steps(self, steps: List[Dict[str, Any]]) -> None:
+        ...
+
+    @abstractmethod
+    async def list_steps(self, workflow_job_id: str) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def compare_and_set_step(
+        self,
+        workflow_job_id: str,
+        step_name: str,
+        expected_version: int,
+        expected_status: str,
+        changes: Dict[str, Any],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        步骤级乐观锁更新，语义同 compare_and_set。
+        """
+
+    @abstractmethod
+    async def list_overdue_steps(self, now: datetime, limit: int) -> List[Dict[str, Any]]:
+        """
+        已派发且超过 deadline_at 的步骤。
+        """
+
+
+class InMemoryWorkflowStore(WorkflowStore):
+    """
+    进程内存储，仅用于本地调试与单副本场景。
+    """
+
+    def __init__(self) -> None:
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._steps: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = asyncio.Lock()
+
+    async def create(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        async with self._lock:
+            self._jobs[job['workflow_job_id']] = dict(job)
+        return dict(job)
+
+    async def get(self, workflow_job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(workflow_job_id)
+        return dict(job) if job else None
+
+    async def list(
+        self, dataset_id: str | None, status: str | None, page_num: int, page_size: int
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        jobs = [
+            job
+            for job in self._jobs.values()
+            if (not dataset_id or job['dataset_id'] == dataset_id) and (not status or job['status'] == status)
+        ]
+        jobs.sort(key=lambda job: job['created_at'], reverse=True)
+        offset = (page_num - 1) * page_size
+        return [dict(job) for job in jobs[offset : offset + page_size]], len(jobs)
+
+    async def compare_and_set(
+        self, workflow_job_id: str, expected_version: int, expected_status: str, changes: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        async with self._lock:
+            job = self._jobs.get(workflow_job_id)
+            if not job or job['version'] != expected_version or job['status'] != expected_status:
+                return None
+            job.update(changes)
+            job['version'] = expected_version + 1
+            return dict(job)
+
+    async def create_steps(self, steps: List[Dict[str, Any]]) -> None:
+        async with self._lock:
+            for step in steps:
+                self._steps[(step['workflow_job_id'], step['step_name'])] = dict(step)
+
+    async def list_steps(self, workflow_job_id: str) -> List[Dict[str, Any]]:
+        return [dict(step) for (job_id, _), step in self._steps.items() if job_id == workflow_job_id]
+
+    async def compare_and_set_step(
+        self,
+        workflow_job_id: str,
+        step_name: str,
+        expected_version: int,
+        expected_status: str,
+        changes: Dict[str, Any],
+    ) -> Optional[Dict[str, Any]]:
+        async with self._lock:
+            step = self._steps.get((workflow_job_id, step_name))
+            if not step or step['version'] != expected_version or step['status'] != expected_status:
+                return None
+            step.update(changes)
+            step['version'] = expected_version + 1
+            return dict(step)
+
+    async def list_overdue_steps(self, now: datetime, limit: int) -> List[Dict[str, Any]]:
+        overdue = [
+            dict(step)
+            for step in self._steps.values()
+            if step['status'] == 'DISPATCHED' and step['deadline_at'] is not None and step['deadline_at'] <= now
+        ]
+        return overdue[:limit]
+
+
+class SqlWorkflowStore(WorkflowStore):
+    """
+    数据库存储（PostgreSQL）：多副本共享，dataset_id/status/created_at 建索引支撑分页过滤。
+    """
+
+    _COLUMNS = (
+        'workflow_job_id',
+        'dataset_id',
+        'dataset_version',
+        'status',
+        'retry_count',
+        'trigger_source',
+        'last_error',
+        'version',
+        'created_at',
+        'updated_at',
+    )
+
+    _STEP_COLUMNS = (
+        'workflow_job_id',
+        'step_name',
+        'depends_on',
+        'status',
+        'attempt',
+        'last_error',
+        'latency_ms',
+        'dispatched_at',
+        'deadline_at',
+        'finished_at',
+        'version',
+        'created_at',
+        'updated_at',
+    )
+
+    @classmethod
+    def _to_dict(cls, job: WorkflowJob) -> Dict[str, Any]:
+        return {column: getattr(job, column) for column in cls._COLUMNS}
+
+    @classmethod
+    def _step_to_dict(cls, step: WorkflowStep) -> Dict[str, Any]:
+        return {column: getattr(step, column) for column in cls._STEP_COLUMNS}
+
+    async def init(self) -> None:
+        await init_database()
+
+    async def create(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        async with session_local() as db:
+            row = WorkflowJob(**job)
+            db.add(row)
+            await db.commit()
+            return self._to_dict(row)
+
+    async def get(self, workflow_job_id: str) -> Optional[Dict[str, Any]]:
+        async with session_local() as db:
+            result = await db.execute(select(WorkflowJob).where(WorkflowJob.workflow_job_id == workflow_job_id))
+            row = result.scalars().first()
+            return self._to_dict(row) if row else None
+
+    async def list(
+        self, dataset_id: str | None, status: str | None, page_num: int, page_size: int
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        query = select(WorkflowJob)
+        if dataset_id:
+            query = query.where(WorkflowJob.dataset_id == dataset_id)
+        if status:
+            query = query.where(WorkflowJob.status == status)
+        async with session_local() as db:
+            total = (await db.execute(select(func.count()).select_from(query.subquery()))).scalar()
+            result = await db.execute(
+                query.order_by(WorkflowJob.created_at.desc(), WorkflowJob.id.desc())
+                .offset((page_num - 1) * page_size)
+                .limit(page_size)
+            )
+            return [self._to_dict(row) for row in result.scalars().all()], total
+
+    async def compare_and_set(
+        self, workflow_job_id: str, expected_version: int, expected_status: str, changes: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        async with session_local() as db:
+            result = await db.execute(
+                update(WorkflowJob)
+                .where(
+                    WorkflowJob.workflow_job_id == workflow_job_id,
+                    WorkflowJob.version == expected_version,
+                    WorkflowJob.status == expected_status,
+                )
+                .values(**changes, version=expected_version + 1)
+            )
+            if result.rowcount != 1:
+                await db.rollback()
+                return None
+            await db.commit()
+        return await self.get(workflow_job_id)
+
+    async def create_steps(self, steps: List[Dict[str, Any]]) -> None:
+        async with session_local() as db:
+            db.add_all([WorkflowStep(**step) for step in steps])
+            await db.commit()
+
+    async def list_steps(self, workflow_job_id: str) -> List[Dict[str, Any]]:
+        async with session_local() as db:
+            result = await db.execute(
+                select(WorkflowStep).where(WorkflowStep.workflow_job_id == workflow_job_id).order_by(WorkflowStep.id)
+            )
+            return [self._step_to_dict(step) for step in result.scalars().all()]
+
+    async def compare_and_set_step(
+        self,
+        workflow_job_id: str,
+        step_name: str,
+        expected_version: int,
+        expected_status: str,
+        changes: Dict[str, Any],
+    ) -> Optional[Dict[str, Any]]:
+        async with session_local() as db:
+            result = await db.execute(
+                update(WorkflowStep)
+                .where(
+                    WorkflowStep.workflow_job_id == workflow_job_id,
+                    WorkflowStep.step_name == step_name,
+                    WorkflowStep.version == expected_version,
+                    WorkflowStep.status == expected_status,
+                )
+                .values(**changes, version=expected_version + 1)
+            )
+            if result.rowcount != 1:
+                await db.rollback()
+                return None
+            await db.commit()
+            result = await db.execute(
+                select(WorkflowStep).where(
+                    WorkflowStep.workflow_job_id == workflow_job_id, WorkflowStep.step_name == step_name
+                )
+            )
+            return self._step_to_dict(result.scalars().one())
+
+    async def list_overdue_steps(self, now: datetime, limit: int) -> List[Dict[str, Any]]:
+        async with session_local() as db:
+            result = await db.execute(
+                select(WorkflowStep)
+                .where(WorkflowStep.status == 'DISPATCHED', WorkflowStep.deadline_at <= now)
+                .order_by(WorkflowStep.deadline_at)
+                .limit(limit)
+            )
+            return [self._step_to_dict(step) for step in result.scalars().all()]
+
+
+def build_workflow_store() -> WorkflowStore:
+    if settings.store_backend == 'memory':
+        return InMemoryWorkflowStore()
+    if settings.store_backend == 'postgres':
+        return SqlWorkflowStore()
+    raise ValueError(f'unsupported workflow store backend: {settings.store_backend}')
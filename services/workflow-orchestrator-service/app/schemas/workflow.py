@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 
 
 class WorkflowCreateRequest(BaseModel):
@@ -8,11 +8,40 @@ class WorkflowCreateRequest(BaseModel):
     trigger_source: Optional[str] = Field(default='ingestion', description='触发来源')
 
 
+class WorkflowTransitionRequest(BaseModel):
+    to_status: str = Field(..., description='目标状态：RUNNING/SUCCEEDED/FAILED/PENDING/DLQ')
+    expected_version: Optional[int] = Field(default=None, description='乐观锁版本，为空时以当前版本为准')
+    last_error: Optional[str] = Field(default=None, description='失败原因，FAILED 时写入')
+
+
 class WorkflowStatusResponse(BaseModel):
     workflow_job_id: str
     dataset_id: str
     dataset_version: str
     status: str
     retry_count: int = 0
+    trigger_source: Optional[str] = None
+    last_error: Optional[str] = None
+    version: int = 1
     created_at: str
     updated_at: str
+
+
+class WorkflowPageResponse(BaseModel):
+    rows: List[WorkflowStatusResponse] = []
+    page_num: int
+    page_size: int
+    total: int
+    has_next: bool
+
+
+class WorkflowStepResponse(BaseModel):
+    workflow_job_id: str
+    step_name: str
+    depends_on: List[str] = []
+    status: str
+    attempt: int = 0
+    last_error: Optional[str] = None
+    latency_ms: Optional[int] = None
+    dispatched_at: Optional[str] = None
+    finished_at: Optional[str] = None
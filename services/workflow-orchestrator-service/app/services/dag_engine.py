@@ -0,0 +1,379 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Deque, Dict, List, Tuple
+from fastapi import HTTPException
+from redis import asyncio as aioredis
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+from app.core.settings import settings
+from app.schemas.workflow import WorkflowTransitionRequest
+from app.services.workflow_service import WorkflowService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class StepSpec:
+    name: str
+    depends_on: Tuple[str, ...] = ()
+    timeout_seconds: int | None = None
+    max_retries: int | None = None
+
+
+# 数据处理 DAG：validate 与 profile 相互独立可并行，refresh_bi 等待入库与画像完成
+DEFAULT_DAG: Tuple[StepSpec, ...] = (
+    StepSpec('validate'),
+    StepSpec('profile'),
+    StepSpec('clean', ('validate',)),
+    StepSpec('map', ('clean',)),
+    StepSpec('dedupe', ('map',)),
+    StepSpec('load', ('dedupe',)),
+    StepSpec('refresh_bi', ('load', 'profile')),
+)
+
+
+def _check_acyclic(dag: Tuple[StepSpec, ...]) -> None:
+    names = {spec.name for spec in dag}
+    resolved: set = set()
+    pending = list(dag)
+    while pending:
+        ready = [spec for spec in pending if set(spec.depends_on) <= resolved]
+        if not ready:
+            raise ValueError(f'invalid workflow dag, cycle or unknown dependency: {[s.name for s in pending]}')
+        for spec in ready:
+            unknown = set(spec.depends_on) - names
+            if unknown:
+                raise ValueError(f'step {spec.name} depends on unknown steps: {unknown}')
+            resolved.add(spec.name)
+            pending.remove(spec)
+
+
+_check_acyclic(DEFAULT_DAG)
+
+
+class DagEngine:
+    """
+    DAG 执行引擎：可运行步骤并行派发到各自的 Redis Stream 队列（workflow.steps.<step>），
+    消费步骤完成事件推进后续步骤，按步骤做超时与重试。
+
+    步骤状态以 version + status 乐观锁更新，多副本下同一步骤只会被派发/推进一次；
+    完成事件通过 consumer group 在副本间分摊。
+    """
+
+    _redis: Redis | None = None
+    _specs: Dict[str, StepSpec] = {spec.name: spec for spec in DEFAULT_DAG}
+    _latency_samples: Dict[str, Deque[int]] = {}
+
+    @staticmethod
+    def _utc_now() -> datetime:
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+
+    @classmethod
+    async def connect(cls) -> None:
+        if cls._redis is not None:
+            return
+        cls._redis = await aioredis.from_url(settings.redis_url, encoding='utf-8', decode_responses=True)
+        await cls._redis.ping()
+
+    @classmethod
+    async def close(cls) -> None:
+        if cls._redis is None:
+            return
+        await cls._redis.close()
+        cls._redis = None
+
+    @classmethod
+    def _timeout_seconds(cls, step_name: str) -> int:
+        return cls._specs[step_name].timeout_seconds or settings.step_timeout_seconds
+
+    @classmethod
+    def _max_retries(cls, step_name: str) -> int:
+        spec = cls._specs[step_name]
+        return settings.step_max_retries if spec.max_retries is None else spec.max_retries
+
+    @classmethod
+    async def start_workflow(cls, workflow_job_id: str) -> List[Dict[str, Any]]:
+        """
+        PENDING -> RUNNING，并按 DAG 初始化步骤、派发无依赖步骤。重试后的再次启动会重建步骤。
+        初始化或派发失败时工作流置为 FAILED，不会停留在缺少步骤的 RUNNING 状态。
+        """
+        await cls.connect()
+        job = await WorkflowService.transition_workflow_job(
+            workflow_job_id, WorkflowTransitionRequest(to_status='RUNNING')
+        )
+        store = WorkflowService.get_store()
+        try:
+            now = cls._utc_now()
+            existing = {step['step_name']: step for step in await store.list_steps(workflow_job_id)}
+            new_steps = []
+            for spec in DEFAULT_DAG:
+                step = existing.get(spec.name)
+                if step is None:
+                    new_steps.append(
+                        {
+                            'workflow_job_id': workflow_job_id,
+                            'step_name': spec.name,
+                            'depends_on': ','.join(spec.depends_on),
+                            'status': 'PENDING',
+                            'attempt': 0,
+                            'last_error': '',
+                            'latency_ms': None,
+                            'dispatched_at': None,
+                            'deadline_at': None,
+                            'finished_at': None,
+                            'version': 1,
+                            'created_at': now,
+                            'updated_at': now,
+                        }
+                    )
+                elif step['status'] == 'FAILED':
+                    # 工作流重试：只重置失败步骤，已成功的步骤不重复执行
+                    await store.compare_and_set_step(
+                        workflow_job_id,
+                        spec.name,
+                        step['version'],
+                        'FAILED',
+                        {'status': 'PENDING', 'attempt': 0, 'last_error': '', 'updated_at': now},
+                    )
+            if new_steps:
+                await store.create_steps(new_steps)
+            await cls._advance(workflow_job_id, job.dataset_id, job.dataset_version)
+        except Exception as exc:
+            # 先完成状态流转再初始化步骤，以状态机拦截并发重复启动；步骤写入或派发失败时置为 FAILED，可按重试流程重新启动
+            logger.exception(f'workflow start failed: job_id={workflow_job_id}, error={exc}')
+            await cls._finish_workflow(workflow_job_id, 'FAILED', f'workflow start failed: {exc}')
+            raise
+        return await store.list_steps(workflow_job_id)
+
+    @classmethod
+    async def _dispatch(cls, step: Dict[str, Any], dataset_id: str, dataset_version: str) -> bool:
+        now = cls._utc_now()
+        attempt = step['attempt'] + 1
+        # 先以乐观锁占位为 DISPATCHED，保证多副本下只派发一次；XADD 失败由超时检查重新派发
+        claimed = await WorkflowService.get_store().compare_and_set_step(
+            step['workflow_job_id'],
+            step['step_name'],
+            step['version'],
+            step['status'],
+            {
+                'status': 'DISPATCHED',
+                'attempt': attempt,
+                'dispatched_at': now,
+                'deadline_at': now + timedelta(seconds=cls._timeout_seconds(step['step_name'])),
+                'updated_at': now,
+            },
+        )
+        if claimed is None:
+            return False
+        await cls._redis.xadd(
+            f'{settings.step_stream_prefix}{step["step_name"]}',
+            {
+                'event_type': 'workflow.step.dispatched',
+                'workflow_job_id': step['workflow_job_id'],
+                'step_name': step['step_name'],
+                'attempt': str(attempt),
+                'dataset_id': dataset_id,
+                'dataset_version': dataset_version,
+                'dispatched_at': now.isoformat(),
+                'timeout_seconds': str(cls._timeout_seconds(step['step_name'])),
+            },
+            maxlen=100000,
+            approximate=True,
+        )
+        logger.info(f'step dispatched: job_id={step["workflow_job_id"]}, step={step["step_name"]}, attempt={attempt}')
+        return True
+
+    @classmethod
+    async def _advance(cls, workflow_job_id: str, dataset_id: str, dataset_version: str) -> None:
+        steps = await WorkflowService.get_store().list_steps(workflow_job_id)
+        status_by_name = {step['step_name']: step['status'] for step in steps}
+        if steps and all(status == 'SUCCEEDED' for status in status_by_name.values()):
+            await cls._finish_workflow(workflow_job_id, 'SUCCEEDED')
+            return
+        runnable = [
+            step
+            for step in steps
+            if step['status'] == 'PENDING'
+            and all(
+                status_by_name.get(dependency) == 'SUCCEEDED'
+                for dependency in filter(None, step['depends_on'].split(','))
+            )
+        ]
+        # 相互独立的步骤并行派发
+        await asyncio.gather(*(cls._dispatch(step, dataset_id, dataset_version) for step in runnable))
+
+    @classmethod
+    async def _finish_workflow(cls, workflow_job_id: str, status: str, last_error: str = '') -> None:
+        try:
+            await WorkflowService.transition_workflow_job(
+                workflow_job_id, WorkflowTransitionRequest(to_status=status, last_error=last_error)
+            )
+            logger.info(f'workflow finished: job_id={workflow_job_id}, status={status}')
+        except HTTPException as exc:
+            # 其他副本已完成收尾
+            logger.info(f'workflow finish skipped: job_id={workflow_job_id}, reason={exc.detail}')
+
+    @classmethod
+    def _record_latency(cls, step_name: str, latency_ms: int) -> None:
+        samples = cls._latency_samples.setdefault(step_name, deque(maxlen=settings.step_latency_window))
+        samples.append(latency_ms)
+
+    @classmethod
+    async def _fail_attempt(cls, step: Dict[str, Any], last_error: str, job: Dict[str, Any]) -> None:
+        now = cls._utc_now()
+        store = WorkflowService.get_store()
+        # 工作流已结束（如并行分支已失败）时不再重试
+        if job['status'] == 'RUNNING' and step['attempt'] <= cls._max_retries(step['step_name']):
+            reset = await store.compare_and_set_step(
+                step['workflow_job_id'],
+                step['step_name'],
+                step['version'],
+                'DISPATCHED',
+                {'status': 'PENDING', 'last_error': last_error[:2000], 'updated_at': now},
+            )
+            if reset is not None:
+                logger.warning(
+                    f'step retry: job_id={step["workflow_job_id"]}, step={step["step_name"]}, '
+                    f'attempt={step["attempt"]}, error={last_error}'
+                )
+                await cls._dispatch(reset, job['dataset_id'], job['dataset_version'])
+            return
+        failed = await store.compare_and_set_step(
+            step['workflow_job_id'],
+            step['step_name'],
+            step['version'],
+            'DISPATCHED',
+            {'status': 'FAILED', 'last_error': last_error[:2000], 'finished_at': now, 'updated_at': now},
+        )
+        if failed is not None and job['status'] == 'RUNNING':
+            await cls._finish_workflow(
+                step['workflow_job_id'], 'FAILED', f'step {step["step_name"]} failed: {last_error}'
+            )
+
+    @classmethod
+    async def handle_step_event(cls, event: Dict[str, str]) -> None:
+        """
+        处理步骤完成事件：{workflow_job_id, step_name, attempt, status: SUCCEEDED|FAILED, error}。
+        """
+        workflow_job_id = event.get('workflow_job_id', '')
+        step_name = event.get('step_name', '')
+        if step_name not in cls._specs:
+            logger.warning(f'unknown step event ignored: {event}')
+            return
+        job = await WorkflowService.get_store().get(workflow_job_id)
+        if not job:
+            logger.warning(f'step event for unknown workflow ignored: {event}')
+            return
+        steps = {step['step_name']: step for step in await WorkflowService.get_store().list_steps(workflow_job_id)}
+        step = steps.get(step_name)
+        attempt = int(event.get('attempt', '0'))
+        if not step or step['status'] != 'DISPATCHED' or step['attempt'] != attempt:
+            # 超时后重新派发的旧尝试、重复投递的完成事件
+            logger.info(f'stale step event ignored: job_id={workflow_job_id}, step={step_name}, attempt={attempt}')
+            return
+
+        now = cls._utc_now()
+        if event.get('status') == 'SUCCEEDED':
+            latency_ms = int((now - step['dispatched_at']).total_seconds() * 1000)
+            done = await WorkflowService.get_store().compare_and_set_step(
+                workflow_job_id,
+                step_name,
+                step['version'],
+                'DISPATCHED',
+                {'status': 'SUCCEEDED', 'latency_ms': latency_ms, 'finished_at': now, 'updated_at': now},
+            )
+            if done is None:
+                return
+            cls._record_latency(step_name, latency_ms)
+            logger.info(f'step succeeded: job_id={workflow_job_id}, step={step_name}, latency_ms={latency_ms}')
+            if job['status'] == 'RUNNING':
+                await cls._advance(workflow_job_id, job['dataset_id'], job['dataset_version'])
+        else:
+            await cls._fail_attempt(step, event.get('error', 'step failed'), job)
+
+    @classmethod
+    async def check_timeouts(cls) -> int:
+        overdue = await WorkflowService.get_store().list_overdue_steps(cls._utc_now(), settings.engine_batch_size)
+        for step in overdue:
+            job = await WorkflowService.get_store().get(step['workflow_job_id'])
+            if not job:
+                continue
+            await cls._fail_attempt(step, f'step timeout after {cls._timeout_seconds(step["step_name"])}s', job)
+        return len(overdue)
+
+    @classmethod
+    def get_step_latency_stats(cls) -> Dict[str, Dict[str, Any]]:
+        """
+        本副本最近 step_latency_window 次成功步骤的派发到完成耗时。
+        """
+        stats = {}
+        for step_name, samples in cls._latency_samples.items():
+            ordered = sorted(samples)
+            if not ordered:
+                continue
+            stats[step_name] = {
+                'count': len(ordered),
+                'avg_ms': round(sum(ordered) / len(ordered), 1),
+                'p50_ms': ordered[max(math.ceil(len(ordered) * 0.5) - 1, 0)],
+                'p95_ms': ordered[max(math.ceil(len(ordered) * 0.95) - 1, 0)],
+                'max_ms': ordered[-1],
+            }
+        return stats
+
+    @classmethod
+    async def _ensure_group(cls) -> None:
+        try:
+            await cls._redis.xgroup_create(
+                settings.step_event_stream_key, settings.engine_consumer_group, id='0', mkstream=True
+            )
+        except ResponseError as exc:
+            if 'BUSYGROUP' not in str(exc):
+                raise
+
+    @classmethod
+    async def run_forever(cls) -> None:
+        while True:
+            try:
+                await cls.connect()
+                await cls._ensure_group()
+                break
+            except Exception as exc:
+                logger.warning(f'dag engine waiting for redis: {exc}')
+                await cls.close()
+                await asyncio.sleep(5)
+        timeout_interval_seconds = settings.step_timeout_check_interval_ms / 1000
+        last_timeout_check = 0.0
+        # 先从 0 读取本 consumer 上次退出前未 ACK 的消息，读空后再消费新消息
+        read_id = '0'
+        while True:
+            try:
+                response = await cls._redis.xreadgroup(
+                    groupname=settings.engine_consumer_group,
+                    consumername=settings.engine_consumer_name,
+                    streams={settings.step_event_stream_key: read_id},
+                    count=settings.engine_batch_size,
+                    block=settings.engine_block_ms,
+                )
+                if read_id == '0' and not any(messages for _, messages in response or []):
+                    read_id = '>'
+                for _, messages in response or []:
+                    for message_id, payload in messages:
+                        try:
+                            await cls.handle_step_event(payload)
+                        except Exception as exc:
+                            # 未能推进的步骤保持 DISPATCHED，由超时检查重新派发
+                            logger.exception(f'step event failed: id={message_id}, error={exc}')
+                        await cls._redis.xack(settings.step_event_stream_key, settings.engine_consumer_group, message_id)
+                if time.monotonic() - last_timeout_check >= timeout_interval_seconds:
+                    last_timeout_check = time.monotonic()
+                    await cls.check_timeouts()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.exception(f'dag engine loop failed: {exc}')
+                await asyncio.sleep(1)
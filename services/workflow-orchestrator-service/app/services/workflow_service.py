@@ -1,36 +1,184 @@
 from datetime import datetime, timezone
 from fastapi import HTTPException
-from typing import Dict
+from typing import Any, Dict, List
 from uuid import uuid4
-from app.schemas.workflow import WorkflowCreateRequest, WorkflowStatusResponse
+import logging
+from app.core.settings import settings
+from app.infrastructure.status_cache import WorkflowStatusCache
+from app.repositories.workflow_store import WorkflowStore, build_workflow_store
+from app.schemas.workflow import (
+    WorkflowCreateRequest,
+    WorkflowPageResponse,
+    WorkflowStatusResponse,
+    WorkflowStepResponse,
+    WorkflowTransitionRequest,
+)
 
-_workflow_store: Dict[str, dict] = {}
+logger = logging.getLogger(__name__)
+
+# 与 docs/architecture/workflow-state-machine.md 保持一致
+ALLOWED_TRANSITIONS: Dict[str, set] = {
+    'PENDING': {'RUNNING'},
+    'RUNNING': {'SUCCEEDED', 'FAILED'},
+    'FAILED': {'PENDING', 'DLQ'},
+    'DLQ': {'PENDING'},
+    'SUCCEEDED': set(),
+}
 
 
 class WorkflowService:
+    _store: WorkflowStore | None = None
+
+    @staticmethod
+    def _utc_now() -> datetime:
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+
+    @classmethod
+    async def startup(cls) -> None:
+        if cls._store is None:
+            cls._store = build_workflow_store()
+            await cls._store.init()
+        if settings.status_cache_enabled:
+            try:
+                await WorkflowStatusCache.connect()
+            except Exception as exc:
+                # 缓存不可用时直接回源存储
+                logger.warning(f'workflow status cache disabled: {exc}')
+
+    @classmethod
+    async def shutdown(cls) -> None:
+        await WorkflowStatusCache.close()
+
+    @classmethod
+    def get_store(cls) -> WorkflowStore:
+        if cls._store is None:
+            raise RuntimeError('workflow store not initialized')
+        return cls._store
+
+    @staticmethod
+    def _format_time(value: datetime | str) -> str:
+        # 缓存命中时时间字段已是 ISO 字符串
+        return value if isinstance(value, str) else value.isoformat()
+
+    @staticmethod
+    def _build_response(job: Dict[str, Any]) -> WorkflowStatusResponse:
+        return WorkflowStatusResponse(
+            workflow_job_id=job['workflow_job_id'],
+            dataset_id=job['dataset_id'],
+            dataset_version=job['dataset_version'],
+            status=job['status'],
+            retry_count=int(job['retry_count']),
+            trigger_source=job['trigger_source'],
+            last_error=job['last_error'],
+            version=int(job['version']),
+            created_at=WorkflowService._format_time(job['created_at']),
+            updated_at=WorkflowService._format_time(job['updated_at']),
+        )
+
     @staticmethod
-    def _utc_now_iso() -> str:
-        return datetime.now(timezone.utc).isoformat()
+    def build_step_response(step: Dict[str, Any]) -> WorkflowStepResponse:
+        return WorkflowStepResponse(
+            workflow_job_id=step['workflow_job_id'],
+            step_name=step['step_name'],
+            depends_on=[name for name in step['depends_on'].split(',') if name],
+            status=step['status'],
+            attempt=step['attempt'],
+            last_error=step['last_error'],
+            latency_ms=step['latency_ms'],
+            dispatched_at=step['dispatched_at'].isoformat() if step['dispatched_at'] else None,
+            finished_at=step['finished_at'].isoformat() if step['finished_at'] else None,
+        )
 
     @classmethod
     async def create_workflow_job(cls, payload: WorkflowCreateRequest) -> WorkflowStatusResponse:
-        now = cls._utc_now_iso()
-        workflow_job_id = uuid4().hex
-        _workflow_store[workflow_job_id] = {
-            'workflow_job_id': workflow_job_id,
-            'dataset_id': payload.dataset_id,
-            'dataset_version': payload.dataset_version,
-            'status': 'PENDING',
-            'retry_count': 0,
-            'created_at': now,
-            'updated_at': now,
-            'trigger_source': payload.trigger_source,
-        }
-        return WorkflowStatusResponse(**_workflow_store[workflow_job_id])
+        now = cls._utc_now()
+        job = await cls.get_store().create(
+            {
+                'workflow_job_id': uuid4().hex,
+                'dataset_id': payload.dataset_id,
+                'dataset_version': payload.dataset_version,
+                'status': 'PENDING',
+                'retry_count': 0,
+                'trigger_source': payload.trigger_source or '',
+                'last_error': '',
+                'version': 1,
+                'created_at': now,
+                'updated_at': now,
+            }
+        )
+        await WorkflowStatusCache.put(job)
+        return cls._build_response(job)
 
     @classmethod
     async def get_workflow_job_status(cls, workflow_job_id: str) -> WorkflowStatusResponse:
-        job = _workflow_store.get(workflow_job_id)
+        cached = await WorkflowStatusCache.get(workflow_job_id)
+        if cached:
+            return cls._build_response(cached)
+        job = await cls.get_store().get(workflow_job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail='workflow job not found')
+        await WorkflowStatusCache.put(job)
+        return cls._build_response(job)
+
+    @classmethod
+    async def list_workflow_jobs(
+        cls, dataset_id: str | None, status: str | None, page_num: int, page_size: int
+    ) -> WorkflowPageResponse:
+        rows, total = await cls.get_store().list(dataset_id, status, page_num, page_size)
+        return WorkflowPageResponse(
+            rows=[cls._build_response(row) for row in rows],
+            page_num=page_num,
+            page_size=page_size,
+            total=total,
+            has_next=page_num * page_size < total,
+        )
+
+    @classmethod
+    async def transition_workflow_job(
+        cls, workflow_job_id: str, payload: WorkflowTransitionRequest
+    ) -> WorkflowStatusResponse:
+        """
+        按状态机做状态变更：以 version + 当前 status 作为乐观锁条件，冲突时返回 409。
+        """
+        store = cls.get_store()
+        job = await store.get(workflow_job_id)
         if not job:
             raise HTTPException(status_code=404, detail='workflow job not found')
-        return WorkflowStatusResponse(**job)
+        if payload.expected_version is not None and payload.expected_version != job['version']:
+            raise HTTPException(
+                status_code=409,
+                detail=f'version conflict: expected={payload.expected_version}, current={job["version"]}',
+            )
+
+        from_status = job['status']
+        to_status = payload.to_status
+        if to_status not in ALLOWED_TRANSITIONS.get(from_status, set()):
+            raise HTTPException(status_code=409, detail=f'invalid transition: {from_status} -> {to_status}')
+
+        changes: Dict[str, Any] = {'status': to_status, 'updated_at': cls._utc_now()}
+        if to_status == 'FAILED':
+            changes['last_error'] = (payload.last_error or '')[:2000]
+        if to_status == 'PENDING' and from_status == 'FAILED':
+            if job['retry_count'] >= settings.max_retry:
+                raise HTTPException(
+                    status_code=409, detail=f'exceed max retry ({settings.max_retry}), move to DLQ instead'
+                )
+            changes['retry_count'] = job['retry_count'] + 1
+        if to_status == 'PENDING' and from_status == 'DLQ':
+            # 人工补偿重新开始计数
+            changes['retry_count'] = 0
+
+        updated = await store.compare_and_set(workflow_job_id, job['version'], from_status, changes)
+        if updated is None:
+            raise HTTPException(status_code=409, detail='workflow job modified concurrently, reload and retry')
+        await WorkflowStatusCache.put(updated)
+        logger.info(
+            f'workflow transition: job_id={workflow_job_id}, {from_status} -> {to_status}, version={updated["version"]}'
+        )
+        return cls._build_response(updated)
+
+    @classmethod
+    async def list_workflow_steps(cls, workflow_job_id: str) -> List[WorkflowStepResponse]:
+        if not await cls.get_store().get(workflow_job_id):
+            raise HTTPException(status_code=404, detail='workflow job not found')
+        return [cls.build_step_response(step) for step in await cls.get_store().list_steps(workflow_job_id)]
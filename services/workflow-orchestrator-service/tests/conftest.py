@@ -0,0 +1,74 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+# 测试不依赖真实 PostgreSQL/Redis：数据库走临时 SQLite 文件，Redis 由 fakeredis 提供；需在导入 app 之前设置
+os.environ.setdefault('WORKFLOW_DB_URL', 'sqlite+aiosqlite://')
+os.environ.setdefault('WORKFLOW_STORE_BACKEND', 'memory')
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import fakeredis  # noqa: E402
+from sqlalchemy import BigInteger, event  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+from app.core.settings import settings  # noqa: E402
+from app.infrastructure import database  # noqa: E402
+from app.infrastructure.status_cache import _SET_IF_NEWER_SCRIPT, WorkflowStatusCache  # noqa: E402
+from app.models import workflow_models  # noqa: E402,F401
+from app.repositories import workflow_store  # noqa: E402
+from app.services.dag_engine import DagEngine  # noqa: E402
+from app.services.workflow_service import WorkflowService  # noqa: E402
+
+
+@compiles(BigInteger, 'sqlite')
+def _compile_big_integer_sqlite(type_, compiler, **kw):
+    # SQLite 仅 INTEGER PRIMARY KEY 自增
+    return 'INTEGER'
+
+
+@pytest.fixture(params=['memory', 'sql'])
+def run_with_store(request, tmp_path, monkeypatch):
+    """
+    在独立事件循环中为 WorkflowService 装配存储（内存 / SQLite 上的 SqlWorkflowStore）与 fakeredis 后执行用例协程。
+
+    用例协程签名为 ``async def scenario(redis_client)``。
+    """
+
+    def _run(scenario):
+        async def _main():
+            redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+            monkeypatch.setattr(WorkflowStatusCache, '_redis', redis_client)
+            monkeypatch.setattr(WorkflowStatusCache, '_set_if_newer', redis_client.register_script(_SET_IF_NEWER_SCRIPT))
+            monkeypatch.setattr(DagEngine, '_redis', redis_client)
+            monkeypatch.setattr(DagEngine, '_latency_samples', {})
+            engine = None
+            if request.param == 'sql':
+                engine = create_async_engine(f'sqlite+aiosqlite:///{tmp_path / "main.db"}')
+
+                @event.listens_for(engine.sync_engine, 'connect')
+                def _attach_schema(dbapi_connection, _):
+                    cursor = dbapi_connection.cursor()
+                    cursor.execute(f"ATTACH DATABASE '{tmp_path / 'schema.db'}' AS {settings.db_schema}")
+                    cursor.close()
+
+                monkeypatch.setattr(
+                    workflow_store, 'session_local', async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+                )
+                async with engine.begin() as conn:
+                    await conn.run_sync(database.Base.metadata.create_all)
+                store = workflow_store.SqlWorkflowStore()
+            else:
+                store = workflow_store.InMemoryWorkflowStore()
+            monkeypatch.setattr(WorkflowService, '_store', store)
+            try:
+                return await scenario(redis_client)
+            finally:
+                if engine is not None:
+                    await engine.dispose()
+
+        return asyncio.run(_main())
+
+    return _run
+
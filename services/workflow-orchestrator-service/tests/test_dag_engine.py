@@ -0,0 +1,220 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from app.core.settings import settings
+from app.schemas.workflow import WorkflowCreateRequest, WorkflowTransitionRequest
+from app.services.dag_engine import DEFAULT_DAG, DagEngine
+from app.services.workflow_service import WorkflowService
+
+
+async def _start() -> str:
+    job = await WorkflowService.create_workflow_job(WorkflowCreateRequest(dataset_id='ds1'))
+    await DagEngine.start_workflow(job.workflow_job_id)
+    return job.workflow_job_id
+
+
+async def _steps(workflow_job_id: str) -> dict:
+    return {step['step_name']: step for step in await WorkflowService.get_store().list_steps(workflow_job_id)}
+
+
+async def _complete(workflow_job_id: str, step_name: str, status: str = 'SUCCEEDED', attempt: int | None = None):
+    step = (await _steps(workflow_job_id))[step_name]
+    await DagEngine.handle_step_event(
+        {
+            'workflow_job_id': workflow_job_id,
+            'step_name': step_name,
+            'attempt': str(step['attempt'] if attempt is None else attempt),
+            'status': status,
+            'error': f'{step_name} error',
+        }
+    )
+
+
+def _dispatched(steps: dict) -> set:
+    return {name for name, step in steps.items() if step['status'] == 'DISPATCHED'}
+
+
+async def _dispatch_count(redis_client, step_name: str) -> int:
+    return await redis_client.xlen(f'{settings.step_stream_prefix}{step_name}')
+
+
+def test_start_dispatches_independent_steps_in_parallel(run_with_store):
+    async def scenario(redis_client):
+        workflow_job_id = await _start()
+
+        steps = await _steps(workflow_job_id)
+        assert set(steps) == {spec.name for spec in DEFAULT_DAG}
+        assert _dispatched(steps) == {'validate', 'profile'}
+        assert await _dispatch_count(redis_client, 'validate') == 1
+        assert await _dispatch_count(redis_client, 'profile') == 1
+        assert (await WorkflowService.get_store().get(workflow_job_id))['status'] == 'RUNNING'
+
+    run_with_store(scenario)
+
+
+def test_advance_follows_dependencies_until_succeeded(run_with_store):
+    async def scenario(redis_client):
+        workflow_job_id = await _start()
+        for step_name in ('validate', 'clean', 'map', 'dedupe', 'load'):
+            await _complete(workflow_job_id, step_name)
+        # refresh_bi 还需等待 profile
+        assert _dispatched(await _steps(workflow_job_id)) == {'profile'}
+
+        await _complete(workflow_job_id, 'profile')
+        assert _dispatched(await _steps(workflow_job_id)) == {'refresh_bi'}
+
+        await _complete(workflow_job_id, 'refresh_bi')
+        assert (await WorkflowService.get_store().get(workflow_job_id))['status'] == 'SUCCEEDED'
+        assert DagEngine.get_step_latency_stats()['validate']['count'] == 1
+
+    run_with_store(scenario)
+
+
+def test_stale_and_duplicate_events_are_ignored(run_with_store):
+    async def scenario(redis_client):
+        workflow_job_id = await _start()
+        await _complete(workflow_job_id, 'validate', attempt=0)
+        assert (await _steps(workflow_job_id))['validate']['status'] == 'DISPATCHED'
+
+        await _complete(workflow_job_id, 'validate')
+        await _complete(workflow_job_id, 'validate', attempt=1)
+        assert await _dispatch_count(redis_client, 'clean') == 1
+
+    run_with_store(scenario)
+
+
+def test_failed_step_retries_then_fails_workflow(run_with_store, monkeypatch):
+    monkeypatch.setattr(settings, 'step_max_retries', 1)
+
+    async def scenario(redis_client):
+        workflow_job_id = await _start()
+        await _complete(workflow_job_id, 'validate', status='FAILED')
+        validate = (await _steps(workflow_job_id))['validate']
+        assert (validate['status'], validate['attempt']) == ('DISPATCHED', 2)
+        assert await _dispatch_count(redis_client, 'validate') == 2
+
+        await _complete(workflow_job_id, 'validate', status='FAILED')
+        assert (await _steps(workflow_job_id))['validate']['status'] == 'FAILED'
+        job = await WorkflowService.get_store().get(workflow_job_id)
+        assert job['status'] == 'FAILED'
+        assert 'step validate failed' in job['last_error']
+
+        # 工作流已失败，并行分支完成后不再推进
+        await _complete(workflow_job_id, 'profile')
+        assert await _dispatch_count(redis_client, 'refresh_bi') == 0
+
+    run_with_store(scenario)
+
+
+def test_timeout_redispatches_overdue_step(run_with_store, monkeypatch):
+    async def scenario(redis_client):
+        workflow_job_id = await _start()
+        now = DagEngine._utc_now()
+        monkeypatch.setattr(
+            DagEngine, '_utc_now', staticmethod(lambda: now + timedelta(seconds=settings.step_timeout_seconds + 1))
+        )
+
+        assert await DagEngine.check_timeouts() == 2
+        steps = await _steps(workflow_job_id)
+        assert steps['validate']['attempt'] == 2
+        assert 'timeout' in steps['validate']['last_error']
+
+    run_with_store(scenario)
+
+
+def test_start_failure_marks_workflow_failed_and_can_restart(run_with_store, monkeypatch):
+    async def scenario(redis_client):
+        job = await WorkflowService.create_workflow_job(WorkflowCreateRequest(dataset_id='ds1'))
+        workflow_job_id = job.workflow_job_id
+        xadd = redis_client.xadd
+
+        async def failing_xadd(*args, **kwargs):
+            raise ConnectionError('redis down')
+
+        monkeypatch.setattr(redis_client, 'xadd', failing_xadd)
+        with pytest.raises(ConnectionError):
+            await DagEngine.start_workflow(workflow_job_id)
+        job = await WorkflowService.get_store().get(workflow_job_id)
+        assert job['status'] == 'FAILED'
+        assert 'workflow start failed' in job['last_error']
+
+        monkeypatch.setattr(redis_client, 'xadd', xadd)
+        await WorkflowService.transition_workflow_job(workflow_job_id, WorkflowTransitionRequest(to_status='PENDING'))
+        await DagEngine.start_workflow(workflow_job_id)
+        assert (await WorkflowService.get_store().get(workflow_job_id))['status'] == 'RUNNING'
+        # 占位成功但未投递的步骤保持 DISPATCHED，由超时检查重新派发
+        assert _dispatched(await _steps(workflow_job_id)) == {'validate', 'profile'}
+
+    run_with_store(scenario)
+
+
+def test_restart_after_step_failure_resets_only_failed_steps(run_with_store, monkeypatch):
+    monkeypatch.setattr(settings, 'step_max_retries', 0)
+
+    async def scenario(redis_client):
+        workflow_job_id = await _start()
+        await _complete(workflow_job_id, 'profile')
+        await _complete(workflow_job_id, 'validate', status='FAILED')
+        assert (await WorkflowService.get_store().get(workflow_job_id))['status'] == 'FAILED'
+
+        await WorkflowService.transition_workflow_job(workflow_job_id, WorkflowTransitionRequest(to_status='PENDING'))
+        await DagEngine.start_workflow(workflow_job_id)
+
+        steps = await _steps(workflow_job_id)
+        assert steps['profile']['status'] == 'SUCCEEDED'
+        assert (steps['validate']['status'], steps['validate']['attempt']) == ('DISPATCHED', 1)
+        assert await _dispatch_count(redis_client, 'profile') == 1
+
+    run_with_store(scenario)
+
+
+def test_restarted_engine_handles_its_own_unacked_events_first(run_with_store, monkeypatch):
+    monkeypatch.setattr(settings, 'engine_block_ms', 10)
+
+    async def scenario(redis_client):
+        workflow_job_id = await _start()
+        await DagEngine._ensure_group()
+        step = (await _steps(workflow_job_id))['validate']
+        await redis_client.xadd(
+            settings.step_event_stream_key,
+            {
+                'workflow_job_id': workflow_job_id,
+                'step_name': 'validate',
+                'attempt': str(step['attempt']),
+                'status': 'SUCCEEDED',
+                'error': '',
+            },
+        )
+        # 上次运行已投递给本 consumer 但退出前未 ACK
+        await redis_client.xreadgroup(
+            settings.engine_consumer_group,
+            settings.engine_consumer_name,
+            {settings.step_event_stream_key: '>'},
+        )
+
+        xreadgroup = redis_client.xreadgroup
+
+        async def yielding_xreadgroup(*args, **kwargs):
+            # fakeredis 的阻塞读取不会让出事件循环
+            response = await xreadgroup(*args, **kwargs)
+            if not response or not any(messages for _, messages in response):
+                await asyncio.sleep(kwargs.get('block', 0) / 1000)
+            return response
+
+        monkeypatch.setattr(redis_client, 'xreadgroup', yielding_xreadgroup)
+        task = asyncio.create_task(DagEngine.run_forever())
+        try:
+            for _ in range(200):
+                pending = await redis_client.xpending(settings.step_event_stream_key, settings.engine_consumer_group)
+                if pending['pending'] == 0:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            task.cancel()
+
+        assert pending['pending'] == 0
+        assert (await _steps(workflow_job_id))['validate']['status'] == 'SUCCEEDED'
+
+    run_with_store(scenario)
@@ -0,0 +1,137 @@
+import pytest
+from fastapi import HTTPException
+
+from app.core.settings import settings
+from app.infrastructure.status_cache import WorkflowStatusCache
+from app.schemas.workflow import WorkflowCreateRequest, WorkflowTransitionRequest
+from app.services.workflow_service import WorkflowService
+
+
+async def _create(dataset_id: str = 'ds1') -> str:
+    job = await WorkflowService.create_workflow_job(WorkflowCreateRequest(dataset_id=dataset_id))
+    return job.workflow_job_id
+
+
+async def _transition(workflow_job_id: str, to_status: str, **kwargs):
+    return await WorkflowService.transition_workflow_job(
+        workflow_job_id, WorkflowTransitionRequest(to_status=to_status, **kwargs)
+    )
+
+
+def test_transition_increments_version_and_refreshes_cache(run_with_store):
+    async def scenario(redis_client):
+        workflow_job_id = await _create()
+        running = await _transition(workflow_job_id, 'RUNNING', expected_version=1)
+        failed = await _transition(workflow_job_id, 'FAILED', last_error='boom')
+
+        assert (running.version, failed.version) == (2, 3)
+        assert failed.last_error == 'boom'
+        cached = await redis_client.hgetall(f'{settings.status_cache_key_prefix}{workflow_job_id}')
+        assert cached['status'] == 'FAILED'
+        assert cached['version'] == '3'
+
+    run_with_store(scenario)
+
+
+def test_stale_expected_version_and_invalid_transition_conflict(run_with_store):
+    async def scenario(redis_client):
+        workflow_job_id = await _create()
+        await _transition(workflow_job_id, 'RUNNING')
+
+        with pytest.raises(HTTPException) as exc_info:
+            await _transition(workflow_job_id, 'SUCCEEDED', expected_version=1)
+        assert exc_info.value.status_code == 409
+        assert 'version conflict' in exc_info.value.detail
+
+        with pytest.raises(HTTPException) as exc_info:
+            await _transition(workflow_job_id, 'PENDING')
+        assert exc_info.value.status_code == 409
+        assert 'invalid transition' in exc_info.value.detail
+
+        assert (await WorkflowService.get_store().get(workflow_job_id))['version'] == 2
+
+    run_with_store(scenario)
+
+
+def test_concurrent_modification_between_read_and_write_conflicts(run_with_store):
+    async def scenario(redis_client):
+        workflow_job_id = await _create()
+        store = WorkflowService.get_store()
+        stale = await store.get(workflow_job_id)
+        # 另一副本在本次读取之后已完成状态变更
+        await _transition(workflow_job_id, 'RUNNING')
+
+        assert await store.compare_and_set(workflow_job_id, stale['version'], 'PENDING', {'status': 'RUNNING'}) is None
+
+        async def stale_get(_):
+            return dict(stale)
+
+        original_get = store.get
+        store.get = stale_get
+        try:
+            with pytest.raises(HTTPException) as exc_info:
+                await _transition(workflow_job_id, 'RUNNING')
+        finally:
+            store.get = original_get
+        assert exc_info.value.status_code == 409
+        assert 'modified concurrently' in exc_info.value.detail
+        assert (await store.get(workflow_job_id))['version'] == 2
+
+    run_with_store(scenario)
+
+
+def test_retry_count_limit_and_dlq_reset(run_with_store, monkeypatch):
+    monkeypatch.setattr(settings, 'max_retry', 1)
+
+    async def scenario(redis_client):
+        workflow_job_id = await _create()
+        await _transition(workflow_job_id, 'RUNNING')
+        await _transition(workflow_job_id, 'FAILED')
+        retried = await _transition(workflow_job_id, 'PENDING')
+        assert retried.retry_count == 1
+
+        await _transition(workflow_job_id, 'RUNNING')
+        await _transition(workflow_job_id, 'FAILED')
+        with pytest.raises(HTTPException) as exc_info:
+            await _transition(workflow_job_id, 'PENDING')
+        assert exc_info.value.status_code == 409
+
+        await _transition(workflow_job_id, 'DLQ')
+        reset = await _transition(workflow_job_id, 'PENDING')
+        assert reset.retry_count == 0
+
+    run_with_store(scenario)
+
+
+def test_older_version_does_not_overwrite_cache(run_with_store):
+    async def scenario(redis_client):
+        workflow_job_id = await _create()
+        stale = await WorkflowService.get_store().get(workflow_job_id)
+        await _transition(workflow_job_id, 'RUNNING')
+
+        # 乱序到达的旧版本回写被忽略
+        await WorkflowStatusCache.put(stale)
+        status = await WorkflowService.get_workflow_job_status(workflow_job_id)
+        assert (status.status, status.version) == ('RUNNING', 2)
+
+    run_with_store(scenario)
+
+
+def test_list_filters_and_pages_newest_first(run_with_store):
+    async def scenario(redis_client):
+        job_ids = [await _create('ds1') for _ in range(3)]
+        await _create('ds2')
+
+        page = await WorkflowService.list_workflow_jobs('ds1', None, 1, 2)
+        assert page.total == 3
+        assert page.has_next is True
+        assert len(page.rows) == 2
+        assert {row.workflow_job_id for row in page.rows} <= set(job_ids)
+        created_at = [row.created_at for row in page.rows]
+        assert created_at == sorted(created_at, reverse=True)
+
+        await _transition(job_ids[0], 'RUNNING')
+        running = await WorkflowService.list_workflow_jobs(None, 'RUNNING', 1, 10)
+        assert [row.workflow_job_id for row in running.rows] == [job_ids[0]]
+
+    run_with_store(scenario)